@@ -0,0 +1,156 @@
+"""
+analytics/amortization.py
+Loan amortization for a grid of scenarios in one array computation.
+
+Scenarios are broadcast arrays of (principal, annual rate, term, extra
+monthly payment, offset balance). The scheduled payment is the standard
+annuity for the rate and term; the extra payment is added on top, and
+interest is charged on the balance net of the offset account.
+
+While the balance is above the offset, each month is
+B[k] = (1 + r) B[k-1] - c with c = payment + extra + r * offset, so
+
+    B[k] = (1 + r)^k (B0 - c / r) + c / r
+
+and once it falls below the offset no interest accrues and it drops by
+payment + extra a month. Balances for every scenario and month are
+evaluated directly from these expressions (scenarios x months arrays);
+nothing iterates month by month.
+"""
+
+from itertools import product
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+SUMMARY_COLUMNS = [
+    "principal", "annual_rate", "years", "extra_payment", "offset_balance", "monthly_payment",
+    "months", "total_interest", "total_paid", "interest_saved", "months_saved",
+]
+
+
+def monthly_payment(principal, annual_rate, months):
+    """Annuity payment repaying principal over months at annual_rate (arrays broadcast)."""
+    principal, rate, months = np.broadcast_arrays(
+        np.asarray(principal, dtype=np.float64),
+        np.asarray(annual_rate, dtype=np.float64) / 12,
+        np.asarray(months, dtype=np.float64),
+    )
+    safe = np.where(rate == 0, 1.0, rate)
+    annuity = principal * safe / (1 - (1 + safe) ** -months)
+    return np.where(rate == 0, principal / months, annuity)
+
+
+def scenario_grid(
+    principal: float,
+    annual_rates: Iterable[float],
+    years: Iterable[int],
+    extra_payments: Iterable[float] = (0.0,),
+    offset_balances: Iterable[float] = (0.0,),
+) -> pd.DataFrame:
+    """Every combination of rate, term, extra payment and offset for one principal."""
+    grid = pd.DataFrame(
+        list(product(annual_rates, years, extra_payments, offset_balances)),
+        columns=["annual_rate", "years", "extra_payment", "offset_balance"],
+    )
+    grid.insert(0, "principal", float(principal))
+    return grid
+
+
+def _balances(principal, rate, payment, extra, offset, max_months: int) -> np.ndarray:
+    """Unfloored balance after months 0..max_months, scenarios x (max_months + 1)."""
+    k = np.arange(max_months + 1, dtype=np.float64)[None, :]
+    B0, r, pay = principal[:, None], rate[:, None], (payment + extra)[:, None]
+    offset = offset[:, None]
+    c = pay + r * offset
+    safe = np.where(r == 0, 1.0, r)
+    with np.errstate(over="ignore", invalid="ignore"):
+        grown = np.where(r == 0, B0 - k * c, (1 + safe) ** k * (B0 - c / safe) + c / safe)
+
+    # Month at which the balance first drops below the offset; linear from there
+    below = grown < offset
+    k1 = np.where(below.any(axis=1), below.argmax(axis=1), max_months)[:, None]
+    at_k1 = np.take_along_axis(grown, k1, axis=1)
+    return np.where(k <= k1, grown, at_k1 - (k - k1) * pay)
+
+
+def amortize(
+    principal,
+    annual_rate,
+    years,
+    extra_payment=0.0,
+    offset_balance=0.0,
+    schedules: bool = False,
+) -> Tuple[pd.DataFrame, Optional[pd.DataFrame]]:
+    """
+    Amortize every scenario (arguments broadcast against each other).
+
+    Args:
+        principal: Loan amount
+        annual_rate: Annual interest rate as a fraction (0.06 = 6%)
+        years: Term in years
+        extra_payment: Monthly payment on top of the scheduled payment
+        offset_balance: Offset account balance (interest is charged on balance - offset)
+        schedules: Also return every scenario's monthly schedule
+
+    Returns:
+        (summary with SUMMARY_COLUMNS, one row per scenario;
+         long schedule with scenario, month, interest, principal_paid, balance, or None)
+        interest_saved / months_saved compare with the same loan without extra
+        payments or offset.
+    """
+    P, rate, yrs, extra, offset = (
+        a.ravel() for a in np.broadcast_arrays(
+            np.asarray(principal, dtype=np.float64), np.asarray(annual_rate, dtype=np.float64),
+            np.asarray(years, dtype=np.float64), np.asarray(extra_payment, dtype=np.float64),
+            np.asarray(offset_balance, dtype=np.float64),
+        )
+    )
+    term = np.round(yrs * 12).astype(np.int64)
+    r = rate / 12
+    payment = monthly_payment(P, rate, term)
+    max_months = int(term.max()) if len(term) else 0
+
+    B = _balances(P, r, payment, extra, offset, max_months)
+    months = np.arange(1, max_months + 1)[None, :]
+    paid_off = B[:, 1:] <= 1e-9
+    payoff = np.where(paid_off.any(axis=1), paid_off.argmax(axis=1) + 1, term)
+    active = months <= payoff[:, None]
+
+    interest = np.where(active, r[:, None] * np.maximum(B[:, :-1] - offset[:, None], 0.0), 0.0)
+    total_interest = interest.sum(axis=1)
+    baseline_interest = payment * term - P
+
+    summary = pd.DataFrame({
+        "principal": P,
+        "annual_rate": rate,
+        "years": yrs,
+        "extra_payment": extra,
+        "offset_balance": offset,
+        "monthly_payment": payment,
+        "months": payoff,
+        "total_interest": total_interest,
+        "total_paid": P + total_interest,
+        "interest_saved": baseline_interest - total_interest,
+        "months_saved": term - payoff,
+    })
+
+    schedule = None
+    if schedules:
+        scenario, month = np.nonzero(active)
+        schedule = pd.DataFrame({
+            "scenario": scenario,
+            "month": month + 1,
+            "interest": interest[scenario, month],
+            "principal_paid": payment[scenario] - interest[scenario, month] + extra[scenario],
+            "balance": np.maximum(B[scenario, month + 1], 0.0),
+        })
+    return summary, schedule
+
+
+def schedule(principal: float, annual_rate: float, years: int, extra_payment: float = 0.0,
+             offset_balance: float = 0.0) -> pd.DataFrame:
+    """Monthly schedule (month, interest, principal_paid, balance) of a single loan."""
+    _, rows = amortize(principal, annual_rate, years, extra_payment, offset_balance, schedules=True)
+    return rows.drop(columns="scenario")
@@ -0,0 +1,98 @@
+"""
+analytics/attribution.py
+Daily return attribution over a range of dates in one pass.
+
+Inputs are aligned dates x symbols frames: the portfolio weights held on
+each date (NaN where the symbol is not in that day's universe) and the
+symbols' returns on that date. Per-holding contribution is w * r; the
+Brinson-Fachler decomposition against a benchmark is computed by sector
+through a symbols x sectors membership matrix S:
+
+    sector weight     wp = W @ S,            wb = B @ S
+    sector return     rp = ((W * R) @ S) / wp,  rb = ((B * R) @ S) / wb
+    allocation        (wp - wb) * (rb - Rb)
+    selection         wb * (rp - rb)
+    interaction       (wp - wb) * (rp - rb)
+
+where Rb is the total benchmark return. The default benchmark is equal
+weight across the day's universe. With fully invested weights the three
+effects sum to the active return Rp - Rb. Missing returns count as 0.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+UNKNOWN_SECTOR = "Unknown"
+
+SECTOR_COLUMNS = [
+    "as_of", "sector", "portfolio_weight", "benchmark_weight", "portfolio_return",
+    "benchmark_return", "allocation", "selection", "interaction",
+]
+
+
+def equal_weight_benchmark(weights: pd.DataFrame) -> pd.DataFrame:
+    """Equal weight across each date's universe (the symbols with a non-NaN weight)."""
+    universe = weights.notna().astype(np.float64)
+    return universe.div(universe.sum(axis=1).replace(0, np.nan), axis=0).fillna(0.0)
+
+
+def contributions(weights: pd.DataFrame, returns: pd.DataFrame) -> pd.DataFrame:
+    """Per-holding contribution w * r, dates x symbols."""
+    return weights.fillna(0.0) * returns.reindex_like(weights).fillna(0.0)
+
+
+def sector_attribution(
+    weights: pd.DataFrame,
+    returns: pd.DataFrame,
+    sectors: Dict[str, str],
+    benchmark: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    Brinson-Fachler allocation, selection and interaction by date and sector.
+
+    Args:
+        weights: Portfolio weights, dates x symbols (NaN = not in the universe that day)
+        returns: Symbol returns on each date, same shape (reindexed to weights)
+        sectors: symbol -> sector (missing symbols are UNKNOWN_SECTOR)
+        benchmark: Benchmark weights like weights (default equal_weight_benchmark)
+
+    Returns:
+        Long frame of SECTOR_COLUMNS, one row per date and sector present in
+        the portfolio or the benchmark
+    """
+    if benchmark is None:
+        benchmark = equal_weight_benchmark(weights)
+    W = weights.fillna(0.0).to_numpy(dtype=np.float64)
+    B = benchmark.reindex_like(weights).fillna(0.0).to_numpy(dtype=np.float64)
+    R = returns.reindex_like(weights).fillna(0.0).to_numpy(dtype=np.float64)
+
+    labels = pd.Index([sectors.get(s) or UNKNOWN_SECTOR for s in weights.columns])
+    codes, names = pd.factorize(labels)
+    S = np.zeros((len(labels), len(names)))
+    S[np.arange(len(labels)), codes] = 1.0
+
+    wp, wb = W @ S, B @ S
+    cp, cb = (W * R) @ S, (B * R) @ S
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rb = np.where(wb != 0, cb / wb, 0.0)
+        # A sector the portfolio does not hold has no selection effect
+        rp = np.where(wp != 0, cp / wp, rb)
+    Rb = cb.sum(axis=1, keepdims=True)
+
+    effects = {
+        "portfolio_weight": wp,
+        "benchmark_weight": wb,
+        "portfolio_return": rp,
+        "benchmark_return": rb,
+        "allocation": (wp - wb) * (rb - Rb),
+        "selection": wb * (rp - rb),
+        "interaction": (wp - wb) * (rp - rb),
+    }
+    present = (wp != 0) | (wb != 0)
+    date_idx, sector_idx = np.nonzero(present)
+    out = pd.DataFrame({name: values[present] for name, values in effects.items()})
+    out.insert(0, "sector", names[sector_idx])
+    out.insert(0, "as_of", weights.index[date_idx])
+    return out[SECTOR_COLUMNS]
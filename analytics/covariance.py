@@ -0,0 +1,259 @@
+"""
+analytics/covariance.py
+Universe return covariance, estimated once per (as_of, lookback, method)
+and served to any subset of symbols by slicing.
+
+Every estimator here is exactly a factor-plus-diagonal matrix
+
+    cov = B @ B.T + diag(d)
+
+where B (symbols x dates, float32) is the scaled, de-meaned return window
+and d is a diagonal term (zero for the sample and EWMA estimators, the
+shrinkage target for Ledoit-Wolf). Storing B and d instead of the N x N
+matrix keeps the cache small (N x lookback floats), and a portfolio
+variance w' cov w is |B_s' w|^2 + sum(d_s w^2) over the held rows only.
+Nothing O(N^2 T) runs after the estimate.
+
+Methods:
+    sample       unbiased sample covariance (np.cov)
+    ledoit_wolf  shrinkage toward a scaled identity (Ledoit & Wolf 2004,
+                 the same estimate as sklearn.covariance.LedoitWolf)
+    ewma         exponentially weighted, half-life in dates
+
+The cache key is (as_of, lookback, method, halflife) plus an optional
+fingerprint of the inputs, so a restatement of the window's prices is a new
+key rather than a stale hit. At most COVARIANCE_CACHE_MAX_FILES .npz files
+are kept on disk; the least recently used are deleted past that.
+
+Missing returns: symbols with less than min_coverage of the window are
+dropped; remaining gaps are filled with the symbol's mean (they add no
+co-movement).
+"""
+
+import glob
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+COVARIANCE_CACHE_DIR = os.getenv("COVARIANCE_CACHE_DIR", "outputs/covariance_cache")
+COVARIANCE_CACHE_MAX_FILES = int(os.getenv("COVARIANCE_CACHE_MAX_FILES", "32"))
+COVARIANCE_MIN_COVERAGE = float(os.getenv("COVARIANCE_MIN_COVERAGE", "0.8"))
+METHODS = ("sample", "ledoit_wolf", "ewma")
+
+
+class FactorCovariance:
+    """cov = B B' + diag(d) over a fixed symbol list."""
+
+    def __init__(self, symbols: Sequence[str], loadings: np.ndarray, diag: np.ndarray, meta: Optional[Dict] = None):
+        self.symbols = list(symbols)
+        self.loadings = np.asarray(loadings, dtype=np.float32)
+        self.diag = np.asarray(diag, dtype=np.float32)
+        self.meta = dict(meta or {})
+        self._pos = {s: i for i, s in enumerate(self.symbols)}
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._pos
+
+    def covered(self, symbols: Sequence[str]) -> List[str]:
+        """The symbols that have a row in this matrix, in the given order."""
+        return [s for s in symbols if s in self._pos]
+
+    def _rows(self, symbols: Sequence[str]) -> np.ndarray:
+        return np.array([self._pos[s] for s in symbols], dtype=np.int64)
+
+    def matrix(self, symbols: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Dense covariance for symbols (default: all), as float64."""
+        symbols = self.symbols if symbols is None else list(symbols)
+        rows = self._rows(symbols)
+        B = self.loadings[rows].astype(np.float64)
+        cov = B @ B.T
+        cov[np.diag_indices_from(cov)] += self.diag[rows]
+        return pd.DataFrame(cov, index=symbols, columns=symbols)
+
+    def variances(self, symbols: Optional[Sequence[str]] = None) -> pd.Series:
+        symbols = self.symbols if symbols is None else list(symbols)
+        rows = self._rows(symbols)
+        B = self.loadings[rows].astype(np.float64)
+        return pd.Series(np.einsum("ij,ij->i", B, B) + self.diag[rows], index=symbols)
+
+    def portfolio_variance(self, weights: pd.Series) -> float:
+        """w' cov w for weights indexed by symbol (symbols outside the matrix must be dropped first)."""
+        rows = self._rows(list(weights.index))
+        w = weights.to_numpy(dtype=np.float64)
+        exposure = self.loadings[rows].astype(np.float64).T @ w
+        return float(exposure @ exposure + (self.diag[rows] * w * w).sum())
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp.npz"
+        np.savez(
+            tmp, symbols=np.array(self.symbols, dtype=object), loadings=self.loadings, diag=self.diag,
+            meta_keys=np.array(list(self.meta), dtype=object),
+            meta_values=np.array([str(v) for v in self.meta.values()], dtype=object),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "FactorCovariance":
+        with np.load(path, allow_pickle=True) as f:
+            meta = dict(zip(f["meta_keys"].tolist(), f["meta_values"].tolist()))
+            return cls(f["symbols"].tolist(), f["loadings"], f["diag"], meta)
+
+
+def _ledoit_wolf_shrinkage(X: np.ndarray) -> float:
+    """Optimal shrinkage of XX'/T toward mu*I for centred X (T x N), without forming the N x N matrix."""
+    T, N = X.shape
+    X2 = X ** 2
+    emp_trace = X2.sum(axis=0) / T
+    mu = emp_trace.sum() / N
+    gram = X @ X.T  # T x T; |X'X|_F = |XX'|_F
+    delta_ = (gram ** 2).sum() / T ** 2
+    beta_ = (X2.sum(axis=1) ** 2).sum()
+    beta = (beta_ / T - delta_) / (N * T)
+    delta = (delta_ - 2 * mu * emp_trace.sum() + N * mu ** 2) / N
+    beta = min(beta, delta)
+    return 0.0 if beta == 0 else float(beta / delta)
+
+
+def estimate(
+    returns: pd.DataFrame,
+    method: str = "sample",
+    halflife: Optional[float] = None,
+    min_coverage: float = COVARIANCE_MIN_COVERAGE,
+) -> FactorCovariance:
+    """
+    Covariance of daily returns (dates x symbols) as a FactorCovariance.
+
+    Args:
+        returns: Return window, NaN where missing
+        method: "sample", "ledoit_wolf" or "ewma"
+        halflife: EWMA half-life in dates (ewma only; default a quarter of the window)
+        min_coverage: Minimum fraction of dates with a return to keep a symbol
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown covariance method {method!r}; expected one of {METHODS}")
+
+    returns = returns.dropna(how="all")
+    keep = returns.notna().sum() >= max(2, min_coverage * len(returns))
+    R = returns.loc[:, keep].to_numpy(dtype=np.float64)
+    symbols = list(returns.columns[keep])
+    T, N = R.shape
+    meta = {"method": method, "dates": T}
+    if N == 0 or T < 2:
+        return FactorCovariance(symbols, np.zeros((N, 0)), np.zeros(N), meta)
+
+    valid = np.isfinite(R)
+    if method == "ewma":
+        halflife = halflife or max(1.0, T / 4)
+        meta["halflife"] = halflife
+        w = 0.5 ** (np.arange(T)[::-1] / halflife)
+        w = w[:, None] * valid
+        w = w / w.sum(axis=0)
+        mean = (np.where(valid, R, 0.0) * w).sum(axis=0)
+        X = np.where(valid, R - mean, 0.0) * np.sqrt(w)
+        return FactorCovariance(symbols, X.T, np.zeros(N), meta)
+
+    mean = np.where(valid, R, 0.0).sum(axis=0) / valid.sum(axis=0)
+    X = np.where(valid, R - mean, 0.0)
+    if method == "sample":
+        return FactorCovariance(symbols, X.T / np.sqrt(T - 1), np.zeros(N), meta)
+
+    shrinkage = _ledoit_wolf_shrinkage(X)
+    mu = (X ** 2).sum() / (T * N)
+    meta["shrinkage"] = shrinkage
+    return FactorCovariance(symbols, X.T * np.sqrt((1 - shrinkage) / T), np.full(N, shrinkage * mu), meta)
+
+
+class CovarianceCache:
+    """In-process (and optionally on-disk) FactorCovariance per (as_of, lookback, method, halflife, fingerprint)."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = COVARIANCE_CACHE_DIR,
+        max_entries: int = 8,
+        max_files: int = COVARIANCE_CACHE_MAX_FILES,
+    ):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_files = max_files
+        self._entries: "OrderedDict[str, FactorCovariance]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        as_of: date, lookback: int, method: str, halflife: Optional[float] = None, fingerprint: Optional[str] = None,
+    ) -> str:
+        suffix = f"_hl{halflife:g}" if method == "ewma" and halflife else ""
+        if fingerprint:
+            suffix += "_" + hashlib.sha1(str(fingerprint).encode()).hexdigest()[:12]
+        return f"{as_of.isoformat()}_{lookback}_{method}{suffix}"
+
+    def get(
+        self,
+        as_of: date,
+        lookback: int,
+        load_returns: Callable[[], pd.DataFrame],
+        method: str = "sample",
+        halflife: Optional[float] = None,
+        fingerprint: Optional[str] = None,
+    ) -> FactorCovariance:
+        """
+        The universe covariance for (as_of, lookback, method), estimating it on first use.
+
+        Args:
+            as_of: Last date of the window
+            lookback: Window length in trading days
+            load_returns: Called only on a miss; dates x symbols returns ending at as_of
+            method: Estimator (see estimate)
+            halflife: EWMA half-life
+            fingerprint: Identifies the input data (e.g. row count and checksum of
+                the price window); a changed fingerprint misses the cache
+        """
+        key = self.key(as_of, lookback, method, halflife, fingerprint)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        path = os.path.join(self.cache_dir, f"{key}.npz") if self.cache_dir else None
+        if path and os.path.exists(path):
+            cov = FactorCovariance.load(path)
+            os.utime(path)
+        else:
+            cov = estimate(load_returns().tail(lookback), method=method, halflife=halflife)
+            if path:
+                cov.save(path)
+                self._prune_files()
+
+        with self._lock:
+            self._entries[key] = cov
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cov
+
+    def _prune_files(self) -> None:
+        """Delete the least recently used cache files beyond max_files."""
+        files = [f for f in glob.glob(os.path.join(self.cache_dir, "*.npz")) if not f.endswith(".tmp.npz")]
+        files.sort(key=os.path.getmtime)
+        for path in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+covariance_cache = CovarianceCache()
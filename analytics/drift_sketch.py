@@ -0,0 +1,236 @@
+"""
+analytics/drift_sketch.py
+Fixed-bin histogram sketches for feature drift (PSI).
+
+A baseline sketch is frozen at training time: per feature, the interior
+decile edges of the training distribution and the row counts per bin. It is
+stored next to the model artifact and in the model_drift_sketches table:
+
+    models/{model}_{version}_drift_baseline.json
+
+Scoring runs bin their feature rows with the baseline's edges and add them to
+a daily sketch (counts only, so runs accumulate incrementally). Daily sketches
+live only in model_drift_sketches (kind = 'daily', one row per day), so the
+drift cron reads what the scoring cron wrote from another container.
+
+PSI for every feature is then one array expression over the (features x bins)
+count matrices. Bins are right-closed like pd.cut, and the outer bins are
+open-ended so current values outside the training range are still counted.
+"""
+
+import json
+import os
+import warnings
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from psycopg2.extras import Json
+
+DRIFT_BINS = int(os.getenv("DRIFT_BINS", "10"))
+DRIFT_SKETCH_TABLE = "model_drift_sketches"
+PSI_EPS = 1e-6
+
+# Rows binned per block when sketching large frames (rows x features x edges booleans)
+_BLOCK_ROWS = 50_000
+
+
+def baseline_path(model: str, version: str, model_dir: str = "models") -> str:
+    return os.path.join(model_dir, f"{model}_{version}_drift_baseline.json")
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _numeric(df: pd.DataFrame, features: Sequence[str]) -> np.ndarray:
+    """Feature matrix as float64; absent or non-numeric columns become NaN."""
+    out = np.full((len(df), len(features)), np.nan)
+    for j, name in enumerate(features):
+        if name in df.columns:
+            out[:, j] = pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    return out
+
+
+class DriftSketch:
+    """Per-feature bin counts over shared edges."""
+
+    def __init__(self, features: Sequence[str], edges: np.ndarray, counts: Optional[np.ndarray] = None,
+                 missing: Optional[np.ndarray] = None, meta: Optional[dict] = None):
+        self.features = list(features)
+        self.edges = np.asarray(edges, dtype=np.float64)  # (features, bins - 1) interior edges
+        n_bins = self.edges.shape[1] + 1
+        self.counts = np.zeros((len(self.features), n_bins), dtype=np.int64) if counts is None \
+            else np.asarray(counts, dtype=np.int64)
+        self.missing = np.zeros(len(self.features), dtype=np.int64) if missing is None \
+            else np.asarray(missing, dtype=np.int64)
+        self.meta = dict(meta or {})
+
+    @classmethod
+    def from_baseline(cls, df: pd.DataFrame, features: Sequence[str], bins: int = DRIFT_BINS, **meta) -> "DriftSketch":
+        """Freeze a baseline: decile edges of df's features and their counts."""
+        values = _numeric(df, features)
+        values[~np.isfinite(values)] = np.nan
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN features have no edges
+            edges = np.nanquantile(values, np.linspace(0, 1, bins + 1)[1:-1], axis=0).T
+        sketch = cls(features, np.nan_to_num(edges, nan=0.0), meta={"kind": "baseline", **meta})
+        sketch._add(values)
+        sketch.meta["rows"] = len(df)
+        return sketch
+
+    def empty_like(self, **meta) -> "DriftSketch":
+        """A zero-count sketch on the same features and edges."""
+        return DriftSketch(self.features, self.edges, meta=meta)
+
+    def _add(self, values: np.ndarray) -> None:
+        n_features, n_bins = self.counts.shape
+        offsets = np.arange(n_features) * n_bins
+        for start in range(0, len(values), _BLOCK_ROWS):
+            block = values[start:start + _BLOCK_ROWS]
+            valid = np.isfinite(block)
+            # Right-closed bins: number of edges strictly below each value
+            bin_idx = (block[:, :, None] > self.edges[None, :, :]).sum(axis=2)
+            flat = (bin_idx + offsets)[valid]
+            self.counts += np.bincount(flat, minlength=n_features * n_bins).reshape(n_features, n_bins)
+            self.missing += (~valid).sum(axis=0)
+
+    def update(self, df: pd.DataFrame) -> "DriftSketch":
+        """Add df's feature rows (e.g. one scoring run) to the counts."""
+        self._add(_numeric(df, self.features))
+        self.meta["rows"] = int(self.meta.get("rows", 0)) + len(df)
+        return self
+
+    def compatible(self, other: "DriftSketch") -> bool:
+        """Same features binned on the same edges (e.g. not from a since-retrained baseline)."""
+        return other.features == self.features and np.array_equal(other.edges, self.edges)
+
+    def merge(self, other: "DriftSketch") -> "DriftSketch":
+        """Sum of two sketches over the same edges."""
+        if not self.compatible(other):
+            raise ValueError("Cannot merge drift sketches built on different features or edges")
+        return DriftSketch(self.features, self.edges, self.counts + other.counts, self.missing + other.missing,
+                           meta={**self.meta, "rows": int(self.meta.get("rows", 0)) + int(other.meta.get("rows", 0))})
+
+    def psi(self, current: "DriftSketch", eps: float = PSI_EPS) -> pd.Series:
+        """PSI of current against this baseline for every feature (0.0 where either side is empty)."""
+        if current.features != self.features:
+            raise ValueError("Baseline and current sketches cover different features")
+        base_n = self.counts.sum(axis=1, keepdims=True)
+        curr_n = current.counts.sum(axis=1, keepdims=True)
+        base = self.counts / np.maximum(base_n, 1)
+        curr = current.counts / np.maximum(curr_n, 1)
+        psi = (((curr + eps) - (base + eps)) * np.log((curr + eps) / (base + eps))).sum(axis=1)
+        psi = np.where((base_n[:, 0] > 0) & (curr_n[:, 0] > 0), psi, 0.0)
+        return pd.Series(psi, index=self.features, name="psi")
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        return {
+            "features": self.features,
+            "edges": self.edges.tolist(),
+            "counts": self.counts.tolist(),
+            "missing": self.missing.tolist(),
+            "meta": self.meta,
+        }
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({**self.to_dict(), "updated_at": datetime.now(timezone.utc).isoformat()}, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "DriftSketch":
+        return cls(d["features"], d["edges"], d["counts"], d["missing"], d.get("meta"))
+
+    @classmethod
+    def load(cls, path: str) -> "DriftSketch":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def save_sketch(conn, sketch: DriftSketch, model: str, version: str, kind: str = "daily",
+                day: Optional[date] = None) -> None:
+    """Upsert a sketch into model_drift_sketches (the caller commits)."""
+    with conn.cursor() as cur:
+        cur.execute(
+            f"""
+            insert into {DRIFT_SKETCH_TABLE} (model, version, kind, day, sketch, updated_at)
+            values (%s, %s, %s, %s, %s, now())
+            on conflict (model, version, kind, day) do update set
+                sketch = excluded.sketch,
+                updated_at = now()
+            """,
+            (model, version, kind, day or _today(), Json(sketch.to_dict())),
+        )
+
+
+def load_baseline(conn, model: str, version: str, model_dir: str = "models") -> Optional[DriftSketch]:
+    """The frozen baseline: next to the model artifact if present, else the latest stored one."""
+    path = baseline_path(model, version, model_dir)
+    if os.path.exists(path):
+        return DriftSketch.load(path)
+    with conn.cursor() as cur:
+        cur.execute(
+            f"""
+            select sketch from {DRIFT_SKETCH_TABLE}
+            where model = %s and version = %s and kind = 'baseline'
+            order by day desc
+            limit 1
+            """,
+            (model, version),
+        )
+        row = cur.fetchone()
+    return DriftSketch.from_dict(row[0]) if row else None
+
+
+def accumulate(conn, baseline: DriftSketch, df: pd.DataFrame, model: str, version: str,
+               day: Optional[date] = None) -> DriftSketch:
+    """Add one scoring run's feature rows to the day's stored sketch (created from the baseline's edges)."""
+    day = day or _today()
+    with conn.cursor() as cur:
+        # Row lock so concurrent runs on the same day add up instead of overwriting
+        cur.execute(
+            f"""
+            select sketch from {DRIFT_SKETCH_TABLE}
+            where model = %s and version = %s and kind = 'daily' and day = %s
+            for update
+            """,
+            (model, version, day),
+        )
+        row = cur.fetchone()
+    sketch = DriftSketch.from_dict(row[0]) if row else None
+    if sketch is None or not baseline.compatible(sketch):
+        sketch = baseline.empty_like(kind="current")
+    sketch.update(df)
+    save_sketch(conn, sketch, model, version, "daily", day)
+    return sketch
+
+
+def load_window(conn, baseline: DriftSketch, model: str, version: str, days: int,
+                end: Optional[date] = None) -> Optional[DriftSketch]:
+    """Merge the baseline-compatible daily sketches of the last `days` days (None when there are none)."""
+    end = end or _today()
+    with conn.cursor() as cur:
+        cur.execute(
+            f"""
+            select sketch from {DRIFT_SKETCH_TABLE}
+            where model = %s and version = %s and kind = 'daily'
+              and day > %s and day <= %s
+            order by day
+            """,
+            (model, version, end - timedelta(days=days), end),
+        )
+        rows = cur.fetchall()
+    merged = None
+    for (data,) in rows:
+        sketch = DriftSketch.from_dict(data)
+        if baseline.compatible(sketch):
+            merged = sketch if merged is None else merged.merge(sketch)
+    return merged
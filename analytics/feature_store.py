@@ -0,0 +1,327 @@
+"""
+analytics/feature_store.py
+Month-partitioned Parquet feature store with a manifest.
+
+Layout:
+    {FEATURE_STORE_DIR}/{dataset}/month=YYYY-MM/part-{k}.parquet
+    {FEATURE_STORE_DIR}/{dataset}/manifest.json
+
+A partition holds one file per chunk it was written from, so builders can
+stream symbol chunks without holding a whole month (or run) in memory.
+
+The manifest records, per partition, a fingerprint of the inputs it was
+built from (per-month digests of each source table over the months the
+partition depends on, plus the feature-definition version). Builders ask
+for stale_partitions() and recompute only those; readers load partitions
+lazily with column projection and date filters (pyarrow.dataset).
+"""
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+FEATURE_STORE_DIR = os.getenv("FEATURE_STORE_DIR", "outputs/feature_store")
+
+# Partition dependency on a source's monthly digests:
+#   (months_before, months_after) -> digests for [M - before, M + after]
+#   "cumulative"                   -> digests for every month <= M
+Window = Union[Tuple[int, int], str]
+
+
+def month_key(dates) -> pd.Series:
+    """YYYY-MM partition key for each date."""
+    return pd.to_datetime(pd.Series(dates)).dt.strftime("%Y-%m")
+
+
+def month_range(start_date, end_date) -> List[str]:
+    """Partition keys covering [start_date, end_date]."""
+    return [p.strftime("%Y-%m") for p in pd.period_range(pd.Timestamp(start_date), pd.Timestamp(end_date), freq="M")]
+
+
+def shift_month(month: str, n: int) -> str:
+    return (pd.Period(month, freq="M") + n).strftime("%Y-%m")
+
+
+def contiguous_runs(months: Sequence[str]) -> List[List[str]]:
+    """Split sorted partition keys into runs of consecutive months."""
+    runs: List[List[str]] = []
+    for month in sorted(months):
+        if runs and shift_month(runs[-1][-1], 1) == month:
+            runs[-1].append(month)
+        else:
+            runs.append([month])
+    return runs
+
+
+def load_input_digests(conn, queries: Mapping[str, str]) -> Dict[str, Dict[str, str]]:
+    """
+    Run one digest query per source.
+
+    Each query returns (month 'YYYY-MM', digest text) rows; a source whose
+    query fails (e.g. missing table) gets an empty digest map.
+    """
+    digests: Dict[str, Dict[str, str]] = {}
+    for source, sql in queries.items():
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+                digests[source] = {str(month): str(digest) for month, digest in cur.fetchall()}
+        except Exception as e:
+            print(f"⚠️ Input digest for {source} unavailable: {e}")
+            conn.rollback()
+            digests[source] = {}
+    return digests
+
+
+def partition_fingerprints(
+    months: Sequence[str],
+    digests: Mapping[str, Mapping[str, str]],
+    windows: Mapping[str, Window],
+    version: str,
+) -> Dict[str, str]:
+    """Fingerprint each partition from the source digests it depends on."""
+    fingerprints = {}
+    for month in months:
+        h = hashlib.sha256(version.encode())
+        for source in sorted(windows):
+            window = windows[source]
+            source_digests = digests.get(source, {})
+            if window == "cumulative":
+                keys = sorted(k for k in source_digests if k <= month)
+            else:
+                before, after = window
+                keys = [shift_month(month, i) for i in range(-before, after + 1)]
+            h.update(source.encode())
+            for k in keys:
+                h.update(f"{k}={source_digests.get(k, '')};".encode())
+        fingerprints[month] = h.hexdigest()
+    return fingerprints
+
+
+class FeatureStore:
+    """One month-partitioned dataset and its manifest."""
+
+    def __init__(self, dataset: str, root: str = FEATURE_STORE_DIR, date_col: str = "date"):
+        self.dataset = dataset
+        self.path = os.path.join(root, dataset)
+        self.date_col = date_col
+        self.manifest_path = os.path.join(self.path, "manifest.json")
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+
+    def load_manifest(self) -> Dict:
+        if not os.path.exists(self.manifest_path):
+            return {"dataset": self.dataset, "version": None, "partitions": {}}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest: Dict) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        tmp = f"{self.manifest_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+    def exists(self) -> bool:
+        return bool(self.load_manifest()["partitions"])
+
+    def stale_partitions(self, fingerprints: Mapping[str, str], version: str) -> List[str]:
+        """Partitions that are missing, built from other inputs, or from another version."""
+        manifest = self.load_manifest()
+        if manifest.get("version") != version:
+            return sorted(fingerprints)
+        built = manifest["partitions"]
+        return sorted(
+            m for m, fp in fingerprints.items()
+            if built.get(m, {}).get("fingerprint") != fp
+        )
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _partition_dir(self, month: str) -> str:
+        return os.path.join(self.path, f"month={month}")
+
+    def _partition_files(self, month: str) -> List[str]:
+        return sorted(glob.glob(os.path.join(self._partition_dir(month), "part-*.parquet")))
+
+    def write_partitions(
+        self,
+        frames: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+        months: Iterable[str],
+        fingerprints: Mapping[str, str],
+        version: str,
+    ) -> Dict[str, int]:
+        """
+        Write the rows falling in each month, then update the manifest.
+
+        Args:
+            frames: A frame, or an iterable of chunk frames (e.g. one per symbol
+                chunk), containing (at least) the rows for every month written
+            months: Partitions to (re)write
+            fingerprints: Input fingerprint per partition
+            version: Feature-definition version
+
+        Returns:
+            Rows written per partition
+        """
+        if isinstance(frames, pd.DataFrame):
+            frames = [frames]
+        months = sorted(set(months))
+        staging = {m: f"{self._partition_dir(m)}.staging" for m in months}
+        for path in staging.values():
+            shutil.rmtree(path, ignore_errors=True)
+            os.makedirs(path)
+
+        # Chunks land in staging dirs; partitions are swapped in once all are written
+        written = dict.fromkeys(months, 0)
+        empty = None
+        for k, chunk in enumerate(frames):
+            keys = month_key(chunk[self.date_col]).to_numpy()
+            for month in months:
+                part = chunk[keys == month]
+                if not part.empty:
+                    part.to_parquet(os.path.join(staging[month], f"part-{k:05d}.parquet"), index=False)
+                    written[month] += int(len(part))
+            empty = chunk.iloc[:0]
+        for month in months:
+            if not written[month] and empty is not None:
+                # Keep the schema readable for months without rows
+                empty.to_parquet(os.path.join(staging[month], "part-00000.parquet"), index=False)
+
+        manifest = self.load_manifest()
+        if manifest.get("version") != version:
+            # Partitions from another feature definition are never mixed in
+            for month in set(manifest["partitions"]) - set(months):
+                shutil.rmtree(self._partition_dir(month), ignore_errors=True)
+            manifest["partitions"] = {}
+        manifest["version"] = version
+
+        for month in months:
+            shutil.rmtree(self._partition_dir(month), ignore_errors=True)
+            os.replace(staging[month], self._partition_dir(month))
+            manifest["partitions"][month] = {
+                "fingerprint": fingerprints[month],
+                "rows": written[month],
+                "built_at": datetime.now(timezone.utc).isoformat(),
+            }
+
+        manifest["updated_at"] = datetime.now(timezone.utc).isoformat()
+        self._write_manifest(manifest)
+        return written
+
+    def prune(self, keep: Sequence[str]) -> List[str]:
+        """Delete partitions not in keep (retention); returns the removed months."""
+        manifest = self.load_manifest()
+        removed = sorted(set(manifest["partitions"]) - set(keep))
+        for month in removed:
+            shutil.rmtree(self._partition_dir(month), ignore_errors=True)
+            manifest["partitions"].pop(month)
+        if removed:
+            self._write_manifest(manifest)
+        return removed
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _months(self, start_date=None, end_date=None) -> List[str]:
+        months = sorted(self.load_manifest()["partitions"])
+        if start_date is not None:
+            months = [m for m in months if m >= pd.Timestamp(start_date).strftime("%Y-%m")]
+        if end_date is not None:
+            months = [m for m in months if m <= pd.Timestamp(end_date).strftime("%Y-%m")]
+        return months
+
+    def schema(self, months: Optional[Sequence[str]] = None):
+        """
+        Arrow schema unified over the part files of the given (default: all) months.
+
+        Chunks may disagree on types of sparse columns (all-null in one chunk,
+        strings in another); those are promoted to a common type.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        files = [f for m in (self._months() if months is None else months) for f in self._partition_files(m)]
+        if not files:
+            return pa.schema([])
+        return pa.unify_schemas([pq.read_schema(f) for f in files], promote_options="permissive")
+
+    def columns(self) -> List[str]:
+        """Column names across stored partitions."""
+        return list(self.schema().names)
+
+    def _read_months(self, months: Sequence[str], columns, schema, start_date, end_date) -> pd.DataFrame:
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(
+            [f for m in months for f in self._partition_files(m)], schema=schema, format="parquet"
+        )
+        if columns is not None:
+            wanted = set(columns) | {self.date_col}
+            columns = [c for c in schema.names if c in wanted]
+
+        df = dataset.to_table(columns=columns).to_pandas()
+        dates = pd.to_datetime(df[self.date_col])
+        mask = pd.Series(True, index=df.index)
+        if start_date is not None:
+            mask &= dates >= pd.Timestamp(start_date)
+        if end_date is not None:
+            mask &= dates <= pd.Timestamp(end_date)
+        return df[mask].reset_index(drop=True)
+
+    def read(
+        self,
+        columns: Optional[Iterable[str]] = None,
+        start_date=None,
+        end_date=None,
+    ) -> pd.DataFrame:
+        """
+        Load rows in [start_date, end_date], reading only the given columns.
+
+        Columns not present in the store are ignored; only partitions that
+        overlap the date range are opened.
+        """
+        months = self._months(start_date, end_date)
+        if not months:
+            return pd.DataFrame(columns=list(columns or []))
+        return self._read_months(months, columns, self.schema(months), start_date, end_date)
+
+    def iter_months(
+        self,
+        columns: Optional[Iterable[str]] = None,
+        start_date=None,
+        end_date=None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Like read(), one month at a time with a consistent schema across months,
+        so consumers can stream the dataset with one partition in memory.
+        """
+        months = self._months(start_date, end_date)
+        schema = self.schema(months)
+        for month in months:
+            yield self._read_months([month], columns, schema, start_date, end_date)
+
+    def latest_date(self) -> Optional[date]:
+        """Most recent date in the newest partition."""
+        months = self._months()
+        if not months:
+            return None
+        part = self._read_months(months[-1:], [self.date_col], self.schema(months[-1:]), None, None)
+        return pd.to_datetime(part[self.date_col]).max().date() if not part.empty else None
+
+
+def windows_span(windows: Mapping[str, Window]) -> Tuple[int, int]:
+    """Largest (months_before, months_after) over non-cumulative windows."""
+    spans = [w for w in windows.values() if w != "cumulative"]
+    return (max((b for b, _ in spans), default=0), max((a for _, a in spans), default=0))
@@ -0,0 +1,266 @@
+"""
+analytics/forward_returns.py
+Forward returns per (symbol, date, horizon in trading days).
+
+Single source for:
+- signal accuracy metrics (SignalRepository.get_accuracy_metrics)
+- training labels (return_1m_fwd = 21d, return_6m_fwd = 126d)
+- backtest forward-return columns
+
+A horizon of h trading days ends h ASX sessions later on the exchange
+calendar (analytics/trading_calendar.py); a symbol with no bar that
+session (suspension, missing data) is valued at its last close before it.
+Rows live in the forward_returns table and are extended incrementally
+as new prices arrive (see jobs/compute_forward_returns_job.py).
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from psycopg2.extras import execute_values
+
+from analytics import trading_calendar
+
+HORIZONS = tuple(
+    int(h) for h in os.getenv("FORWARD_RETURN_HORIZONS", "1,5,21,63,126").split(",") if h.strip()
+)
+
+# Training label names for the horizons the models use
+LABEL_COLUMNS = {21: "return_1m_fwd", 126: "return_6m_fwd"}
+
+
+def compute_forward_returns(prices: pd.DataFrame, horizons: Sequence[int] = HORIZONS) -> pd.DataFrame:
+    """
+    Long-format forward returns from a (symbol, dt, close) frame.
+
+    Args:
+        prices: Price bars; need not be sorted
+        horizons: Horizons in ASX trading days
+
+    Returns:
+        DataFrame with symbol, dt, horizon, fwd_return, end_dt (rows whose
+        end session is after the symbol's last bar are omitted)
+    """
+    columns = ["symbol", "dt", "horizon", "fwd_return", "end_dt"]
+    if prices.empty:
+        return pd.DataFrame(columns=columns)
+
+    px = prices[["symbol", "dt", "close"]].copy()
+    px["dt"] = pd.to_datetime(px["dt"]).astype("datetime64[ns]")
+    last_bar = px.groupby("symbol")["dt"].transform("max")
+    bars = px.rename(columns={"dt": "bar_dt", "close": "end_close"}).sort_values("bar_dt")
+
+    frames = []
+    for h in horizons:
+        left = px.assign(horizon=h, end_dt=trading_calendar.offset(px["dt"], h).astype("datetime64[ns]"))
+        left = left[left["end_dt"] <= last_bar].sort_values("end_dt")
+        # Last close at or before the end session (suspensions, missing bars)
+        merged = pd.merge_asof(
+            left, bars, left_on="end_dt", right_on="bar_dt", by="symbol", direction="backward"
+        )
+        merged["fwd_return"] = merged["end_close"] / merged["close"] - 1
+        frames.append(merged[columns])
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def to_wide(long: pd.DataFrame) -> pd.DataFrame:
+    """Pivot long forward returns to one fwd_return_{h}d column per horizon."""
+    if long.empty:
+        return pd.DataFrame(columns=["symbol", "dt"])
+    wide = long.pivot_table(index=["symbol", "dt"], columns="horizon", values="fwd_return", aggfunc="last")
+    wide.columns = [f"fwd_return_{h}d" for h in wide.columns]
+    return wide.reset_index()
+
+
+def load_forward_returns(
+    conn,
+    start_date=None,
+    end_date=None,
+    horizons: Sequence[int] = HORIZONS,
+    symbols: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """
+    Read stored forward returns as a wide (symbol, dt, fwd_return_{h}d) frame.
+    """
+    clauses = ["horizon = any(%s)"]
+    params: List = [list(horizons)]
+    if start_date is not None:
+        clauses.append("dt >= %s")
+        params.append(start_date)
+    if end_date is not None:
+        clauses.append("dt <= %s")
+        params.append(end_date)
+    if symbols is not None:
+        clauses.append("symbol = any(%s)")
+        params.append(list(symbols))
+
+    with conn.cursor() as cur:
+        cur.execute(
+            f"""
+            select symbol, dt, horizon, fwd_return
+            from forward_returns
+            where {' and '.join(clauses)}
+            """,
+            params,
+        )
+        rows = cur.fetchall()
+
+    long = pd.DataFrame(rows, columns=["symbol", "dt", "horizon", "fwd_return"])
+    long["dt"] = pd.to_datetime(long["dt"])
+    long["fwd_return"] = long["fwd_return"].astype(float)
+    return to_wide(long)
+
+
+def attach_labels(
+    df: pd.DataFrame,
+    conn=None,
+    horizons: Sequence[int] = (21,),
+    date_col: str = "dt",
+    names: Optional[Dict[int, str]] = None,
+) -> pd.DataFrame:
+    """
+    Add training labels (e.g. return_1m_fwd) to a (symbol, date[, close]) frame.
+
+    Labels come from the forward_returns table when a connection is given
+    and it has rows for the frame's range; otherwise they are computed from
+    the frame's own close column with the same trading-day definition.
+    The frame's date column keeps its original dtype.
+
+    Args:
+        names: Column name per horizon (default LABEL_COLUMNS, then
+            fwd_return_{h}d)
+    """
+    names = LABEL_COLUMNS if names is None else names
+    key = pd.to_datetime(df[date_col])
+    wide = pd.DataFrame()
+
+    if conn is not None and not df.empty:
+        try:
+            wide = load_forward_returns(
+                conn, key.min().date(), key.max().date(), horizons, df["symbol"].unique().tolist()
+            )
+        except Exception as e:
+            print(f"⚠️ forward_returns unavailable, computing labels from close: {e}")
+            conn.rollback()
+            wide = pd.DataFrame()
+
+    out = df.copy()
+    index = pd.MultiIndex.from_arrays([out["symbol"], key])
+    labels = _reindex_wide(wide, index, horizons)
+
+    # Rows the table does not cover yet (new symbols, stale table)
+    if "close" in df.columns and labels.isna().any().any():
+        local = to_wide(compute_forward_returns(
+            pd.DataFrame({"symbol": df["symbol"], "dt": key, "close": df["close"]}), horizons
+        ))
+        labels = labels.fillna(_reindex_wide(local, index, horizons))
+
+    for h in horizons:
+        out[names.get(h, f"fwd_return_{h}d")] = labels[f"fwd_return_{h}d"].to_numpy()
+    return out
+
+
+def _reindex_wide(wide: pd.DataFrame, index: pd.MultiIndex, horizons: Sequence[int]) -> pd.DataFrame:
+    """Align a wide forward-return frame to (symbol, dt) rows; missing -> NaN."""
+    cols = [f"fwd_return_{h}d" for h in horizons]
+    if wide.empty:
+        return pd.DataFrame(np.nan, index=index, columns=cols)
+    return wide.set_index(["symbol", "dt"]).reindex(index=index, columns=cols)
+
+
+def _watermarks(conn, horizons: Sequence[int]) -> pd.DataFrame:
+    """Latest stored dt per (symbol, horizon)."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            select symbol, horizon, max(dt)
+            from forward_returns
+            where horizon = any(%s)
+            group by symbol, horizon
+            """,
+            (list(horizons),),
+        )
+        rows = cur.fetchall()
+    marks = pd.DataFrame(rows, columns=["symbol", "horizon", "last_dt"])
+    marks["last_dt"] = pd.to_datetime(marks["last_dt"])
+    return marks
+
+
+def update_forward_returns(
+    conn,
+    horizons: Sequence[int] = HORIZONS,
+    full: bool = False,
+    page_size: int = 5000,
+) -> Dict[int, int]:
+    """
+    Extend the forward_returns table with rows whose end bar has arrived.
+
+    Only each symbol's tail is reloaded: from the earliest per-horizon
+    watermark (symbols missing any horizon are reloaded in full), so a
+    daily run touches roughly max(horizon) bars per symbol.
+
+    Args:
+        conn: psycopg2 connection (caller commits)
+        horizons: Horizons in trading days
+        full: Recompute every row instead of extending
+
+    Returns:
+        Rows written per horizon
+    """
+    marks = pd.DataFrame(columns=["symbol", "horizon", "last_dt"]) if full else _watermarks(conn, horizons)
+
+    # Per-symbol reload point; None when any horizon has no rows yet
+    complete = marks.groupby("symbol")["horizon"].nunique() == len(horizons)
+    since = marks.groupby("symbol")["last_dt"].min()[complete]
+
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            select p.symbol, p.dt, p.close
+            from prices p
+            left join unnest(%s::text[], %s::date[]) as w(symbol, since) on w.symbol = p.symbol
+            where p.close is not null and (w.since is null or p.dt >= w.since)
+            """,
+            (since.index.tolist(), [d.date() for d in since]),
+        )
+        prices = pd.DataFrame(cur.fetchall(), columns=["symbol", "dt", "close"])
+
+    if prices.empty:
+        return {h: 0 for h in horizons}
+
+    prices["dt"] = pd.to_datetime(prices["dt"])
+    prices["close"] = prices["close"].astype(float)
+    fwd = compute_forward_returns(prices, horizons)
+
+    # Drop rows already stored for their (symbol, horizon)
+    if not marks.empty:
+        fwd = fwd.merge(marks, on=["symbol", "horizon"], how="left")
+        fwd = fwd[fwd["last_dt"].isna() | (fwd["dt"] > fwd["last_dt"])]
+
+    rows = list(zip(
+        fwd["symbol"],
+        pd.to_datetime(fwd["dt"]).dt.date,
+        fwd["horizon"].astype(int),
+        fwd["fwd_return"].astype(float),
+        pd.to_datetime(fwd["end_dt"]).dt.date,
+    ))
+    if rows:
+        with conn.cursor() as cur:
+            execute_values(
+                cur,
+                """
+                insert into forward_returns (symbol, dt, horizon, fwd_return, end_dt)
+                values %s
+                on conflict (symbol, dt, horizon) do update set
+                    fwd_return = excluded.fwd_return,
+                    end_dt = excluded.end_dt,
+                    updated_at = now()
+                """,
+                rows,
+                page_size=page_size,
+            )
+
+    return fwd.groupby("horizon").size().reindex(list(horizons), fill_value=0).astype(int).to_dict()
@@ -0,0 +1,236 @@
+"""
+analytics/lgbm_cv.py
+Parallel, cached LightGBM cross-validation over one binned dataset.
+
+The feature matrix is binned once into LightGBM's binary Dataset format
+(cached on disk by a hash of the features) and every fold trains on an
+index subset of it, so no fold re-bins or copies raw frames. (candidate,
+fold) jobs run on a thread pool: LightGBM releases the GIL while training,
+and each job is capped at TRAIN_THREADS_PER_JOB OpenMP threads so
+TRAIN_WORKERS x threads matches the machine.
+
+Each fold's score is cached under a key of (hash of the fold's rows and
+labels, candidate params, seed), so re-running after a data change only
+retrains the folds whose rows changed. At most LGBM_CACHE_MAX_DATASETS
+binned datasets and LGBM_CACHE_MAX_RESULTS fold results are kept on disk;
+the least recently used are deleted past that.
+
+Candidate params use the scikit-learn estimator names (n_estimators,
+subsample, random_state, class_weight, ...) so the same dicts configure
+the final LGBMClassifier / LGBMRegressor fit.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_squared_error, roc_auc_score
+
+LGBM_CACHE_DIR = os.getenv("LGBM_CACHE_DIR", "outputs/lgbm_cache")
+LGBM_CACHE_MAX_DATASETS = int(os.getenv("LGBM_CACHE_MAX_DATASETS", "4"))
+LGBM_CACHE_MAX_RESULTS = int(os.getenv("LGBM_CACHE_MAX_RESULTS", "5000"))
+TRAIN_WORKERS = int(os.getenv("TRAIN_WORKERS", str(min(4, os.cpu_count() or 1))))
+TRAIN_THREADS_PER_JOB = int(
+    os.getenv("TRAIN_THREADS_PER_JOB", str(max(1, (os.cpu_count() or 1) // TRAIN_WORKERS)))
+)
+
+METRICS = {
+    "auc": (lambda y, p: float(roc_auc_score(y, p)), True),
+    "rmse": (lambda y, p: float(np.sqrt(mean_squared_error(y, p))), False),
+}
+
+
+def _digest(*parts) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else json.dumps(part, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def _prune(directory: str, pattern: str, max_files: int) -> None:
+    """Delete the least recently used cache files matching pattern beyond max_files."""
+    files = glob.glob(os.path.join(directory, pattern))
+    files.sort(key=os.path.getmtime)
+    for path in files[:max(0, len(files) - max_files)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def param_grid(overrides: Sequence[Mapping], base: Mapping) -> List[Dict]:
+    """Candidate param dicts: base updated with each override ({} = base itself)."""
+    return [{**base, **override} for override in (overrides or [{}])]
+
+
+def _train_params(params: Mapping, objective: str, seed: int, threads: int) -> Tuple[Dict, int]:
+    """scikit-learn style kwargs -> (lgb.train params, num_boost_round)."""
+    params = dict(params)
+    rounds = int(params.pop("n_estimators", 100))
+    params.pop("class_weight", None)
+    seed = params.pop("random_state", seed)
+    return {"objective": objective, "verbose": -1, **params, "seed": seed, "num_threads": threads}, rounds
+
+
+def _balanced_weights(y: np.ndarray) -> np.ndarray:
+    """Per-row weights matching class_weight='balanced'."""
+    classes, inverse, counts = np.unique(y, return_inverse=True, return_counts=True)
+    return (len(y) / (len(classes) * counts))[inverse]
+
+
+class BinnedDataset:
+    """A feature matrix binned once, with raw values and labels for fold scoring."""
+
+    def __init__(
+        self,
+        X: pd.DataFrame,
+        labels: Mapping[str, pd.Series],
+        cache_dir: str = LGBM_CACHE_DIR,
+        dataset_params: Optional[Mapping] = None,
+    ):
+        self.features = [str(c) for c in X.columns]
+        self.values = X.to_numpy(dtype=np.float64)
+        self.labels = {name: np.asarray(y, dtype=np.float64) for name, y in labels.items()}
+        self.row_hashes = pd.util.hash_pandas_object(X.reset_index(drop=True), index=False).to_numpy()
+        self.cache_dir = cache_dir
+        self.key = _digest(self.features, self.row_hashes.tobytes(), dict(dataset_params or {}), lgb.__version__)
+        self._lock = threading.Lock()
+
+        # Pre-filtering would fix min_data_in_leaf at binning time; candidates vary it
+        params = {"verbose": -1, "feature_pre_filter": False, **(dataset_params or {})}
+        path = os.path.join(cache_dir, "datasets", f"{self.key}.bin")
+        if os.path.exists(path):
+            self.dataset = lgb.Dataset(path, params=params).construct()
+            self.from_cache = True
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.dataset = lgb.Dataset(
+                self.values, feature_name=self.features, params=params, free_raw_data=True
+            ).construct()
+            tmp = f"{path}.tmp"
+            self.dataset.save_binary(tmp)
+            os.replace(tmp, path)
+            self.from_cache = False
+            _prune(os.path.dirname(path), "*.bin", LGBM_CACHE_MAX_DATASETS)
+
+    def subset(self, idx: np.ndarray, label: str, weight: Optional[np.ndarray] = None) -> lgb.Dataset:
+        """Rows idx of the binned dataset, labelled (and weighted) for one job."""
+        with self._lock:
+            part = self.dataset.subset(np.asarray(idx, dtype=np.int32)).construct()
+        part.set_label(self.labels[label][idx])
+        if weight is not None:
+            part.set_weight(weight)
+        return part
+
+    def fold_key(self, train_idx: np.ndarray, val_idx: np.ndarray, label: str, spec: Mapping, seed: int) -> str:
+        y = self.labels[label]
+        return _digest(
+            self.features,
+            self.row_hashes[train_idx].tobytes(), y[train_idx].tobytes(),
+            self.row_hashes[val_idx].tobytes(), y[val_idx].tobytes(),
+            dict(spec), seed, lgb.__version__,
+        )
+
+
+def fit_fold(
+    data: BinnedDataset,
+    train_idx: np.ndarray,
+    val_idx: np.ndarray,
+    spec: Mapping,
+    seed: int,
+    threads: int = TRAIN_THREADS_PER_JOB,
+) -> Dict:
+    """Train one candidate on one fold and score it on the fold's validation rows."""
+    label = spec["label"]
+    params, rounds = _train_params(spec["params"], spec["objective"], seed, threads)
+    y_train = data.labels[label][train_idx]
+    weight = _balanced_weights(y_train) if spec["params"].get("class_weight") == "balanced" else None
+
+    train_set = data.subset(train_idx, label, weight)
+    valid_sets, callbacks = [], []
+    if spec.get("early_stopping_rounds"):
+        valid_sets = [data.subset(val_idx, label)]
+        callbacks = [lgb.early_stopping(stopping_rounds=spec["early_stopping_rounds"], verbose=False)]
+    booster = lgb.train(params, train_set, num_boost_round=rounds, valid_sets=valid_sets, callbacks=callbacks)
+
+    best = booster.best_iteration or None
+    pred = booster.predict(data.values[val_idx], num_iteration=best, num_threads=threads)
+    score_fn, _ = METRICS[spec["metric"]]
+    return {"score": score_fn(data.labels[label][val_idx], pred), "best_iteration": best or rounds}
+
+
+def cross_validate(
+    data: BinnedDataset,
+    folds: Sequence[Tuple[np.ndarray, np.ndarray]],
+    candidates: Mapping[str, Mapping],
+    workers: int = TRAIN_WORKERS,
+    threads: int = TRAIN_THREADS_PER_JOB,
+) -> pd.DataFrame:
+    """
+    Score every candidate on every fold, in parallel, reusing cached fold results.
+
+    Args:
+        data: Binned dataset shared by all jobs
+        folds: (train_idx, val_idx) pairs, e.g. TimeSeriesSplit(...).split(X)
+        candidates: name -> spec with keys
+            label: key of data.labels to fit
+            objective: LightGBM objective ("binary", "regression", ...)
+            metric: "auc" or "rmse"
+            params: scikit-learn style params (random_state defaults to the fold number)
+            early_stopping_rounds: optional; stops on the fold's validation rows
+        workers: Concurrent jobs
+        threads: LightGBM threads per job
+
+    Returns:
+        One row per (candidate, fold): candidate, fold, score, best_iteration, cached
+    """
+    results_dir = os.path.join(data.cache_dir, "results")
+    os.makedirs(results_dir, exist_ok=True)
+
+    rows, pending = [], []
+    for fold, (train_idx, val_idx) in enumerate(folds, 1):
+        for name, spec in candidates.items():
+            seed = int(spec["params"].get("random_state", fold))
+            key = data.fold_key(train_idx, val_idx, spec["label"], spec, seed)
+            path = os.path.join(results_dir, f"{key}.json")
+            if os.path.exists(path):
+                with open(path) as f:
+                    rows.append({"candidate": name, "fold": fold, **json.load(f), "cached": True})
+                os.utime(path)
+            else:
+                pending.append((name, fold, train_idx, val_idx, spec, seed, path))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(fit_fold, data, train_idx, val_idx, spec, seed, threads): (name, fold, path)
+            for name, fold, train_idx, val_idx, spec, seed, path in pending
+        }
+        for future in as_completed(futures):
+            name, fold, path = futures[future]
+            result = future.result()
+            tmp = f"{path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(result, f)
+            os.replace(tmp, path)
+            rows.append({"candidate": name, "fold": fold, **result, "cached": False})
+
+    if pending:
+        _prune(results_dir, "*.json", LGBM_CACHE_MAX_RESULTS)
+    return pd.DataFrame(rows, columns=["candidate", "fold", "score", "best_iteration", "cached"]).sort_values(
+        ["candidate", "fold"], ignore_index=True
+    )
+
+
+def best_candidate(results: pd.DataFrame, candidates: Mapping[str, Mapping]) -> str:
+    """Candidate with the best mean fold score for its metric."""
+    means = results.groupby("candidate")["score"].mean()
+    higher_better = {name: METRICS[spec["metric"]][1] for name, spec in candidates.items()}
+    return max(means.index, key=lambda name: means[name] if higher_better[name] else -means[name])
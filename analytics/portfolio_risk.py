@@ -0,0 +1,120 @@
+"""
+analytics/portfolio_risk.py
+Time-series portfolio risk metrics from a dates x symbols return matrix.
+
+Portfolios are rows of a weight matrix W (portfolios x symbols, dense or
+scipy.sparse), so one portfolio and every portfolio in a nightly batch go
+through the same matrix products:
+
+    portfolio returns (dates x portfolios) = R @ W.T
+
+On a date where a holding has no return (suspension, not yet listed),
+the portfolio return is the weighted mean over the holdings that do, i.e.
+the remaining weights are renormalised for that date.
+
+Units follow RiskMetricsService: volatility, returns and drawdowns are
+percentages; volatility and Sharpe are annualised over 252 trading days.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS_PER_YEAR = 252
+RISK_FREE_RATE = 2.0  # annual %
+
+
+def portfolio_returns(returns: pd.DataFrame, weights) -> pd.DataFrame:
+    """
+    Daily returns of each portfolio.
+
+    Args:
+        returns: Daily returns, dates x symbols (NaN where missing)
+        weights: Portfolios x symbols in returns' column order; an ndarray
+            (1-D for a single portfolio) or a scipy.sparse matrix
+
+    Returns:
+        Dates x portfolios; NaN on dates where a portfolio has no priced holding
+    """
+    R = returns.to_numpy(dtype=np.float64)
+    valid = np.isfinite(R)
+    W = weights[None, :] if isinstance(weights, np.ndarray) and weights.ndim == 1 else weights
+
+    # (P x N) @ (N x T) keeps a sparse W on the left
+    weighted = np.asarray(W @ np.where(valid, R, 0.0).T).T
+    covered = np.asarray(W @ valid.T.astype(np.float64)).T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.where(covered > 0, weighted / covered, np.nan)
+    return pd.DataFrame(out, index=returns.index)
+
+
+def risk_metrics(
+    port_returns: pd.DataFrame,
+    benchmark: Optional[pd.Series] = None,
+    risk_free_rate: float = RISK_FREE_RATE,
+) -> pd.DataFrame:
+    """
+    Volatility, Sharpe, beta and max drawdown for every column of port_returns.
+
+    Args:
+        port_returns: Dates x portfolios daily returns (from portfolio_returns)
+        benchmark: Benchmark daily returns by date (e.g. XJO.AX); beta is NaN without it
+        risk_free_rate: Annual risk-free rate in %
+
+    Returns:
+        One row per portfolio: volatility, sharpe_ratio, beta, max_drawdown_pct,
+        observations (metrics are NaN with fewer than 2 observations)
+    """
+    P = port_returns.to_numpy(dtype=np.float64)
+    valid = np.isfinite(P)
+    n = valid.sum(axis=0)
+    P0 = np.where(valid, P, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = P0.sum(axis=0) / n
+        var = (np.where(valid, P - mean, 0.0) ** 2).sum(axis=0) / n
+        volatility = np.sqrt(var * TRADING_DAYS_PER_YEAR) * 100
+        sharpe = np.where(
+            volatility > 0, (mean * TRADING_DAYS_PER_YEAR * 100 - risk_free_rate) / volatility, np.nan
+        )
+
+        # Drawdown of cumulative wealth, starting from 1 before the first return
+        wealth = np.cumprod(1 + P0, axis=0)
+        peak = np.maximum(np.maximum.accumulate(wealth, axis=0), 1.0)
+        max_drawdown = np.minimum((wealth / peak - 1).min(axis=0, initial=0.0), 0.0) * 100
+
+        beta = np.full(P.shape[1], np.nan)
+        if benchmark is not None:
+            b = benchmark.reindex(port_returns.index).to_numpy(dtype=np.float64)[:, None]
+            both = valid & np.isfinite(b)
+            nb = both.sum(axis=0)
+            mu_p = np.where(both, P, 0.0).sum(axis=0) / nb
+            mu_b = np.where(both, b, 0.0).sum(axis=0) / nb
+            dp = np.where(both, P - mu_p, 0.0)
+            db = np.where(both, b - mu_b, 0.0)
+            var_b = (db * db).sum(axis=0)
+            beta = np.where((nb >= 2) & (var_b > 1e-12), (dp * db).sum(axis=0) / var_b, np.nan)
+
+    out = pd.DataFrame({
+        "volatility": volatility,
+        "sharpe_ratio": sharpe,
+        "beta": beta,
+        "max_drawdown_pct": max_drawdown,
+        "observations": n,
+    }, index=port_returns.columns)
+    out.loc[n < 2, ["volatility", "sharpe_ratio", "beta", "max_drawdown_pct"]] = np.nan
+    return out
+
+
+def correlation_matrix(returns: pd.DataFrame, min_periods: int = 20) -> Dict[str, Dict[str, float]]:
+    """Pairwise correlation of holdings' returns as {ticker: {ticker: corr}} (NaN pairs omitted)."""
+    return correlation_dict(returns.corr(min_periods=min_periods))
+
+
+def correlation_dict(corr: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    """A correlation frame as {ticker: {ticker: corr}} (NaN pairs omitted)."""
+    return {
+        ticker: {other: float(v) for other, v in row.items() if np.isfinite(v)}
+        for ticker, row in corr.iterrows()
+    }
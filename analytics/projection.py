@@ -0,0 +1,130 @@
+"""
+analytics/projection.py
+Monte Carlo projection of equity, property and loan balances.
+
+Each path steps monthly:
+    equity    geometric Brownian motion with the portfolio's expected
+              return and volatility (from model expected returns and the
+              cached return covariance, see equity_moments)
+    property  geometric Brownian motion with an assumed growth and
+              volatility, correlated with equity
+    loan      balance under a fixed payment and a floating rate that
+              follows a random walk (floored at 0):
+                  B[t] = G[t] * (B0 - payment * sum(1 / G[1..t])),
+                  G[t] = prod(1 + rate[s] / 12)
+
+Paths are simulated in chunks of chunk_size with cumulative sums and
+products over (paths x months) arrays, so memory is bounded by
+chunk_size x months regardless of n_paths; only the yearly values of
+every path are kept for the percentiles. chunk_size is capped so a chunk
+never exceeds PROJECTION_MAX_CHUNK_CELLS paths x months (about 24 MB of
+draws at the default, a few hundred MB peak with the temporaries). Chunk i
+draws from SeedSequence(seed).spawn(...)[i], so a seed and chunk_size
+reproduce the same paths.
+"""
+
+import os
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+PROJECTION_CHUNK_PATHS = int(os.getenv("PROJECTION_CHUNK_PATHS", "2000"))
+PROJECTION_MAX_CHUNK_CELLS = int(os.getenv("PROJECTION_MAX_CHUNK_CELLS", "1000000"))
+PERCENTILES = (5, 25, 50, 75, 95)
+MONTHS_PER_YEAR = 12
+TRADING_DAYS_PER_MONTH = 21
+
+
+def equity_moments(
+    weights: pd.Series,
+    expected_returns: pd.Series,
+    cov,
+    horizon_days: int = TRADING_DAYS_PER_MONTH,
+) -> Tuple[float, float]:
+    """
+    Monthly expected return and volatility of a weighted equity portfolio.
+
+    Args:
+        weights: Portfolio weights by symbol (renormalised over symbols the
+            covariance covers)
+        expected_returns: Expected return per symbol over horizon_days
+            (e.g. ml_expected_return); missing symbols get the median
+        cov: FactorCovariance of daily returns (analytics.covariance)
+        horizon_days: Trading days the expected returns are quoted over
+    """
+    held = weights[cov.covered(list(weights.index))]
+    held = held / held.sum()
+    er = expected_returns.reindex(held.index).fillna(expected_returns.median()).fillna(0.0)
+    monthly_er = (1 + er) ** (TRADING_DAYS_PER_MONTH / horizon_days) - 1
+    mu = float((held * monthly_er).sum())
+    sigma = float(np.sqrt(cov.portfolio_variance(held) * TRADING_DAYS_PER_MONTH))
+    return mu, sigma
+
+
+def simulate(
+    years: int = 10,
+    n_paths: int = 10_000,
+    seed: Optional[int] = None,
+    chunk_size: int = PROJECTION_CHUNK_PATHS,
+    equity_value: float = 0.0,
+    equity_mu: float = 0.0,
+    equity_sigma: float = 0.0,
+    property_value: float = 0.0,
+    property_growth: float = 0.0,
+    property_vol: float = 0.0,
+    equity_property_corr: float = 0.0,
+    loan_balance: float = 0.0,
+    loan_rate: float = 0.0,
+    loan_payment: float = 0.0,
+    loan_rate_vol: float = 0.0,
+) -> Dict[str, np.ndarray]:
+    """
+    Yearly values (paths x years + 1, starting at t=0) for equity, property,
+    loan and net worth.
+
+    equity_mu and equity_sigma are monthly; property_growth, property_vol,
+    loan_rate and loan_rate_vol are annual; loan_payment is monthly.
+    """
+    months = years * MONTHS_PER_YEAR
+    chunk_size = max(1, min(chunk_size, PROJECTION_MAX_CHUNK_CELLS // months))
+    yearly = np.arange(MONTHS_PER_YEAR - 1, months, MONTHS_PER_YEAR)
+    out = {name: np.empty((n_paths, years + 1)) for name in ("equity", "property", "loan")}
+    out["equity"][:, 0], out["property"][:, 0], out["loan"][:, 0] = equity_value, property_value, loan_balance
+
+    prop_mu, prop_sigma = property_growth / MONTHS_PER_YEAR, property_vol / np.sqrt(MONTHS_PER_YEAR)
+    rate_step = loan_rate_vol / np.sqrt(MONTHS_PER_YEAR)
+    rho = float(np.clip(equity_property_corr, -1.0, 1.0))
+
+    n_chunks = max(1, -(-n_paths // chunk_size))
+    for i, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        rows = slice(i * chunk_size, min((i + 1) * chunk_size, n_paths))
+        m = rows.stop - rows.start
+        z = np.random.default_rng(child).standard_normal((3, m, months))
+
+        equity_log = (equity_mu - 0.5 * equity_sigma ** 2) + equity_sigma * z[0]
+        prop_z = rho * z[0] + np.sqrt(1 - rho ** 2) * z[1]
+        prop_log = (prop_mu - 0.5 * prop_sigma ** 2) + prop_sigma * prop_z
+        out["equity"][rows, 1:] = equity_value * np.exp(np.cumsum(equity_log, axis=1)[:, yearly])
+        out["property"][rows, 1:] = property_value * np.exp(np.cumsum(prop_log, axis=1)[:, yearly])
+
+        rate = np.maximum(loan_rate + rate_step * np.cumsum(z[2], axis=1), 0.0)
+        growth = np.cumprod(1 + rate / MONTHS_PER_YEAR, axis=1)
+        balance = growth * (loan_balance - loan_payment * np.cumsum(1 / growth, axis=1))
+        # Once repaid the loan stays repaid
+        balance = np.where(np.minimum.accumulate(balance, axis=1) <= 0, 0.0, balance)
+        out["loan"][rows, 1:] = balance[:, yearly]
+
+    out["net_worth"] = out["equity"] + out["property"] - out["loan"]
+    return out
+
+
+def fan_chart(values: np.ndarray, percentiles: Sequence[float] = PERCENTILES) -> pd.DataFrame:
+    """Percentiles of paths x years values, one row per year (0 = today)."""
+    bands = np.percentile(values, percentiles, axis=0).T
+    return pd.DataFrame(bands, columns=[f"p{p:g}" for p in percentiles]).rename_axis("year")
+
+
+def project(percentiles: Sequence[float] = PERCENTILES, **kwargs) -> Dict[str, pd.DataFrame]:
+    """Fan charts for equity, property, loan and net worth (arguments as simulate)."""
+    return {name: fan_chart(values, percentiles) for name, values in simulate(**kwargs).items()}
@@ -0,0 +1,190 @@
+"""
+analytics/rebalancing.py
+Signal-driven rebalancing over position arrays, for one portfolio or all.
+
+Input is a long frame with one row per (portfolio, holding). Target
+weights, trades, turnover and priorities are computed column-wise, and
+portfolio totals and priority ranks are per-portfolio group operations,
+so one call plans every portfolio when a new signal set lands.
+
+Rules (weights in % of portfolio value):
+    STRONG_SELL, confidence >= 70   exit (target 0)
+    SELL,        confidence >= 60   halve
+    STRONG_BUY,  confidence >= 80   x1.2
+    BUY,         confidence >= 70   x1.1
+    otherwise                       keep
+Targets are capped at MAX_POSITION_SIZE; a kept position that would fall
+below MIN_POSITION_SIZE is raised to it on a buy signal, else left as is.
+Changes smaller than the threshold are not traded. Positions above
+OVERWEIGHT_THRESHOLD with no other trade are trimmed to OVERWEIGHT_TARGET.
+
+Priority within a portfolio ranks by action (SELL > TRIM > ADD/BUY),
+then confidence, then trade value (capped).
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+MAX_POSITION_SIZE = 10.0
+MIN_POSITION_SIZE = 2.0
+OVERWEIGHT_THRESHOLD = 15.0
+OVERWEIGHT_TARGET = 12.0
+REBALANCE_THRESHOLD = 0.5
+DEFAULT_CONFIDENCE = 50.0
+
+ACTION_WEIGHTS = {"SELL": 3, "TRIM": 2, "ADD": 1, "BUY": 1, "HOLD": 0}
+
+SUGGESTION_COLUMNS = [
+    "portfolio_id", "ticker", "action", "suggested_quantity", "suggested_value", "reason",
+    "current_signal", "signal_confidence", "current_shares", "current_weight_pct",
+    "target_weight_pct", "confidence_score", "priority",
+]
+
+
+def target_weights(
+    current_weight: np.ndarray,
+    signal: np.ndarray,
+    confidence: np.ndarray,
+    max_weight: float = MAX_POSITION_SIZE,
+    min_weight: float = MIN_POSITION_SIZE,
+) -> np.ndarray:
+    """Target weight (%) per position from its current weight, signal and confidence."""
+    cw = np.asarray(current_weight, dtype=np.float64)
+    signal = np.asarray(signal, dtype=object)
+    conf = np.nan_to_num(np.asarray(confidence, dtype=np.float64), nan=0.0)
+    is_buy = (signal == "BUY") | (signal == "STRONG_BUY")
+
+    target = np.select(
+        [
+            (signal == "STRONG_SELL") & (conf >= 70),
+            (signal == "SELL") & (conf >= 60),
+            (signal == "STRONG_BUY") & (conf >= 80),
+            (signal == "BUY") & (conf >= 70),
+        ],
+        [0.0, cw * 0.5, cw * 1.2, cw * 1.1],
+        default=cw,
+    )
+    target = np.minimum(target, max_weight)
+    small = (target > 0) & (target < min_weight)
+    return np.where(small, np.where(is_buy, min_weight, cw), target)
+
+
+def _with_weights(positions: pd.DataFrame) -> pd.DataFrame:
+    df = positions.reset_index(drop=True).copy()
+    if "portfolio_id" not in df:
+        df["portfolio_id"] = 0
+    for col in ("shares", "current_price", "current_value", "signal_confidence"):
+        df[col] = pd.to_numeric(df[col], errors="coerce") if col in df else np.nan
+    if "current_signal" not in df:
+        df["current_signal"] = None
+    if "total_value" not in df:
+        df["total_value"] = df.groupby("portfolio_id")["current_value"].transform("sum")
+    if "current_weight_pct" not in df:
+        df["current_weight_pct"] = df["current_value"].fillna(0) / df["total_value"] * 100
+    if "target_weight_pct" not in df:
+        df["target_weight_pct"] = target_weights(
+            df["current_weight_pct"].to_numpy(), df["current_signal"].to_numpy(), df["signal_confidence"].to_numpy()
+        )
+    return df
+
+
+def plan_trades(positions: pd.DataFrame, threshold: float = REBALANCE_THRESHOLD) -> pd.DataFrame:
+    """
+    Rebalancing suggestions for every portfolio in positions.
+
+    Args:
+        positions: One row per holding with portfolio_id (optional for a single
+            portfolio), ticker, shares, current_price, current_value,
+            current_signal, signal_confidence. Optional overrides:
+            total_value, current_weight_pct, target_weight_pct (NaN = no target)
+        threshold: Minimum weight change (%) to trade
+
+    Returns:
+        One row per suggestion (SUGGESTION_COLUMNS), ordered by portfolio and priority
+    """
+    df = _with_weights(positions)
+    cw = df["current_weight_pct"].to_numpy(dtype=np.float64)
+    tw = df["target_weight_pct"].to_numpy(dtype=np.float64)
+    total = df["total_value"].to_numpy(dtype=np.float64)
+    price = np.nan_to_num(df["current_price"].to_numpy(dtype=np.float64), nan=0.0)
+    shares = np.nan_to_num(df["shares"].to_numpy(dtype=np.float64), nan=0.0)
+    raw_conf = df["signal_confidence"].to_numpy(dtype=np.float64)
+    conf = np.where(np.isnan(raw_conf), DEFAULT_CONFIDENCE, raw_conf)
+
+    has_target = ~np.isnan(tw)
+    tw0 = np.nan_to_num(tw, nan=0.0)
+    moved = has_target & ~((np.abs(tw0 - cw) < threshold) & (tw0 > 0))
+    sell = moved & (tw0 == 0)
+    trim = moved & ~sell & (tw0 < cw - threshold)
+    add = moved & ~sell & ~trim & (tw0 > cw + threshold)
+    overweight = (cw > OVERWEIGHT_THRESHOLD) & ~(sell | trim | add)
+    tw0 = np.where(overweight, OVERWEIGHT_TARGET, tw0)
+
+    trade_value = np.abs(tw0 - cw) / 100 * total
+    with np.errstate(invalid="ignore", divide="ignore"):
+        trade_qty = np.where(price > 0, trade_value / price, 0.0)
+    quantity = np.where(sell, shares, trade_qty)
+    value = np.where(sell, shares * price, trade_value)
+    score = np.select([sell, trim, add], [conf, conf * 0.8, conf * 0.9], default=70.0)
+    action = np.select([sell, trim | overweight, add], ["SELL", "TRIM", "ADD"], default="")
+
+    keep = action != ""
+    out = df.loc[keep, ["portfolio_id", "ticker", "current_signal", "signal_confidence", "shares",
+                        "current_weight_pct"]].rename(columns={"shares": "current_shares"})
+    out["action"] = action[keep]
+    out["target_weight_pct"] = tw0[keep]
+    out["suggested_quantity"] = np.where(quantity[keep] != 0, quantity[keep], np.nan)
+    out["suggested_value"] = np.where(value[keep] != 0, value[keep], np.nan)
+    out["current_shares"] = out["current_shares"].where(out["current_shares"] != 0)
+    out["confidence_score"] = score[keep]
+    out["reason"] = _reasons(out, conf[keep], overweight[keep], cw[keep] > OVERWEIGHT_THRESHOLD)
+    return prioritize(out)[SUGGESTION_COLUMNS]
+
+
+def _reasons(out: pd.DataFrame, conf: np.ndarray, overweight_only: np.ndarray, overweight: np.ndarray) -> list:
+    reasons = []
+    for action, signal, c, cw, tw, only, over in zip(
+        out["action"], out["current_signal"], conf, out["current_weight_pct"], out["target_weight_pct"],
+        overweight_only, overweight,
+    ):
+        if only:
+            reasons.append(f"Position is {cw:.1f}% of portfolio (overweight). Reduce concentration risk.")
+            continue
+        if action == "SELL":
+            reason = f"{signal} signal (confidence: {c:.1f}%). Exit position."
+        elif action == "TRIM":
+            reason = f"{signal or 'Rebalance'} - reduce from {cw:.1f}% to {tw:.1f}%"
+        else:
+            reason = f"{signal or 'Rebalance'} - increase from {cw:.1f}% to {tw:.1f}%"
+        reasons.append(f"{reason} Position overweight ({cw:.1f}%)." if over else reason)
+    return reasons
+
+
+def prioritize(suggestions: pd.DataFrame) -> pd.DataFrame:
+    """Assign priority 1..n within each portfolio (highest composite score first)."""
+    if suggestions.empty:
+        return suggestions.assign(priority=pd.Series(dtype="int64"))
+    df = suggestions.reset_index(drop=True)
+    group = df["portfolio_id"] if "portfolio_id" in df else pd.Series(0, index=df.index)
+    value = pd.to_numeric(df.get("suggested_value"), errors="coerce").fillna(0.0)
+    conf = pd.to_numeric(df.get("confidence_score"), errors="coerce").fillna(DEFAULT_CONFIDENCE)
+    sort_score = df["action"].map(ACTION_WEIGHTS).fillna(0) * 100 + conf + np.minimum(value / 1000, 50)
+
+    order = pd.DataFrame({"group": group, "score": -sort_score}).sort_values(["group", "score"], kind="stable").index
+    df = df.loc[order].reset_index(drop=True)
+    df["priority"] = df.groupby(group.loc[order].to_numpy()).cumcount() + 1
+    return df
+
+
+def turnover(suggestions: pd.DataFrame) -> pd.Series:
+    """One-way turnover (% of portfolio value) implied by each portfolio's suggestions."""
+    change = (suggestions["target_weight_pct"] - suggestions["current_weight_pct"]).abs()
+    return (change.groupby(suggestions["portfolio_id"]).sum() / 2).rename("turnover_pct")
+
+
+def records(suggestions: pd.DataFrame, drop: Optional[list] = None) -> list:
+    """Suggestions as dicts with NaN as None (for JSON and the DB)."""
+    df = suggestions.drop(columns=drop or [], errors="ignore")
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
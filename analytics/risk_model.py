@@ -1,21 +1,35 @@
 """
 analytics/risk_model.py
 Compute basic risk exposure snapshot (volatility + beta vs market proxy).
+
+Volatility, market beta and market correlation are computed for every
+symbol at once from the dates x symbols return matrix. Each symbol's
+moments use only the dates where both it and the market have a return
+(missing data is masked, not dropped per column), optionally EWMA
+weighted, and symbols with fewer than RISK_MIN_OBS observations are
+skipped.
 """
 
 import json
 import os
+from typing import Dict, Optional
 
 import numpy as np
 import pandas as pd
 import psycopg2
-from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 
+from services.table_loader import copy_upsert
+
 load_dotenv(dotenv_path=".env", override=True)
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 LOOKBACK_DAYS = int(os.getenv("RISK_LOOKBACK_DAYS", "252"))
+MIN_OBS = int(os.getenv("RISK_MIN_OBS", "60"))
+# EWMA half-life in trading days; 0 weights the lookback equally
+EWMA_HALFLIFE = float(os.getenv("RISK_EWMA_HALFLIFE", "0"))
+
+SNAPSHOT_COLUMNS = ["symbol", "as_of", "sector", "factor_vol", "beta_market", "factor_corr"]
 
 if not DATABASE_URL:
     raise SystemExit("DATABASE_URL not set")
@@ -41,6 +55,90 @@ def _load_sector_map(con) -> dict:
     return dict(zip(df["symbol"], df["sector"]))
 
 
+def time_weights(n: int, halflife: Optional[float] = None) -> np.ndarray:
+    """Weights for n dates, oldest first: equal, or halving every `halflife` dates back."""
+    if not halflife:
+        return np.ones(n)
+    return 0.5 ** (np.arange(n)[::-1] / halflife)
+
+
+def market_exposures(
+    returns: pd.DataFrame,
+    market: Optional[pd.Series] = None,
+    halflife: Optional[float] = None,
+    min_obs: int = MIN_OBS,
+) -> pd.DataFrame:
+    """
+    Volatility, beta and correlation against the market for every column of returns.
+
+    Args:
+        returns: Daily returns, dates x symbols, NaN where a symbol has no return
+        market: Market returns by date (default: equal-weighted mean of returns)
+        halflife: EWMA half-life in dates (None/0 = equal weights)
+        min_obs: Symbols with fewer dates overlapping the market get NaN
+
+    Returns:
+        DataFrame indexed by symbol with vol (daily), beta, corr, n_obs
+    """
+    if market is None:
+        market = returns.mean(axis=1)
+    R = returns.to_numpy(dtype=np.float64)
+    m = market.reindex(returns.index).to_numpy(dtype=np.float64)[:, None]
+
+    valid = np.isfinite(R) & np.isfinite(m)
+    w = time_weights(len(R), halflife)[:, None] * valid
+    sw = w.sum(axis=0)
+    n_obs = valid.sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Per-symbol means over that symbol's own dates, then centred moments
+        mu_r = (w * np.where(valid, R, 0.0)).sum(axis=0) / sw
+        mu_m = (w * np.where(valid, m, 0.0)).sum(axis=0) / sw
+        dr = np.where(valid, R - mu_r, 0.0)
+        dm = np.where(valid, m - mu_m, 0.0)
+        var_r = np.einsum("tn,tn->n", w * dr, dr) / sw
+        var_m = np.einsum("tn,tn->n", w * dm, dm) / sw
+        cov = np.einsum("tn,tn->n", w * dr, dm) / sw
+
+        beta = np.where(var_m > 0, cov / var_m, np.nan)
+        corr = np.where((var_r > 0) & (var_m > 0), cov / np.sqrt(var_r * var_m), np.nan)
+    vol = np.sqrt(var_r)
+
+    enough = n_obs >= max(min_obs, 2)
+    out = pd.DataFrame({"vol": vol, "beta": beta, "corr": corr, "n_obs": n_obs}, index=returns.columns)
+    out.loc[~enough, ["vol", "beta", "corr"]] = np.nan
+    return out
+
+
+def build_snapshot(
+    prices: pd.DataFrame,
+    sector_map: Dict[str, str],
+    halflife: Optional[float] = EWMA_HALFLIFE,
+    min_obs: int = MIN_OBS,
+) -> pd.DataFrame:
+    """risk_exposure_snapshot rows from (dt, symbol, close) bars; empty if there is no return history."""
+    prices = prices.copy()
+    prices["dt"] = pd.to_datetime(prices["dt"])
+    prices = prices.sort_values(["symbol", "dt"])
+    prices["ret1"] = prices.groupby("symbol")["close"].pct_change()
+
+    recent = prices.groupby("symbol").tail(LOOKBACK_DAYS)
+    pivot = recent.pivot(index="dt", columns="symbol", values="ret1").dropna(how="all")
+    if pivot.empty:
+        return pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+
+    exposures = market_exposures(pivot, halflife=halflife, min_obs=min_obs).dropna(subset=["vol", "beta"])
+    corr = exposures["corr"].astype(object).where(np.isfinite(exposures["corr"]), None)
+    return pd.DataFrame({
+        "symbol": exposures.index,
+        "as_of": pivot.index.max().date(),
+        "sector": exposures.index.map(sector_map),
+        "factor_vol": exposures["vol"].to_numpy(),
+        "beta_market": exposures["beta"].to_numpy(),
+        "factor_corr": [json.dumps({"market": c}) for c in corr],
+    })
+
+
 def main() -> None:
     with psycopg2.connect(DATABASE_URL) as con:
         prices = _load_prices(con)
@@ -48,65 +146,13 @@ def main() -> None:
             print("⚠️ No prices found; cannot compute risk snapshot.")
             return
 
-        sector_map = _load_sector_map(con)
-
-        prices["dt"] = pd.to_datetime(prices["dt"])
-        prices = prices.sort_values(["symbol", "dt"])
-        prices["ret1"] = prices.groupby("symbol")["close"].pct_change()
-
-        recent = prices.groupby("symbol").tail(LOOKBACK_DAYS)
-        pivot = recent.pivot(index="dt", columns="symbol", values="ret1").dropna(how="all")
-        if pivot.empty:
-            print("⚠️ Not enough return history for risk snapshot.")
-            return
-
-        market_ret = pivot.mean(axis=1)
-        market_var = float(np.var(market_ret))
-        as_of = pivot.index.max().date()
-
-        rows = []
-        for symbol in pivot.columns:
-            series = pivot[symbol].dropna()
-            if len(series) < 60 or market_var == 0:
-                continue
-
-            aligned = series.align(market_ret, join="inner")[0]
-            mkt = market_ret.loc[aligned.index]
-            cov = float(np.cov(aligned, mkt)[0, 1])
-            beta = cov / market_var if market_var else None
-            corr = float(np.corrcoef(aligned, mkt)[0, 1]) if len(aligned) > 1 else None
-            vol = float(np.std(aligned))
-
-            rows.append(
-                (
-                    symbol,
-                    as_of,
-                    sector_map.get(symbol),
-                    vol,
-                    beta,
-                    json.dumps({"market": corr}),
-                )
-            )
-
-        if not rows:
+        snapshot = build_snapshot(prices, _load_sector_map(con))
+        if snapshot.empty:
             print("⚠️ No risk rows computed.")
             return
 
-        sql = """
-        insert into risk_exposure_snapshot (symbol, as_of, sector, factor_vol, beta_market, factor_corr)
-        values %s
-        on conflict (symbol, as_of) do update set
-            sector = excluded.sector,
-            factor_vol = excluded.factor_vol,
-            beta_market = excluded.beta_market,
-            factor_corr = excluded.factor_corr
-        """
-
-        with con.cursor() as cur:
-            execute_values(cur, sql, rows)
-            con.commit()
-
-        print(f"✅ Risk snapshot rows: {len(rows)}")
+        rows = copy_upsert(con, "risk_exposure_snapshot", [snapshot], SNAPSHOT_COLUMNS, conflict=("symbol", "as_of"))
+        print(f"✅ Risk snapshot rows: {rows}")
 
 
 if __name__ == "__main__":
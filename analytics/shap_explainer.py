@@ -6,6 +6,11 @@ Generates:
 - Feature importance via SHAP values
 - Individual prediction explanations
 - Summary plots for model transparency
+
+Tree models are explained with LightGBM's built-in TreeSHAP
+(``predict(..., pred_contrib=True)``), which scores a whole universe in
+one batched call without the ``shap`` package. Contributions are in raw
+score (log-odds for classifiers) space: base_value + sum(row) = raw score.
 """
 
 import os
@@ -13,11 +18,10 @@ import json
 import pickle
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from typing import Dict, Sequence, Tuple
+from psycopg2.extras import execute_values
 
-# Uncomment when shap is installed
+# Uncomment when shap is installed (only needed for plots)
 # import shap
 # import matplotlib.pyplot as plt
 
@@ -28,6 +32,36 @@ def load_model(model_path: str):
         return pickle.load(f)
 
 
+def compute_contributions(
+    model,
+    features: pd.DataFrame
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Batched TreeSHAP contributions for every row of ``features``.
+
+    Args:
+        model: Fitted LightGBM model (sklearn wrapper or Booster)
+        features: Feature matrix in the model's training column order
+
+    Returns:
+        (contributions, base_values): float32 arrays of shape
+        [n_rows, n_features] and [n_rows]. For multiclass models the
+        last class is explained.
+    """
+    n_rows, n_features = features.shape
+    raw = np.asarray(model.predict(features, pred_contrib=True))
+    if raw.ndim != 2 or raw.shape[0] != n_rows or raw.shape[1] % (n_features + 1):
+        raise ValueError(
+            f"Unexpected pred_contrib shape {raw.shape} for {n_rows}x{n_features} features"
+        )
+
+    # Multiclass output is [n, (f+1) * k]; keep the last class block
+    block = raw[:, -(n_features + 1):]
+    contributions = block[:, :n_features].astype(np.float32)
+    base_values = block[:, n_features].astype(np.float32)
+    return contributions, base_values
+
+
 def compute_shap_values(
     model_path: str,
     features: pd.DataFrame,
@@ -39,56 +73,26 @@ def compute_shap_values(
     Args:
         model_path: Path to pickled model
         features: DataFrame of input features
-        model_type: Type of model ('tree', 'linear', 'deep')
+        model_type: Type of model (only 'tree' is supported)
         
     Returns:
         Dictionary with SHAP values and feature importance
     """
     print(f"📊 Computing SHAP values for {model_path}")
-    
-    # Load model
+
+    if model_type != "tree":
+        raise ValueError(f"Unsupported model_type '{model_type}' (only 'tree')")
+
     model = load_model(model_path)
-    
-    # Note: Uncomment when shap is installed
-    print("⚠️ SHAP library not installed. This is a scaffold.")
-    print("Install with: pip install shap")
-    
-    # Scaffold return - replace with actual SHAP computation
-    # if model_type == "tree":
-    #     explainer = shap.TreeExplainer(model)
-    #     shap_values = explainer.shap_values(features)
-    # elif model_type == "linear":
-    #     explainer = shap.LinearExplainer(model, features)
-    #     shap_values = explainer.shap_values(features)
-    # else:
-    #     explainer = shap.KernelExplainer(model.predict, features)
-    #     shap_values = explainer.shap_values(features)
-    # 
-    # # Compute mean absolute SHAP values (feature importance)
-    # if isinstance(shap_values, list):
-    #     # For multi-output models
-    #     mean_shap = np.mean([np.abs(sv).mean(axis=0) for sv in shap_values], axis=0)
-    # else:
-    #     mean_shap = np.abs(shap_values).mean(axis=0)
-    # 
-    # feature_importance = dict(zip(features.columns, mean_shap))
-    
-    # Simulated feature importance
+    contributions, _ = compute_contributions(model, features)
+
+    # Mean absolute SHAP value per feature (global importance)
+    mean_shap = np.abs(contributions).mean(axis=0)
+    order = np.argsort(-mean_shap, kind="stable")[:20]
     feature_names = features.columns.tolist()
-    feature_importance = {
-        name: np.random.random() * 10
-        for name in feature_names[:20]  # Top 20 features
-    }
-    
-    # Sort by importance
-    sorted_features = sorted(
-        feature_importance.items(),
-        key=lambda x: x[1],
-        reverse=True
-    )
-    
+
     return {
-        'feature_importance': dict(sorted_features[:20]),
+        'feature_importance': {feature_names[i]: float(mean_shap[i]) for i in order},
         'num_features': len(feature_names),
         'model_type': model_type,
         'explanation_method': 'SHAP'
@@ -114,27 +118,67 @@ def explain_prediction(
     print(f"🔍 Explaining prediction {prediction_index}")
     
     model = load_model(model_path)
-    
-    # Scaffold - replace with actual SHAP computation
-    # explainer = shap.TreeExplainer(model)
-    # shap_values = explainer.shap_values(features.iloc[prediction_index:prediction_index+1])
-    # 
-    # explanation = {
-    #     'base_value': explainer.expected_value,
-    #     'shap_values': dict(zip(features.columns, shap_values[0])),
-    #     'feature_values': dict(features.iloc[prediction_index])
-    # }
-    
-    # Simulated explanation
-    feature_names = features.columns.tolist()[:10]
-    explanation = {
-        'base_value': 0.5,
-        'shap_values': {name: np.random.randn() * 0.1 for name in feature_names},
-        'feature_values': {name: features.iloc[prediction_index][name] for name in feature_names if name in features.columns},
-        'prediction': 0.65
+    row = features.iloc[prediction_index:prediction_index + 1]
+    contributions, base_values = compute_contributions(model, row)
+
+    feature_names = features.columns.tolist()
+    return {
+        'base_value': float(base_values[0]),
+        'shap_values': dict(zip(feature_names, contributions[0].tolist())),
+        'feature_values': row.iloc[0].to_dict(),
+        'prediction': float(base_values[0] + contributions[0].sum())
     }
-    
-    return explanation
+
+
+def persist_contributions(
+    conn,
+    model_version: str,
+    as_of,
+    symbols: Sequence[str],
+    feature_names: Sequence[str],
+    contributions: np.ndarray,
+    base_values: np.ndarray
+) -> int:
+    """
+    Bulk upsert per-symbol contributions into model_shap_values.
+
+    Feature names are written once per model version to
+    model_shap_feature_sets; each value row stores a float4 array aligned
+    with them. The caller owns the transaction.
+
+    Returns:
+        Number of rows written
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            insert into model_shap_feature_sets (model_version, feature_names)
+            values (%s, %s)
+            on conflict (model_version) do update set feature_names = excluded.feature_names
+            """,
+            (model_version, list(feature_names)),
+        )
+        rows = [
+            (model_version, as_of, symbol, base, contrib)
+            for symbol, base, contrib in zip(
+                symbols, base_values.tolist(), contributions.tolist()
+            )
+        ]
+        execute_values(
+            cur,
+            """
+            insert into model_shap_values (
+                model_version, as_of, symbol, base_value, contributions
+            ) values %s
+            on conflict (model_version, as_of, symbol) do update set
+                base_value = excluded.base_value,
+                contributions = excluded.contributions,
+                created_at = now()
+            """,
+            rows,
+            page_size=1000,
+        )
+    return len(rows)
 
 
 def generate_shap_plots(
@@ -0,0 +1,138 @@
+"""
+analytics/trading_calendar.py
+ASX trading calendar.
+
+Trading days are weekdays that are not ASX market holidays:
+- New Year's Day, Australia Day (Monday substitute when on a weekend)
+- Good Friday, Easter Monday
+- Anzac Day (no substitute)
+- King's/Queen's Birthday (second Monday of June)
+- Christmas Day, Boxing Day (weekday substitutes)
+- one-off closures (ASX_EXTRA_HOLIDAYS, e.g. the 2022 National Day of Mourning)
+
+Holidays for CALENDAR_START_YEAR..CALENDAR_END_YEAR are expanded once into a
+numpy busdaycalendar, so offset/next/is_trading_day are vectorized and O(1)
+per date. Early closes (Christmas Eve, New Year's Eve) are trading days.
+
+Scalar inputs return datetime.date / bool; array-like inputs return
+datetime64[D] / bool arrays.
+"""
+
+import os
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+
+CALENDAR_START_YEAR = int(os.getenv("CALENDAR_START_YEAR", "1990"))
+CALENDAR_END_YEAR = int(os.getenv("CALENDAR_END_YEAR", "2050"))
+
+# One-off closures not produced by the rules below
+ASX_EXTRA_HOLIDAYS = [
+    d.strip() for d in os.getenv("ASX_EXTRA_HOLIDAYS", "2022-09-22").split(",") if d.strip()
+]
+
+
+def _easter_sunday(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    weekday = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * weekday) // 451
+    month, day = divmod(h + weekday - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _monday_if_weekend(d: date) -> date:
+    return d + timedelta(days=(7 - d.weekday()) % 7) if d.weekday() >= 5 else d
+
+
+def asx_holidays(year: int) -> List[date]:
+    """ASX market holidays falling on weekdays in a given year."""
+    easter = _easter_sunday(year)
+    june_first = date(year, 6, 1)
+    kings_birthday = june_first + timedelta(days=(7 - june_first.weekday()) % 7 + 7)
+
+    # Christmas/Boxing Day substitutes land on the next free weekdays
+    christmas_days = []
+    for d in (date(year, 12, 25), date(year, 12, 26)):
+        while d.weekday() >= 5 or d in christmas_days:
+            d += timedelta(days=1)
+        christmas_days.append(d)
+
+    holidays = [
+        _monday_if_weekend(date(year, 1, 1)),
+        _monday_if_weekend(date(year, 1, 26)),
+        easter - timedelta(days=2),
+        easter + timedelta(days=1),
+        date(year, 4, 25),
+        kings_birthday,
+        *christmas_days,
+    ]
+    holidays += [date.fromisoformat(d) for d in ASX_EXTRA_HOLIDAYS if d.startswith(str(year))]
+    return sorted({d for d in holidays if d.weekday() < 5})
+
+
+@lru_cache(maxsize=1)
+def _calendar() -> np.busdaycalendar:
+    holidays = [d for y in range(CALENDAR_START_YEAR, CALENDAR_END_YEAR + 1) for d in asx_holidays(y)]
+    return np.busdaycalendar(weekmask="1111100", holidays=np.array(holidays, dtype="datetime64[D]"))
+
+
+def _as_days(dates) -> np.ndarray:
+    if hasattr(dates, "to_numpy"):
+        dates = dates.to_numpy()
+    return np.asarray(dates, dtype="datetime64[D]")
+
+
+def _result(days: np.ndarray):
+    return days.item() if days.ndim == 0 else days
+
+
+def is_trading_day(dates):
+    """True for ASX trading days."""
+    return _result(np.is_busday(_as_days(dates), busdaycal=_calendar()))
+
+
+def offset(dates, n: int, roll: str = "backward"):
+    """
+    Move dates by n trading days.
+
+    Non-trading dates are first rolled to a trading day ('backward' to the
+    previous one, 'forward' to the next), so offset(saturday, 1) is Monday
+    and offset(saturday, 0) is Friday.
+    """
+    return _result(np.busday_offset(_as_days(dates), n, roll=roll, busdaycal=_calendar()))
+
+
+def next_trading_day(dates):
+    """First trading day strictly after each date."""
+    return offset(dates, 1, roll="backward")
+
+
+def previous_trading_day(dates):
+    """Last trading day strictly before each date."""
+    return offset(dates, -1, roll="forward")
+
+
+def latest_trading_day(dates):
+    """Each date if it is a trading day, else the trading day before it."""
+    return offset(dates, 0, roll="backward")
+
+
+def trading_days(start, end) -> np.ndarray:
+    """Trading days in [start, end] as datetime64[D]."""
+    start, end = _as_days(start), _as_days(end)
+    days = np.arange(start, end + np.timedelta64(1, "D"), dtype="datetime64[D]")
+    return days[np.is_busday(days, busdaycal=_calendar())]
+
+
+def count_trading_days(start, end):
+    """Trading days in [start, end) (vectorized)."""
+    return _result(np.busday_count(_as_days(start), _as_days(end), busdaycal=_calendar()))
@@ -0,0 +1,151 @@
+"""Tests for EventBus queued, concurrent dispatch."""
+
+import asyncio
+import importlib
+import threading
+import time
+
+import pytest
+
+from app.core.events.event_bus import Event, EventBus, EventType
+
+# The package re-exports the event_bus instance under the module's name
+event_bus_module = importlib.import_module("app.core.events.event_bus")
+
+
+@pytest.fixture
+def bus():
+    """Fresh EventBus instance."""
+    EventBus._instance = None
+    yield EventBus()
+    EventBus._instance = None
+
+
+@pytest.mark.asyncio
+async def test_publish_does_not_wait_for_handlers(bus):
+    release = asyncio.Event()
+    handled = []
+
+    async def slow_handler(event):
+        await release.wait()
+        handled.append(event.event_id)
+
+    bus.subscribe(EventType.SIGNAL_GENERATED, slow_handler)
+    event = Event(type=EventType.SIGNAL_GENERATED, payload={})
+
+    await asyncio.wait_for(bus.publish(event), timeout=1)
+    assert handled == []
+
+    release.set()
+    await bus.drain()
+    assert handled == [event.event_id]
+    await bus.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_handlers_run_concurrently_and_sync_handlers_off_loop(bus):
+    threads = []
+
+    async def async_handler(event):
+        await asyncio.sleep(0.1)
+
+    def sync_handler(event):
+        threads.append(threading.current_thread())
+        time.sleep(0.1)
+
+    for handler in (async_handler, async_handler, sync_handler):
+        bus.subscribe(EventType.PORTFOLIO_CHANGED, handler)
+
+    started = time.perf_counter()
+    await bus.publish(Event(type=EventType.PORTFOLIO_CHANGED, payload={}))
+    await bus.drain()
+
+    assert time.perf_counter() - started < 0.25
+    assert threads and threads[0] is not threading.main_thread()
+    stats = bus.metrics()[EventType.PORTFOLIO_CHANGED.value]
+    assert stats["handled"] == 3 and stats["queue_depth"] == 0
+    assert stats["latency_max"] >= 0.1
+    await bus.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_applies_backpressure(bus, monkeypatch):
+    monkeypatch.setattr(event_bus_module, "EVENT_BUS_QUEUE_SIZE", 2)
+    monkeypatch.setattr(event_bus_module, "EVENT_BUS_WORKERS", 1)
+    release = asyncio.Event()
+
+    async def blocked_handler(event):
+        await release.wait()
+
+    bus.subscribe(EventType.JOB_COMPLETED, blocked_handler)
+    for _ in range(3):  # one being handled, two queued
+        await bus.publish(Event(type=EventType.JOB_COMPLETED, payload={}))
+    await asyncio.sleep(0)
+
+    blocked = asyncio.ensure_future(bus.publish(Event(type=EventType.JOB_COMPLETED, payload={})))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+    assert bus.metrics()[EventType.JOB_COMPLETED.value]["queue_depth"] == 2
+
+    release.set()
+    await asyncio.wait_for(blocked, timeout=1)
+    await bus.drain()
+    assert bus.metrics()[EventType.JOB_COMPLETED.value]["handled"] == 4
+    await bus.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_handler_errors_are_counted(bus):
+    async def faulty_handler(event):
+        raise RuntimeError("boom")
+
+    bus.subscribe(EventType.ALERT_TRIGGERED, faulty_handler)
+    await bus.publish(Event(type=EventType.ALERT_TRIGGERED, payload={}))
+    await bus.drain()
+
+    assert bus.metrics()[EventType.ALERT_TRIGGERED.value]["failed"] == 1
+    await bus.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_history_is_a_ring_buffer_per_type(bus):
+    for i in range(1200):
+        await bus.publish(Event(type=EventType.PRICE_UPDATED, payload={"i": i}))
+    await bus.publish(Event(type=EventType.NEWS_INGESTED, payload={"i": -1}))
+
+    prices = bus.get_history(EventType.PRICE_UPDATED, limit=2000)
+    assert len(prices) == event_bus_module.EVENT_BUS_HISTORY
+    assert prices[-1].payload["i"] == 1199
+    assert [e.payload["i"] for e in bus.get_history(EventType.NEWS_INGESTED)] == [-1]
+    assert bus.get_history(limit=1)[0].type == EventType.NEWS_INGESTED
+    await bus.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_single_worker_handles_events_in_order(bus, monkeypatch):
+    monkeypatch.setattr(event_bus_module, "EVENT_BUS_WORKERS", 1)
+    handled = []
+
+    async def handler(event):
+        await asyncio.sleep(0.01 if event.payload["i"] == 0 else 0)
+        handled.append(event.payload["i"])
+
+    bus.subscribe(EventType.PORTFOLIO_CHANGED, handler)
+    for i in range(5):
+        await bus.publish(Event(type=EventType.PORTFOLIO_CHANGED, payload={"i": i}))
+    await bus.drain()
+
+    assert handled == [0, 1, 2, 3, 4]
+    await bus.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_does_not_wait_for_hung_handlers(bus):
+    async def hung_handler(event):
+        await asyncio.Event().wait()
+
+    bus.subscribe(EventType.JOB_COMPLETED, hung_handler)
+    await bus.publish(Event(type=EventType.JOB_COMPLETED, payload={}))
+
+    await asyncio.wait_for(bus.shutdown(timeout=0.05), timeout=1)
+    assert bus.metrics()[EventType.JOB_COMPLETED.value]["handled"] == 0
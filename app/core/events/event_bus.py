@@ -1,15 +1,45 @@
-"""Event Bus for pub/sub within the application."""
+"""Event Bus for pub/sub within the application.
+
+publish() records the event and puts it on its type's bounded queue, waiting
+only while that queue is full (backpressure); it does not wait for handlers.
+Each event type has EVENT_BUS_WORKERS worker tasks that take events off the
+queue and run all of the type's handlers concurrently: coroutine handlers on
+the loop, sync handlers in a shared thread pool. Workers start on first
+publish in the running loop (and restart if the loop changes, e.g. per test).
+
+Ordering: with the default of 4 workers, up to 4 events of the same type
+are handled at once and may finish out of order (e.g. two PORTFOLIO_CHANGED
+events for one portfolio). Before the queues, publish() handled events
+strictly in order; set EVENT_BUS_WORKERS=1 to get that back (handlers of
+one event still run concurrently with each other).
+
+History is a ring buffer per event type plus one across all types, each
+keeping the last EVENT_BUS_HISTORY events. metrics() reports queue depth and
+handler latency per type.
+"""
 import asyncio
 import logging
-from collections import defaultdict
+import os
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional
 import uuid
 
 logger = logging.getLogger(__name__)
 
+EVENT_BUS_QUEUE_SIZE = int(os.getenv("EVENT_BUS_QUEUE_SIZE", "1000"))
+EVENT_BUS_WORKERS = int(os.getenv("EVENT_BUS_WORKERS", "4"))
+EVENT_BUS_THREADS = int(os.getenv("EVENT_BUS_THREADS", "8"))
+EVENT_BUS_HISTORY = int(os.getenv("EVENT_BUS_HISTORY", "1000"))
+# Seconds shutdown() waits for queued events before cancelling the workers
+EVENT_BUS_SHUTDOWN_TIMEOUT = float(os.getenv("EVENT_BUS_SHUTDOWN_TIMEOUT", "10"))
+# Recent handler latencies kept per type for the percentiles in metrics()
+LATENCY_WINDOW = 1000
+
 class EventType(str, Enum):
     SIGNAL_GENERATED = "signal.generated"
     SIGNAL_CHANGED = "signal.changed"
@@ -38,15 +68,29 @@ class Event:
             "source": self.source, "user_id": self.user_id,
         }
 
+@dataclass
+class _TypeStats:
+    published: int = 0
+    handled: int = 0
+    failed: int = 0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
 class EventBus:
-    """In-memory event bus for pub/sub."""
+    """In-memory event bus for pub/sub with per-type worker queues."""
     _instance: Optional["EventBus"] = None
 
     def __new__(cls) -> "EventBus":
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._handlers: Dict[EventType, List[Callable]] = defaultdict(list)
-            cls._instance._history: List[Event] = []
+            cls._instance._history: Deque[Event] = deque(maxlen=EVENT_BUS_HISTORY)
+            cls._instance._history_by_type: Dict[EventType, Deque[Event]] = defaultdict(
+                lambda: deque(maxlen=EVENT_BUS_HISTORY))
+            cls._instance._stats: Dict[EventType, _TypeStats] = defaultdict(_TypeStats)
+            cls._instance._queues: Dict[EventType, asyncio.Queue] = {}
+            cls._instance._workers: Dict[EventType, List[asyncio.Task]] = {}
+            cls._instance._loop: Optional[asyncio.AbstractEventLoop] = None
+            cls._instance._executor: Optional[ThreadPoolExecutor] = None
         return cls._instance
 
     def subscribe(self, event_type: EventType, handler: Callable) -> Callable[[], None]:
@@ -58,21 +102,93 @@ class EventBus:
 
     async def publish(self, event: Event) -> None:
         self._history.append(event)
-        if len(self._history) > 1000:
-            self._history = self._history[-1000:]
-        for handler in self._handlers.get(event.type, []):
+        self._history_by_type[event.type].append(event)
+        self._stats[event.type].published += 1
+        await self._queue(event.type).put(event)
+
+    def _queue(self, event_type: EventType) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Queues and workers belong to one loop; start over in a new one
+            self._loop, self._queues, self._workers = loop, {}, {}
+        if event_type not in self._queues:
+            queue = self._queues[event_type] = asyncio.Queue(maxsize=EVENT_BUS_QUEUE_SIZE)
+            self._workers[event_type] = [
+                loop.create_task(self._worker(event_type, queue), name=f"event-bus-{event_type.value}-{i}")
+                for i in range(EVENT_BUS_WORKERS)
+            ]
+        return self._queues[event_type]
+
+    async def _worker(self, event_type: EventType, queue: asyncio.Queue) -> None:
+        while True:
+            event = await queue.get()
             try:
-                if asyncio.iscoroutinefunction(handler):
-                    await handler(event)
-                else:
-                    handler(event)
-            except Exception as e:
-                logger.error(f"Event handler error: {e}")
+                handlers = list(self._handlers.get(event_type, []))
+                await asyncio.gather(*(self._run(handler, event) for handler in handlers))
+            finally:
+                queue.task_done()
+
+    async def _run(self, handler: Callable, event: Event) -> None:
+        stats = self._stats[event.type]
+        started = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(handler):
+                await handler(event)
+            else:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(EVENT_BUS_THREADS, thread_name_prefix="event-bus")
+                await asyncio.get_running_loop().run_in_executor(self._executor, handler, event)
+            stats.handled += 1
+        except Exception as e:
+            stats.failed += 1
+            logger.error(f"Event handler error: {e}")
+        finally:
+            stats.latencies.append(time.perf_counter() - started)
+
+    async def drain(self) -> None:
+        """Wait until every queued event has been handled."""
+        if self._loop is asyncio.get_running_loop():
+            await asyncio.gather(*(queue.join() for queue in list(self._queues.values())))
+
+    async def shutdown(self, timeout: float = EVENT_BUS_SHUTDOWN_TIMEOUT) -> None:
+        """Handle queued events (for up to timeout seconds), then stop the workers and the thread pool."""
+        try:
+            await asyncio.wait_for(self.drain(), timeout)
+        except asyncio.TimeoutError:
+            pending = sum(queue.qsize() for queue in self._queues.values())
+            logger.warning(f"Event bus shutdown timed out after {timeout}s with {pending} events queued")
+        tasks = [task for workers in self._workers.values() for task in workers]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop, self._queues, self._workers = None, {}, {}
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
 
     def get_history(self, event_type: Optional[EventType] = None, limit: int = 100) -> List[Event]:
-        events = self._history
-        if event_type:
-            events = [e for e in events if e.type == event_type]
-        return events[-limit:]
+        events = self._history_by_type.get(event_type, ()) if event_type else self._history
+        return list(events)[-limit:]
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth, handler counts and handler latency (seconds) per event type.
+
+        Call from the event loop thread: workers update the stats there.
+        """
+        out = {}
+        for event_type, stats in self._stats.items():
+            queue = self._queues.get(event_type)
+            latencies = sorted(stats.latencies)
+            out[event_type.value] = {
+                "queue_depth": queue.qsize() if queue else 0,
+                "queue_size": EVENT_BUS_QUEUE_SIZE,
+                "published": stats.published,
+                "handled": stats.handled,
+                "failed": stats.failed,
+                "latency_mean": sum(latencies) / len(latencies) if latencies else None,
+                "latency_p95": latencies[int(0.95 * (len(latencies) - 1))] if latencies else None,
+                "latency_max": latencies[-1] if latencies else None,
+            }
+        return out
 
 event_bus = EventBus()
@@ -87,6 +87,7 @@ class TestRegisterEventHandlers:
             
             # Act
             await clean_event_bus.publish(drift_event)
+            await clean_event_bus.drain()
             
             # Assert
             mock_notify.assert_called_once()
@@ -111,6 +112,7 @@ class TestRegisterEventHandlers:
                     source="test"
                 )
                 await clean_event_bus.publish(event)
+            await clean_event_bus.drain()
             
             # Assert
             assert mock_notify.call_count == 3
@@ -139,6 +141,7 @@ class TestRegisterEventHandlers:
             
             # Act
             await clean_event_bus.publish(drift_event)
+            await clean_event_bus.drain()
             
             # Assert
             call_kwargs = mock_notify.call_args[1]
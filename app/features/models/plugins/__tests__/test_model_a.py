@@ -423,6 +423,88 @@ class TestModelAGetSignal:
         assert call_args[0][1] == date.today()
 
 
+# ===========================================================================
+# TestModelAFeatureSnapshots
+# ===========================================================================
+
+def _snapshot_row(symbol="BHP.AX", **overrides):
+    """Single-row snapshot shaped like engineer_features output."""
+    row = {
+        "dt": pd.Timestamp("2024-01-15"), "symbol": symbol,
+        "close": 45.0, "volume": 1_000_000,
+        "mom_12_1": 0.15, "mom_6": 0.10, "mom_3": 0.05,
+        "vol_90": 0.02, "adv_20_median": 10_000_000.0,
+        "trend_200": 1, "sma200_slope_pos": 1,
+    }
+    row.update(overrides)
+    return pd.DataFrame([row])
+
+
+class TestModelAFeatureSnapshots:
+    """Test point-in-time feature snapshots for single-ticker lookups."""
+
+    @pytest.mark.asyncio
+    async def test_get_signal_scores_snapshot_without_regenerating(self, plugin):
+        """A stored snapshot is scored directly; the price pipeline is skipped."""
+        with patch.object(plugin, "_get_signal_from_db", return_value=None), \
+             patch.object(plugin, "_get_feature_snapshot", return_value=_snapshot_row()), \
+             patch.object(plugin, "generate_signals", new_callable=AsyncMock) as mock_generate:
+            result = await plugin.get_signal("BHP.AX", as_of=date(2024, 1, 15))
+
+        mock_generate.assert_not_called()
+        assert result.symbol == "BHP.AX"
+        assert result.confidence == pytest.approx(0.7)
+        assert result.metadata["source"] == "feature_snapshot"
+
+    @pytest.mark.asyncio
+    async def test_get_signal_snapshot_failing_filters_returns_none(self, plugin):
+        """A snapshot that fails the liquidity gate yields no signal."""
+        snapshot = _snapshot_row(adv_20_median=1000.0)
+        with patch.object(plugin, "_get_signal_from_db", return_value=None), \
+             patch.object(plugin, "_get_feature_snapshot", return_value=snapshot), \
+             patch.object(plugin, "generate_signals", new_callable=AsyncMock) as mock_generate:
+            result = await plugin.get_signal("BHP.AX", as_of=date(2024, 1, 15))
+
+        mock_generate.assert_not_called()
+        assert result is None
+
+    @pytest.mark.asyncio
+    async def test_feature_engineering_persists_snapshots(self, plugin):
+        """Engineered features are written as a by-product of a scoring run."""
+        prices = pd.DataFrame({"dt": [date(2024, 1, 15)], "symbol": ["BHP.AX"],
+                               "close": [45.0], "volume": [1_000_000]})
+        latest = _snapshot_row()
+
+        with patch.object(plugin, "_load_prices", return_value=prices), \
+             patch("app.features.models.plugins.model_a.run_cpu_bound",
+                   new_callable=AsyncMock, return_value=latest), \
+             patch.object(plugin, "_persist_feature_snapshots") as mock_persist:
+            result = await plugin._load_and_engineer_features(["BHP.AX"], date(2024, 1, 15))
+
+        assert result is latest
+        mock_persist.assert_called_once_with(latest, date(2024, 1, 15))
+
+    def test_get_feature_snapshot_reads_current_feature_set(self, plugin):
+        """Snapshot lookup is keyed by symbol, date and feature-set version."""
+        from app.features.models.plugins.model_a import FEATURE_SET_VERSION
+
+        cursor = MagicMock()
+        cursor.fetchone.return_value = ({"close": 45.0, "mom_12_1": None},)
+        con = MagicMock()
+        con.cursor.return_value.__enter__.return_value = cursor
+        cm = MagicMock()
+        cm.__enter__ = MagicMock(return_value=con)
+        cm.__exit__ = MagicMock(return_value=False)
+
+        with patch("app.features.models.plugins.model_a.db_context", return_value=cm):
+            snapshot = plugin._get_feature_snapshot("BHP.AX", date(2024, 1, 15))
+
+        assert cursor.execute.call_args[0][1] == ("BHP.AX", date(2024, 1, 15), FEATURE_SET_VERSION)
+        assert snapshot.iloc[0]["symbol"] == "BHP.AX"
+        assert snapshot.iloc[0]["close"] == 45.0
+        assert np.isnan(snapshot.iloc[0]["mom_12_1"])
+
+
 # ===========================================================================
 # TestModelAGetSignalFromDb
 # ===========================================================================
@@ -526,11 +608,50 @@ class TestModelAExplain:
         assert "error" in result
         assert result["error"] == "Model not loaded"
 
+    @staticmethod
+    def _db_returning(row):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = row
+        con = MagicMock()
+        con.cursor.return_value.__enter__.return_value = cursor
+        cm = MagicMock()
+        cm.__enter__ = MagicMock(return_value=con)
+        cm.__exit__ = MagicMock(return_value=False)
+        return cm, cursor
+
     def test_get_shap_from_db_returns_none(self, plugin):
-        """The placeholder _get_shap_from_db always returns None."""
-        result = plugin._get_shap_from_db("BHP.AX")
+        """No stored contributions for the symbol yields None."""
+        cm, _ = self._db_returning(None)
+        with patch("app.features.models.plugins.model_a.db_context", return_value=cm):
+            result = plugin._get_shap_from_db("BHP.AX")
         assert result is None
 
+    def test_get_shap_from_db_sorted_by_absolute_contribution(self, plugin):
+        """Stored contributions are zipped with feature names, largest |value| first."""
+        cm, cursor = self._db_returning(
+            (["mom_12_1", "vol_90", "mom_6"], [0.05, -0.30, 0.10])
+        )
+        with patch("app.features.models.plugins.model_a.db_context", return_value=cm):
+            result = plugin._get_shap_from_db("BHP.AX")
+
+        assert cursor.execute.call_args[0][1] == ("BHP.AX", "model_a_v1.1")
+        assert [f["name"] for f in result] == ["vol_90", "mom_6", "mom_12_1"]
+        assert result[0]["shap_value"] == pytest.approx(-0.30)
+        assert result[0]["importance"] == pytest.approx(0.30)
+
+    @pytest.mark.asyncio
+    async def test_generate_signals_stores_contributions(self, plugin):
+        """A scoring run stores SHAP contributions for the scored universe."""
+        with patch.object(plugin, "_load_and_engineer_features",
+                          new_callable=AsyncMock, return_value=_snapshot_row()), \
+             patch.object(plugin, "_store_contributions") as mock_store:
+            signals = await plugin.generate_signals(["BHP.AX"], date(2024, 1, 15))
+
+        assert len(signals) == 1
+        stored_df, stored_as_of = mock_store.call_args[0]
+        assert stored_df["symbol"].tolist() == ["BHP.AX"]
+        assert stored_as_of == date(2024, 1, 15)
+
 
 # ===========================================================================
 # TestModelAApplyFilters
@@ -1,11 +1,56 @@
 """Base class for ML model plugins."""
+import asyncio
+import multiprocessing
+import os
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, field
 from datetime import date
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Callable, Dict, List, Literal, Optional
+
+from app.core import logger
 
 SignalType = Literal['STRONG_BUY', 'BUY', 'HOLD', 'SELL', 'STRONG_SELL']
 
+# Shared process pool for CPU-bound plugin work (feature engineering).
+# Created lazily so importing a plugin never forks worker processes.
+_cpu_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_cpu_executor() -> ProcessPoolExecutor:
+    """Return the shared process pool, creating it on first use.
+
+    Pool size is read from MODEL_CPU_WORKERS (default: min(4, cpu_count)).
+    Workers use the "spawn" start method so they never inherit the API's
+    DB connection pool or event loop.
+    """
+    global _cpu_executor
+    if _cpu_executor is None:
+        workers = int(os.getenv("MODEL_CPU_WORKERS", min(4, os.cpu_count() or 1)))
+        _cpu_executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info(f"Initialized model CPU executor ({workers} workers)")
+    return _cpu_executor
+
+
+async def run_cpu_bound(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a picklable, module-level function in the shared process pool.
+
+    Falls back to a worker thread if the pool has died (e.g. a worker was
+    OOM-killed) so a single crash degrades throughput rather than signals.
+    """
+    global _cpu_executor
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_cpu_executor(), func, *args)
+    except BrokenProcessPool:
+        logger.warning("Model CPU executor is broken; recreating and running in a thread")
+        _cpu_executor = None
+        return await asyncio.to_thread(func, *args)
+
 @dataclass
 class ModelConfig:
     """Configuration for a model plugin."""
@@ -14,6 +14,7 @@ The plugin extracts the core feature engineering and inference logic from the
 legacy Model A job (run_model_a_job.py) into a reusable, testable component.
 """
 
+import asyncio
 import os
 from datetime import date, timedelta
 from typing import Any, Dict, List, Optional
@@ -23,14 +24,31 @@ import numpy as np
 import pandas as pd
 import lightgbm as lgb
 
-from app.core import db, logger, PROJECT_ROOT
+from psycopg2.extras import Json, execute_values
+
+from app.core import db, db_context, logger, PROJECT_ROOT
 from app.features.models.plugins.base import (
     ModelConfig,
     ModelOutput,
     ModelPlugin,
     SignalType,
+    run_cpu_bound,
 )
 
+# Version of the engineer_features output stored in model_a_feature_snapshots.
+# Bump whenever engineer_features changes so stale snapshots are never scored.
+FEATURE_SET_VERSION = "model_a_tech_v1"
+
+# Engineered columns persisted per snapshot (superset of inference inputs
+# and the columns _apply_filters needs).
+SNAPSHOT_COLUMNS = [
+    "close", "volume",
+    "mom_12_1", "mom_9", "mom_6", "mom_3",
+    "vol_30", "vol_90", "vol_ratio_30_90",
+    "adv_20_median", "adv_ratio_20_60",
+    "trend_200", "sma200_slope_pos", "sma200_slope", "trend_strength",
+]
+
 
 class ModelAPlugin(ModelPlugin):
     """
@@ -231,8 +249,10 @@ class ModelAPlugin(ModelPlugin):
             logger.warning(f"ModelA: No symbols passed filters for {as_of}")
             return []
 
-        # Run ML inference
-        signals = self._run_inference(df, as_of)
+        # Run ML inference (LightGBM releases the GIL, so a thread is enough)
+        signals = await asyncio.to_thread(self._run_inference, df, as_of)
+        if signals:
+            await asyncio.to_thread(self._store_contributions, df, as_of)
 
         logger.info(f"ModelA: Generated {len(signals)} signals")
         return signals
@@ -243,11 +263,9 @@ class ModelAPlugin(ModelPlugin):
         """
         Load price history and engineer technical features.
 
-        Features engineered:
-        - Momentum: 12-1, 6M, 3M, 9M returns
-        - Volatility: 30d, 90d rolling std deviation
-        - Trend: 200-day SMA, slope analysis
-        - Volume: ADV 20-day median, ratios
+        The price query runs in a worker thread so other plugins' DB loads
+        overlap with it, and the pandas feature pipeline runs in the shared
+        process pool (see engineer_features) so it never blocks the event loop.
 
         Args:
             symbols: List of symbols to process
@@ -259,6 +277,34 @@ class ModelAPlugin(ModelPlugin):
         # Load 520 days of history for feature calculation
         start_date = as_of - timedelta(days=520)
 
+        df = await asyncio.to_thread(self._load_prices, symbols, start_date, as_of)
+
+        if df.empty:
+            logger.warning(f"No price data found for symbols from {start_date} to {as_of}")
+            return pd.DataFrame()
+
+        latest = await run_cpu_bound(engineer_features, df, as_of)
+
+        # By-product: snapshot features so single-ticker lookups skip this step
+        if not latest.empty:
+            await asyncio.to_thread(self._persist_feature_snapshots, latest, as_of)
+
+        return latest
+
+    def _load_prices(
+        self, symbols: List[str], start_date: date, as_of: date
+    ) -> pd.DataFrame:
+        """
+        Load close/volume history for symbols between start_date and as_of.
+
+        Args:
+            symbols: List of symbols to load
+            start_date: First date (inclusive)
+            as_of: Last date (inclusive)
+
+        Returns:
+            DataFrame with columns dt, symbol, close, volume
+        """
         query = """
             SELECT dt, symbol, close, volume
             FROM prices
@@ -268,86 +314,85 @@ class ModelAPlugin(ModelPlugin):
         """
 
         with db() as con:
-            df = pd.read_sql(
+            return pd.read_sql(
                 query,
                 con,
                 params=(start_date, as_of, symbols),
             )
 
-        if df.empty:
-            logger.warning(f"No price data found for symbols from {start_date} to {as_of}")
-            return pd.DataFrame()
+    def _persist_feature_snapshots(self, df: pd.DataFrame, as_of: date) -> None:
+        """
+        Upsert engineered features into model_a_feature_snapshots.
 
-        df["dt"] = pd.to_datetime(df["dt"])
-        df = df.sort_values(["symbol", "dt"])
+        Failures are logged and swallowed: snapshots are a cache for
+        single-ticker lookups and must never fail a scoring run.
 
-        # Calculate returns
-        df["ret1"] = df.groupby("symbol")["close"].pct_change()
+        Args:
+            df: Engineered feature snapshot, one row per symbol
+            as_of: Snapshot date
+        """
+        cols = [c for c in SNAPSHOT_COLUMNS if c in df.columns]
+        values = df[cols].astype(float).replace([np.inf, -np.inf], np.nan)
+        values = values.astype(object).where(values.notna(), None)
 
-        # Momentum features
-        df["mom_12_1"] = (
-            df.groupby("symbol")["close"].shift(21) /
-            df.groupby("symbol")["close"].shift(252) - 1.0
-        )
-        df["mom_6"] = df.groupby("symbol")["close"].pct_change(126)
-        df["mom_3"] = df.groupby("symbol")["close"].pct_change(63)
-        df["mom_9"] = df.groupby("symbol")["close"].pct_change(189)
-
-        # Volatility features
-        df["vol_90"] = (
-            df.groupby("symbol")["ret1"]
-            .rolling(90)
-            .std()
-            .reset_index(level=0, drop=True)
-        )
-        df["vol_30"] = (
-            df.groupby("symbol")["ret1"]
-            .rolling(30)
-            .std()
-            .reset_index(level=0, drop=True)
-        )
-        df["vol_ratio_30_90"] = df["vol_30"] / (df["vol_90"] + 1e-12)
-
-        # Volume/liquidity features
-        df["adv_20_median"] = (
-            (df["close"] * df["volume"])
-            .groupby(df["symbol"])
-            .rolling(20)
-            .median()
-            .reset_index(level=0, drop=True)
-        )
+        rows = [
+            (symbol, as_of, FEATURE_SET_VERSION, Json(dict(zip(cols, record))))
+            for symbol, record in zip(df["symbol"], values.itertuples(index=False))
+        ]
 
-        adv_60 = (
-            df.groupby("symbol")["adv_20_median"]
-            .rolling(60)
-            .median()
-            .reset_index(level=0, drop=True)
-        )
-        df["adv_ratio_20_60"] = df["adv_20_median"] / (adv_60 + 1e-12)
-
-        # Trend features
-        sma200 = (
-            df.groupby("symbol")["close"]
-            .rolling(200)
-            .mean()
-            .reset_index(level=0, drop=True)
-        )
-        sma200_lag = sma200.groupby(df["symbol"]).shift(20)
+        try:
+            with db_context() as con, con.cursor() as cur:
+                execute_values(
+                    cur,
+                    """
+                    INSERT INTO model_a_feature_snapshots (
+                        symbol, as_of, feature_set_version, features
+                    ) VALUES %s
+                    ON CONFLICT (symbol, as_of, feature_set_version) DO UPDATE SET
+                        features = EXCLUDED.features,
+                        created_at = NOW()
+                    """,
+                    rows,
+                )
+            logger.debug(f"ModelA: Stored {len(rows)} feature snapshots for {as_of}")
+        except Exception as e:
+            logger.warning(f"ModelA: Failed to store feature snapshots: {e}")
 
-        df["trend_200"] = (df["close"] > sma200).astype(int)
-        df["sma200_slope_pos"] = (sma200 > sma200_lag).astype(int)
-        df["sma200_slope"] = (sma200 - sma200_lag) / (sma200_lag + 1e-12)
-        df["trend_strength"] = np.where(
-            df["trend_200"],
-            1,
-            -1
-        ) * np.log1p(np.abs(df["sma200_slope"]))
+    def _get_feature_snapshot(
+        self, symbol: str, as_of: date
+    ) -> Optional[pd.DataFrame]:
+        """
+        Read a symbol's point-in-time feature snapshot.
 
-        # Get latest snapshot
-        latest = df.groupby("symbol").tail(1).copy()
-        latest = latest[latest["dt"].dt.date == as_of]
+        Args:
+            symbol: Ticker symbol
+            as_of: Snapshot date
 
-        return latest
+        Returns:
+            Single-row DataFrame shaped like engineer_features output,
+            or None if no snapshot exists for the current feature set
+        """
+        query = """
+            SELECT features
+            FROM model_a_feature_snapshots
+            WHERE symbol = %s AND as_of = %s AND feature_set_version = %s
+        """
+
+        try:
+            with db_context() as con, con.cursor() as cur:
+                cur.execute(query, (symbol, as_of, FEATURE_SET_VERSION))
+                row = cur.fetchone()
+        except Exception as e:
+            logger.error(f"ModelA: Failed to read feature snapshot: {e}")
+            return None
+
+        if row is None:
+            return None
+
+        features = {k: np.nan if v is None else v for k, v in row[0].items()}
+        return pd.DataFrame(
+            [{"dt": pd.Timestamp(as_of), "symbol": symbol, **features}]
+        )
 
     def _apply_filters(
         self,
@@ -429,19 +474,7 @@ class ModelAPlugin(ModelPlugin):
         if self._classifier is None or self._regressor is None:
             raise RuntimeError("Models not loaded. Call _load_models() first.")
 
-        # Prepare feature matrix
-        X = pd.DataFrame()
-        for feat in self._features:
-            if feat in df.columns:
-                X[feat] = df[feat]
-            else:
-                # Fill missing features with neutral values
-                logger.warning(f"Feature {feat} not found, filling with 0")
-                X[feat] = 0.0
-
-        # Replace inf/-inf with NaN, then fill
-        X = X.replace([np.inf, -np.inf], np.nan)
-        X = X.fillna(0.0)
+        X = self._feature_matrix(df)
 
         # Run inference
         try:
@@ -494,6 +527,61 @@ class ModelAPlugin(ModelPlugin):
 
         return signals
 
+    def _feature_matrix(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Build the classifier/regressor input matrix in training column order.
+
+        Missing features are filled with neutral values and inf/NaN with 0.
+        """
+        X = pd.DataFrame(index=df.index)
+        for feat in self._features:
+            if feat in df.columns:
+                X[feat] = df[feat]
+            else:
+                # Fill missing features with neutral values
+                logger.warning(f"Feature {feat} not found, filling with 0")
+                X[feat] = 0.0
+
+        # Replace inf/-inf with NaN, then fill
+        X = X.replace([np.inf, -np.inf], np.nan)
+        return X.fillna(0.0)
+
+    @property
+    def _shap_model_version(self) -> str:
+        """Key for this model's rows in model_shap_values."""
+        return f"{self._config.model_id}_{self._config.version}"
+
+    def _store_contributions(self, df: pd.DataFrame, as_of: date) -> None:
+        """
+        Compute TreeSHAP contributions for the scored universe and store them.
+
+        One batched pred_contrib call covers every symbol, so reasoning
+        endpoints become lookups instead of per-request SHAP runs. Failures
+        are logged and swallowed; explanations must never fail a scoring run.
+
+        Args:
+            df: Filtered feature frame that was scored
+            as_of: Signal date
+        """
+        from analytics.shap_explainer import compute_contributions, persist_contributions
+
+        try:
+            X = self._feature_matrix(df)
+            contributions, base_values = compute_contributions(self._classifier, X)
+            with db_context() as con:
+                count = persist_contributions(
+                    con,
+                    self._shap_model_version,
+                    as_of,
+                    df["symbol"].tolist(),
+                    self._features,
+                    contributions,
+                    base_values,
+                )
+            logger.debug(f"ModelA: Stored SHAP contributions for {count} symbols")
+        except Exception as e:
+            logger.warning(f"ModelA: Failed to store SHAP contributions: {e}")
+
     def _classify_signal(
         self, confidence: float, exp_return: float
     ) -> SignalType:
@@ -533,7 +621,9 @@ class ModelAPlugin(ModelPlugin):
 
         Strategy:
         1. Check database for cached signal from this date
-        2. If not found or as_of is None (use today), generate fresh signal
+        2. Score the symbol's stored feature snapshot (one row read plus
+           one model evaluation)
+        3. If neither exists, generate fresh signal from price history
 
         Args:
             symbol: Ticker symbol (e.g., "BHP.AX")
@@ -555,6 +645,18 @@ class ModelAPlugin(ModelPlugin):
         if signal:
             return signal
 
+        # Score from the point-in-time feature snapshot
+        snapshot = await asyncio.to_thread(self._get_feature_snapshot, symbol, as_of)
+        if snapshot is not None:
+            snapshot = self._apply_filters(snapshot)
+            if snapshot.empty:
+                return None
+            signals = self._run_inference(snapshot, as_of)
+            if not signals:
+                return None
+            signals[0].metadata["source"] = "feature_snapshot"
+            return signals[0]
+
         # Generate fresh signal
         signals = await self.generate_signals([symbol], as_of)
         return signals[0] if signals else None
@@ -685,22 +787,127 @@ class ModelAPlugin(ModelPlugin):
 
     def _get_shap_from_db(self, symbol: str) -> Optional[List[Dict[str, Any]]]:
         """
-        Retrieve SHAP values for a symbol from database.
-
-        Note: This is a placeholder for when SHAP values are stored.
-        Currently returns None as SHAP persistence is not yet implemented.
+        Retrieve the latest stored SHAP contributions for a symbol.
 
         Args:
             symbol: Ticker symbol
 
         Returns:
-            List of feature/value dicts if found, else None
+            List of feature/value dicts sorted by |contribution|, else None
         """
-        # TODO: Implement when SHAP values table is created
-        # Query would look like:
-        # SELECT feature_name, shap_value
-        # FROM model_shap_values
-        # WHERE symbol = %s AND model = %s
-        # ORDER BY abs(shap_value) DESC
+        query = """
+            SELECT fs.feature_names, sv.contributions
+            FROM model_shap_values sv
+            JOIN model_shap_feature_sets fs ON fs.model_version = sv.model_version
+            WHERE sv.symbol = %s AND sv.model_version = %s
+            ORDER BY sv.as_of DESC
+            LIMIT 1
+        """
+
+        try:
+            with db_context() as con, con.cursor() as cur:
+                cur.execute(query, (symbol, self._shap_model_version))
+                row = cur.fetchone()
+        except Exception as e:
+            logger.debug(f"ModelA: SHAP lookup unavailable for {symbol}: {e}")
+            return None
+
+        if row is None:
+            return None
+
+        features = [
+            {"name": name, "importance": abs(float(value)), "shap_value": float(value)}
+            for name, value in zip(row[0], row[1])
+        ]
+        return sorted(features, key=lambda x: x["importance"], reverse=True)
 
-        return None
+
+def engineer_features(df: pd.DataFrame, as_of: date) -> pd.DataFrame:
+    """
+    Engineer Model A technical features from raw price history.
+
+    Pure function of its inputs so it can run in a worker process.
+
+    Features engineered:
+    - Momentum: 12-1, 6M, 3M, 9M returns
+    - Volatility: 30d, 90d rolling std deviation
+    - Trend: 200-day SMA, slope analysis
+    - Volume: ADV 20-day median, ratios
+
+    Args:
+        df: Price history with columns dt, symbol, close, volume
+        as_of: Target date for the snapshot
+
+    Returns:
+        DataFrame with engineered features, one row per symbol
+    """
+    df["dt"] = pd.to_datetime(df["dt"])
+    df = df.sort_values(["symbol", "dt"])
+
+    # Calculate returns
+    df["ret1"] = df.groupby("symbol")["close"].pct_change()
+
+    # Momentum features
+    df["mom_12_1"] = (
+        df.groupby("symbol")["close"].shift(21) /
+        df.groupby("symbol")["close"].shift(252) - 1.0
+    )
+    df["mom_6"] = df.groupby("symbol")["close"].pct_change(126)
+    df["mom_3"] = df.groupby("symbol")["close"].pct_change(63)
+    df["mom_9"] = df.groupby("symbol")["close"].pct_change(189)
+
+    # Volatility features
+    df["vol_90"] = (
+        df.groupby("symbol")["ret1"]
+        .rolling(90)
+        .std()
+        .reset_index(level=0, drop=True)
+    )
+    df["vol_30"] = (
+        df.groupby("symbol")["ret1"]
+        .rolling(30)
+        .std()
+        .reset_index(level=0, drop=True)
+    )
+    df["vol_ratio_30_90"] = df["vol_30"] / (df["vol_90"] + 1e-12)
+
+    # Volume/liquidity features
+    df["adv_20_median"] = (
+        (df["close"] * df["volume"])
+        .groupby(df["symbol"])
+        .rolling(20)
+        .median()
+        .reset_index(level=0, drop=True)
+    )
+
+    adv_60 = (
+        df.groupby("symbol")["adv_20_median"]
+        .rolling(60)
+        .median()
+        .reset_index(level=0, drop=True)
+    )
+    df["adv_ratio_20_60"] = df["adv_20_median"] / (adv_60 + 1e-12)
+
+    # Trend features
+    sma200 = (
+        df.groupby("symbol")["close"]
+        .rolling(200)
+        .mean()
+        .reset_index(level=0, drop=True)
+    )
+    sma200_lag = sma200.groupby(df["symbol"]).shift(20)
+
+    df["trend_200"] = (df["close"] > sma200).astype(int)
+    df["sma200_slope_pos"] = (sma200 > sma200_lag).astype(int)
+    df["sma200_slope"] = (sma200 - sma200_lag) / (sma200_lag + 1e-12)
+    df["trend_strength"] = np.where(
+        df["trend_200"],
+        1,
+        -1
+    ) * np.log1p(np.abs(df["sma200_slope"]))
+
+    # Get latest snapshot
+    latest = df.groupby("symbol").tail(1).copy()
+    latest = latest[latest["dt"].dt.date == as_of]
+
+    return latest
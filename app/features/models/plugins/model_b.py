@@ -13,6 +13,7 @@ The plugin extracts the core feature engineering and inference logic from the
 legacy Model B job (jobs/generate_signals_model_b.py) into a reusable, testable component.
 """
 
+import asyncio
 import json
 import os
 from datetime import date
@@ -342,13 +343,26 @@ class ModelBPlugin(ModelPlugin):
             f"ModelB: Generating signals for {len(symbols)} symbols as of {as_of}"
         )
 
-        # Fetch fundamentals
-        df = self._fetch_fundamentals(symbols)
+        # Fetch fundamentals off the event loop so other plugins' loads overlap
+        df = await asyncio.to_thread(self._fetch_fundamentals, symbols)
 
         if df.empty:
             logger.warning(f"ModelB: No fundamental data found for {as_of}")
             return []
 
+        # Feature build and inference are CPU-bound; run them off the event loop
+        signals = await asyncio.to_thread(self._run_inference, df, as_of)
+
+        logger.info(f"ModelB: Generated {len(signals)} signals")
+        return signals
+
+    def _run_inference(self, df: pd.DataFrame, as_of: date) -> List[ModelOutput]:
+        """
+        Build derived features, filter by coverage, score and grade the
+        fundamentals frame, and convert to ModelOutput signals.
+
+        Synchronous (called via asyncio.to_thread from generate_signals).
+        """
         # Compute derived features
         df = self.compute_derived_features(df)
 
@@ -454,7 +468,6 @@ class ModelBPlugin(ModelPlugin):
             )
             signals.append(output)
 
-        logger.info(f"ModelB: Generated {len(signals)} signals")
         return signals
 
     async def get_signal(
@@ -4,7 +4,7 @@ EnsembleService: Weighted aggregation of multiple model signals.
 This service coordinates the ensemble system by:
 1. Fetching enabled models from the registry
 2. Getting dynamic weights from config
-3. Generating signals from each model
+3. Generating signals from each model concurrently (with per-model timeouts)
 4. Aggregating signals using weighted voting
 5. Detecting and resolving conflicts
 6. Publishing SIGNAL_GENERATED events
@@ -13,15 +13,28 @@ The ensemble replaces the hardcoded 60/40 weighting from the legacy
 generate_ensemble_signals.py job with a configurable, plugin-based system.
 """
 
+import asyncio
+import time
 from datetime import date
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+import pandas as pd
+
 from app.core import logger
 from app.core.service import BaseService
 from app.core.events.event_bus import EventType
 from app.features.models.plugins.base import ModelOutput, SignalType
 from app.features.models.registry import model_registry
 
+# Signal codes ordered from most bearish to most bullish; codes above HOLD
+# are buy-side and codes below HOLD are sell-side.
+SIGNAL_CODES: Tuple[SignalType, ...] = (
+    "STRONG_SELL", "SELL", "HOLD", "BUY", "STRONG_BUY",
+)
+_SIGNAL_TO_CODE: Dict[str, int] = {sig: i for i, sig in enumerate(SIGNAL_CODES)}
+_HOLD_CODE = _SIGNAL_TO_CODE["HOLD"]
+
 
 class EnsembleService(BaseService):
     """
@@ -43,6 +56,7 @@ class EnsembleService(BaseService):
         min_agreement: Minimum model agreement threshold (default: 0.5)
         min_confidence: Minimum confidence for final signals (default: 0.6)
         conflict_strategy: How to resolve conflicts (default: "weighted_majority")
+        model_timeout: Seconds each model may take before it is dropped (default: 120)
 
     Example:
         >>> service = EnsembleService()
@@ -62,6 +76,7 @@ class EnsembleService(BaseService):
         - Conflict resolution strategy
         - Minimum agreement threshold
         - Minimum confidence threshold
+        - Per-model signal generation timeout
         """
         super().__init__()
         self.registry = model_registry
@@ -75,6 +90,7 @@ class EnsembleService(BaseService):
             "conflict_strategy", "weighted_majority"
         )
         self.flag_conflicts = ensemble_config.get("flag_conflicts", True)
+        self.model_timeout = float(ensemble_config.get("model_timeout_seconds", 120))
 
         logger.info(
             f"Initialized EnsembleService: "
@@ -94,7 +110,8 @@ class EnsembleService(BaseService):
 
         This is the main entry point for ensemble signal generation. It:
         1. Retrieves enabled models and their weights
-        2. Generates signals from each model
+        2. Generates signals from all models concurrently; a model that fails
+           or exceeds model_timeout contributes no signals (partial result)
         3. Aggregates signals using weighted voting
         4. Detects conflicts and applies resolution strategy
         5. Optionally persists results to database
@@ -149,22 +166,23 @@ class EnsembleService(BaseService):
             f"{', '.join(f'{m.config.model_id}={weights[m.config.model_id]:.2f}' for m in enabled_models)}"
         )
 
-        # Generate signals from each model
-        model_outputs: Dict[str, List[ModelOutput]] = {}
-
-        for model in enabled_models:
-            try:
-                signals = await model.generate_signals(symbols, as_of)
-                model_outputs[model.config.model_id] = signals
-                logger.info(
-                    f"  {model.config.model_id}: Generated {len(signals)} signals"
-                )
-            except Exception as e:
-                logger.error(
-                    f"  {model.config.model_id}: Signal generation failed: {e}"
-                )
-                # Continue with other models even if one fails
-                model_outputs[model.config.model_id] = []
+        # Generate signals from all models concurrently. Wall time is bounded
+        # by the slowest model (or model_timeout), not the sum over models.
+        results = await asyncio.gather(
+            *(self._run_model(model, symbols, as_of) for model in enabled_models)
+        )
+        model_outputs: Dict[str, List[ModelOutput]] = {
+            model.config.model_id: signals
+            for model, signals in zip(enabled_models, results)
+        }
+        failed_models = [
+            model.config.model_id
+            for model, signals in zip(enabled_models, results)
+            if signals is None
+        ]
+        for model_id in failed_models:
+            # Continue with other models even if one fails
+            model_outputs[model_id] = []
 
         # Aggregate signals
         ensemble_signals = self._aggregate_signals(model_outputs, weights, as_of)
@@ -199,12 +217,55 @@ class EnsembleService(BaseService):
                 "symbols": symbols,
                 "signal_count": len(ensemble_signals),
                 "models": list(model_outputs.keys()),
+                "failed_models": failed_models,
                 "conflicts": conflict_count,
             },
         )
 
         return ensemble_signals
 
+    async def _run_model(
+        self, model, symbols: List[str], as_of: date
+    ) -> Optional[List[ModelOutput]]:
+        """
+        Run a single model's signal generation under the configured timeout.
+
+        Failures and timeouts are logged and reported as None so the caller
+        can aggregate whatever the remaining models produced. On timeout the
+        awaiting task is cancelled; work already handed to a thread or process
+        pool finishes in the background and its result is discarded.
+
+        Args:
+            model: ModelPlugin instance
+            symbols: List of ticker symbols
+            as_of: Date for signal generation
+
+        Returns:
+            List of ModelOutputs, or None if the model failed or timed out
+        """
+        model_id = model.config.model_id
+        started = time.perf_counter()
+
+        try:
+            signals = await asyncio.wait_for(
+                model.generate_signals(symbols, as_of),
+                timeout=self.model_timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.error(
+                f"  {model_id}: Signal generation timed out after {self.model_timeout:.0f}s"
+            )
+            return None
+        except Exception as e:
+            logger.error(f"  {model_id}: Signal generation failed: {e}")
+            return None
+
+        logger.info(
+            f"  {model_id}: Generated {len(signals)} signals "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        return signals
+
     def _aggregate_signals(
         self,
         model_outputs: Dict[str, List[ModelOutput]],
@@ -214,12 +275,15 @@ class EnsembleService(BaseService):
         """
         Aggregate signals from multiple models using weighted voting.
 
-        For each symbol present in multiple models:
-        1. Calculate weighted ensemble score (sum of confidence * weight)
-        2. Collect individual model signals and confidences
-        3. Detect conflicts (opposite signals from different models)
-        4. Apply conflict resolution strategy
-        5. Determine final signal based on ensemble score or majority
+        Model outputs are packed into a symbols x models matrix (confidence,
+        signal code, expected return, presence mask) and every symbol is
+        scored in the same set of array operations:
+        1. Weighted ensemble score (sum of confidence * weight)
+        2. Conflict flag (any buy-side and any sell-side signal)
+        3. Agreement flag (all present models emit the same signal)
+        4. Final signal via the configured conflict resolution strategy
+
+        Only symbols with signals from at least two models are kept.
 
         Args:
             model_outputs: Dict mapping model_id to list of ModelOutputs
@@ -229,180 +293,201 @@ class EnsembleService(BaseService):
         Returns:
             List of aggregated signal dictionaries, sorted by ensemble score
         """
-        # Build map of symbol -> list of (model_id, ModelOutput) tuples
-        symbol_signals: Dict[str, List[Tuple[str, ModelOutput]]] = {}
+        model_ids = list(model_outputs.keys())
+        symbols, present, confidence, codes, exp_returns = self._build_signal_matrix(
+            model_outputs
+        )
+        if not symbols:
+            return []
+
+        # Only include symbols with signals from multiple models
+        keep = present.sum(axis=1) >= 2
+        symbols = [s for s, k in zip(symbols, keep) if k]
+        present = present[keep]
+        confidence = confidence[keep]
+        codes = codes[keep]
+        exp_returns = exp_returns[keep]
+
+        weight_vec = np.array([weights.get(mid, 0.0) for mid in model_ids], dtype=float)
+
+        # Weighted ensemble score
+        ensemble_score = np.where(present, confidence * weight_vec, 0.0).sum(axis=1)
+
+        # Conflict: at least one buy-side and one sell-side signal
+        has_buy = (present & (codes > _HOLD_CODE)).any(axis=1)
+        has_sell = (present & (codes < _HOLD_CODE)).any(axis=1)
+        conflict = has_buy & has_sell
+
+        # Agreement: every present model emitted the same signal
+        max_code = np.where(present, codes, -1).max(axis=1)
+        min_code = np.where(present, codes, len(SIGNAL_CODES)).min(axis=1)
+        signals_agree = max_code == min_code
+
+        final_codes = self._resolve_signals(
+            present, codes, weight_vec, ensemble_score, conflict
+        )
 
-        for model_id, outputs in model_outputs.items():
-            for output in outputs:
-                if output.symbol not in symbol_signals:
-                    symbol_signals[output.symbol] = []
-                symbol_signals[output.symbol].append((model_id, output))
+        # Sort by ensemble score (descending); stable so ties keep input order
+        order = np.argsort(-ensemble_score, kind="stable")
+
+        # Materialise rows from plain lists; indexing numpy scalars per cell
+        # would dominate the run time for large universes.
+        present_rows = present[order].tolist()
+        code_rows = codes[order].tolist()
+        conf_rows = confidence[order].tolist()
+        ret_rows = np.where(np.isnan(exp_returns), None, exp_returns)[order].tolist()
+        scores = ensemble_score[order].tolist()
+        conflicts = conflict[order].tolist()
+        agrees = signals_agree[order].tolist()
+        finals = final_codes[order].tolist()
+        ordered_symbols = [symbols[i] for i in order.tolist()]
+        as_of_str = as_of.isoformat()
 
-        # Aggregate each symbol
         ensemble_signals = []
 
-        for symbol, model_sigs in symbol_signals.items():
-            # Only include symbols with signals from multiple models
-            if len(model_sigs) < 2:
-                continue
-
-            result = self._aggregate_symbol(symbol, model_sigs, weights, as_of)
-            ensemble_signals.append(result)
+        for r in range(len(ordered_symbols)):
+            cols = [j for j, p in enumerate(present_rows[r]) if p]
+            row_models = [model_ids[j] for j in cols]
+            model_signal_map = {
+                model_ids[j]: SIGNAL_CODES[code_rows[r][j]] for j in cols
+            }
 
-        # Sort by ensemble score (descending)
-        ensemble_signals.sort(key=lambda x: x["ensemble_score"], reverse=True)
+            conflict_reason = None
+            if conflicts[r]:
+                conflict_reason = ", ".join(
+                    f"{mid}={sig}" for mid, sig in model_signal_map.items()
+                )
 
-        # Add rank
-        for i, sig in enumerate(ensemble_signals, 1):
-            sig["rank"] = i
+            ensemble_signals.append({
+                "symbol": ordered_symbols[r],
+                "signal": SIGNAL_CODES[finals[r]],
+                "ensemble_score": scores[r],
+                "confidence": scores[r],
+                "model_signals": model_signal_map,
+                "model_confidences": {model_ids[j]: conf_rows[r][j] for j in cols},
+                "model_expected_returns": {model_ids[j]: ret_rows[r][j] for j in cols},
+                "conflict": conflicts[r],
+                "conflict_reason": conflict_reason,
+                "signals_agree": agrees[r],
+                "as_of": as_of_str,
+                "models_contributing": row_models,
+                "rank": r + 1,
+            })
 
         return ensemble_signals
 
-    def _aggregate_symbol(
-        self,
-        symbol: str,
-        model_signals: List[Tuple[str, ModelOutput]],
-        weights: Dict[str, float],
-        as_of: date,
-    ) -> Dict:
+    @staticmethod
+    def _build_signal_matrix(
+        model_outputs: Dict[str, List[ModelOutput]],
+    ) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """
-        Aggregate signals for a single symbol across models.
+        Pack model outputs into dense symbols x models arrays.
 
-        Calculation:
-        - ensemble_score = sum(model_confidence * model_weight) for all models
-        - conflict = models produce opposite signals (buy vs sell)
-        - final_signal = determined by conflict resolution strategy
+        Rows follow the order in which symbols first appear across models;
+        columns follow model_outputs order.
 
         Args:
-            symbol: Ticker symbol
-            model_signals: List of (model_id, ModelOutput) tuples
-            weights: Model weights
-            as_of: Signal date
+            model_outputs: Dict mapping model_id to list of ModelOutputs
 
         Returns:
-            Dictionary with aggregated signal data
+            Tuple of (symbols, present, confidence, codes, expected_returns)
+            where present is a bool mask, codes index into SIGNAL_CODES and
+            missing expected returns are NaN.
         """
-        # Extract data
-        model_ids = [mid for mid, _ in model_signals]
-        outputs = [out for _, out in model_signals]
-
-        # Calculate weighted ensemble score
-        ensemble_score = 0.0
-        for model_id, output in model_signals:
-            weight = weights.get(model_id, 0.0)
-            ensemble_score += output.confidence * weight
-
-        # Collect individual signals and confidences
-        model_signal_map = {mid: out.signal for mid, out in model_signals}
-        model_conf_map = {mid: out.confidence for mid, out in model_signals}
-        model_exp_return_map = {
-            mid: out.expected_return for mid, out in model_signals
-        }
-
-        # Detect conflicts
-        buy_signals = {"STRONG_BUY", "BUY"}
-        sell_signals = {"STRONG_SELL", "SELL"}
-
-        has_buy = any(sig in buy_signals for sig in model_signal_map.values())
-        has_sell = any(sig in sell_signals for sig in model_signal_map.values())
-
-        conflict = has_buy and has_sell
-        conflict_reason = None
-
-        if conflict:
-            # Create conflict description
-            signal_strs = [
-                f"{mid}={sig}" for mid, sig in model_signal_map.items()
-            ]
-            conflict_reason = ", ".join(signal_strs)
-
-        # Check agreement
-        unique_signals = set(model_signal_map.values())
-        signals_agree = len(unique_signals) == 1
-
-        # Determine final signal
-        final_signal = self._resolve_signal(
-            model_signal_map,
-            weights,
-            ensemble_score,
-            conflict,
-        )
+        columns = [
+            (
+                [o.symbol for o in outputs],
+                [o.signal for o in outputs],
+                [o.confidence for o in outputs],
+                [np.nan if o.expected_return is None else o.expected_return for o in outputs],
+            )
+            for outputs in model_outputs.values()
+        ]
+
+        all_symbols = [sym for col in columns for sym in col[0]]
+        symbol_index = pd.Index(pd.unique(np.asarray(all_symbols, dtype=object)))
+        signal_index = pd.Index(SIGNAL_CODES)
+
+        shape = (len(symbol_index), len(model_outputs))
+        present = np.zeros(shape, dtype=bool)
+        confidence = np.zeros(shape, dtype=float)
+        codes = np.full(shape, _HOLD_CODE, dtype=np.int8)
+        exp_returns = np.full(shape, np.nan, dtype=float)
+
+        for j, (syms, signals, confs, rets) in enumerate(columns):
+            if not syms:
+                continue
+            rows = symbol_index.get_indexer(syms)
+            present[rows, j] = True
+            confidence[rows, j] = confs
+            codes[rows, j] = signal_index.get_indexer(signals)
+            exp_returns[rows, j] = rets
 
-        return {
-            "symbol": symbol,
-            "signal": final_signal,
-            "ensemble_score": ensemble_score,
-            "confidence": ensemble_score,
-            "model_signals": model_signal_map,
-            "model_confidences": model_conf_map,
-            "model_expected_returns": model_exp_return_map,
-            "conflict": conflict,
-            "conflict_reason": conflict_reason,
-            "signals_agree": signals_agree,
-            "as_of": as_of.isoformat(),
-            "models_contributing": model_ids,
-        }
+        return symbol_index.tolist(), present, confidence, codes, exp_returns
 
-    def _resolve_signal(
+    def _resolve_signals(
         self,
-        model_signals: Dict[str, SignalType],
-        weights: Dict[str, float],
-        ensemble_score: float,
-        has_conflict: bool,
-    ) -> SignalType:
+        present: np.ndarray,
+        codes: np.ndarray,
+        weights: np.ndarray,
+        ensemble_score: np.ndarray,
+        has_conflict: np.ndarray,
+    ) -> np.ndarray:
         """
-        Resolve final signal using configured strategy.
+        Resolve final signal codes for all symbols using configured strategy.
 
         Strategies:
         1. weighted_majority: Use weighted voting, default to HOLD on conflict
         2. confidence_based: Use ensemble_score thresholds
         3. conservative: Always HOLD on conflict, otherwise use majority
 
+        Weighted-vote ties go to the signal emitted by the earliest model.
+
         Args:
-            model_signals: Dict of model_id -> signal
-            weights: Model weights
-            ensemble_score: Weighted confidence score
-            has_conflict: Whether models disagree
+            present: Bool mask of shape (symbols, models)
+            codes: Signal codes (indices into SIGNAL_CODES), same shape
+            weights: Model weights, shape (models,)
+            ensemble_score: Weighted confidence scores, shape (symbols,)
+            has_conflict: Conflict flags, shape (symbols,)
 
         Returns:
-            Final SignalType
+            Array of final signal codes, shape (symbols,)
         """
-        if self.conflict_strategy == "conservative" and has_conflict:
-            # Conservative: always HOLD on conflict
-            return "HOLD"
-
         if self.conflict_strategy == "confidence_based":
             # Use ensemble score thresholds
-            if ensemble_score >= 0.7:
-                return "STRONG_BUY"
-            elif ensemble_score >= 0.6:
-                return "BUY"
-            elif ensemble_score <= 0.3:
-                return "STRONG_SELL"
-            elif ensemble_score <= 0.4:
-                return "SELL"
-            else:
-                return "HOLD"
-
-        # Default: weighted_majority
-        # Calculate weighted votes for each signal type
-        signal_scores: Dict[SignalType, float] = {}
-
-        for model_id, signal in model_signals.items():
-            weight = weights.get(model_id, 0.0)
-            signal_scores[signal] = signal_scores.get(signal, 0.0) + weight
-
-        # Get signal with highest weighted vote
-        if not signal_scores:
-            return "HOLD"
-
-        winning_signal = max(signal_scores.items(), key=lambda x: x[1])[0]
+            return np.select(
+                [
+                    ensemble_score >= 0.7,
+                    ensemble_score >= 0.6,
+                    ensemble_score <= 0.3,
+                    ensemble_score <= 0.4,
+                ],
+                [
+                    _SIGNAL_TO_CODE["STRONG_BUY"],
+                    _SIGNAL_TO_CODE["BUY"],
+                    _SIGNAL_TO_CODE["STRONG_SELL"],
+                    _SIGNAL_TO_CODE["SELL"],
+                ],
+                default=_HOLD_CODE,
+            ).astype(np.int8)
+
+        # weighted_majority (and conservative without conflict):
+        # votes[s, k] = total weight of models voting signal k for symbol s
+        n_models = codes.shape[1]
+        one_hot = present[:, :, None] & (
+            codes[:, :, None] == np.arange(len(SIGNAL_CODES))[None, None, :]
+        )
+        votes = (one_hot * weights[None, :, None]).sum(axis=1)
 
-        # On conflict, default to HOLD for safety
-        if has_conflict and winning_signal not in {"HOLD"}:
-            return "HOLD"
+        # Break ties in favour of the signal first emitted in model order
+        first_model = np.where(
+            one_hot.any(axis=1), one_hot.argmax(axis=1), n_models
+        )
+        tied = one_hot.any(axis=1) & (votes == votes.max(axis=1, keepdims=True))
+        winning = np.where(tied, first_model, n_models + 1).argmin(axis=1)
 
-        return winning_signal
+        # On conflict, default to HOLD for safety (conservative behaves the same)
+        return np.where(has_conflict, _HOLD_CODE, winning).astype(np.int8)
 
     def _persist_signals(self, signals: List[Dict], as_of: date) -> None:
         """
@@ -528,7 +613,6 @@ class EnsembleService(BaseService):
             Signal dictionary if found, else None
         """
         from app.core import db
-        import pandas as pd
 
         query = """
             SELECT
@@ -7,9 +7,11 @@ from typing import Optional, List, Dict, Any
 from datetime import date, datetime, timedelta
 from decimal import Decimal
 
-from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.extras import Json, RealDictCursor, execute_values
 import numpy as np
+import pandas as pd
 
+from analytics import rebalancing
 from app.core.repository import BaseRepository
 from app.core import db_context, logger
 
@@ -580,117 +582,16 @@ class PortfolioRepository(BaseRepository):
                     logger.debug(f"No holdings with prices for portfolio {portfolio_id}")
                     return []
 
+                positions = pd.DataFrame([dict(row) for row in holdings])
+                positions['total_value'] = total_value
+                suggestions = rebalancing.records(rebalancing.plan_trades(positions), drop=['portfolio_id'])
+
                 # Clear old suggestions
                 cur.execute(
                     "DELETE FROM portfolio_rebalancing_suggestions WHERE portfolio_id = %s",
                     (portfolio_id,)
                 )
-
-                suggestions = []
-                priority = 1
-
-                for holding in holdings:
-                    ticker = holding['ticker']
-                    shares = float(holding['shares'])
-                    current_price = float(holding['current_price'])
-                    current_value = float(holding['current_value'])
-                    signal = holding['current_signal']
-                    confidence = float(holding['signal_confidence']) if holding['signal_confidence'] else 0
-
-                    if not signal:
-                        continue
-
-                    current_weight = (current_value / total_value) * 100 if total_value else 0
-
-                    action = None
-                    suggested_qty = None
-                    suggested_value = None
-                    target_weight = None
-                    conf_score = None
-                    reason = None
-
-                    # Rule 1: Strong signals with high confidence
-                    if signal == 'STRONG_SELL' and confidence >= 70:
-                        action = 'SELL'
-                        suggested_qty = shares
-                        suggested_value = shares * current_price
-                        target_weight = 0
-                        conf_score = confidence
-                        reason = f"Strong sell signal (confidence: {confidence:.1f}%). Returns don't justify risk."
-
-                    elif signal == 'SELL' and confidence >= 60:
-                        action = 'TRIM'
-                        suggested_qty = shares * 0.5
-                        suggested_value = suggested_qty * current_price
-                        target_weight = current_weight * 0.5
-                        conf_score = confidence * 0.8
-                        reason = f"Sell signal (confidence: {confidence:.1f}%). Consider reducing exposure."
-
-                    elif signal == 'STRONG_BUY' and confidence >= 80:
-                        action = 'ADD'
-                        suggested_qty = shares * 0.2
-                        suggested_value = suggested_qty * current_price
-                        target_weight = current_weight * 1.2
-                        conf_score = confidence
-                        reason = f"Strong buy signal (confidence: {confidence:.1f}%). Attractive entry point."
-
-                    elif signal == 'BUY' and confidence >= 70:
-                        action = 'ADD'
-                        suggested_qty = shares * 0.1
-                        suggested_value = suggested_qty * current_price
-                        target_weight = current_weight * 1.1
-                        conf_score = confidence * 0.9
-                        reason = f"Buy signal (confidence: {confidence:.1f}%). Good value opportunity."
-
-                    # Rule 2: Overweight positions (> 15% of portfolio)
-                    elif current_weight > 15:
-                        action = 'TRIM'
-                        target_value = total_value * 0.12
-                        target_shares = target_value / current_price
-                        suggested_qty = shares - target_shares
-                        suggested_value = suggested_qty * current_price
-                        target_weight = 12.0
-                        conf_score = 70.0
-                        reason = f"Position is {current_weight:.1f}% of portfolio (overweight). Reduce concentration risk."
-
-                    else:
-                        continue
-
-                    # Insert suggestion
-                    cur.execute(
-                        """
-                        INSERT INTO portfolio_rebalancing_suggestions (
-                            portfolio_id, ticker, action, suggested_quantity, suggested_value,
-                            reason, current_signal, signal_confidence,
-                            current_shares, current_weight_pct, target_weight_pct,
-                            priority, confidence_score, expires_at
-                        )
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        """,
-                        (
-                            portfolio_id, ticker, action, suggested_qty, suggested_value,
-                            reason, signal, confidence,
-                            shares, current_weight, target_weight,
-                            priority, conf_score, datetime.now() + timedelta(days=7)
-                        )
-                    )
-
-                    suggestions.append({
-                        'ticker': ticker,
-                        'action': action,
-                        'suggested_quantity': Decimal(str(suggested_qty)),
-                        'suggested_value': Decimal(str(suggested_value)),
-                        'reason': reason,
-                        'current_signal': signal,
-                        'signal_confidence': Decimal(str(confidence)),
-                        'current_shares': Decimal(str(shares)),
-                        'current_weight_pct': Decimal(str(current_weight)),
-                        'target_weight_pct': Decimal(str(target_weight)),
-                        'priority': priority,
-                        'confidence_score': Decimal(str(conf_score)),
-                    })
-
-                    priority += 1
+                self._insert_suggestions(cur, portfolio_id, suggestions)
 
                 logger.info(f"Generated {len(suggestions)} rebalancing suggestions for portfolio {portfolio_id}")
                 return suggestions
@@ -699,6 +600,116 @@ class PortfolioRepository(BaseRepository):
             logger.error(f"Error getting rebalancing suggestions for portfolio {portfolio_id}: {e}")
             raise
 
+    def get_portfolio(self, portfolio_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a portfolio by ID.
+
+        Args:
+            portfolio_id: Portfolio ID
+
+        Returns:
+            Dictionary with portfolio data or None if not found
+        """
+        try:
+            with db_context() as conn:
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                cur.execute(
+                    """
+                    SELECT
+                        id, user_id, name, total_value, total_cost_basis,
+                        total_pl, total_pl_pct, cash_balance, last_synced_at,
+                        is_active, created_at, updated_at
+                    FROM user_portfolios
+                    WHERE id = %s
+                    """,
+                    (portfolio_id,)
+                )
+                row = cur.fetchone()
+                return dict(row) if row else None
+
+        except Exception as e:
+            logger.error(f"Error retrieving portfolio {portfolio_id}: {e}")
+            raise
+
+    def clear_old_suggestions(self, portfolio_id: int) -> int:
+        """
+        Delete a portfolio's pending rebalancing suggestions.
+
+        Args:
+            portfolio_id: Portfolio ID
+
+        Returns:
+            Number of suggestions deleted
+        """
+        try:
+            with db_context() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    """
+                    DELETE FROM portfolio_rebalancing_suggestions
+                    WHERE portfolio_id = %s
+                      AND status = 'pending'
+                    """,
+                    (portfolio_id,)
+                )
+                return cur.rowcount
+
+        except Exception as e:
+            logger.error(f"Error clearing rebalancing suggestions for portfolio {portfolio_id}: {e}")
+            raise
+
+    def save_suggestions(
+        self,
+        portfolio_id: int,
+        suggestions: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Insert rebalancing suggestions for a portfolio.
+
+        Args:
+            portfolio_id: Portfolio ID
+            suggestions: Suggestion dictionaries (RebalancingService output)
+
+        Returns:
+            Number of suggestions inserted
+        """
+        try:
+            with db_context() as conn:
+                cur = conn.cursor()
+                self._insert_suggestions(cur, portfolio_id, suggestions)
+                logger.debug(f"Saved {len(suggestions)} rebalancing suggestions for portfolio {portfolio_id}")
+                return len(suggestions)
+
+        except Exception as e:
+            logger.error(f"Error saving rebalancing suggestions for portfolio {portfolio_id}: {e}")
+            raise
+
+    @staticmethod
+    def _insert_suggestions(cur, portfolio_id: int, suggestions: List[Dict[str, Any]]) -> None:
+        if not suggestions:
+            return
+        expires_at = datetime.now() + timedelta(days=7)
+        execute_values(
+            cur,
+            """
+            INSERT INTO portfolio_rebalancing_suggestions (
+                portfolio_id, ticker, action, suggested_quantity, suggested_value,
+                reason, current_signal, signal_confidence,
+                current_shares, current_weight_pct, target_weight_pct,
+                priority, confidence_score, expires_at
+            ) VALUES %s
+            """,
+            [
+                (
+                    portfolio_id, s['ticker'], s['action'], s.get('suggested_quantity'),
+                    s.get('suggested_value'), s['reason'], s.get('current_signal'),
+                    s.get('signal_confidence'), s.get('current_shares'), s.get('current_weight_pct'),
+                    s.get('target_weight_pct'), s.get('priority'), s.get('confidence_score'), expires_at,
+                )
+                for s in suggestions
+            ]
+        )
+
     def get_risk_metrics(
         self,
         portfolio_id: int,
@@ -842,3 +853,146 @@ class PortfolioRepository(BaseRepository):
         except Exception as e:
             logger.error(f"Error calculating risk metrics for portfolio {portfolio_id}: {e}")
             raise
+
+    def get_historical_prices(
+        self,
+        ticker: str,
+        days: int = 400
+    ) -> pd.DataFrame:
+        """
+        Get daily closes for a ticker.
+
+        Args:
+            ticker: Stock ticker (e.g. 'BHP.AX', 'XJO.AX')
+            days: Calendar days of history
+
+        Returns:
+            DataFrame with date and close, oldest first (empty if none)
+        """
+        try:
+            with db_context() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    """
+                    SELECT dt, close
+                    FROM prices
+                    WHERE symbol = %s
+                      AND dt >= current_date - (%s * interval '1 day')
+                      AND close IS NOT NULL
+                    ORDER BY dt
+                    """,
+                    (ticker, days)
+                )
+                rows = cur.fetchall()
+
+                return pd.DataFrame(
+                    [(row[0], float(row[1])) for row in rows],
+                    columns=['date', 'close']
+                )
+
+        except Exception as e:
+            logger.error(f"Error retrieving price history for {ticker}: {e}")
+            raise
+
+    def get_cached_metrics(
+        self,
+        portfolio_id: int,
+        as_of: date
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get stored risk metrics for a portfolio and day.
+
+        Args:
+            portfolio_id: Portfolio ID
+            as_of: Calculation date
+
+        Returns:
+            Metrics dictionary or None if not calculated that day
+        """
+        try:
+            with db_context() as conn:
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                cur.execute(
+                    """
+                    SELECT
+                        as_of, total_return_pct, volatility, sharpe_ratio, beta,
+                        max_drawdown_pct, top_holding_weight_pct, top_5_weight_pct,
+                        herfindahl_index, sector_weights, signal_distribution,
+                        correlation_matrix
+                    FROM portfolio_risk_metrics
+                    WHERE portfolio_id = %s
+                      AND as_of = %s
+                    LIMIT 1
+                    """,
+                    (portfolio_id, as_of)
+                )
+                row = cur.fetchone()
+                if not row:
+                    return None
+
+                metrics = {
+                    key: float(value) if isinstance(value, Decimal) else value
+                    for key, value in dict(row).items()
+                }
+                metrics['as_of'] = metrics['as_of'].isoformat()
+                metrics['correlation_matrix'] = metrics['correlation_matrix'] or {}
+                return metrics
+
+        except Exception as e:
+            logger.error(f"Error retrieving cached risk metrics for portfolio {portfolio_id}: {e}")
+            raise
+
+    def save_risk_metrics(
+        self,
+        portfolio_id: int,
+        metrics: Dict[str, Any]
+    ) -> None:
+        """
+        Upsert a portfolio's risk metrics for metrics['as_of'].
+
+        Args:
+            portfolio_id: Portfolio ID
+            metrics: Output of RiskMetricsService.calculate_risk_metrics
+        """
+        try:
+            with db_context() as conn:
+                cur = conn.cursor()
+                cur.execute(
+                    """
+                    INSERT INTO portfolio_risk_metrics (
+                        portfolio_id, as_of, total_return_pct, volatility,
+                        sharpe_ratio, beta, max_drawdown_pct,
+                        top_holding_weight_pct, top_5_weight_pct, herfindahl_index,
+                        sector_weights, signal_distribution, correlation_matrix
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (portfolio_id, as_of)
+                    DO UPDATE SET
+                        total_return_pct = EXCLUDED.total_return_pct,
+                        volatility = EXCLUDED.volatility,
+                        sharpe_ratio = EXCLUDED.sharpe_ratio,
+                        beta = EXCLUDED.beta,
+                        max_drawdown_pct = EXCLUDED.max_drawdown_pct,
+                        top_holding_weight_pct = EXCLUDED.top_holding_weight_pct,
+                        top_5_weight_pct = EXCLUDED.top_5_weight_pct,
+                        herfindahl_index = EXCLUDED.herfindahl_index,
+                        signal_distribution = EXCLUDED.signal_distribution,
+                        correlation_matrix = EXCLUDED.correlation_matrix,
+                        calculation_timestamp = now()
+                    """,
+                    (
+                        portfolio_id, metrics.get('as_of') or date.today(),
+                        metrics.get('total_return_pct'), metrics.get('volatility'),
+                        metrics.get('sharpe_ratio'), metrics.get('beta'),
+                        metrics.get('max_drawdown_pct'), metrics.get('top_holding_weight_pct'),
+                        metrics.get('top_5_weight_pct'), metrics.get('herfindahl_index'),
+                        Json(metrics.get('sector_weights') or {}),
+                        Json(metrics.get('signal_distribution') or {}),
+                        Json(metrics.get('correlation_matrix') or {}),
+                    )
+                )
+                logger.debug(f"Saved risk metrics for portfolio {portfolio_id}")
+
+        except Exception as e:
+            logger.error(f"Error saving risk metrics for portfolio {portfolio_id}: {e}")
+            raise
@@ -682,3 +682,60 @@ class TestRiskMetricsService:
 
         assert duration < 5.0  # Should complete in under 5 seconds
         assert result is not None
+
+    # =============================================================================
+    # Time-series metrics from the cached return panel
+    # =============================================================================
+
+    @pytest.fixture
+    def panel_prices(self):
+        """One year of closes for the sample holdings and the XJO.AX benchmark"""
+        dates = pd.date_range(end=datetime.now(), periods=252, freq='B')
+        rng = np.random.default_rng(7)
+        xjo = rng.normal(0.0004, 0.01, 252)
+        returns = {
+            'XJO.AX': xjo,
+            'BHP.AX': 1.5 * xjo + rng.normal(0, 0.005, 252),
+            'CBA.AX': 1.5 * xjo + rng.normal(0, 0.005, 252),
+            'WES.AX': 1.5 * xjo + rng.normal(0, 0.005, 252),
+        }
+        return {
+            ticker: pd.DataFrame({'date': dates, 'close': 100 * (1 + r).cumprod()})
+            for ticker, r in returns.items()
+        }
+
+    @pytest.mark.asyncio
+    async def test_beta_and_volatility_from_return_history(self, service, mock_repository, sample_holdings, panel_prices):
+        """Beta is estimated against XJO.AX from daily returns, not a placeholder"""
+        mock_repository.get_holdings.return_value = sample_holdings
+        mock_repository.get_historical_prices.side_effect = lambda ticker: panel_prices[ticker]
+
+        result = await service.calculate_risk_metrics(portfolio_id=1)
+
+        assert 1.3 < result['beta'] < 1.7
+        assert result['volatility'] > 15.0  # ~1.5x a 16% index volatility
+        assert result['max_drawdown_pct'] <= 0
+        assert set(result['correlation_matrix']) == {'BHP.AX', 'CBA.AX', 'WES.AX'}
+        assert result['correlation_matrix']['BHP.AX']['CBA.AX'] > 0.5
+
+    @pytest.mark.asyncio
+    async def test_price_history_fetched_once_and_results_memoised(self, service, mock_repository, sample_holdings, panel_prices):
+        """Repeat calculations reuse cached returns and the memoised result"""
+        mock_repository.get_holdings.return_value = sample_holdings
+        mock_repository.get_historical_prices.side_effect = lambda ticker: panel_prices[ticker]
+
+        first = await service.calculate_risk_metrics(portfolio_id=1, recalculate=True)
+        again = await service.calculate_risk_metrics(portfolio_id=1, recalculate=True)
+
+        assert again == first
+        assert mock_repository.get_historical_prices.call_count == 4  # 3 holdings + benchmark
+        mock_repository.save_risk_metrics.assert_called_once()
+
+        # A changed position is recomputed from the cached returns
+        changed = [dict(h) for h in sample_holdings]
+        changed[0]['current_value'] = 9000.0
+        mock_repository.get_holdings.return_value = changed
+        await service.calculate_risk_metrics(portfolio_id=1, recalculate=True)
+
+        assert mock_repository.get_historical_prices.call_count == 4
+        assert mock_repository.save_risk_metrics.call_count == 2
@@ -7,11 +7,18 @@ This service generates AI-driven rebalancing suggestions based on:
 - Position sizing rules (max 10%, min 2%)
 - Portfolio concentration limits
 - Risk-adjusted target weights
+
+The rules themselves live in analytics/rebalancing.py, which also plans
+every portfolio in one batch (jobs/rebalance_portfolios_job.py).
 """
 
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+import numpy as np
+import pandas as pd
+
+from analytics import rebalancing
 from app.core.service import BaseService
 from app.core.events.event_bus import EventType
 from app.core import logger
@@ -26,10 +33,10 @@ class RebalancingService(BaseService):
     """
 
     # Constants for position sizing rules
-    MAX_POSITION_SIZE = 10.0  # Maximum 10% per holding
-    MIN_POSITION_SIZE = 2.0   # Minimum 2% per holding
-    OVERWEIGHT_THRESHOLD = 15.0  # Flag positions > 15%
-    REBALANCE_THRESHOLD = 0.5  # 0.5% threshold for action
+    MAX_POSITION_SIZE = rebalancing.MAX_POSITION_SIZE  # Maximum 10% per holding
+    MIN_POSITION_SIZE = rebalancing.MIN_POSITION_SIZE   # Minimum 2% per holding
+    OVERWEIGHT_THRESHOLD = rebalancing.OVERWEIGHT_THRESHOLD  # Flag positions > 15%
+    REBALANCE_THRESHOLD = rebalancing.REBALANCE_THRESHOLD  # 0.5% threshold for action
 
     def __init__(self, repository=None):
         """Initialize service with optional repository."""
@@ -163,55 +170,20 @@ class RebalancingService(BaseService):
         Returns:
             Dictionary mapping ticker to target weight percentage
         """
-        target_weights = {}
-
-        for holding in holdings:
-            ticker = holding.get('ticker')
-            signal = holding.get('current_signal')
-            confidence = holding.get('signal_confidence', 0)
-            current_value = holding.get('current_value', 0)
-            current_weight = (current_value / total_value) * 100 if total_value > 0 else 0
-
-            # Calculate target weight based on signal
-            if signal == 'STRONG_SELL' and confidence >= 70:
-                # Exit position completely
-                target_weight = 0.0
-
-            elif signal == 'SELL' and confidence >= 60:
-                # Reduce position by 50%
-                target_weight = current_weight * 0.5
-
-            elif signal == 'STRONG_BUY' and confidence >= 80:
-                # Increase position by 20%
-                target_weight = min(current_weight * 1.2, self.MAX_POSITION_SIZE)
-
-            elif signal == 'BUY' and confidence >= 70:
-                # Increase position by 10%
-                target_weight = min(current_weight * 1.1, self.MAX_POSITION_SIZE)
-
-            elif signal == 'HOLD' or not signal:
-                # Maintain current weight
-                target_weight = current_weight
-
-            else:
-                # Default: maintain current weight
-                target_weight = current_weight
-
-            # Apply position sizing constraints
-            if target_weight > self.MAX_POSITION_SIZE:
-                target_weight = self.MAX_POSITION_SIZE
-
-            # For positions we're keeping, enforce minimum size
-            if target_weight > 0 and target_weight < self.MIN_POSITION_SIZE:
-                # Either increase to minimum or exit completely
-                if signal in ['BUY', 'STRONG_BUY']:
-                    target_weight = self.MIN_POSITION_SIZE
-                else:
-                    target_weight = current_weight  # Keep as is
-
-            target_weights[ticker] = target_weight
-
-        return target_weights
+        if not holdings:
+            return {}
+        current_weight = np.array([
+            (h.get('current_value', 0) / total_value) * 100 if total_value > 0 else 0
+            for h in holdings
+        ], dtype=np.float64)
+        targets = rebalancing.target_weights(
+            current_weight,
+            np.array([h.get('current_signal') for h in holdings], dtype=object),
+            np.array([h.get('signal_confidence') for h in holdings], dtype=np.float64),
+            max_weight=self.MAX_POSITION_SIZE,
+            min_weight=self.MIN_POSITION_SIZE,
+        )
+        return {h.get('ticker'): float(t) for h, t in zip(holdings, targets)}
 
     def _generate_actions(
         self,
@@ -234,111 +206,28 @@ class RebalancingService(BaseService):
         Returns:
             List of action dictionaries
         """
-        actions = []
-
-        # Create holdings lookup
         holdings_map = {h.get('ticker'): h for h in holdings}
+        # Targeted tickers, then held tickers without a target (checked for overweight only)
+        tickers = list(target_weights) + [t for t in current_weights if t not in target_weights]
+        if not tickers:
+            return []
 
-        for ticker, target_weight in target_weights.items():
-            current_weight = current_weights.get(ticker, 0)
-            weight_diff = abs(target_weight - current_weight)
-
-            # Skip if difference is below threshold
-            if weight_diff < threshold and target_weight > 0:
-                continue
-
-            holding = holdings_map.get(ticker, {})
-            signal = holding.get('current_signal')
-            confidence = holding.get('signal_confidence', 50.0)
-            current_price = holding.get('current_price', 0)
-            current_shares = holding.get('shares', 0)
-
-            # Determine action type
-            if target_weight == 0:
-                action = 'SELL'
-                suggested_qty = float(current_shares)
-                suggested_value = suggested_qty * current_price if current_price else 0
-                reason = f"{signal} signal (confidence: {confidence:.1f}%). Exit position."
-                conf_score = float(confidence)
-
-            elif target_weight < current_weight - threshold:
-                action = 'TRIM'
-                # Calculate shares to sell
-                target_value = (target_weight / 100) * total_value
-                current_value = (current_weight / 100) * total_value
-                value_to_sell = current_value - target_value
-                suggested_qty = value_to_sell / current_price if current_price else 0
-                suggested_value = value_to_sell
-                reason = f"{signal or 'Rebalance'} - reduce from {current_weight:.1f}% to {target_weight:.1f}%"
-                conf_score = float(confidence) * 0.8
-
-            elif target_weight > current_weight + threshold:
-                action = 'ADD'
-                # Calculate shares to buy
-                target_value = (target_weight / 100) * total_value
-                current_value = (current_weight / 100) * total_value
-                value_to_add = target_value - current_value
-                suggested_qty = value_to_add / current_price if current_price else 0
-                suggested_value = value_to_add
-                reason = f"{signal or 'Rebalance'} - increase from {current_weight:.1f}% to {target_weight:.1f}%"
-                conf_score = float(confidence) * 0.9
-
-            else:
-                # HOLD - no action needed
-                continue
-
-            actions.append({
+        positions = pd.DataFrame([
+            {
                 'ticker': ticker,
-                'action': action,
-                'suggested_quantity': float(suggested_qty) if suggested_qty else None,
-                'suggested_value': float(suggested_value) if suggested_value else None,
-                'reason': reason,
-                'current_signal': signal,
-                'signal_confidence': float(confidence) if confidence else None,
-                'current_shares': float(current_shares) if current_shares else None,
-                'current_weight_pct': float(current_weight),
-                'target_weight_pct': float(target_weight),
-                'confidence_score': conf_score,
-                'priority': 1  # Will be updated by _prioritize_suggestions
-            })
-
-        # Check for overweight positions (>15% threshold)
-        for ticker, current_weight in current_weights.items():
-            if current_weight > self.OVERWEIGHT_THRESHOLD:
-                # Check if we already have an action for this ticker
-                existing_action = next((a for a in actions if a['ticker'] == ticker), None)
-
-                if not existing_action:
-                    holding = holdings_map.get(ticker, {})
-                    current_price = holding.get('current_price', 0)
-                    current_shares = holding.get('shares', 0)
-
-                    # Suggest bringing down to 12%
-                    target_weight = 12.0
-                    target_value = (target_weight / 100) * total_value
-                    current_value = (current_weight / 100) * total_value
-                    value_to_sell = current_value - target_value
-                    suggested_qty = value_to_sell / current_price if current_price else 0
-
-                    actions.append({
-                        'ticker': ticker,
-                        'action': 'TRIM',
-                        'suggested_quantity': float(suggested_qty),
-                        'suggested_value': float(value_to_sell),
-                        'reason': f"Position is {current_weight:.1f}% of portfolio (overweight). Reduce concentration risk.",
-                        'current_signal': holding.get('current_signal'),
-                        'signal_confidence': holding.get('signal_confidence'),
-                        'current_shares': float(current_shares) if current_shares else None,
-                        'current_weight_pct': float(current_weight),
-                        'target_weight_pct': target_weight,
-                        'confidence_score': 70.0,
-                        'priority': 1
-                    })
-                elif existing_action and 'concentration' not in existing_action['reason'].lower():
-                    # Update existing action reason to include overweight warning
-                    existing_action['reason'] = f"{existing_action['reason']} Position overweight ({current_weight:.1f}%)."
-
-        return actions
+                'shares': holdings_map.get(ticker, {}).get('shares'),
+                'current_price': holdings_map.get(ticker, {}).get('current_price'),
+                'current_signal': holdings_map.get(ticker, {}).get('current_signal'),
+                'signal_confidence': holdings_map.get(ticker, {}).get('signal_confidence'),
+                'current_weight_pct': current_weights.get(ticker, 0.0),
+                'target_weight_pct': target_weights.get(ticker, np.nan),
+            }
+            for ticker in tickers
+        ])
+        positions['current_value'] = positions['current_weight_pct'] / 100 * total_value
+        positions['total_value'] = float(total_value)
+
+        return rebalancing.records(rebalancing.plan_trades(positions, threshold=threshold), drop=['portfolio_id'])
 
     def _prioritize_suggestions(
         self,
@@ -356,39 +245,15 @@ class RebalancingService(BaseService):
         if not suggestions:
             return []
 
-        # Define action priority weights
-        action_weights = {
-            'SELL': 3,    # Highest priority (exit bad positions)
-            'TRIM': 2,    # Medium-high priority (reduce risk)
-            'ADD': 1,     # Medium priority (capture opportunities)
-            'BUY': 1,     # Medium priority (new positions)
-            'HOLD': 0     # Lowest priority
-        }
-
-        # Calculate composite score for sorting
-        for suggestion in suggestions:
-            action_weight = action_weights.get(suggestion['action'], 0)
-            confidence = suggestion.get('confidence_score', 50.0)
-            value_impact = suggestion.get('suggested_value', 0)
-
-            # Composite score: action priority + confidence + value impact (normalized)
-            suggestion['_sort_score'] = (
-                action_weight * 100 +
-                confidence +
-                min(value_impact / 1000, 50)  # Normalize value impact
-            )
-
-        # Sort by composite score (descending)
-        sorted_suggestions = sorted(
-            suggestions,
-            key=lambda x: x['_sort_score'],
-            reverse=True
-        )
-
-        # Assign priority numbers
-        for i, suggestion in enumerate(sorted_suggestions, start=1):
-            suggestion['priority'] = i
-            # Remove internal sort score
-            suggestion.pop('_sort_score', None)
-
-        return sorted_suggestions
+        ranked = rebalancing.prioritize(pd.DataFrame({
+            'position': range(len(suggestions)),
+            'action': [s['action'] for s in suggestions],
+            'confidence_score': [s.get('confidence_score') for s in suggestions],
+            'suggested_value': [s.get('suggested_value') for s in suggestions],
+        }))
+        prioritized = []
+        for position, priority in zip(ranked['position'], ranked['priority']):
+            suggestion = suggestions[position]
+            suggestion['priority'] = int(priority)
+            prioritized.append(suggestion)
+        return prioritized
@@ -0,0 +1,116 @@
+"""
+app/features/portfolio/services/return_panel.py
+Process-wide cache of daily return series for portfolio risk.
+
+Each ticker's close history is fetched at most once per day and kept as a
+return series; a holdings x days return matrix is then a column selection
+of cached series. Risk results are memoised per (holdings hash, as_of), so
+recalculating an unchanged portfolio is a dictionary lookup.
+"""
+
+import hashlib
+import json
+import threading
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from app.core import logger
+
+
+def holdings_key(holdings: Iterable[Dict[str, Any]]) -> str:
+    """Stable hash of the positions that drive risk (ticker, value, P&L, signal)."""
+    positions = sorted(
+        (
+            str(h.get('ticker')),
+            round(float(h.get('current_value') or 0), 2),
+            h.get('unrealized_pl_pct') if h.get('unrealized_pl_pct') is None else round(float(h['unrealized_pl_pct']), 4),
+            h.get('current_signal'),
+        )
+        for h in holdings
+    )
+    return hashlib.sha1(json.dumps(positions, default=str).encode()).hexdigest()
+
+
+def _close_returns(prices: Any) -> pd.Series:
+    """Daily returns from a (date, close) frame; empty for missing or malformed history."""
+    if not isinstance(prices, pd.DataFrame) or prices.empty or 'close' not in prices.columns:
+        return pd.Series(dtype=float)
+    date_col = 'date' if 'date' in prices.columns else 'dt' if 'dt' in prices.columns else None
+    closes = prices.set_index(pd.to_datetime(prices[date_col]))['close'] if date_col else prices['close']
+    closes = pd.to_numeric(closes, errors='coerce').sort_index()
+    closes = closes[~closes.index.duplicated(keep='last')]
+    return closes.pct_change(fill_method=None).iloc[1:]
+
+
+class ReturnPanel:
+    """Daily return series by ticker, refreshed when the day rolls over."""
+
+    def __init__(self, max_results: int = 4096):
+        self._lock = threading.Lock()
+        self._day: Optional[date] = None
+        self._returns: Dict[str, pd.Series] = {}
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._max_results = max_results
+
+    def _roll(self, as_of: date) -> None:
+        if self._day != as_of:
+            self._day = as_of
+            self._returns.clear()
+            self._results.clear()
+
+    def returns(
+        self,
+        tickers: List[str],
+        fetch: Callable[[str], Any],
+        as_of: Optional[date] = None,
+    ) -> pd.DataFrame:
+        """
+        Days x tickers return matrix, fetching only tickers not cached today.
+
+        Args:
+            tickers: Columns to return (tickers without history are all-NaN)
+            fetch: ticker -> DataFrame with date and close (e.g. repository.get_historical_prices)
+            as_of: Cache day (default today)
+        """
+        as_of = as_of or date.today()
+        with self._lock:
+            self._roll(as_of)
+            missing = [t for t in dict.fromkeys(tickers) if t not in self._returns]
+
+        loaded = {}
+        for ticker in missing:
+            try:
+                loaded[ticker] = _close_returns(fetch(ticker))
+            except Exception as e:
+                logger.debug(f"Could not fetch historical prices for {ticker}: {e}")
+                loaded[ticker] = pd.Series(dtype=float)
+
+        with self._lock:
+            self._roll(as_of)
+            self._returns.update(loaded)
+            series = {t: self._returns.get(t, loaded.get(t)) for t in tickers}
+        panel = pd.concat(series, axis=1).sort_index() if series else pd.DataFrame()
+        return panel.reindex(columns=list(tickers))
+
+    def get_result(self, key: str, as_of: Optional[date] = None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._roll(as_of or date.today())
+            return self._results.get(key)
+
+    def put_result(self, key: str, result: Dict[str, Any], as_of: Optional[date] = None) -> None:
+        with self._lock:
+            self._roll(as_of or date.today())
+            if len(self._results) >= self._max_results:
+                self._results.pop(next(iter(self._results)))
+            self._results[key] = result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._day = None
+            self._returns.clear()
+            self._results.clear()
+
+
+return_panel = ReturnPanel()
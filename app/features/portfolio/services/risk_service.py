@@ -16,9 +16,11 @@ import numpy as np
 import pandas as pd
 from datetime import datetime, date
 
+from analytics import portfolio_risk
 from app.core.service import BaseService
 from app.core.events.event_bus import EventType
 from app.core import logger
+from app.features.portfolio.services.return_panel import holdings_key, return_panel
 
 
 class RiskMetricsService(BaseService):
@@ -50,7 +52,9 @@ class RiskMetricsService(BaseService):
 
         Args:
             portfolio_id: Portfolio ID
-            recalculate: Force recalculation even if cached
+            recalculate: Ignore today's stored metrics (holdings may have
+                changed since); results for identical holdings are still
+                served from the in-process memo
 
         Returns:
             Dictionary with risk metrics
@@ -81,17 +85,13 @@ class RiskMetricsService(BaseService):
             if total_value <= 0:
                 raise Exception("Portfolio has no value")
 
-            # Fetch historical prices for advanced calculations
-            # (Currently using simplified metrics based on unrealized P&L)
-            if recalculate and holdings:
-                # Attempt to fetch historical data for first holding
-                # In a full implementation, this would be used for time-series analysis
-                try:
-                    first_ticker = holdings[0].get('ticker')
-                    if first_ticker:
-                        _ = self.repo.get_historical_prices(first_ticker)
-                except Exception as e:
-                    logger.debug(f"Could not fetch historical prices: {e}")
+            # Memoised per (portfolio, holdings, day): unchanged holdings are not recomputed
+            as_of = date.today()
+            key = f"{portfolio_id}:{holdings_key(holdings)}"
+            memo = return_panel.get_result(key, as_of)
+            if memo is not None:
+                logger.info(f"Using memoised risk metrics for portfolio {portfolio_id}")
+                return dict(memo)
 
             # Calculate concentration metrics
             weights = [(h.get('current_value', 0) / total_value) * 100 for h in holdings]
@@ -109,43 +109,25 @@ class RiskMetricsService(BaseService):
                 signal = h.get('current_signal') or 'UNKNOWN'
                 signal_dist[signal] = signal_dist.get(signal, 0) + 1
 
-            # Calculate return metrics from unrealized P&L
+            # Average unrealized P&L of the holdings since purchase
             returns_pct = [
                 float(h['unrealized_pl_pct'])
                 for h in holdings
                 if h.get('unrealized_pl_pct') is not None
             ]
+            total_return = float(np.mean(returns_pct)) if returns_pct else None
 
-            if returns_pct:
-                total_return = float(np.mean(returns_pct))
-                volatility = self._calculate_volatility(np.array(returns_pct))
-                sharpe = self._calculate_sharpe_ratio(
-                    np.array(returns_pct),
-                    risk_free_rate=self.DEFAULT_RISK_FREE_RATE,
-                    volatility=volatility
-                )
-
-                # Simple max drawdown from current returns
-                max_drawdown = float(min(returns_pct)) if returns_pct else 0
-            else:
-                total_return = None
-                volatility = None
-                sharpe = None
-                max_drawdown = None
-
-            # Beta calculation (simplified - would need historical data)
-            # For now, use a placeholder value
-            beta = 1.0
+            # Volatility, Sharpe, beta and drawdown from the daily return history
+            series_metrics = self._calculate_time_series_metrics(holdings, total_value, as_of)
 
             # Build metrics dictionary
             metrics = {
-                'as_of': date.today().isoformat(),
+                'as_of': as_of.isoformat(),
                 'total_return_pct': total_return,
-                'volatility': volatility,
-                'sharpe_ratio': sharpe,
-                'beta': beta,
-                'max_drawdown_pct': max_drawdown,
+                **series_metrics,
                 'top_holding_weight_pct': top_holding_weight,
+                'top_5_weight_pct': top_5_weight,
+                'herfindahl_index': herfindahl,
                 'signal_distribution': signal_dist
             }
 
@@ -156,14 +138,16 @@ class RiskMetricsService(BaseService):
                     metrics=metrics
                 )
 
+            return_panel.put_result(key, dict(metrics), as_of)
+
             # Publish event
             await self.publish_event(
                 EventType.PORTFOLIO_CHANGED,
                 {
                     'portfolio_id': portfolio_id,
                     'action': 'risk_metrics_calculated',
-                    'volatility': volatility,
-                    'sharpe_ratio': sharpe
+                    'volatility': metrics['volatility'],
+                    'sharpe_ratio': metrics['sharpe_ratio']
                 }
             )
 
@@ -175,6 +159,59 @@ class RiskMetricsService(BaseService):
             logger.error(f"Error calculating risk metrics: {e}")
             raise
 
+    def _calculate_time_series_metrics(
+        self,
+        holdings: List[Dict[str, Any]],
+        total_value: float,
+        as_of: date
+    ) -> Dict[str, Any]:
+        """
+        Portfolio volatility, Sharpe, beta and max drawdown over the last year.
+
+        Holdings' daily returns come from the shared return panel (each
+        ticker's history is fetched once per day), weighted by current value.
+
+        Args:
+            holdings: Holdings with ticker and current_value
+            total_value: Portfolio value
+            as_of: Cache day
+
+        Returns:
+            volatility, sharpe_ratio, beta, max_drawdown_pct (None where the
+            history is too short) and correlation_matrix
+        """
+        values = pd.Series(
+            [float(h.get('current_value') or 0) / float(total_value) for h in holdings],
+            index=[h.get('ticker') for h in holdings],
+        )
+        weights = values[values.index.notna()].groupby(level=0).sum()
+        tickers = list(weights.index)
+
+        panel = return_panel.returns(
+            list(dict.fromkeys(tickers + [self.DEFAULT_BENCHMARK])),
+            self.repo.get_historical_prices,
+            as_of,
+        ).tail(self.TRADING_DAYS_PER_YEAR)
+        holding_returns = panel[tickers]
+
+        port = portfolio_risk.portfolio_returns(holding_returns, weights.to_numpy())
+        row = portfolio_risk.risk_metrics(
+            port,
+            benchmark=panel[self.DEFAULT_BENCHMARK],
+            risk_free_rate=self.DEFAULT_RISK_FREE_RATE,
+        ).iloc[0]
+
+        def _opt(value: float) -> Optional[float]:
+            return float(value) if np.isfinite(value) else None
+
+        return {
+            'volatility': _opt(row['volatility']),
+            'sharpe_ratio': _opt(row['sharpe_ratio']),
+            'beta': _opt(row['beta']),
+            'max_drawdown_pct': _opt(row['max_drawdown_pct']),
+            'correlation_matrix': portfolio_risk.correlation_matrix(holding_returns) if len(tickers) > 1 else {},
+        }
+
     def _calculate_sharpe_ratio(
         self,
         returns: np.ndarray,
@@ -268,6 +268,26 @@ class TestGetSignalReasoning:
         assert reasoning['shap_values'] == {'momentum': 0.45, 'rsi': -0.15}
         assert 'factors' in reasoning
 
+    def test_get_signal_reasoning_prefers_stored_contributions(self, repository, mock_db_context, mock_logger):
+        """Contributions from model_shap_values are zipped with their feature names."""
+        mock_cursor = mock_db_context['cursor']
+        mock_cursor.fetchone.return_value = {
+            'signal_label': 'BUY',
+            'confidence': 0.62,
+            'shap_values': None,
+            'feature_contributions': {'stale': 1.0},
+            'feature_names': ['mom_12_1', 'vol_90'],
+            'contributions': [0.25, -0.5],
+        }
+
+        reasoning = repository.get_signal_reasoning("BHP.AX", model_version="model_a_v1.1")
+
+        assert reasoning['feature_contributions'] == {'mom_12_1': 0.25, 'vol_90': -0.5}
+        # Contributions are only joined from the requested model version
+        query, params = mock_cursor.execute.call_args[0]
+        assert "v.model_version = %s" in query
+        assert params == ("model_a_v1.1", "BHP.AX")
+
     def test_get_signal_reasoning_not_found(self, repository, mock_db_context, mock_logger):
         """Test getting reasoning when none exists."""
         # Setup
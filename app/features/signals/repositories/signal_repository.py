@@ -12,6 +12,19 @@ from psycopg2.extras import RealDictCursor, execute_values
 from app.core.repository import BaseRepository
 from app.core import db_context, logger, parse_as_of
 
+# Signal outcomes are judged on the 21-trading-day forward return
+# (forward_returns table, see analytics/forward_returns.py)
+ACCURACY_HORIZON_DAYS = 21
+
+
+def _served_shap_version() -> str:
+    """model_shap_values key of the Model A version being served (model_id_version, as ModelA writes it)."""
+    # Deferred: the registry imports the model plugins
+    from app.features.models.registry import model_registry
+
+    version = (model_registry.get_model_config("model_a") or {}).get("version", "v1.1")
+    return f"model_a_{version}"
+
 
 class SignalRepository(BaseRepository):
     """
@@ -213,12 +226,14 @@ class SignalRepository(BaseRepository):
             logger.error(f"Error retrieving signal for ticker={ticker}: {e}")
             raise
 
-    def get_signal_reasoning(self, ticker: str) -> Optional[Dict[str, Any]]:
+    def get_signal_reasoning(self, ticker: str, model_version: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Get SHAP-based reasoning (feature contributions) for a ticker's signal.
 
         Args:
             ticker: Stock ticker symbol (e.g., "BHP.AX")
+            model_version: model_shap_values version to attach contributions
+                from (default: the served Model A version, see _served_shap_version)
 
         Returns:
             Dictionary with reasoning data or None if not found:
@@ -239,6 +254,7 @@ class SignalRepository(BaseRepository):
             ticker = ticker.strip().upper()
             if not ticker.endswith('.AX'):
                 ticker = f"{ticker}.AX"
+            model_version = model_version or _served_shap_version()
 
             with db_context() as conn:
                 cur = conn.cursor(cursor_factory=RealDictCursor)
@@ -246,16 +262,26 @@ class SignalRepository(BaseRepository):
                 cur.execute(
                     """
                     SELECT
-                        signal_label,
-                        confidence,
-                        shap_values,
-                        feature_contributions
-                    FROM model_a_ml_signals
-                    WHERE symbol = %s
-                    ORDER BY as_of DESC
+                        s.signal_label,
+                        s.confidence,
+                        s.shap_values,
+                        s.feature_contributions,
+                        sv.feature_names,
+                        sv.contributions
+                    FROM model_a_ml_signals s
+                    LEFT JOIN LATERAL (
+                        SELECT fs.feature_names, v.contributions
+                        FROM model_shap_values v
+                        JOIN model_shap_feature_sets fs
+                            ON fs.model_version = v.model_version
+                        WHERE v.symbol = s.symbol AND v.as_of = s.as_of
+                          AND v.model_version = %s
+                    ) sv ON TRUE
+                    WHERE s.symbol = %s
+                    ORDER BY s.as_of DESC
                     LIMIT 1
                     """,
-                    (ticker,)
+                    (model_version, ticker)
                 )
 
                 row = cur.fetchone()
@@ -264,12 +290,21 @@ class SignalRepository(BaseRepository):
                     logger.debug(f"No signal reasoning found for ticker={ticker}")
                     return None
 
+                # Contributions precomputed at signal-generation time
+                # (model_shap_values) take precedence over the legacy JSONB column
+                feature_contributions = row['feature_contributions']
+                if row.get('feature_names') and row.get('contributions'):
+                    feature_contributions = {
+                        name: float(value)
+                        for name, value in zip(row['feature_names'], row['contributions'])
+                    }
+
                 result = {
                     "ticker": ticker,
                     "signal_label": row['signal_label'],
                     "confidence": float(row['confidence']) if row['confidence'] else None,
                     "shap_values": row['shap_values'],
-                    "feature_contributions": row['feature_contributions'],
+                    "feature_contributions": feature_contributions,
                     "factors": []
                 }
 
@@ -364,8 +399,8 @@ class SignalRepository(BaseRepository):
         """
         Calculate historical signal accuracy for a specific ticker.
 
-        Analyzes historical signals by comparing predicted returns with actual
-        price movements 30 days later.
+        Analyzes historical signals by comparing predicted returns with the
+        precomputed forward return ACCURACY_HORIZON_DAYS trading days later.
 
         Args:
             ticker: Stock ticker symbol (e.g., "BHP.AX")
@@ -377,7 +412,7 @@ class SignalRepository(BaseRepository):
                 - signals_analyzed: Total number of signals analyzed
                 - overall_accuracy: Overall accuracy rate (0-1)
                 - by_signal: Accuracy breakdown by signal type
-                - lookback_days: Number of days used for validation (30)
+                - lookback_days: Trading days used for validation (21)
 
         Example:
             >>> repo = SignalRepository()
@@ -405,28 +440,34 @@ class SignalRepository(BaseRepository):
                         -- Calculate if signal was correct by comparing predicted vs actual return
                         CASE
                             WHEN s.ml_expected_return > 0
-                                 AND p_future.close > p_current.close
+                                 AND o.fwd_return > 0
                             THEN true
                             WHEN s.ml_expected_return < 0
-                                 AND p_future.close < p_current.close
+                                 AND o.fwd_return < 0
                             THEN true
                             WHEN s.ml_expected_return = 0
-                                 AND ABS(p_future.close - p_current.close) / p_current.close < 0.02
+                                 AND ABS(o.fwd_return) < 0.02
                             THEN true
                             ELSE false
                         END as was_correct
                     FROM model_a_ml_signals s
-                    LEFT JOIN prices p_current ON p_current.ticker = s.symbol
+                    LEFT JOIN forward_returns fr ON fr.symbol = s.symbol
+                        AND fr.dt = s.as_of
+                        AND fr.horizon = %s
+                    -- Signals forward_returns does not cover yet fall back to the close 30 days later
+                    LEFT JOIN prices p_current ON p_current.symbol = s.symbol
                         AND p_current.dt = s.as_of
-                    LEFT JOIN prices p_future ON p_future.ticker = s.symbol
+                    LEFT JOIN prices p_future ON p_future.symbol = s.symbol
                         AND p_future.dt = s.as_of + INTERVAL '30 days'
+                    CROSS JOIN LATERAL (
+                        SELECT COALESCE(fr.fwd_return, p_future.close / NULLIF(p_current.close, 0) - 1) AS fwd_return
+                    ) o
                     WHERE s.symbol = %s
-                      AND p_current.close IS NOT NULL
-                      AND p_future.close IS NOT NULL
+                      AND o.fwd_return IS NOT NULL
                     ORDER BY s.as_of DESC
                     LIMIT %s
                     """,
-                    (ticker, limit)
+                    (ACCURACY_HORIZON_DAYS, ticker, limit)
                 )
 
                 rows = cur.fetchall()
@@ -438,7 +479,7 @@ class SignalRepository(BaseRepository):
                         "signals_analyzed": 0,
                         "overall_accuracy": None,
                         "by_signal": {},
-                        "lookback_days": 30,
+                        "lookback_days": ACCURACY_HORIZON_DAYS,
                         "message": "No historical signals with outcome data available"
                     }
 
@@ -486,7 +527,7 @@ class SignalRepository(BaseRepository):
                     "signals_analyzed": total_signals,
                     "overall_accuracy": round(overall_accuracy, 2),
                     "by_signal": by_signal,
-                    "lookback_days": 30,
+                    "lookback_days": ACCURACY_HORIZON_DAYS,
                     "message": f"Analyzed {total_signals} historical signals"
                 }
 
@@ -3,6 +3,9 @@ app/features/signals/services/__tests__/test_ensemble_service.py
 Comprehensive unit tests for EnsembleService following TDD best practices.
 """
 
+import asyncio
+import time
+
 import pytest
 from unittest.mock import Mock, MagicMock, patch, AsyncMock, call
 from datetime import date, datetime
@@ -344,6 +347,83 @@ class TestEnsembleServiceGenerateSignals:
                 mock_persist.assert_called_once()
                 assert len(result) == 1
 
+    @pytest.mark.asyncio
+    async def test_generate_signals_runs_models_concurrently(self, mock_event_bus, mock_logger):
+        """Test that total time is bounded by the slowest model, not the sum."""
+        mock_registry = MagicMock()
+        mock_registry.get_ensemble_config.return_value = {}
+
+        model_a = create_mock_plugin("model_a", weight=0.6)
+        model_b = create_mock_plugin("model_b", weight=0.4)
+
+        def slow_model(signal, confidence):
+            async def generate(*_):
+                await asyncio.sleep(0.2)
+                return [create_model_output("BHP.AX", signal, confidence)]
+            return generate
+
+        model_a.generate_signals.side_effect = slow_model("BUY", 0.8)
+        model_b.generate_signals.side_effect = slow_model("BUY", 0.7)
+
+        mock_registry.get_enabled.return_value = [model_a, model_b]
+        mock_registry.get_ensemble_weights.return_value = {
+            "model_a": 0.6,
+            "model_b": 0.4,
+        }
+
+        with patch('app.features.models.services.ensemble_service.model_registry', mock_registry):
+            service = EnsembleService()
+
+            started = time.perf_counter()
+            result = await service.generate_ensemble_signals(["BHP.AX"], date(2024, 1, 15), persist=False)
+            elapsed = time.perf_counter() - started
+
+            assert len(result) == 1
+            assert elapsed < 0.35
+
+    @pytest.mark.asyncio
+    async def test_generate_signals_timed_out_model_is_dropped(self, mock_event_bus, mock_logger):
+        """Test that a model exceeding the timeout yields a partial result."""
+        mock_registry = MagicMock()
+        mock_registry.get_ensemble_config.return_value = {"model_timeout_seconds": 0.05}
+
+        model_a = create_mock_plugin("model_a", weight=0.4)
+        model_b = create_mock_plugin("model_b", weight=0.3)
+        model_c = create_mock_plugin("model_c", weight=0.3)
+
+        async def hang(*_):
+            await asyncio.sleep(5)
+            return []
+
+        model_a.generate_signals.side_effect = hang
+        model_b.generate_signals.return_value = [
+            create_model_output("BHP.AX", "BUY", 0.75),
+        ]
+        model_c.generate_signals.return_value = [
+            create_model_output("BHP.AX", "BUY", 0.70),
+        ]
+
+        mock_registry.get_enabled.return_value = [model_a, model_b, model_c]
+        mock_registry.get_ensemble_weights.return_value = {
+            "model_a": 0.4,
+            "model_b": 0.3,
+            "model_c": 0.3,
+        }
+
+        with patch('app.features.models.services.ensemble_service.model_registry', mock_registry):
+            service = EnsembleService()
+
+            result = await service.generate_ensemble_signals(["BHP.AX"], date(2024, 1, 15), persist=False)
+
+            assert len(result) == 1
+            assert set(result[0]['model_signals']) == {"model_b", "model_c"}
+            error_msg = str(mock_logger.error.call_args[0][0])
+            assert "model_a" in error_msg
+            assert "timed out" in error_msg
+
+            event = mock_event_bus.publish.call_args[0][0]
+            assert event.payload['failed_models'] == ["model_a"]
+
 
 class TestEnsembleServiceAggregation:
     """Test signal aggregation logic."""
@@ -485,9 +565,47 @@ class TestEnsembleServiceAggregation:
             assert cba['rank'] == 2
             assert bhp['ensemble_score'] > cba['ensemble_score']
 
+    def test_aggregation_weighted_vote_tie_goes_to_first_model(self, service):
+        """Test that equal weighted votes resolve to the earliest model's signal."""
+        model_outputs = {
+            "model_a": [create_model_output("BHP.AX", "HOLD", 0.6)],
+            "model_b": [create_model_output("BHP.AX", "BUY", 0.7)],
+        }
+
+        result = service._aggregate_signals(
+            model_outputs, {"model_a": 0.5, "model_b": 0.5}, date(2024, 1, 15)
+        )
+
+        assert result[0]['signal'] == "HOLD"
+        assert result[0]['models_contributing'] == ["model_a", "model_b"]
+        assert result[0]['model_expected_returns'] == {"model_a": None, "model_b": None}
+
+    def test_aggregation_large_universe(self, service):
+        """Test that thousands of symbols across several models aggregate quickly."""
+        signals = ["STRONG_SELL", "SELL", "HOLD", "BUY", "STRONG_BUY"]
+        model_ids = ["model_a", "model_b", "model_c"]
+        model_outputs = {
+            mid: [
+                create_model_output(f"S{i}.AX", signals[(i + k) % 5], (i % 100) / 100, 0.01)
+                for i in range(3000)
+            ]
+            for k, mid in enumerate(model_ids)
+        }
+        weights = {"model_a": 0.5, "model_b": 0.3, "model_c": 0.2}
+
+        started = time.perf_counter()
+        result = service._aggregate_signals(model_outputs, weights, date(2024, 1, 15))
+        elapsed = time.perf_counter() - started
+
+        assert len(result) == 3000
+        assert [s['rank'] for s in result] == list(range(1, 3001))
+        scores = [s['ensemble_score'] for s in result]
+        assert scores == sorted(scores, reverse=True)
+        assert elapsed < 1.0
+
 
 class TestEnsembleServiceResolveSignal:
-    """Test _resolve_signal method with different strategies."""
+    """Test _resolve_signals with different strategies."""
 
     @pytest.mark.asyncio
     async def test_resolve_signal_weighted_majority_strategy(self, mock_event_bus, mock_logger):
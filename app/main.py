@@ -14,6 +14,7 @@ from fastapi.openapi.utils import get_openapi
 from slowapi.errors import RateLimitExceeded
 
 from app.core import logger
+from app.core.events import event_bus
 from app.core.events.handlers import register_event_handlers
 from app.routes import (
     health, refresh, model, portfolio, loan, insights, fusion, jobs, drift,
@@ -94,6 +95,12 @@ async def startup_event():
     logger.info("✅ Application startup complete - event handlers registered")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Handle queued events and stop the event bus workers."""
+    await event_bus.shutdown()
+
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """Log all incoming requests."""
@@ -3,15 +3,25 @@ app/routes/fusion.py
 Portfolio Fusion API - Unified portfolio view across all asset classes.
 """
 
-from typing import Optional
+from typing import Literal, Optional
 
+import pandas as pd
 from psycopg2.extras import RealDictCursor
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException, Header, Query
 
+from analytics import projection
 from app.core import db_context, require_key, logger
+from services.universe_returns import universe_covariance
 
 router = APIRouter(prefix="/portfolio", tags=["Portfolio Fusion"])
 
+# Signals table and forward horizon (trading days) of each model's ml_expected_return
+PROJECTION_MODELS = {
+    "model_a": ("model_a_ml_signals", 21),
+    "model_b": ("model_b_ml_signals", 126),
+}
+MAX_PROJECTION_PATHS = 100_000
+
 
 @router.get("/overview")
 def get_portfolio_overview(x_api_key: Optional[str] = Header(None)):
@@ -224,3 +234,115 @@ def refresh_portfolio_fusion(x_api_key: Optional[str] = Header(None)):
     except Exception as e:
         logger.error(f"Error refreshing portfolio fusion: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _equity_inputs(conn, model: str, n_holdings: int, lookback: int, cov_method: str):
+    """Monthly (mu, sigma) of the model's top-ranked names, equal weighted, and the signals date."""
+    table, horizon_days = PROJECTION_MODELS[model]
+    signals = pd.read_sql(
+        f"""
+        SELECT as_of, symbol, rank, ml_expected_return
+        FROM {table}
+        WHERE as_of = (SELECT max(as_of) FROM {table})
+        """,
+        conn,
+    )
+    if signals.empty:
+        return None
+    as_of = signals["as_of"].iloc[0]
+    expected = signals.set_index("symbol")["ml_expected_return"].astype(float)
+    top = signals.sort_values("rank").head(n_holdings)["symbol"]
+
+    # Universe covariance from the same shared loader (and cache entry) as the model routes
+    cov = universe_covariance(conn, as_of, lookback, method=cov_method)
+    weights = pd.Series(1.0, index=top)
+    if not cov.covered(list(weights.index)):
+        return None
+    mu, sigma = projection.equity_moments(weights, expected, cov, horizon_days)
+    return mu, sigma, as_of
+
+
+@router.get("/projection")
+def get_portfolio_projection(
+    model: Literal["model_a", "model_b"] = Query("model_a", description="Expected returns source"),
+    years: int = Query(10, ge=1, le=40),
+    paths: int = Query(10_000, ge=100, le=MAX_PROJECTION_PATHS),
+    seed: Optional[int] = Query(None, description="Seed for reproducible paths"),
+    n_holdings: int = Query(20, ge=1, le=200),
+    lookback: int = Query(252, ge=20, le=1260),
+    cov_method: Literal["sample", "ledoit_wolf", "ewma"] = Query("ledoit_wolf"),
+    property_growth: float = Query(0.04, description="Annual property growth"),
+    property_vol: float = Query(0.08, ge=0, description="Annual property volatility"),
+    equity_property_corr: float = Query(0.3, ge=-1, le=1),
+    loan_rate_vol: float = Query(0.01, ge=0, description="Annual volatility of the loan rate"),
+    x_api_key: Optional[str] = Header(None),
+):
+    """
+    Monte Carlo projection of the latest fusion snapshot.
+
+    Equity follows the expected return and covariance of the model's top
+    n_holdings (equal weight), property an assumed growth and volatility,
+    and loans amortize at the balance-weighted rate of loan_accounts under a
+    floating-rate random walk.
+
+    Returns:
+        - Percentile fan (p5..p95 by year) for equity, property, loans and net worth
+        - The simulation inputs
+    """
+    require_key(x_api_key)
+
+    with db_context() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute("""
+                SELECT equity_value, property_value, loan_balance, loan_monthly_payment, computed_at
+                FROM portfolio_fusion
+                ORDER BY computed_at DESC
+                LIMIT 1
+            """)
+            fusion = cursor.fetchone()
+            if not fusion:
+                return {
+                    "status": "no_data",
+                    "message": "No portfolio fusion data available. Run portfolio_fusion_job.py first.",
+                }
+
+            cursor.execute("""
+                SELECT SUM(principal * annual_rate) / NULLIF(SUM(principal), 0) AS annual_rate
+                FROM loan_accounts
+            """)
+            loan_rate = float((cursor.fetchone() or {}).get("annual_rate") or 0)
+
+        equity = _equity_inputs(conn, model, n_holdings, lookback, cov_method)
+
+    if equity is None:
+        raise HTTPException(status_code=404, detail=f"No {model} signals with price history to project equities")
+    equity_mu, equity_sigma, signals_as_of = equity
+
+    inputs = {
+        "equity_value": float(fusion["equity_value"] or 0),
+        "equity_mu": equity_mu,
+        "equity_sigma": equity_sigma,
+        "property_value": float(fusion["property_value"] or 0),
+        "property_growth": property_growth,
+        "property_vol": property_vol,
+        "equity_property_corr": equity_property_corr,
+        "loan_balance": float(fusion["loan_balance"] or 0),
+        "loan_rate": loan_rate,
+        "loan_payment": float(fusion["loan_monthly_payment"] or 0),
+        "loan_rate_vol": loan_rate_vol,
+    }
+    fans = projection.project(years=years, n_paths=paths, seed=seed, **inputs)
+    logger.info("Projected %d paths x %d years from %s signals", paths, years, model)
+
+    return {
+        "status": "success",
+        "computed_at": fusion["computed_at"].isoformat(),
+        "signals_as_of": str(signals_as_of),
+        "model": model,
+        "years": years,
+        "paths": paths,
+        "seed": seed,
+        "inputs": inputs,
+        "percentiles": list(projection.PERCENTILES),
+        "fan": {name: fan.reset_index().to_dict(orient="records") for name, fan in fans.items()},
+    }
@@ -10,6 +10,7 @@ from fastapi import APIRouter, Header, HTTPException
 from fastapi.responses import JSONResponse
 
 from app.core import db, require_key, logger
+from app.core.events import event_bus
 
 router = APIRouter()
 
@@ -79,3 +80,11 @@ def debug_db_check(x_api_key: Optional[str] = Header(default=None)):
     except Exception as e:
         logger.exception("DB check failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/debug/event_bus")
+async def debug_event_bus(x_api_key: Optional[str] = Header(default=None)):
+    """Event bus queue depth and handler latency per event type."""
+    # async so metrics() runs on the loop thread that mutates the bus's stats
+    require_key(x_api_key)
+    return {"status": "ok", "event_types": event_bus.metrics()}
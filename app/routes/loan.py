@@ -3,7 +3,7 @@ app/routes/loan.py
 Loan simulation and summary endpoints.
 """
 
-from typing import Optional
+from typing import List, Optional
 
 import psycopg2
 from fastapi import APIRouter, Header, HTTPException, Query
@@ -14,26 +14,70 @@ from app.core import db, require_key, logger
 router = APIRouter()
 
 
+MAX_LOAN_SCENARIOS = 5000
+
+
 class LoanSimulateReq(BaseModel):
     principal: float
     annual_rate: float
     years: int
     extra_payment: float = 0.0
+    offset_balance: float = 0.0
     persist: bool = False
+    # Scenario grid: any list given is crossed with the others (or the single value above)
+    annual_rates: Optional[List[float]] = None
+    years_options: Optional[List[int]] = None
+    extra_payments: Optional[List[float]] = None
+    offset_balances: Optional[List[float]] = None
+    include_schedules: bool = False
 
 
 @router.post("/loan/simulate")
 def loan_simulate(req: LoanSimulateReq, x_api_key: Optional[str] = Header(default=None)):
-    """Simulate loan amortization schedule."""
+    """Simulate a loan amortization schedule, or a grid of scenarios."""
     require_key(x_api_key)
     try:
-        from jobs.loan_simulator import loan_amortization
+        from jobs.loan_simulator import loan_scenarios
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Loan module import failed: {e}")
 
-    schedule = loan_amortization(req.principal, req.annual_rate, req.years, req.extra_payment)
+    rates = req.annual_rates or [req.annual_rate]
+    terms = req.years_options or [req.years]
+    extras = req.extra_payments or [req.extra_payment]
+    offsets = req.offset_balances or [req.offset_balance]
+    n_scenarios = len(rates) * len(terms) * len(extras) * len(offsets)
+    if n_scenarios > MAX_LOAN_SCENARIOS:
+        raise HTTPException(
+            status_code=400, detail=f"{n_scenarios} scenarios requested; the limit is {MAX_LOAN_SCENARIOS}"
+        )
+
+    grid_requested = any(v is not None for v in (
+        req.annual_rates, req.years_options, req.extra_payments, req.offset_balances
+    ))
+    if grid_requested:
+        summary, schedules = loan_scenarios(
+            req.principal, rates, terms, extras, offsets, schedules=req.include_schedules
+        )
+        summary = summary.rename_axis("scenario").reset_index()
+        response = {
+            "status": "ok",
+            "count": int(len(summary)),
+            "best": summary.nsmallest(1, "total_interest").to_dict(orient="records")[0],
+            "scenarios": summary.to_dict(orient="records"),
+        }
+        if schedules is not None:
+            response["schedules"] = {
+                int(scenario): rows.drop(columns="scenario").to_dict(orient="records")
+                for scenario, rows in schedules.groupby("scenario")
+            }
+        return response
+
+    summary, schedule = loan_scenarios(
+        req.principal, [req.annual_rate], [req.years], [req.extra_payment], [req.offset_balance], schedules=True
+    )
+    schedule = schedule.drop(columns="scenario")
     monthly_payment = schedule["principal_paid"].iloc[0] + schedule["interest"].iloc[0]
-    total_interest = float(schedule["interest"].sum())
+    total_interest = float(summary["total_interest"].iloc[0])
 
     if req.persist:
         with db() as con, con.cursor() as cur:
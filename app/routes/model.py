@@ -6,7 +6,7 @@ Model A v1.1 run, persist, and dashboard endpoints.
 import os
 import json
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Literal, Optional
 
 import numpy as np
 import pandas as pd
@@ -15,6 +15,7 @@ from psycopg2.extras import execute_values
 from pydantic import BaseModel
 
 from app.core import db, require_key, logger, parse_as_of, OUTPUT_DIR
+from services.universe_returns import universe_covariance
 
 router = APIRouter()
 
@@ -68,6 +69,8 @@ class ModelAV11Req(BaseModel):
     adv_lookback: int = 20
     sma_lookback: int = 200
     sma_slope_lag: int = 20
+    cov_method: Literal["sample", "ledoit_wolf", "ewma"] = "sample"
+    cov_halflife: Optional[float] = None
     model: str = "model_a_v1_1"
 
 
@@ -165,20 +168,15 @@ def run_model_a_v1_1(req: ModelAV11Req, x_api_key: Optional[str] = Header(defaul
     w = _cap_weights(w, req.max_weight)
     target["weight_raw"] = w
 
-    sel = px[px["symbol"].isin(target["symbol"])].copy()
-    rets = sel.pivot(index="dt", columns="symbol", values="ret1").tail(req.vol_lookback)
-    valid = rets.notna().sum() >= int(0.8 * req.vol_lookback)
-    rets = rets.loc[:, valid].dropna()
-    target = target[target["symbol"].isin(rets.columns)].copy()
+    # Universe covariance, estimated once per (as_of, lookback, method, prices) and sliced to the targets
+    with db() as con:
+        cov = universe_covariance(con, as_of, req.vol_lookback, method=req.cov_method, halflife=req.cov_halflife)
+    target = target[target["symbol"].isin(cov.covered(target["symbol"]))].copy()
 
-    if rets.empty or target.empty:
+    if target.empty:
         raise HTTPException(status_code=400, detail="Not enough valid history for vol targeting.")
 
-    w_vec = target.set_index("symbol")["weight_raw"].reindex(rets.columns).fillna(0.0).values
-    cov = np.cov(rets.values, rowvar=False)
-    if not np.isfinite(cov).all():
-        raise HTTPException(status_code=400, detail="Covariance matrix contains NaNs; check input returns frame.")
-    port_vol_daily = float(np.sqrt(w_vec.T @ cov @ w_vec))
+    port_vol_daily = float(np.sqrt(cov.portfolio_variance(target.set_index("symbol")["weight_raw"])))
     port_vol_annual = port_vol_daily * np.sqrt(252.0)
 
     scale = 1.0 if port_vol_annual == 0 else min(1.0, req.target_vol_annual / port_vol_annual)
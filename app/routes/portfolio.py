@@ -3,6 +3,7 @@ app/routes/portfolio.py
 Portfolio attribution and performance endpoints.
 """
 
+import os
 from typing import Optional
 
 from fastapi import APIRouter, Header, HTTPException
@@ -12,6 +13,9 @@ from app.core import db, require_key, logger
 
 router = APIRouter()
 
+# Pending dates one attribution request computes; full backfills run in the job
+ATTRIBUTION_API_MAX_DATES = int(os.getenv("ATTRIBUTION_API_MAX_DATES", "5"))
+
 
 class PortfolioAttributionRunReq(BaseModel):
     model: str = "model_a_v1_1"
@@ -23,12 +27,15 @@ def run_portfolio_attribution(
     req: PortfolioAttributionRunReq,
     x_api_key: Optional[str] = Header(default=None),
 ):
-    """Run portfolio attribution calculation."""
+    """
+    Run portfolio attribution for as_of, or for the most recent
+    ATTRIBUTION_API_MAX_DATES pending dates when as_of is omitted.
+    """
     require_key(x_api_key)
     try:
         from jobs.portfolio_attribution_job import main as attribution_main
-        attribution_main(model=req.model, as_of=req.as_of)
-        return {"status": "ok", "model": req.model, "as_of": req.as_of}
+        dates = attribution_main(model=req.model, as_of=req.as_of, max_dates=ATTRIBUTION_API_MAX_DATES)
+        return {"status": "ok", "model": req.model, "as_of": req.as_of, "dates": dates}
     except Exception as exc:
         logger.exception("Portfolio attribution run failed: %s", exc)
         raise HTTPException(status_code=500, detail=str(exc))
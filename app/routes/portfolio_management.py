@@ -8,10 +8,13 @@ import io
 from datetime import date, datetime, timedelta
 from typing import Optional, List
 import numpy as np
+import pandas as pd
+from psycopg2.extras import execute_values
 
 from fastapi import APIRouter, HTTPException, UploadFile, File, Query, Depends
 from pydantic import BaseModel
 
+from analytics import rebalancing
 from app.core import db_context, logger
 from app.auth import get_current_user_id
 
@@ -501,103 +504,36 @@ def get_rebalancing_suggestions(
             (portfolio_id,)
         )
 
-        suggestions = []
-        priority = 1
-
-        for ticker, shares, current_price, current_value, signal, confidence in holdings:
-            if not signal:
-                continue
-
-            current_weight = (float(current_value) / float(total_value)) * 100 if current_value and total_value else 0
-
-            # Rule 1: Strong signals with high confidence
-            if signal == 'STRONG_SELL' and confidence and confidence >= 70:
-                # Suggest selling entire position
-                reason = f"Strong sell signal (confidence: {confidence:.1f}%). Returns don't justify risk."
-                action = 'SELL'
-                suggested_qty = float(shares)
-                suggested_value = float(shares) * float(current_price)
-                target_weight = 0
-                conf_score = float(confidence)
-
-            elif signal == 'SELL' and confidence and confidence >= 60:
-                # Suggest trimming position by 50%
-                reason = f"Sell signal (confidence: {confidence:.1f}%). Consider reducing exposure."
-                action = 'TRIM'
-                suggested_qty = float(shares) * 0.5
-                suggested_value = suggested_qty * float(current_price)
-                target_weight = current_weight * 0.5
-                conf_score = float(confidence) * 0.8
-
-            elif signal == 'STRONG_BUY' and confidence and confidence >= 80:
-                # Suggest adding to position (20% more)
-                reason = f"Strong buy signal (confidence: {confidence:.1f}%). Attractive entry point."
-                action = 'ADD'
-                suggested_qty = float(shares) * 0.2
-                suggested_value = suggested_qty * float(current_price)
-                target_weight = current_weight * 1.2
-                conf_score = float(confidence)
-
-            elif signal == 'BUY' and confidence and confidence >= 70:
-                # Suggest adding to position (10% more)
-                reason = f"Buy signal (confidence: {confidence:.1f}%). Good value opportunity."
-                action = 'ADD'
-                suggested_qty = float(shares) * 0.1
-                suggested_value = suggested_qty * float(current_price)
-                target_weight = current_weight * 1.1
-                conf_score = float(confidence) * 0.9
-
-            # Rule 2: Overweight positions (> 15% of portfolio)
-            elif current_weight > 15:
-                reason = f"Position is {current_weight:.1f}% of portfolio (overweight). Reduce concentration risk."
-                action = 'TRIM'
-                # Bring down to 12%
-                target_value = float(total_value) * 0.12
-                target_shares = target_value / float(current_price)
-                suggested_qty = float(shares) - target_shares
-                suggested_value = suggested_qty * float(current_price)
-                target_weight = 12.0
-                conf_score = 70.0
+        positions = pd.DataFrame(holdings, columns=[
+            'ticker', 'shares', 'current_price', 'current_value', 'current_signal', 'signal_confidence',
+        ])
+        positions['total_value'] = float(total_value)
+        planned = rebalancing.records(rebalancing.plan_trades(positions), drop=['portfolio_id'])
 
-            else:
-                # No action needed
-                continue
-
-            # Insert suggestion
-            cur.execute(
+        if planned:
+            expires_at = datetime.now() + timedelta(days=7)
+            execute_values(
+                cur,
                 """
                 insert into portfolio_rebalancing_suggestions (
                     portfolio_id, ticker, action, suggested_quantity, suggested_value,
                     reason, current_signal, signal_confidence,
                     current_shares, current_weight_pct, target_weight_pct,
                     priority, confidence_score, expires_at
-                )
-                values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ) values %s
                 """,
-                (
-                    portfolio_id, ticker, action, suggested_qty, suggested_value,
-                    reason, signal, confidence,
-                    float(shares), current_weight, target_weight,
-                    priority, conf_score, datetime.now() + timedelta(days=7)
-                )
+                [
+                    (
+                        portfolio_id, s['ticker'], s['action'], s['suggested_quantity'], s['suggested_value'],
+                        s['reason'], s['current_signal'], s['signal_confidence'],
+                        s['current_shares'], s['current_weight_pct'], s['target_weight_pct'],
+                        s['priority'], s['confidence_score'], expires_at,
+                    )
+                    for s in planned
+                ]
             )
 
-            suggestions.append(RebalancingSuggestion(
-                ticker=ticker,
-                action=action,
-                suggested_quantity=suggested_qty,
-                suggested_value=suggested_value,
-                reason=reason,
-                current_signal=signal,
-                signal_confidence=float(confidence) if confidence else None,
-                current_shares=float(shares),
-                current_weight_pct=current_weight,
-                target_weight_pct=target_weight,
-                priority=priority,
-                confidence_score=conf_score,
-            ))
-
-            priority += 1
+        suggestions = [RebalancingSuggestion(**s) for s in planned]
 
         con.commit()
 
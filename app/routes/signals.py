@@ -11,6 +11,7 @@ from psycopg2.extras import execute_values
 from pydantic import BaseModel
 
 from app.core import db, require_key, logger, parse_as_of, ENABLE_ASSISTANT
+from app.features.signals.repositories.signal_repository import ACCURACY_HORIZON_DAYS
 
 router = APIRouter()
 
@@ -671,40 +672,44 @@ def get_signal_accuracy(
 
     with db() as con, con.cursor() as cur:
         # Get historical signals with actual outcomes
-        # Note: This is a simplified version. In production, you'd compare
-        # the signal prediction with actual price movement over the next N days.
         cur.execute(
             """
             SELECT
                 s.signal_label,
                 s.confidence,
                 s.as_of,
-                -- Calculate if signal was correct (simplified):
-                -- Compare predicted return with actual return 30 days later
+                -- Calculate if signal was correct:
+                -- Compare predicted return with the forward return over the horizon
                 CASE
                     WHEN s.ml_expected_return > 0
-                         AND p_future.close > p_current.close
+                         AND o.fwd_return > 0
                     THEN true
                     WHEN s.ml_expected_return < 0
-                         AND p_future.close < p_current.close
+                         AND o.fwd_return < 0
                     THEN true
                     WHEN s.ml_expected_return = 0
-                         AND abs(p_future.close - p_current.close) / p_current.close < 0.02
+                         AND abs(o.fwd_return) < 0.02
                     THEN true
                     ELSE false
                 END as was_correct
             FROM model_a_ml_signals s
-            LEFT JOIN prices p_current ON p_current.ticker = s.symbol
+            LEFT JOIN forward_returns fr ON fr.symbol = s.symbol
+                AND fr.dt = s.as_of
+                AND fr.horizon = %s
+            -- Signals forward_returns does not cover yet fall back to the close 30 days later
+            LEFT JOIN prices p_current ON p_current.symbol = s.symbol
                 AND p_current.dt = s.as_of
-            LEFT JOIN prices p_future ON p_future.ticker = s.symbol
+            LEFT JOIN prices p_future ON p_future.symbol = s.symbol
                 AND p_future.dt = s.as_of + INTERVAL '30 days'
+            CROSS JOIN LATERAL (
+                SELECT COALESCE(fr.fwd_return, p_future.close / NULLIF(p_current.close, 0) - 1) AS fwd_return
+            ) o
             WHERE s.symbol = %s
-              AND p_current.close IS NOT NULL
-              AND p_future.close IS NOT NULL
+              AND o.fwd_return IS NOT NULL
             ORDER BY s.as_of DESC
             LIMIT %s
             """,
-            (ticker, limit)
+            (ACCURACY_HORIZON_DAYS, ticker, limit)
         )
         rows = cur.fetchall()
 
@@ -756,6 +761,6 @@ def get_signal_accuracy(
             "signals_analyzed": total_signals,
             "overall_accuracy": round(overall_accuracy, 2),
             "by_signal": by_signal,
-            "lookback_days": 30,
+            "lookback_days": ACCURACY_HORIZON_DAYS,
             "message": f"Analyzed {total_signals} historical signals"
         }
@@ -239,6 +239,24 @@ create table if not exists portfolio_attribution (
 );
 create index if not exists portfolio_attribution_model_asof_idx
     on portfolio_attribution (model, as_of);
+""",
+    "portfolio_attribution_sector": """
+create table if not exists portfolio_attribution_sector (
+    id bigserial primary key,
+    model text not null,
+    as_of date not null,
+    sector text not null,
+    portfolio_weight numeric,
+    benchmark_weight numeric,
+    portfolio_return numeric,
+    benchmark_return numeric,
+    allocation numeric,
+    selection numeric,
+    interaction numeric,
+    created_at timestamptz not null default now()
+);
+create unique index if not exists portfolio_attribution_sector_uidx
+    on portfolio_attribution_sector (model, as_of, sector);
 """,
     "portfolio_performance": """
 create table if not exists portfolio_performance (
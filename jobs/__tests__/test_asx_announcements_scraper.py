@@ -0,0 +1,131 @@
+"""
+jobs/__tests__/test_asx_announcements_scraper.py
+Unit tests for the ASX announcements PDF pipeline.
+Tests the text cache, politeness limiter and concurrent text gathering.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from jobs import asx_announcements_scraper as scraper
+
+
+@pytest.fixture(autouse=True)
+def text_cache(tmp_path):
+    with patch.object(scraper, "PDF_TEXT_CACHE_DIR", str(tmp_path)):
+        yield tmp_path
+
+
+def _gather(links):
+    """Run _gather_texts over PDF links with a thread pool and no request spacing."""
+    limiter_cls = scraper.PolitenessLimiter
+    df = pd.DataFrame([{"headline": str(i), "pdf_link": link} for i, link in enumerate(links)])
+    with patch.object(scraper, "ProcessPoolExecutor",
+                      lambda max_workers, mp_context: ThreadPoolExecutor(max_workers)), \
+         patch.object(scraper, "PolitenessLimiter",
+                      lambda *_: limiter_cls(concurrency=4, min_interval=0)):
+        return asyncio.run(scraper._gather_texts(df))
+
+
+class TestPdfTextCache:
+    """Test URL / content-hash keyed PDF text cache."""
+
+    def test_rerun_skips_download(self):
+        """A URL parsed once is served from the cache afterwards."""
+        with patch.object(scraper, "_download", return_value=b"%PDF-1") as mock_download, \
+             patch.object(scraper, "extract_pdf_text", return_value="Dividend declared"):
+            first = _gather(["https://asx.test/a.pdf"])
+            second = _gather(["https://asx.test/a.pdf"])
+
+        assert first == second == ["Dividend declared"]
+        mock_download.assert_called_once()
+
+    def test_same_content_at_new_url_is_not_reparsed(self):
+        """Identical PDF bytes behind a different URL reuse the extracted text."""
+        with patch.object(scraper, "_download", return_value=b"%PDF-1"), \
+             patch.object(scraper, "extract_pdf_text", return_value="Results") as mock_extract:
+            _gather(["https://asx.test/a.pdf"])
+            texts = _gather(["https://asx.test/mirror/a.pdf"])
+
+        assert texts == ["Results"]
+        mock_extract.assert_called_once()
+
+    def test_prune_drops_expired_then_least_recently_used(self, text_cache):
+        now = time.time()
+        for age_days, name in [(200, "old.txt"), (3, "c.txt"), (2, "b.txt"), (1, "a.txt")]:
+            path = text_cache / name
+            path.write_text(name)
+            os.utime(path, (now - age_days * 86400,) * 2)
+
+        with patch.object(scraper, "PDF_TEXT_CACHE_MAX_AGE_DAYS", 90), \
+             patch.object(scraper, "PDF_TEXT_CACHE_MAX_FILES", 2):
+            removed = scraper.prune_pdf_text_cache()
+
+        assert removed == 2
+        assert sorted(p.name for p in text_cache.iterdir()) == ["a.txt", "b.txt"]
+
+
+class TestPolitenessLimiter:
+    """Test request spacing."""
+
+    def test_spaces_request_starts(self):
+        starts = []
+
+        async def run():
+            limiter = scraper.PolitenessLimiter(concurrency=4, min_interval=0.05)
+
+            async def request():
+                async with limiter:
+                    starts.append(time.monotonic())
+
+            await asyncio.gather(*(request() for _ in range(3)))
+
+        asyncio.run(run())
+
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        assert all(gap >= 0.045 for gap in gaps)
+
+
+class TestGatherTexts:
+    """Test the concurrent download/extract stage."""
+
+    def test_resolves_pdfs_and_keeps_inline_text(self):
+        df = pd.DataFrame([
+            {"headline": "A", "pdf_link": "https://asx.test/a.pdf", "text": None},
+            {"headline": "B", "pdf_link": "https://news.test/b", "text": "Inline news text"},
+            {"headline": "C", "pdf_link": None, "text": None},
+            {"headline": "D", "pdf_link": "https://asx.test/d.pdf", "text": None},
+        ])
+        limiter_cls = scraper.PolitenessLimiter
+
+        with patch.object(scraper, "ProcessPoolExecutor",
+                          lambda max_workers, mp_context: ThreadPoolExecutor(max_workers)), \
+             patch.object(scraper, "PolitenessLimiter",
+                          lambda *_: limiter_cls(concurrency=4, min_interval=0)), \
+             patch.object(scraper, "_download", side_effect=lambda url: url.encode()), \
+             patch.object(scraper, "extract_pdf_text", side_effect=lambda b: f"text:{b.decode()}"):
+            texts = asyncio.run(scraper._gather_texts(df))
+
+        assert texts == [
+            "text:https://asx.test/a.pdf",
+            "Inline news text",
+            "",
+            "text:https://asx.test/d.pdf",
+        ]
+
+    def test_download_failure_yields_empty_text(self):
+        df = pd.DataFrame([{"headline": "A", "pdf_link": "https://asx.test/a.pdf"}])
+
+        with patch.object(scraper, "ProcessPoolExecutor",
+                          lambda max_workers, mp_context: ThreadPoolExecutor(max_workers)), \
+             patch.object(scraper, "_download", side_effect=OSError("timeout")):
+            texts = asyncio.run(scraper._gather_texts(df))
+
+        assert texts == [""]
+
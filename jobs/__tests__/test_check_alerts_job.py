@@ -199,3 +199,27 @@ class TestCheckAlerts:
         check_alerts()
 
         mock_logger.error.assert_called()
+
+
+class TestIsMarketOpen:
+    """Tests for the ASX trading-hours guard."""
+
+    def test_open_during_session_on_trading_day(self):
+        from jobs.check_alerts_job import MARKET_TZ, is_market_open
+
+        assert is_market_open(datetime(2026, 3, 10, 11, 30, tzinfo=MARKET_TZ))
+
+    def test_closed_outside_hours_weekends_and_holidays(self):
+        from jobs.check_alerts_job import MARKET_TZ, is_market_open
+
+        assert not is_market_open(datetime(2026, 3, 10, 16, 30, tzinfo=MARKET_TZ))
+        assert not is_market_open(datetime(2026, 3, 14, 11, 0, tzinfo=MARKET_TZ))  # Saturday
+        assert not is_market_open(datetime(2026, 1, 26, 11, 0, tzinfo=MARKET_TZ))  # Australia Day
+
+    def test_converts_utc_to_sydney_time(self):
+        from datetime import timezone
+
+        from jobs.check_alerts_job import is_market_open
+
+        # 23:30 UTC Monday = 10:30 AEDT Tuesday
+        assert is_market_open(datetime(2026, 3, 9, 23, 30, tzinfo=timezone.utc))
@@ -0,0 +1,96 @@
+"""
+jobs/__tests__/test_ingest_news_job.py
+Unit tests for the news ingestion job.
+Tests incremental fetch windows, concurrent fetching and the single bulk insert.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from jobs import ingest_news_job as job
+
+
+def _article(url, title="BHP lifts dividend", published="2026-01-02T00:00:00Z"):
+    return {
+        "url": url,
+        "title": title,
+        "description": "Strong profit growth",
+        "content": "...",
+        "publishedAt": published,
+        "source": {"name": "Reuters"},
+        "author": "Desk",
+    }
+
+
+class TestFetchWindow:
+    """Test per-ticker high-water marks."""
+
+    @patch.object(job, "NEWS_API_KEY", "key")
+    @patch("jobs.ingest_news_job.requests.get")
+    def test_since_narrows_from_parameter(self, mock_get):
+        mock_get.return_value.json.return_value = {"articles": []}
+        since = datetime.now(timezone.utc).replace(microsecond=0)
+
+        job.fetch_news_for_ticker("BHP.AX", days=7, since=since)
+
+        params = mock_get.call_args[1]["params"]
+        assert params["from"] > since.strftime("%Y-%m-%dT%H:%M:%S")
+        assert params["q"] == "BHP OR ASX:BHP"
+
+    @patch.object(job, "NEWS_API_KEY", "key")
+    @patch("jobs.ingest_news_job.requests.get")
+    def test_old_high_water_mark_is_capped_by_days(self, mock_get):
+        mock_get.return_value.json.return_value = {"articles": []}
+
+        job.fetch_news_for_ticker("BHP.AX", days=7, since=datetime(2020, 1, 1))
+
+        assert mock_get.call_args[1]["params"]["from"] > "2020-01-02"
+
+
+class TestConcurrentFetch:
+    """Test fetching all tickers under a shared limiter."""
+
+    def test_fetches_every_ticker_with_its_high_water_mark(self):
+        hwm = {"BHP.AX": datetime(2026, 1, 1, tzinfo=timezone.utc)}
+        calls = []
+
+        def fake_fetch(ticker, days, since):
+            calls.append((ticker, days, since))
+            return [_article(f"https://news.test/{ticker}")]
+
+        with patch.object(job, "fetch_news_for_ticker", side_effect=fake_fetch), \
+             patch.object(job, "NEWS_MIN_INTERVAL", 0):
+            result = asyncio.run(
+                job.fetch_news_for_tickers(["BHP.AX", "CBA.AX"], days=3, high_water_marks=hwm)
+            )
+
+        assert sorted(calls) == [("BHP.AX", 3, hwm["BHP.AX"]), ("CBA.AX", 3, None)]
+        assert list(result) == ["BHP.AX", "CBA.AX"]
+
+
+class TestRunNewsIngestion:
+    """Test the end-to-end job flow with storage mocked."""
+
+    def test_single_bulk_insert_per_run(self):
+        fetched = {
+            "BHP.AX": [_article("https://news.test/1"), _article("https://news.test/2")],
+            "CBA.AX": [_article("https://news.test/3"), {"url": "", "title": "no url"}],
+        }
+
+        async def fake_fetch(tickers, days, high_water_marks):
+            return fetched
+
+        with patch.object(job, "get_top_tickers", return_value=["BHP.AX", "CBA.AX"]), \
+             patch.object(job, "get_high_water_marks", return_value={}), \
+             patch.object(job, "fetch_news_for_tickers", side_effect=fake_fetch), \
+             patch.object(job, "analyze_sentiments",
+                          side_effect=lambda texts: [{"label": "positive", "score": 0.9}] * len(texts)), \
+             patch.object(job, "insert_news_records", return_value=3) as mock_insert:
+            total = job.run_news_ingestion(ticker_limit=2, days=7)
+
+        assert total == 3
+        mock_insert.assert_called_once()
+        records = mock_insert.call_args[0][0]
+        assert [r[0] for r in records] == ["BHP.AX", "BHP.AX", "CBA.AX"]
+        assert records[0][5:7] == ("positive", 0.9)
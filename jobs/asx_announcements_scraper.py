@@ -3,12 +3,17 @@ jobs/asx_announcements_scraper.py
 ASX announcements scraper with NLP sentiment and event tagging.
 """
 
+import asyncio
+import hashlib
+import io
 import os
 import re
 import time
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Optional
+from multiprocessing import get_context
+from typing import List, Optional
 
 import pandas as pd
 import pdfplumber
@@ -16,11 +21,12 @@ import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
-from transformers import pipeline
 
 # Import logger for structured logging
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.core import logger
+from services.rate_limiter import PolitenessLimiter
+from services.sentiment import get_sentiment_service
 
 load_dotenv(dotenv_path=".env", override=True)
 
@@ -40,19 +46,18 @@ NEWS_LIMIT_PER_TICKER = int(os.getenv("MODEL_C_NEWS_LIMIT", "4"))
 NEWS_QUERY = os.getenv("MODEL_C_NEWS_QUERY", "ASX OR Australia stock")
 NEWS_THROTTLE = float(os.getenv("MODEL_C_NEWS_SLEEP", "1.2"))
 EODHD_NEWS_PREFIX = os.getenv("EODHD_NEWS_PREFIX", "ASX")
+PDF_CONCURRENCY = int(os.getenv("ASX_PDF_CONCURRENCY", "4"))
+PDF_WORKERS = int(os.getenv("ASX_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_TEXT_CACHE_DIR = os.getenv("ASX_PDF_TEXT_CACHE", "data/nlp/pdf_text_cache")
+# Cached texts unused for this many days are dropped, then the least recently
+# used beyond the file limit (pruned once per scrape)
+PDF_TEXT_CACHE_MAX_AGE_DAYS = float(os.getenv("ASX_PDF_TEXT_CACHE_MAX_AGE_DAYS", "90"))
+PDF_TEXT_CACHE_MAX_FILES = int(os.getenv("ASX_PDF_TEXT_CACHE_MAX_FILES", "5000"))
 
 if not DATABASE_URL:
     raise EnvironmentError("DATABASE_URL not set")
 
 engine = create_engine(DATABASE_URL)
-_nlp_sentiment = None
-
-
-def _get_nlp():
-    global _nlp_sentiment
-    if _nlp_sentiment is None:
-        _nlp_sentiment = pipeline("sentiment-analysis", model="yiyanghkust/finbert-tone")
-    return _nlp_sentiment
 
 
 def fetch_announcements() -> pd.DataFrame:
@@ -88,32 +93,153 @@ def fetch_announcements() -> pd.DataFrame:
     return pd.DataFrame(records)
 
 
-def parse_pdf_text(url: Optional[str]) -> str:
+def _hash(value) -> str:
+    data = value.encode("utf-8") if isinstance(value, str) else value
+    return hashlib.sha256(data).hexdigest()
+
+
+def _cache_read(name: str) -> Optional[str]:
+    path = os.path.join(PDF_TEXT_CACHE_DIR, name)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        value = f.read()
+    # Touch on read so pruning drops the least recently used entries
+    os.utime(path)
+    return value
+
+
+def _cache_write(name: str, value: str) -> None:
+    os.makedirs(PDF_TEXT_CACHE_DIR, exist_ok=True)
+    path = os.path.join(PDF_TEXT_CACHE_DIR, name)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(value)
+    os.replace(tmp, path)
+
+
+def prune_pdf_text_cache() -> int:
+    """Remove cache files past PDF_TEXT_CACHE_MAX_AGE_DAYS, then the oldest beyond PDF_TEXT_CACHE_MAX_FILES."""
+    if not os.path.isdir(PDF_TEXT_CACHE_DIR):
+        return 0
+    entries = []
+    for name in os.listdir(PDF_TEXT_CACHE_DIR):
+        if name.endswith(".tmp"):
+            continue
+        path = os.path.join(PDF_TEXT_CACHE_DIR, name)
+        try:
+            entries.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    entries.sort(reverse=True)
+    cutoff = time.time() - PDF_TEXT_CACHE_MAX_AGE_DAYS * 86400
+    stale = [path for i, (mtime, path) in enumerate(entries) if mtime < cutoff or i >= PDF_TEXT_CACHE_MAX_FILES]
+    for path in stale:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return len(stale)
+
+
+def cached_pdf_text(url: str) -> Optional[str]:
+    """Previously extracted text for a URL, if any."""
+    content_key = _cache_read(f"url-{_hash(url)}.ref")
+    return _cache_read(f"{content_key}.txt") if content_key else None
+
+
+def _store_pdf_text(url: str, content_key: str, text: str) -> None:
+    _cache_write(f"{content_key}.txt", text)
+    _cache_write(f"url-{_hash(url)}.ref", content_key)
+
+
+def extract_pdf_text(content: bytes) -> str:
+    """Extract whitespace-normalised text from PDF bytes (runs in a worker process)."""
+    text = ""
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        for page in pdf.pages:
+            text += page.extract_text() or ""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _download(url: str) -> bytes:
+    resp = requests.get(url, timeout=20, headers={"User-Agent": USER_AGENT})
+    resp.raise_for_status()
+    return resp.content
+
+
+async def _fetch_pdf_text(
+    url: Optional[str],
+    limiter: PolitenessLimiter,
+    pool: ProcessPoolExecutor,
+) -> str:
     if not url:
         return ""
     try:
-        resp = requests.get(url, timeout=20, headers={"User-Agent": USER_AGENT})
-        resp.raise_for_status()
-        path = "/tmp/asx_announcement.pdf"
-        with open(path, "wb") as f:
-            f.write(resp.content)
-        text = ""
-        with pdfplumber.open(path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-        return re.sub(r"\s+", " ", text).strip()
+        cached = cached_pdf_text(url)
+        if cached is not None:
+            return cached
+        async with limiter:
+            content = await asyncio.to_thread(_download, url)
+        loop = asyncio.get_running_loop()
+        content_key = _hash(content)
+        text = _cache_read(f"{content_key}.txt")
+        if text is None:
+            text = await loop.run_in_executor(pool, extract_pdf_text, content)
+        _store_pdf_text(url, content_key, text)
+        return text
     except Exception as exc:
         logger.error(f"PDF parse failed for {url}: {exc}")
         return ""
 
 
+async def _gather_texts(df: pd.DataFrame) -> List[str]:
+    """
+    Resolve announcement texts concurrently.
+
+    Inline texts (news fallbacks) are used as-is; PDFs go through the text
+    cache, then a polite rate-limited download, then extraction in a
+    process pool. The cache is pruned once the batch is resolved.
+    """
+    texts = [row.get("text") or None for _, row in df.iterrows()]
+    links = [row.get("pdf_link") for _, row in df.iterrows()]
+    pending = [i for i, text in enumerate(texts) if text is None and links[i]]
+
+    if pending:
+        limiter = PolitenessLimiter(PDF_CONCURRENCY, REQUEST_SLEEP)
+        with ProcessPoolExecutor(
+            max_workers=max(1, min(PDF_WORKERS, len(pending))),
+            mp_context=get_context("spawn"),
+        ) as pool:
+            fetched = await asyncio.gather(
+                *(_fetch_pdf_text(links[i], limiter, pool) for i in pending)
+            )
+        for i, text in zip(pending, fetched):
+            texts[i] = text
+        prune_pdf_text_cache()
+
+    return [text or "" for text in texts]
+
+
 def classify_text(text: str):
-    if not text:
-        return None, None, None
-    model = _get_nlp()
-    result = model(text[:512])[0]
-    label = result.get("label")
-    score = result.get("score")
+    return classify_texts([text])[0]
+
+
+def classify_texts(texts: list) -> list:
+    """Batched classify_text: (sentiment, event_type, confidence) per text."""
+    scored = [t for t in texts if t]
+    sentiments = iter(get_sentiment_service().analyze_batch(scored))
+    results = []
+    for text in texts:
+        if not text:
+            results.append((None, None, None))
+            continue
+        sentiment = next(sentiments)
+        results.append((sentiment["label"], _event_type(text), sentiment["score"]))
+    return results
+
+
+def _event_type(text: str) -> str:
     lowered = text.lower()
     event = "general"
     if "guidance" in lowered:
@@ -124,7 +250,7 @@ def classify_text(text: str):
         event = "acquisition"
     elif "earnings" in lowered or "results" in lowered:
         event = "earnings"
-    return label, event, score
+    return event
 
 
 def _stance_from_sentiment(label: Optional[str]) -> str:
@@ -241,10 +367,11 @@ def run_scraper(limit: int = ANNOUNCEMENT_LIMIT) -> pd.DataFrame:
             print("Warning: No fallback news returned.")
             return df
 
+    texts = asyncio.run(_gather_texts(df))
+
     results = []
-    for _, row in df.iterrows():
-        text = row.get("text") or parse_pdf_text(row.get("pdf_link"))
-        sentiment, event_type, confidence = classify_text(text)
+    rows = (row for _, row in df.iterrows())
+    for row, text, (sentiment, event_type, confidence) in zip(rows, texts, classify_texts(texts)):
         stance = _stance_from_sentiment(sentiment)
         relevance = _relevance_score(text, row.get("code"))
         results.append(
@@ -263,7 +390,6 @@ def run_scraper(limit: int = ANNOUNCEMENT_LIMIT) -> pd.DataFrame:
                 "created_at": datetime.utcnow(),
             }
         )
-        time.sleep(REQUEST_SLEEP)
 
     out = pd.DataFrame(results)
     if "dt" in out.columns:
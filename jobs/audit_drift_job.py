@@ -1,17 +1,30 @@
 """
 jobs/audit_drift_job.py
 Compute PSI feature drift between a baseline and current dataset.
+
+The baseline is the histogram sketch frozen at training time; the current
+distribution is the sum of the daily sketches accumulated by scoring runs
+(jobs/generate_signals.py) over the last DRIFT_WINDOW_DAYS. Both are read
+from the model_drift_sketches table (see analytics/drift_sketch.py). When
+either sketch is missing, it is built once from the CSV paths below.
 """
 
 import os
-import numpy as np
+import sys
 import pandas as pd
+import psycopg2
 import requests
 from datetime import datetime
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analytics import drift_sketch
+from analytics.drift_sketch import DriftSketch
+
 load_dotenv(dotenv_path=".env", override=True)
 
+DATABASE_URL = os.getenv("DATABASE_URL")
+
 BASELINE_PATH = os.getenv("DRIFT_BASELINE_PATH", "outputs/model_a_training_dataset.csv")
 CURRENT_PATH = os.getenv("DRIFT_CURRENT_PATH", "outputs/model_a_ml_signals_latest.csv")
 OUT_PATH = os.getenv("DRIFT_OUT_PATH", "")
@@ -20,55 +33,69 @@ OS_API_KEY = os.getenv("OS_API_KEY", "")
 DRIFT_MODEL = os.getenv("DRIFT_MODEL", "model_a_ml")
 BASELINE_LABEL = os.getenv("DRIFT_BASELINE_LABEL", "training_baseline")
 CURRENT_LABEL = os.getenv("DRIFT_CURRENT_LABEL", "latest_signals")
+# Artifact prefix/version whose sketches are compared (models/model_a_v1_4_*)
+DRIFT_ARTIFACT = os.getenv("DRIFT_ARTIFACT", "model_a")
+DRIFT_MODEL_VERSION = os.getenv("DRIFT_MODEL_VERSION", "v1_4")
+DRIFT_WINDOW_DAYS = int(os.getenv("DRIFT_WINDOW_DAYS", "7"))
 
-def psi_for_feature(base: pd.Series, curr: pd.Series, bins: int = 10) -> float:
-    base = pd.to_numeric(base, errors="coerce").dropna()
-    curr = pd.to_numeric(curr, errors="coerce").dropna()
-    if base.empty or curr.empty:
-        return 0.0
-
-    quantiles = np.linspace(0, 1, bins + 1)
-    cuts = base.quantile(quantiles).values
-    cuts = np.unique(cuts)
-    if len(cuts) < 2:
-        return 0.0
-
-    base_bins = pd.cut(base, bins=cuts, include_lowest=True)
-    curr_bins = pd.cut(curr, bins=cuts, include_lowest=True)
-
-    base_dist = base_bins.value_counts(normalize=True).sort_index()
-    curr_dist = curr_bins.value_counts(normalize=True).sort_index()
-
-    aligned = pd.concat([base_dist, curr_dist], axis=1).fillna(0.0)
-    aligned.columns = ["base", "current"]
-
-    eps = 1e-6
-    psi = ((aligned["current"] + eps) - (aligned["base"] + eps)) * np.log((aligned["current"] + eps) / (aligned["base"] + eps))
-    return float(psi.sum())
 
+def _numeric_columns(df: pd.DataFrame):
+    return [
+        c for c in df.columns
+        if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])
+    ]
 
-def main():
-    if not os.path.exists(BASELINE_PATH) or not os.path.exists(CURRENT_PATH):
-        raise SystemExit("Missing baseline or current dataset. Set DRIFT_BASELINE_PATH/DRIFT_CURRENT_PATH.")
 
+def load_baseline(conn) -> DriftSketch:
+    """Frozen baseline sketch; built from BASELINE_PATH (and stored) if the model has none."""
+    sketch = drift_sketch.load_baseline(conn, DRIFT_ARTIFACT, DRIFT_MODEL_VERSION)
+    if sketch is not None:
+        return sketch
+    if not os.path.exists(BASELINE_PATH):
+        raise SystemExit(
+            f"No baseline sketch for {DRIFT_ARTIFACT} {DRIFT_MODEL_VERSION} and no dataset {BASELINE_PATH}. "
+            "Set DRIFT_BASELINE_PATH."
+        )
     baseline = pd.read_csv(BASELINE_PATH)
-    current = pd.read_csv(CURRENT_PATH)
-
-    numeric_cols = [
-        c for c in baseline.columns
-        if c in current.columns
-        and pd.api.types.is_numeric_dtype(baseline[c])
-        and not pd.api.types.is_bool_dtype(baseline[c])
-    ]
-    if not numeric_cols:
+    sketch = DriftSketch.from_baseline(baseline, _numeric_columns(baseline), source=BASELINE_PATH)
+    drift_sketch.save_sketch(conn, sketch, DRIFT_ARTIFACT, DRIFT_MODEL_VERSION, kind="baseline")
+    conn.commit()
+    print(f"📌 Baseline sketch frozen from {BASELINE_PATH}")
+    return sketch
+
+
+def load_current(conn, baseline: DriftSketch) -> DriftSketch:
+    """Daily scoring sketches over the window; CURRENT_PATH when no run has been sketched."""
+    current = drift_sketch.load_window(conn, baseline, DRIFT_ARTIFACT, DRIFT_MODEL_VERSION, DRIFT_WINDOW_DAYS)
+    if current is not None:
+        return current
+    if not os.path.exists(CURRENT_PATH):
+        raise SystemExit("No scoring sketches in the window and no current dataset. Set DRIFT_CURRENT_PATH.")
+    return baseline.empty_like(kind="current", source=CURRENT_PATH).update(pd.read_csv(CURRENT_PATH))
+
+
+def compute_drift(baseline: DriftSketch, current: DriftSketch) -> pd.DataFrame:
+    """PSI per feature observed in the current window, highest first."""
+    psi = baseline.psi(current)
+    observed = current.counts.sum(axis=1) > 0
+    if not observed.any():
         raise SystemExit("No shared numeric columns to compare.")
+    return (
+        psi[observed].rename_axis("feature").reset_index()
+        .sort_values("psi", ascending=False, ignore_index=True)
+    )
 
-    results = []
-    for col in numeric_cols:
-        psi = psi_for_feature(baseline[col], current[col])
-        results.append({"feature": col, "psi": psi})
 
-    out = pd.DataFrame(results).sort_values("psi", ascending=False)
+def main():
+    if not DATABASE_URL:
+        raise SystemExit("DATABASE_URL not set")
+    conn = psycopg2.connect(DATABASE_URL)
+    try:
+        baseline = load_baseline(conn)
+        current = load_current(conn, baseline)
+    finally:
+        conn.close()
+    out = compute_drift(baseline, current)
     out_path = OUT_PATH
     if not out_path:
         ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
@@ -83,6 +110,8 @@ def main():
             "current_label": CURRENT_LABEL,
             "metrics": {
                 "n_features": int(len(out)),
+                "current_rows": int(current.meta.get("rows", 0)),
+                "window_days": DRIFT_WINDOW_DAYS,
                 "psi_mean": float(out["psi"].mean()),
                 "psi_max": float(out["psi"].max()),
                 "top_features": out.head(10).to_dict(orient="records"),
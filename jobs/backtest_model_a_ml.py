@@ -10,16 +10,25 @@ Supports:
 """
 
 import os
+import sys
 import json
-from datetime import datetime, timedelta
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from multiprocessing import get_context, shared_memory, util
 from dateutil.relativedelta import relativedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple
 
 import pandas as pd
 import numpy as np
 import psycopg2
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.forward_returns import attach_labels
+from analytics.trading_calendar import next_trading_day
+
 load_dotenv(dotenv_path=".env", override=True)
 
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -27,6 +36,8 @@ TRAIN_MONTHS = int(os.getenv("BACKTEST_TRAIN_MONTHS", "12"))
 TEST_MONTHS = int(os.getenv("BACKTEST_TEST_MONTHS", "1"))
 TOP_N = int(os.getenv("BACKTEST_TOP_N", "50"))
 INITIAL_CAPITAL = float(os.getenv("BACKTEST_INITIAL_CAPITAL", "1000000"))
+COST_BPS = float(os.getenv("BACKTEST_COST_BPS", "0"))
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", str(min(4, os.cpu_count() or 1))))
 
 if not DATABASE_URL or DATABASE_URL.strip() in ["...", ""]:
     raise ValueError("DATABASE_URL not set in .env")
@@ -50,14 +61,12 @@ def load_prices(start_date, end_date) -> pd.DataFrame:
             con,
             params=(start_date, end_date),
         )
-    if df.empty:
-        return df
-    df["dt"] = pd.to_datetime(df["dt"])
-    df = df.sort_values(["symbol", "dt"])
-    df["daily_return"] = df.groupby("symbol")["close"].pct_change()
-    df["fwd_return_1d"] = df.groupby("symbol")["daily_return"].shift(-1)
-    df["fwd_return_5d"] = df.groupby("symbol")["close"].pct_change(5).shift(-5)
-    df["fwd_return_21d"] = df.groupby("symbol")["close"].pct_change(21).shift(-21)
+        if df.empty:
+            return df
+        df["dt"] = pd.to_datetime(df["dt"])
+        df = df.sort_values(["symbol", "dt"])
+        df["daily_return"] = df.groupby("symbol")["close"].pct_change()
+        df = attach_labels(df, con, horizons=(1, 5, 21), names={})
     return df
 
 
@@ -93,25 +102,24 @@ def load_signals_from_csv(path: str = "outputs/model_a_ml_signals_latest.csv") -
 
 def compute_technical_signals(prices: pd.DataFrame, as_of_date) -> pd.DataFrame:
     """Compute momentum signals for a given date (used when ML signals unavailable)."""
-    px = prices[prices["dt"] <= pd.Timestamp(as_of_date)].copy()
+    px = prices[prices["dt"] <= pd.Timestamp(as_of_date)]
     if px.empty:
         return pd.DataFrame()
 
-    latest = px.groupby("symbol").tail(1).copy()
+    px = px.sort_values(["symbol", "dt"], kind="stable")
+    # Position counted back from each symbol's latest row (0 = latest)
+    from_end = px.groupby("symbol", sort=False).cumcount(ascending=False).to_numpy()
 
-    # Compute momentum features
-    for symbol in latest["symbol"].unique():
-        sym_data = px[px["symbol"] == symbol].tail(252)
-        if len(sym_data) < 126:
-            continue
-        close = sym_data["close"].values
-        mom_6 = (close[-1] / close[-126] - 1) if len(close) >= 126 else np.nan
-        mom_12_1 = (close[-21] / close[-252] - 1) if len(close) >= 252 else np.nan
-        vol_90 = sym_data["daily_return"].tail(90).std() if len(sym_data) >= 90 else np.nan
+    def close_at(k: int) -> pd.Series:
+        rows = px[from_end == k]
+        return pd.Series(rows["close"].to_numpy(), index=rows["symbol"].to_numpy())
 
-        latest.loc[latest["symbol"] == symbol, "mom_6"] = mom_6
-        latest.loc[latest["symbol"] == symbol, "mom_12_1"] = mom_12_1
-        latest.loc[latest["symbol"] == symbol, "vol_90"] = vol_90
+    latest = px[from_end == 0].set_index("symbol", drop=False)
+    latest["mom_6"] = latest["close"] / close_at(125) - 1
+    latest["mom_12_1"] = close_at(20) / close_at(251) - 1
+    vol = px[from_end < 90].groupby("symbol")["daily_return"].std()
+    latest["vol_90"] = vol.where(px.groupby("symbol").size() >= 90)
+    latest = latest.reset_index(drop=True)
 
     # Score and rank
     latest = latest.dropna(subset=["mom_6", "mom_12_1"])
@@ -130,6 +138,78 @@ def _zscore(s: pd.Series) -> pd.Series:
     return (s - s.mean()) / (s.std(ddof=0) + 1e-12)
 
 
+def build_backtest_matrices(
+    signals: pd.DataFrame,
+    prices: pd.DataFrame,
+    score_col: str,
+) -> Dict[str, np.ndarray]:
+    """
+    Pivot signals and prices into dense dates x symbols matrices.
+
+    Returns:
+        Dict with signal_dates [D], symbols [S], scores [D, S] (NaN where a
+        signal has no score), present [D, S] (signal exists) and
+        next_returns [D, S] (daily return on the next ASX trading day; rows with no
+        price data that day are all NaN and flagged by has_next_prices [D]).
+    """
+    sig_dates = signals["as_of"].to_numpy().astype("datetime64[D]")
+    px_dates = prices["dt"].to_numpy().astype("datetime64[D]")
+
+    symbols = pd.unique(np.concatenate([signals["symbol"].to_numpy(), prices["symbol"].to_numpy()]))
+    symbol_index = pd.Index(symbols)
+    signal_dates = np.unique(sig_dates)
+    price_dates = np.unique(px_dates)
+
+    scores = np.full((len(signal_dates), len(symbols)), np.nan)
+    present = np.zeros(scores.shape, dtype=bool)
+    rows = np.searchsorted(signal_dates, sig_dates)
+    cols = symbol_index.get_indexer(signals["symbol"])
+    scores[rows, cols] = signals[score_col].to_numpy(dtype=float)
+    present[rows, cols] = True
+
+    returns = np.full((len(price_dates), len(symbols)), np.nan)
+    if "daily_return" in prices.columns:
+        returns[
+            np.searchsorted(price_dates, px_dates),
+            symbol_index.get_indexer(prices["symbol"]),
+        ] = prices["daily_return"].to_numpy(dtype=float)
+
+    next_days = next_trading_day(signal_dates)
+    pos = np.minimum(np.searchsorted(price_dates, next_days), max(len(price_dates) - 1, 0))
+    has_next_prices = (len(price_dates) > 0) & (price_dates[pos] == next_days)
+    next_returns = np.where(has_next_prices[:, None], returns[pos], np.nan)
+
+    return {
+        "signal_dates": signal_dates,
+        "price_dates": price_dates,
+        "symbols": symbols,
+        "scores": scores,
+        "present": present,
+        "next_returns": next_returns,
+        "has_next_prices": has_next_prices,
+    }
+
+
+def select_top_n(scores: np.ndarray, present: np.ndarray, top_n: int) -> np.ndarray:
+    """
+    Boolean [D, S] mask of the top_n scores per row via argpartition.
+
+    Signals with a NaN score rank below every scored signal but above
+    symbols with no signal, matching a descending sort_values().head().
+    """
+    n_dates, n_symbols = scores.shape
+    if top_n <= 0 or n_symbols == 0:
+        return np.zeros(scores.shape, dtype=bool)
+    if top_n >= n_symbols:
+        return present.copy()
+
+    key = np.where(present, np.nan_to_num(scores, nan=-np.finfo(float).max), -np.inf)
+    top = np.argpartition(-key, top_n - 1, axis=1)[:, :top_n]
+    selected = np.zeros(scores.shape, dtype=bool)
+    selected[np.arange(n_dates)[:, None], top] = True
+    return selected & present
+
+
 def run_single_period_backtest(
     signals: pd.DataFrame,
     prices: pd.DataFrame,
@@ -137,102 +217,303 @@ def run_single_period_backtest(
     end_date,
     top_n: int = TOP_N,
     initial_capital: float = INITIAL_CAPITAL,
+    cost_bps: float = COST_BPS,
+    rebalance_every: int = 1,
 ) -> Dict[str, Any]:
-    """Run backtest for a single period."""
-    signals = signals.copy()
-    prices = prices.copy()
+    """
+    Run backtest for a single period.
+
+    Each signal date holds the top_n signals equal-weighted for the next
+    trading day's return; names without a return that day sit in cash.
+    Selection, weights, turnover and costs are computed on dates x symbols
+    matrices in one pass.
+
+    Args:
+        signals: Signals with as_of, symbol and ml_prob/score columns
+        prices: Prices with dt, symbol and daily_return columns
+        start_date: Period start (inclusive)
+        end_date: Period end (inclusive)
+        top_n: Number of names held per rebalance
+        initial_capital: Starting equity
+        cost_bps: One-way transaction cost charged on turnover (basis points)
+        rebalance_every: Re-select holdings every N signal dates
 
-    # Filter to period
-    signals = signals[(signals["as_of"] >= pd.Timestamp(start_date)) & (signals["as_of"] <= pd.Timestamp(end_date))]
-    prices = prices[(prices["dt"] >= pd.Timestamp(start_date)) & (prices["dt"] <= pd.Timestamp(end_date))]
+    Returns:
+        Dict with equity_curve, stats and error
+    """
+    start_ts, end_ts = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    signals = signals[(signals["as_of"] >= start_ts) & (signals["as_of"] <= end_ts)]
+    prices = prices[(prices["dt"] >= start_ts) & (prices["dt"] <= end_ts)]
 
     if signals.empty or prices.empty:
         return {"equity_curve": [], "stats": None, "error": "No data for period"}
 
-    # Determine score column
-    score_col = "ml_prob" if "ml_prob" in signals.columns and signals["ml_prob"].notna().any() else "score"
-
-    equity_curve = []
-    capital = initial_capital
-    daily_returns = []
-
-    # Get unique signal dates
-    signal_dates = sorted(signals["as_of"].dt.date.unique())
-
-    for sig_date in signal_dates:
-        day_signals = signals[signals["as_of"].dt.date == sig_date]
-        day_signals = day_signals.sort_values(score_col, ascending=False).head(top_n)
-
-        if day_signals.empty:
-            continue
-
-        # Get next day returns
-        next_day = pd.Timestamp(sig_date) + timedelta(days=1)
-        while next_day.weekday() >= 5:  # Skip weekends
-            next_day += timedelta(days=1)
-
-        day_prices = prices[prices["dt"].dt.date == next_day.date()]
-        if day_prices.empty:
-            continue
-
-        # Calculate portfolio return (equal weight)
-        n_positions = len(day_signals)
-        weight = 1.0 / n_positions
-        port_return = 0.0
-        matched = 0
-
-        for _, sig in day_signals.iterrows():
-            sym_price = day_prices[day_prices["symbol"] == sig["symbol"]]
-            if not sym_price.empty and "daily_return" in sym_price.columns:
-                ret = sym_price["daily_return"].iloc[0]
-                if pd.notna(ret):
-                    port_return += weight * ret
-                    matched += 1
-
-        if matched > 0:
-            capital *= (1 + port_return)
-            daily_returns.append(port_return)
-            equity_curve.append({
-                "date": sig_date,
-                "equity": capital,
-                "return": port_return,
-                "n_positions": matched,
-            })
-
-    if not equity_curve:
+    m = build_backtest_matrices(signals, prices, _score_column(signals))
+    return evaluate_backtest(
+        m, start_date, end_date,
+        top_n=top_n,
+        initial_capital=initial_capital,
+        cost_bps=cost_bps,
+        rebalance_every=rebalance_every,
+    )
+
+
+def _score_column(signals: pd.DataFrame) -> str:
+    """Rank by ml_prob when the signals carry it, else by score."""
+    return "ml_prob" if "ml_prob" in signals.columns and signals["ml_prob"].notna().any() else "score"
+
+
+def evaluate_backtest(
+    m: Dict[str, np.ndarray],
+    start_date,
+    end_date,
+    top_n: int = TOP_N,
+    initial_capital: float = INITIAL_CAPITAL,
+    cost_bps: float = COST_BPS,
+    rebalance_every: int = 1,
+) -> Dict[str, Any]:
+    """
+    Backtest one [start_date, end_date] window of prebuilt matrices.
+
+    Equivalent to run_single_period_backtest on frames filtered to the
+    window: signal rows outside it are dropped, and a row whose next
+    trading day falls after end_date has no return.
+    """
+    start = np.datetime64(pd.Timestamp(start_date).date(), "D")
+    end = np.datetime64(pd.Timestamp(end_date).date(), "D")
+    rows = (m["signal_dates"] >= start) & (m["signal_dates"] <= end)
+    has_prices = ((m["price_dates"] >= start) & (m["price_dates"] <= end)).any()
+
+    if not rows.any() or not has_prices:
+        return {"equity_curve": [], "stats": None, "error": "No data for period"}
+
+    signal_dates = m["signal_dates"][rows]
+    in_window = next_trading_day(signal_dates) <= end
+    has_next_prices = m["has_next_prices"][rows] & in_window
+    next_returns = np.where(in_window[:, None], m["next_returns"][rows], np.nan)
+
+    selected = select_top_n(m["scores"][rows], m["present"][rows], top_n)
+    if rebalance_every > 1:
+        # Hold each rebalance date's picks until the next rebalance
+        selected = selected[(np.arange(len(selected)) // rebalance_every) * rebalance_every]
+    n_selected = selected.sum(axis=1)
+
+    # Equal weight across selected names; unmatched names earn nothing
+    weights = selected / np.maximum(n_selected, 1)[:, None]
+    matched = selected & ~np.isnan(next_returns)
+    n_matched = matched.sum(axis=1)
+    gross = np.where(matched, weights * next_returns, 0.0).sum(axis=1)
+
+    active = has_next_prices & (n_selected > 0) & (n_matched > 0)
+    if not active.any():
         return {"equity_curve": [], "stats": None, "error": "No matched positions"}
 
+    held = weights[active]
+    turnover = np.abs(np.diff(held, axis=0, prepend=0.0)).sum(axis=1)
+    returns = gross[active] - turnover * cost_bps / 1e4
+    equity = initial_capital * np.cumprod(1 + returns)
+
+    dates = pd.to_datetime(signal_dates[active]).date
+    equity_curve = [
+        {"date": d, "equity": eq, "return": r, "n_positions": n}
+        for d, eq, r, n in zip(dates, equity.tolist(), returns.tolist(), n_matched[active].tolist())
+    ]
+
     # Compute stats
-    returns = np.array(daily_returns)
     stats = {
         "start_date": str(start_date),
         "end_date": str(end_date),
         "n_days": len(returns),
-        "total_return": float(capital / initial_capital - 1),
-        "mean_daily_return": float(np.mean(returns)) if len(returns) > 0 else 0.0,
-        "std_daily_return": float(np.std(returns)) if len(returns) > 0 else 0.0,
+        "total_return": float(equity[-1] / initial_capital - 1),
+        "mean_daily_return": float(np.mean(returns)),
+        "std_daily_return": float(np.std(returns)),
         "sharpe": float(np.mean(returns) / (np.std(returns) + 1e-12) * np.sqrt(252)),
-        "max_drawdown": float(_compute_max_drawdown(equity_curve)),
-        "win_rate": float(np.sum(returns > 0) / len(returns)) if len(returns) > 0 else 0.0,
+        "max_drawdown": float(_max_drawdown(equity)),
+        "win_rate": float(np.sum(returns > 0) / len(returns)),
+        "mean_turnover": float(np.mean(turnover)),
+        "total_cost": float(np.sum(turnover) * cost_bps / 1e4),
     }
 
     return {"equity_curve": equity_curve, "stats": stats, "error": None}
 
 
+def _max_drawdown(equity: np.ndarray) -> float:
+    """Maximum peak-to-trough drawdown of an equity array."""
+    if len(equity) == 0:
+        return 0.0
+    peak = np.maximum.accumulate(equity)
+    return float(np.max((peak - equity) / peak))
+
+
 def _compute_max_drawdown(equity_curve: List[Dict]) -> float:
     """Compute maximum drawdown from equity curve."""
-    if not equity_curve:
-        return 0.0
-    equities = [e["equity"] for e in equity_curve]
-    peak = equities[0]
-    max_dd = 0.0
-    for eq in equities:
-        if eq > peak:
-            peak = eq
-        dd = (peak - eq) / peak
-        if dd > max_dd:
-            max_dd = dd
-    return max_dd
+    return _max_drawdown(np.array([e["equity"] for e in equity_curve], dtype=float))
+
+
+# ---------------------------------------------------------------------------
+# Parallel fold / parameter-sweep execution over shared-memory matrices
+# ---------------------------------------------------------------------------
+
+_SHARED_KEYS = ("signal_dates", "price_dates", "scores", "present", "next_returns", "has_next_prices")
+_worker_matrices: Dict[str, np.ndarray] = {}
+_worker_handles: List[shared_memory.SharedMemory] = []
+
+
+def _share_matrices(m: Dict[str, np.ndarray]) -> Tuple[Dict[str, Tuple], List[shared_memory.SharedMemory]]:
+    """Copy matrices into shared memory once; returns (spec, handles to unlink)."""
+    spec, handles = {}, []
+    for key in _SHARED_KEYS:
+        arr = np.ascontiguousarray(m[key])
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        spec[key] = (shm.name, arr.shape, arr.dtype.str)
+        handles.append(shm)
+    return spec, handles
+
+
+def _attach_shared(spec: Dict[str, Tuple]) -> None:
+    """Pool initializer: map the parent's matrices without copying them."""
+    for key, (name, shape, dtype) in spec.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _worker_handles.append(shm)
+        _worker_matrices[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    # Pool workers exit through multiprocessing's finalizers, not atexit
+    util.Finalize(None, _detach_shared, exitpriority=10)
+
+
+def _detach_shared() -> None:
+    """Close this worker's mappings (the parent unlinks the segments)."""
+    _worker_matrices.clear()  # views must go before their buffers can close
+    while _worker_handles:
+        _worker_handles.pop().close()
+
+
+def _run_task(task: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+    """Evaluate one (fold, parameters) task against the shared matrices."""
+    return task["key"], evaluate_backtest(
+        _worker_matrices,
+        task["start"],
+        task["end"],
+        top_n=task["top_n"],
+        cost_bps=task["cost_bps"],
+        rebalance_every=task["rebalance_every"],
+    )
+
+
+def _evaluate_tasks(
+    m: Dict[str, np.ndarray],
+    tasks: List[Dict[str, Any]],
+    workers: int,
+) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+    """Yield (key, result) as tasks complete, in a process pool when worthwhile."""
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield task["key"], evaluate_backtest(
+                m, task["start"], task["end"],
+                top_n=task["top_n"],
+                cost_bps=task["cost_bps"],
+                rebalance_every=task["rebalance_every"],
+            )
+        return
+
+    spec, handles = _share_matrices(m)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)),
+            mp_context=get_context("spawn"),
+            initializer=_attach_shared,
+            initargs=(spec,),
+        ) as pool:
+            futures = [pool.submit(_run_task, task) for task in tasks]
+            for future in as_completed(futures):
+                yield future.result()
+    finally:
+        for shm in handles:
+            shm.close()
+            shm.unlink()
+
+
+def _walk_forward_windows(start_date, end_date, train_months: int, test_months: int) -> List[Dict[str, Any]]:
+    """Rolling train/test windows between start_date and end_date."""
+    current_start = pd.Timestamp(start_date)
+    end_ts = pd.Timestamp(end_date)
+    windows = []
+
+    while current_start + relativedelta(months=train_months + test_months) <= end_ts:
+        train_end = current_start + relativedelta(months=train_months)
+        windows.append({
+            "fold_id": len(windows) + 1,
+            "train_start": current_start.date(),
+            "train_end": train_end.date(),
+            "test_start": train_end.date(),
+            "test_end": (train_end + relativedelta(months=test_months)).date(),
+        })
+        # Roll forward
+        current_start += relativedelta(months=test_months)
+
+    return windows
+
+
+def _load_backtest_matrices(
+    start_date,
+    end_date,
+    windows: List[Dict[str, Any]],
+    use_db_signals: bool,
+) -> Optional[Dict[str, np.ndarray]]:
+    """Load prices/signals once and pivot them for every fold."""
+    prices = load_prices(start_date, end_date)
+    if prices.empty:
+        return None
+
+    print(f"   Loaded {len(prices):,} price rows")
+
+    # Load or generate signals
+    if use_db_signals:
+        signals = load_signals_from_db(start_date, end_date)
+        if signals.empty:
+            signals = load_signals_from_csv()
+    else:
+        signals = pd.DataFrame()
+
+    # If no signals available, compute technical signals at each fold's train end
+    if signals.empty:
+        fold_signals = [compute_technical_signals(prices, w["train_end"]) for w in windows]
+        fold_signals = [f for f in fold_signals if not f.empty]
+        if not fold_signals:
+            signals = pd.DataFrame(columns=["as_of", "symbol", "score"])
+        else:
+            signals = pd.concat(fold_signals, ignore_index=True)
+        signals["as_of"] = pd.to_datetime(signals["as_of"])
+
+    return build_backtest_matrices(signals, prices, _score_column(signals))
+
+
+def _aggregate_folds(folds: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Aggregate statistics across folds."""
+    valid_folds = [f for f in folds if f.get("stats")]
+    if not valid_folds:
+        return None
+    return {
+        "n_folds": len(valid_folds),
+        "mean_sharpe": float(np.mean([f["stats"]["sharpe"] for f in valid_folds])),
+        "std_sharpe": float(np.std([f["stats"]["sharpe"] for f in valid_folds])),
+        "mean_return": float(np.mean([f["stats"]["total_return"] for f in valid_folds])),
+        "mean_max_dd": float(np.mean([f["stats"]["max_drawdown"] for f in valid_folds])),
+        "mean_win_rate": float(np.mean([f["stats"]["win_rate"] for f in valid_folds])),
+    }
+
+
+def _fold_tasks(windows: List[Dict[str, Any]], params: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "key": (param_id, w["fold_id"]),
+            "start": w["test_start"],
+            "end": w["test_end"],
+            **p,
+        }
+        for param_id, p in enumerate(params)
+        for w in windows
+    ]
 
 
 def run_walk_forward_backtest(
@@ -242,6 +523,8 @@ def run_walk_forward_backtest(
     test_months: int = TEST_MONTHS,
     top_n: int = TOP_N,
     use_db_signals: bool = True,
+    cost_bps: float = COST_BPS,
+    workers: int = BACKTEST_WORKERS,
 ) -> Dict[str, Any]:
     """
     Run walk-forward validation backtest.
@@ -253,6 +536,8 @@ def run_walk_forward_backtest(
         test_months: Number of months for test window
         top_n: Number of top stocks to hold
         use_db_signals: Whether to load signals from DB (vs compute from prices)
+        cost_bps: One-way transaction cost charged on turnover (basis points)
+        workers: Process-pool size for evaluating folds (1 = in-process)
 
     Returns:
         Dictionary with results for each fold and aggregate stats
@@ -260,86 +545,74 @@ def run_walk_forward_backtest(
     print(f"🚀 Starting walk-forward backtest from {start_date} to {end_date}")
     print(f"   Train window: {train_months} months, Test window: {test_months} months")
 
-    # Load all price data
-    prices = load_prices(start_date, end_date)
-    if prices.empty:
+    windows = _walk_forward_windows(start_date, end_date, train_months, test_months)
+    m = _load_backtest_matrices(start_date, end_date, windows, use_db_signals)
+    if m is None:
         return {"error": "No price data available", "folds": [], "aggregate": None}
 
-    print(f"   Loaded {len(prices):,} price rows")
+    if not windows:
+        return {"error": "No valid folds generated", "folds": [], "aggregate": None}
 
-    # Load or generate signals
-    if use_db_signals:
-        signals = load_signals_from_db(start_date, end_date)
-        if signals.empty:
-            signals = load_signals_from_csv()
-    else:
-        signals = pd.DataFrame()
+    params = [{"top_n": top_n, "cost_bps": cost_bps, "rebalance_every": 1}]
+    folds = {w["fold_id"]: dict(w) for w in windows}
 
-    # Generate rolling windows
-    current_start = pd.Timestamp(start_date)
-    end_ts = pd.Timestamp(end_date)
-    folds = []
+    for (_, fold_id), result in _evaluate_tasks(m, _fold_tasks(windows, params), workers):
+        fold = folds[fold_id]
+        fold["result"] = result
+        fold["stats"] = result.get("stats")
+        fold["error"] = result.get("error")
+        print(f"   Fold {fold_id}: {fold['test_start']} to {fold['test_end']} | "
+              f"Sharpe: {fold['stats']['sharpe']:.2f}" if fold["stats"] else f"   Fold {fold_id}: Error")
 
-    while current_start + relativedelta(months=train_months + test_months) <= end_ts:
-        train_end = current_start + relativedelta(months=train_months)
-        test_start = train_end
-        test_end = test_start + relativedelta(months=test_months)
+    folds = [folds[w["fold_id"]] for w in windows]
+    return {"folds": folds, "aggregate": _aggregate_folds(folds), "error": None}
 
-        fold = {
-            "fold_id": len(folds) + 1,
-            "train_start": current_start.date(),
-            "train_end": train_end.date(),
-            "test_start": test_start.date(),
-            "test_end": test_end.date(),
-        }
 
-        # If no signals available, compute technical signals
-        if signals.empty:
-            fold_signals = compute_technical_signals(prices, train_end)
-        else:
-            fold_signals = signals[
-                (signals["as_of"] >= pd.Timestamp(test_start)) &
-                (signals["as_of"] < pd.Timestamp(test_end))
-            ]
-
-        # Run test period backtest
-        result = run_single_period_backtest(
-            fold_signals if not fold_signals.empty else signals,
-            prices,
-            test_start,
-            test_end,
-            top_n=top_n,
-        )
+def run_parameter_sweep(
+    start_date,
+    end_date,
+    top_n_values: Iterable[int] = (TOP_N,),
+    rebalance_every_values: Iterable[int] = (1,),
+    cost_bps_values: Iterable[float] = (COST_BPS,),
+    train_months: int = TRAIN_MONTHS,
+    test_months: int = TEST_MONTHS,
+    use_db_signals: bool = True,
+    workers: int = BACKTEST_WORKERS,
+) -> Dict[str, Any]:
+    """
+    Walk-forward backtest over a grid of top_n x rebalance frequency x costs.
 
-        fold["result"] = result
-        fold["stats"] = result.get("stats")
-        fold["error"] = result.get("error")
-        folds.append(fold)
+    Every (fold, parameter set) pair is an independent task over the same
+    shared-memory matrices, so the sweep scales with available cores.
 
-        print(f"   Fold {fold['fold_id']}: {test_start.date()} to {test_end.date()} | "
-              f"Sharpe: {fold['stats']['sharpe']:.2f}" if fold["stats"] else f"   Fold {fold['fold_id']}: Error")
+    Returns:
+        Dict with one entry per parameter set (params, fold stats,
+        aggregate), sorted by mean Sharpe descending
+    """
+    windows = _walk_forward_windows(start_date, end_date, train_months, test_months)
+    m = _load_backtest_matrices(start_date, end_date, windows, use_db_signals)
+    if m is None:
+        return {"error": "No price data available", "results": []}
+    if not windows:
+        return {"error": "No valid folds generated", "results": []}
 
-        # Roll forward
-        current_start += relativedelta(months=test_months)
+    params = [
+        {"top_n": int(n), "rebalance_every": int(r), "cost_bps": float(c)}
+        for n, r, c in itertools.product(top_n_values, rebalance_every_values, cost_bps_values)
+    ]
+    print(f"🔁 Sweeping {len(params)} parameter sets x {len(windows)} folds")
 
-    if not folds:
-        return {"error": "No valid folds generated", "folds": [], "aggregate": None}
+    fold_stats: Dict[int, Dict[int, Optional[Dict[str, Any]]]] = {i: {} for i in range(len(params))}
+    for (param_id, fold_id), result in _evaluate_tasks(m, _fold_tasks(windows, params), workers):
+        fold_stats[param_id][fold_id] = result.get("stats")
 
-    # Aggregate statistics across folds
-    valid_folds = [f for f in folds if f.get("stats")]
-    if valid_folds:
-        aggregate = {
-            "n_folds": len(valid_folds),
-            "mean_sharpe": float(np.mean([f["stats"]["sharpe"] for f in valid_folds])),
-            "std_sharpe": float(np.std([f["stats"]["sharpe"] for f in valid_folds])),
-            "mean_return": float(np.mean([f["stats"]["total_return"] for f in valid_folds])),
-            "mean_max_dd": float(np.mean([f["stats"]["max_drawdown"] for f in valid_folds])),
-            "mean_win_rate": float(np.mean([f["stats"]["win_rate"] for f in valid_folds])),
-        }
-    else:
-        aggregate = None
+    results = []
+    for param_id, p in enumerate(params):
+        folds = [{"fold_id": w["fold_id"], "stats": fold_stats[param_id].get(w["fold_id"])} for w in windows]
+        results.append({"params": p, "folds": folds, "aggregate": _aggregate_folds(folds)})
 
-    return {"folds": folds, "aggregate": aggregate, "error": None}
+    results.sort(key=lambda r: r["aggregate"]["mean_sharpe"] if r["aggregate"] else -np.inf, reverse=True)
+    return {"results": results, "error": None}
 
 
 def persist_backtest_results(results: Dict[str, Any], model: str = "model_a_ml"):
@@ -421,6 +694,8 @@ def main(
     test_months: int = TEST_MONTHS,
     top_n: int = TOP_N,
     persist: bool = True,
+    cost_bps: float = COST_BPS,
+    workers: int = BACKTEST_WORKERS,
 ):
     """Main entry point for backtest."""
     # Default to last 3 years
@@ -440,6 +715,8 @@ def main(
         train_months=train_months,
         test_months=test_months,
         top_n=top_n,
+        cost_bps=cost_bps,
+        workers=workers,
     )
 
     if results.get("error"):
@@ -477,6 +754,8 @@ if __name__ == "__main__":
     parser.add_argument("--test-months", type=int, default=TEST_MONTHS, help="Test window in months")
     parser.add_argument("--top-n", type=int, default=TOP_N, help="Number of top stocks to hold")
     parser.add_argument("--no-persist", action="store_true", help="Don't persist results to DB")
+    parser.add_argument("--cost-bps", type=float, default=COST_BPS, help="One-way cost on turnover (bps)")
+    parser.add_argument("--workers", type=int, default=BACKTEST_WORKERS, help="Parallel fold workers")
 
     args = parser.parse_args()
 
@@ -487,4 +766,6 @@ if __name__ == "__main__":
         test_months=args.test_months,
         top_n=args.top_n,
         persist=not args.no_persist,
+        cost_bps=args.cost_bps,
+        workers=args.workers,
     )
@@ -15,7 +15,19 @@ from datetime import datetime, timedelta
 
 # Import logger for structured logging
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analytics.feature_store import (
+    FeatureStore,
+    contiguous_runs,
+    load_input_digests,
+    month_key,
+    month_range,
+    partition_fingerprints,
+    shift_month,
+    windows_span,
+)
+from analytics.forward_returns import attach_labels
 from app.core import logger
+from services.table_loader import copy_swap, pg_columns_from_arrow
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -34,13 +46,17 @@ def _safe_read_sql(query: str, params=None):
         return pd.DataFrame()
 
 # --- Load technicals (from prices) ---
-def load_technical_features(start_date: str, end_date: str):
+def load_technical_features(start_date: str, end_date: str, symbols=None):
     q = """
     select dt as date, symbol, open, high, low, close, volume
     from prices
     where dt between %s and %s
     """
-    px = _safe_read_sql(q, params=(start_date, end_date))
+    params = (start_date, end_date)
+    if symbols is not None:
+        q += "  and symbol = any(%s)\n"
+        params += (list(symbols),)
+    px = _safe_read_sql(q, params=params)
     if px.empty:
         return px
 
@@ -243,85 +259,165 @@ def load_etf_features():
     """
     return _safe_read_sql(q)
 
-# --- Merge all sources ---
-def build_features(start_date, end_date):
-    tech = load_technical_features(start_date, end_date)
-    if tech.empty:
-        raise ValueError("No technical data loaded; check prices table.")
-    fund = load_fundamentals()
-    fund_features = load_fundamental_features()
+# --- Memory-bounded build: cross-sectional pass, then symbol chunks ---
+# Price rows per symbol chunk; peak memory is roughly this many rows of the wide panel
+FEATURE_BUILD_CHUNK_ROWS = int(os.getenv("FEATURE_BUILD_CHUNK_ROWS", "250000"))
+
+# Fundamentals (one row per symbol) that feed the per-date cross-sectional features
+CROSS_SECTION_COLUMNS = [
+    "pe_ratio", "pb_ratio", "roe", "current_ratio", "debt_to_equity", "profit_margin", "revenue_growth_yoy",
+]
+ZSCORE_COLUMNS = ["pe_ratio", "pb_ratio", "pe_inverse", "roe", "current_ratio", "debt_to_equity"]
+
+
+def load_price_index(start_date, end_date) -> pd.DataFrame:
+    """(date, symbol) of every price row in range; the cross-section each date is computed over."""
+    q = """
+    select dt as date, symbol
+    from prices
+    where dt between %s and %s
+    """
+    return _safe_read_sql(q, params=(start_date, end_date))
+
+
+def load_side_inputs() -> dict:
+    """Non-price sources, loaded once and sliced per symbol chunk."""
+    inputs = {
+        "fund": load_fundamentals(),
+        "fund_features": load_fundamental_features(),
+        "trends": [],
+        "sent": load_sentiment(),
+        "announcements": load_asx_announcements(),
+        "macro": load_macro_features(),
+        "etf": load_etf_features(),
+        "risk": load_risk_snapshot(),
+    }
     fund_trends = load_fundamental_trends()
-    macro = load_macro_features()
-    sent = load_sentiment()
-    announcements = load_asx_announcements()
-    etf = load_etf_features()
-    risk_snapshot = load_risk_snapshot()
+    if not fund_trends.empty and {"symbol", "date", "metric"}.issubset(fund_trends.columns):
+        inputs["trends"] = [
+            _pivot_trends(fund_trends, "mean_value", "mean"),
+            _pivot_trends(fund_trends, "pct_change", "pct"),
+            _pivot_trends(fund_trends, "slope", "slope"),
+            _pivot_trends(fund_trends, "volatility", "vol"),
+        ]
+    return inputs
+
+
+def cross_sectional_stats(index: pd.DataFrame, fund: pd.DataFrame):
+    """
+    First pass over the narrow (date, symbol) panel.
+
+    Returns:
+        (stats, ranks): per-date mean/std of ZSCORE_COLUMNS, indexed by date with
+        (column, stat) columns; and per-row value_score / quality_score_v2,
+        which need the full cross-section's percentile ranks.
+    """
+    if fund.empty or "symbol" not in fund.columns:
+        return pd.DataFrame(), pd.DataFrame()
+    cols = [c for c in CROSS_SECTION_COLUMNS if c in fund.columns]
+    panel = index.merge(fund[["symbol"] + cols], on="symbol", how="left")
+    if "pe_ratio" in panel.columns:
+        panel["pe_inverse"] = 1 / panel["pe_ratio"].replace(0, np.nan)
+
+    by_date = panel.groupby("date")
+    stats = by_date[[c for c in ZSCORE_COLUMNS if c in panel.columns]].agg(["mean", "std"])
+
+    ranks = panel[["date", "symbol"]].copy()
+    if all(c in panel.columns for c in ["pe_inverse", "pb_ratio", "roe"]):
+        pb_inv_rank = 1 - by_date["pb_ratio"].rank(pct=True)  # Lower P/B is better
+        ranks["value_score"] = (by_date["pe_inverse"].rank(pct=True) + pb_inv_rank + by_date["roe"].rank(pct=True)) / 3
+    if all(c in panel.columns for c in ["roe", "profit_margin", "revenue_growth_yoy"]):
+        ranks["quality_score_v2"] = (
+            by_date["roe"].rank(pct=True)
+            + by_date["profit_margin"].rank(pct=True)
+            + by_date["revenue_growth_yoy"].rank(pct=True)
+        ) / 3
+    return stats, ranks.drop_duplicates(["date", "symbol"])
+
+
+def symbol_chunks(rows_per_symbol: pd.Series, chunk_rows: int):
+    """Group symbols (in order) into chunks of at most chunk_rows price rows."""
+    chunks, current, size = [], [], 0
+    for symbol, rows in rows_per_symbol.sort_index().items():
+        if current and size + rows > chunk_rows:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(symbol)
+        size += rows
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _for_symbols(df: pd.DataFrame, symbols) -> pd.DataFrame:
+    return df[df["symbol"].isin(symbols)]
+
+
+def _zscore(df: pd.DataFrame, stats: pd.DataFrame, col: str, invert: bool = False) -> pd.Series:
+    mean = stats[(col, "mean")].reindex(df["date"]).to_numpy()
+    std = stats[(col, "std")].reindex(df["date"]).to_numpy()
+    return ((mean - df[col]) if invert else (df[col] - mean)) / std
+
+
+def assemble_features(tech: pd.DataFrame, inputs: dict, stats: pd.DataFrame, ranks: pd.DataFrame, conn) -> pd.DataFrame:
+    """Merge all sources onto one symbol chunk of the technical panel."""
+    symbols = tech["symbol"].unique()
+    fund = inputs["fund"]
+    fund_features = inputs["fund_features"]
+    sent = inputs["sent"]
+    announcements = inputs["announcements"]
+    macro = inputs["macro"]
+    etf = inputs["etf"]
+    risk_snapshot = inputs["risk"]
 
     df = tech
     if not fund.empty and "symbol" in fund.columns:
-        df = df.merge(fund, on="symbol", how="left")
+        df = df.merge(_for_symbols(fund, symbols), on="symbol", how="left")
     if not fund_features.empty and {"symbol", "date"}.issubset(fund_features.columns):
-        df = df.merge(fund_features, on=["symbol", "date"], how="left")
-    if not fund_trends.empty and {"symbol", "date", "metric"}.issubset(fund_trends.columns):
-        mean_wide = _pivot_trends(fund_trends, "mean_value", "mean")
-        pct_wide = _pivot_trends(fund_trends, "pct_change", "pct")
-        slope_wide = _pivot_trends(fund_trends, "slope", "slope")
-        vol_wide = _pivot_trends(fund_trends, "volatility", "vol")
-        df = df.merge(mean_wide, on=["symbol", "date"], how="left")
-        df = df.merge(pct_wide, on=["symbol", "date"], how="left")
-        df = df.merge(slope_wide, on=["symbol", "date"], how="left")
-        df = df.merge(vol_wide, on=["symbol", "date"], how="left")
+        df = df.merge(_for_symbols(fund_features, symbols), on=["symbol", "date"], how="left")
+    for wide in inputs["trends"]:
+        df = df.merge(_for_symbols(wide, symbols), on=["symbol", "date"], how="left")
     if not sent.empty and {"symbol", "date"}.issubset(sent.columns):
-        df = df.merge(sent, on=["symbol", "date"], how="left")
+        df = df.merge(_for_symbols(sent, symbols), on=["symbol", "date"], how="left")
     if not announcements.empty and {"symbol", "date"}.issubset(announcements.columns):
-        df = df.merge(announcements, on=["symbol", "date"], how="left")
+        df = df.merge(_for_symbols(announcements, symbols), on=["symbol", "date"], how="left")
     if not macro.empty and "date" in macro.columns:
         df = df.merge(macro, on="date", how="left")
     if not etf.empty and {"symbol", "sector"}.issubset(etf.columns):
-        df = df.merge(etf[["symbol", "sector"]], on="symbol", how="left")
+        df = df.merge(_for_symbols(etf, symbols)[["symbol", "sector"]], on="symbol", how="left")
     if not risk_snapshot.empty and "symbol" in risk_snapshot.columns:
         df = df.merge(
-            risk_snapshot[["symbol", "factor_vol", "beta_market"]],
+            _for_symbols(risk_snapshot, symbols)[["symbol", "factor_vol", "beta_market"]],
             on="symbol",
             how="left",
         )
 
-    # Valuation z-scores (cross-sectional)
+    # Valuation z-scores (cross-sectional, from the per-date aggregates of the first pass)
     if "pe_ratio" in df.columns:
-        df["pe_ratio_zscore"] = df.groupby("date")["pe_ratio"].transform(lambda x: (x - x.mean()) / x.std())
+        df["pe_ratio_zscore"] = _zscore(df, stats, "pe_ratio")
     if "pb_ratio" in df.columns:
-        df["pb_ratio_zscore"] = df.groupby("date")["pb_ratio"].transform(lambda x: (x - x.mean()) / x.std())
+        df["pb_ratio_zscore"] = _zscore(df, stats, "pb_ratio")
     if "roe" in df.columns:
         df["roe_ratio"] = df["roe"]
     if "debt_to_equity" in df.columns:
         df["debt_to_equity_ratio"] = df["debt_to_equity"]
 
     # V2 Model B fundamental features
-    if "pe_ratio" in df.columns and "pe_ratio" in df.columns:
+    if "pe_ratio" in df.columns:
         df["pe_inverse"] = 1 / df["pe_ratio"].replace(0, np.nan)
-        df["pe_inverse_zscore"] = df.groupby("date")["pe_inverse"].transform(lambda x: (x - x.mean()) / x.std())
+        df["pe_inverse_zscore"] = _zscore(df, stats, "pe_inverse")
 
     # Financial health score (combines profitability, liquidity, leverage)
     if all(c in df.columns for c in ["roe", "current_ratio", "debt_to_equity"]):
         # Normalize each component (handle missing values)
-        roe_norm = df.groupby("date")["roe"].transform(lambda x: (x - x.mean()) / x.std()).fillna(0)
-        current_norm = df.groupby("date")["current_ratio"].transform(lambda x: (x - x.mean()) / x.std()).fillna(0)
-        debt_norm = df.groupby("date")["debt_to_equity"].transform(lambda x: (x.mean() - x) / x.std()).fillna(0)  # Inverted (lower is better)
+        roe_norm = _zscore(df, stats, "roe").fillna(0)
+        current_norm = _zscore(df, stats, "current_ratio").fillna(0)
+        debt_norm = _zscore(df, stats, "debt_to_equity", invert=True).fillna(0)  # Inverted (lower is better)
         df["financial_health_score"] = (roe_norm + current_norm + debt_norm) / 3
 
-    # Value score (combines P/E, P/B, ROE)
-    if all(c in df.columns for c in ["pe_inverse", "pb_ratio", "roe"]):
-        pe_inv_rank = df.groupby("date")["pe_inverse"].rank(pct=True)
-        pb_inv_rank = df.groupby("date")["pb_ratio"].transform(lambda x: 1 - x.rank(pct=True))  # Lower P/B is better
-        roe_rank = df.groupby("date")["roe"].rank(pct=True)
-        df["value_score"] = (pe_inv_rank + pb_inv_rank + roe_rank) / 3
-
-    # Quality score (profitability + growth)
-    if all(c in df.columns for c in ["roe", "profit_margin", "revenue_growth_yoy"]):
-        roe_rank = df.groupby("date")["roe"].rank(pct=True)
-        margin_rank = df.groupby("date")["profit_margin"].rank(pct=True)
-        growth_rank = df.groupby("date")["revenue_growth_yoy"].rank(pct=True)
-        df["quality_score_v2"] = (roe_rank + margin_rank + growth_rank) / 3
+    # Value score (P/E, P/B, ROE) and quality score (profitability + growth) ranks
+    if len(ranks.columns) > 2:
+        df = df.merge(_for_symbols(ranks, symbols), on=["date", "symbol"], how="left")
 
     # Macro deltas
     for col in ("cpi", "yield_curve_slope", "yield_10y"):
@@ -350,8 +446,8 @@ def build_features(start_date, end_date):
         )
         df["sma200_slope_pos"] = (df["sma200_slope"] > 0).astype(int)
 
-    # Forward returns (TARGET) (NEW!)
-    df["return_1m_fwd"] = df.groupby("symbol")["close"].shift(-21) / df["close"] - 1
+    # Forward returns (TARGET) from the forward_returns table
+    df = attach_labels(df, conn, horizons=(21,), date_col="date")
     df["return_1m_fwd_sign"] = (df["return_1m_fwd"] > 0).astype(int)
 
     # Sentiment composite
@@ -382,47 +478,196 @@ def build_features(start_date, end_date):
         df["sector_spread_1m"] = df["return_1m"] - df["asx200_return_1m"]
     df.dropna(subset=["close"], inplace=True)
 
-    # Save to parquet files (backup)
-    dated_path = f"outputs/featureset_extended_{end_date}.parquet"
-    df.to_parquet(dated_path, index=False)
-    latest_path = "outputs/featureset_extended_latest.parquet"
-    df.to_parquet(latest_path, index=False)
+    return df
+
+
+def iter_feature_chunks(start_date, end_date, chunk_rows: int = FEATURE_BUILD_CHUNK_ROWS):
+    """
+    Yield the extended feature panel for [start_date, end_date] one symbol chunk at a time.
+
+    Cross-sectional features are computed from per-date aggregates of a first
+    pass over the narrow (date, symbol) price index, so each chunk only holds
+    its own symbols' wide rows.
+    """
+    index = load_price_index(start_date, end_date)
+    if index.empty:
+        raise ValueError("No technical data loaded; check prices table.")
+    inputs = load_side_inputs()
+    stats, ranks = cross_sectional_stats(index, inputs["fund"])
+    chunks = symbol_chunks(index["symbol"].value_counts(), chunk_rows)
+    del index
+
+    conn = db()
     try:
-        link_path = "outputs/featureset_extended_latest.symlink.parquet"
-        if os.path.islink(link_path) or os.path.exists(link_path):
-            os.remove(link_path)
-        os.symlink(os.path.basename(dated_path), link_path)
-    except Exception as e:
-        print(f"⚠️ Symlink creation failed: {e}")
+        for i, symbols in enumerate(chunks, 1):
+            tech = load_technical_features(start_date, end_date, symbols)
+            if tech.empty:
+                continue
+            logger.info(f"Feature chunk {i}/{len(chunks)}: {len(symbols)} symbols, {len(tech)} rows")
+            yield assemble_features(tech, inputs, stats, ranks, conn)
+    finally:
+        conn.close()
+
+
+# --- Partitioned, incremental build ---
+FEATURE_SET_VERSION = os.getenv("FEATURE_SET_VERSION", "extended_v2")  # bump when feature definitions change
+FEATURE_DATASET = "model_a_features_extended"
+EXPORT_LATEST_PARQUET = os.getenv("EXPORT_LATEST_PARQUET", "0") == "1"
+FEATURE_TABLE = "model_a_features_extended"
+FEATURE_TABLE_INDEXES = [("date", "symbol"), ("symbol", "date")]
+
+# Per-month digest of each input, as (month, digest) rows
+INPUT_DIGEST_SQL = {
+    "prices": """
+        select to_char(dt, 'YYYY-MM'), count(*) || ':' || sum(close) || ':' || sum(volume) || ':' || max(dt)
+        from prices group by 1
+    """,
+    "features_fundamental": """
+        select to_char(as_of, 'YYYY-MM'), md5(string_agg(t::text, ',' order by t::text))
+        from features_fundamental t group by 1
+    """,
+    "features_fundamental_trends": """
+        select to_char(as_of, 'YYYY-MM'), md5(string_agg(t::text, ',' order by t::text))
+        from features_fundamental_trends t group by 1
+    """,
+    "nlp_announcements": """
+        select to_char(dt, 'YYYY-MM'), md5(string_agg(t::text, ',' order by t::text))
+        from nlp_announcements t group by 1
+    """,
+    "macro_data": """
+        select to_char(dt, 'YYYY-MM'), md5(string_agg(t::text, ',' order by t::text))
+        from macro_data t group by 1
+    """,
+    # Latest snapshot per symbol, keyed by the quarter it reports
+    "fundamentals": """
+        select to_char(period_end, 'YYYY-MM'), md5(string_agg(f::text, ',' order by f::text))
+        from (
+            select distinct on (symbol) symbol, pe_ratio, pb_ratio, eps, roe, debt_to_equity, market_cap,
+                div_yield, revenue_growth_yoy, profit_margin, current_ratio, quick_ratio, eps_growth,
+                free_cash_flow, period_end
+            from fundamentals
+            where pe_ratio is not null or market_cap is not null
+            order by symbol, updated_at desc
+        ) f
+        group by 1
+    """,
+}
+
+# Months of each input a partition depends on: rolling windows reach back
+# 252 sessions (+20 for adv_zscore), labels 21 sessions ahead; a restated
+# fundamentals quarter invalidates every partition from that quarter on.
+# ETF sectors and the risk snapshot are taken as of the build.
+INPUT_WINDOWS = {
+    "prices": (13, 2),
+    "features_fundamental": (0, 0),
+    "features_fundamental_trends": (0, 0),
+    "nlp_announcements": (0, 0),
+    "macro_data": (1, 0),
+    "sentiment_file": (0, 0),
+    "fundamentals": "cumulative",
+}
+
+
+def _sentiment_file_digests() -> dict:
+    df = load_sentiment()
+    if df.empty or "date" not in df.columns:
+        return {}
+    months = month_key(df["date"])
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    return {m: str(int(h.sum())) for m, h in hashes.groupby(months.to_numpy())}
+
+
+def input_digests() -> dict:
+    with db() as con:
+        digests = load_input_digests(con, INPUT_DIGEST_SQL)
+    digests["sentiment_file"] = _sentiment_file_digests()
+    return digests
+
+
+def build_features(start_date, end_date, full: bool = False) -> int:
+    """
+    Bring the month-partitioned feature store up to date for [start_date, end_date].
 
-    # PERFORMANCE OPTIMIZATION: Write to database for fast API access
+    Only partitions whose input fingerprint changed (new or restated prices,
+    fundamentals, announcements, macro; FEATURE_SET_VERSION bump) are
+    recomputed; partitions before start_date are dropped. Recomputed runs are
+    streamed into the store in symbol chunks, and the store is streamed into
+    the database a month at a time, so peak memory is bounded by
+    FEATURE_BUILD_CHUNK_ROWS and the largest month.
+
+    Returns:
+        Rows in the range's partitions
+    """
+    store = FeatureStore(FEATURE_DATASET, date_col="date")
+    months = month_range(start_date, end_date)
+    fingerprints = partition_fingerprints(months, input_digests(), INPUT_WINDOWS, FEATURE_SET_VERSION)
+    stale = months if full else store.stale_partitions(fingerprints, FEATURE_SET_VERSION)
+
+    if stale:
+        print(f"⚙️ Rebuilding {len(stale)}/{len(months)} partitions")
+        warmup_months, label_months = windows_span(INPUT_WINDOWS)
+        for run in contiguous_runs(stale):
+            # Warm up rolling windows before the run; load enough after it for labels
+            run_start = pd.Period(shift_month(run[0], -warmup_months), freq="M").start_time.date()
+            run_end = min(
+                pd.Period(shift_month(run[-1], label_months), freq="M").end_time.date(),
+                pd.Timestamp(end_date).date(),
+            )
+            print(f"  - {run[0]} → {run[-1]} (inputs {run_start} → {run_end})")
+            written = store.write_partitions(
+                iter_feature_chunks(run_start, run_end), run, fingerprints, FEATURE_SET_VERSION
+            )
+            print(f"    wrote {sum(written.values())} rows")
+    else:
+        print("✅ Feature store up to date; nothing to rebuild")
+    store.prune(keep=months)
+
+    manifest = store.load_manifest()["partitions"]
+    rows = sum(manifest[m]["rows"] for m in months if m in manifest)
+
+    if EXPORT_LATEST_PARQUET:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        latest_path = "outputs/featureset_extended_latest.parquet"
+        schema = store.schema()
+        with pq.ParquetWriter(latest_path, schema) as writer:
+            for month in store.iter_months(start_date=start_date, end_date=end_date):
+                writer.write_table(pa.Table.from_pandas(month, schema=schema, preserve_index=False))
+        print(f"📌 Latest parquet: {latest_path}")
+
+    # COPY into a shadow table and swap it in: readers never see a missing or partial table
     try:
-        logger.info(f"Writing {len(df)} feature rows to database...")
-        with db() as con:
-            # Write to model_a_features_extended table
-            # This allows API to read pre-computed features instead of computing on-demand
-            df.to_sql(
-                "model_a_features_extended",
-                con,
-                if_exists="replace",  # Replace existing data
-                index=False,
-                method="multi",  # Batch insert for performance
-                chunksize=1000
+        logger.info(f"Loading {rows} feature rows into {FEATURE_TABLE}...")
+        con = db()
+        try:
+            loaded = copy_swap(
+                con, FEATURE_TABLE,
+                store.iter_months(start_date=start_date, end_date=end_date),
+                pg_columns_from_arrow(store.schema()),
+                indexes=FEATURE_TABLE_INDEXES,
             )
-            con.commit()
-        logger.info("✅ Features successfully written to database")
-        print("✅ Features written to database: model_a_features_extended")
+        finally:
+            con.close()
+        logger.info(f"✅ {loaded} features swapped into {FEATURE_TABLE}")
+        print(f"✅ Features written to database: {FEATURE_TABLE}")
     except Exception as e:
         logger.error(f"Failed to write features to database: {e}")
-        print(f"⚠️ Database write failed (features still in parquet): {e}")
+        print(f"⚠️ Database write failed (features still in the feature store): {e}")
 
-    print(f"✅ Extended features saved: {len(df)} rows.")
-    print(f"📦 Dated parquet: {dated_path}")
-    print(f"📌 Latest parquet: {latest_path}")
-    print("💾 Database table: model_a_features_extended")
-    return df
+    print(f"✅ Extended features: {rows} rows.")
+    print(f"📦 Feature store: {store.path}")
+    print(f"💾 Database table: {FEATURE_TABLE}")
+    return rows
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the extended feature store")
+    parser.add_argument("--full", action="store_true", help="Rebuild every partition")
+    parser.add_argument("--days", type=int, default=760, help="Days of history to keep")
+    args = parser.parse_args()
+
     end = datetime.utcnow().date()
-    start = end - timedelta(days=760)
-    build_features(start, end)
+    start = end - timedelta(days=args.days)
+    build_features(start, end, full=args.full)
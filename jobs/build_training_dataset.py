@@ -12,6 +12,16 @@ from psycopg2.extras import execute_values
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(PROJECT_ROOT)
 
+from analytics.feature_store import (
+    FeatureStore,
+    contiguous_runs,
+    load_input_digests,
+    month_range,
+    partition_fingerprints,
+    shift_month,
+    windows_span,
+)
+from analytics.forward_returns import attach_labels
 from api_clients.eodhd_client import fetch_eod_prices_for_symbols
 
 # --- Load environment variables
@@ -22,6 +32,26 @@ LOOKBACK_MONTHS = int(os.getenv("LOOKBACK_MONTHS", "36"))
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "100"))
 FETCH_EODHD = os.getenv("FETCH_EODHD", "0") == "1"
 EODHD_THROTTLE_S = float(os.getenv("EODHD_THROTTLE_S", "1.2"))
+DATASET_VERSION = os.getenv("TRAINING_DATASET_VERSION", "model_a_v1")  # bump when features change
+FULL_REBUILD = os.getenv("FULL_REBUILD", "0") == "1"
+# Rewrite the CSV/Parquet exports even when no partition changed
+FORCE_EXPORT = os.getenv("FORCE_EXPORT", "0") == "1"
+
+CSV_OUT = "outputs/model_a_training_dataset_36m.csv"
+PARQUET_OUT = "outputs/model_a_training_dataset_36m.parquet"
+LEGACY_OUT = "outputs/model_a_training_dataset.csv"
+DATA_CSV = "data/training/model_a_training_dataset_36m.csv"
+DATA_PARQUET = "data/training/model_a_training_dataset_36m.parquet"
+EXPORT_PATHS = [CSV_OUT, PARQUET_OUT, LEGACY_OUT, DATA_CSV, DATA_PARQUET]
+
+# Partition month M depends on prices from 13 months before (252-session
+# momentum, SMA200 + 20-session slope) to 2 months after (21-session label)
+INPUT_WINDOWS = {"prices": (13, 2)}
+PRICES_DIGEST_SQL = """
+    select to_char(dt, 'YYYY-MM'), count(*) || ':' || sum(close) || ':' || sum(volume) || ':' || max(dt)
+    from prices group by 1
+"""
+store = FeatureStore("model_a_training", date_col="dt")
 
 if not DATABASE_URL or DATABASE_URL.strip() in ["...", ""]:
     raise ValueError("DATABASE_URL not set in .env — please fix before running.")
@@ -44,14 +74,14 @@ def _load_symbols(conn):
         )
         return [r[0] for r in cur.fetchall()]
 
-def _load_prices_batch(conn, symbols):
+def _load_prices_batch(conn, symbols, from_date, to_date):
     query = """
     select symbol, dt, close, volume
     from prices
     where dt >= %s and dt <= %s and symbol = any(%s)
     order by symbol, dt;
     """
-    return pd.read_sql(query, conn, params=(start_date, end_date, symbols))
+    return pd.read_sql(query, conn, params=(from_date, to_date, symbols))
 
 def _upsert_prices(conn, frame: pd.DataFrame):
     if frame.empty:
@@ -77,6 +107,47 @@ def _upsert_prices(conn, frame: pd.DataFrame):
         )
         conn.commit()
 
+def compute_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Technical features for a (symbol, dt, close, volume) frame sorted by symbol, dt."""
+    df = df.copy()
+    df["close"] = df["close"].astype(float)
+    df["volume"] = df["volume"].astype(float)
+
+    # Calculate returns and momentum features
+    df["ret_1d"] = df.groupby("symbol")["close"].pct_change()
+    df["mom_6"] = df.groupby("symbol")["close"].transform(lambda x: x.pct_change(126))
+    df["mom_12_1"] = df.groupby("symbol")["close"].transform(lambda x: x.pct_change(252))
+
+    # Volatility: rolling 90-day std of daily returns
+    df["vol_90"] = df.groupby("symbol")["ret_1d"].rolling(90).std().reset_index(0, drop=True)
+
+    # ADV: median volume * price over 20 days
+    df["adv_20_median"] = (
+        df.groupby("symbol")["volume"].rolling(20).median().reset_index(0, drop=True)
+        * df["close"]
+    )
+
+    # SMA200 & slope
+    df["sma_200"] = df.groupby("symbol")["close"].transform(lambda x: x.rolling(200).mean())
+    df["trend_200"] = df["close"] > df["sma_200"]
+
+    # Slope of SMA200 (positive or not)
+    def slope(series):
+        if series.isna().sum() > 0:
+            return np.nan
+        y = series.values
+        x = np.arange(len(y))
+        a, b = np.polyfit(x, y, 1)
+        return a
+
+    df["sma200_slope"] = (
+        df.groupby("symbol")["sma_200"]
+        .transform(lambda x: x.rolling(20).apply(slope, raw=False))
+    )
+    df["sma200_slope_pos"] = df["sma200_slope"] > 0
+    return df
+
+
 with psycopg2.connect(DATABASE_URL) as con:
     symbols = _load_symbols(con)
 
@@ -96,82 +167,57 @@ with psycopg2.connect(DATABASE_URL) as con:
             _upsert_prices(con, eod_df)
         time.sleep(0.2)
 
-    batches = [symbols[i : i + BATCH_SIZE] for i in range(0, len(symbols), BATCH_SIZE)]
-    frames = []
-    for idx, batch in enumerate(batches, start=1):
-        print(f"  - Batch {idx}/{len(batches)}: {len(batch)} symbols")
-        frame = _load_prices_batch(con, batch)
-        frames.append(frame)
-    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    # Only partitions whose price inputs changed are recomputed
+    months = month_range(start_date, end_date)
+    digests = load_input_digests(con, {"prices": PRICES_DIGEST_SQL})
+    fingerprints = partition_fingerprints(months, digests, INPUT_WINDOWS, DATASET_VERSION)
+    stale = months if FULL_REBUILD else store.stale_partitions(fingerprints, DATASET_VERSION)
+    print(f"⚙️ {len(stale)}/{len(months)} partitions to rebuild")
 
+    batches = [symbols[i : i + BATCH_SIZE] for i in range(0, len(symbols), BATCH_SIZE)]
+    warmup_months, label_months = windows_span(INPUT_WINDOWS)
+    for run in contiguous_runs(stale):
+        run_start = pd.Period(shift_month(run[0], -warmup_months), freq="M").start_time.date()
+        run_end = min(pd.Period(shift_month(run[-1], label_months), freq="M").end_time.date(), end_date)
+        print(f"  - Partitions {run[0]} → {run[-1]} (prices {run_start} → {run_end})")
+        frames = []
+        for idx, batch in enumerate(batches, start=1):
+            print(f"    Batch {idx}/{len(batches)}: {len(batch)} symbols")
+            frames.append(_load_prices_batch(con, batch, run_start, run_end))
+        prices = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        if prices.empty:
+            continue
+        # Forward 21-trading-day return (target), from the forward_returns table
+        features = attach_labels(compute_features(prices), con, horizons=(21,))
+        written = store.write_partitions(features, run, fingerprints, DATASET_VERSION)
+        print(f"    wrote {sum(written.values()):,} rows")
+    removed = store.prune(keep=months)
+
+# The exports are derived from the store: only rewrite them when it changed
+if not (stale or removed or FORCE_EXPORT) and all(os.path.exists(p) for p in EXPORT_PATHS):
+    print("✅ No partitions changed; training dataset exports are current")
+    sys.exit(0)
+
+df = store.read(start_date=start_date, end_date=end_date)
 if df.empty:
     raise ValueError("No price data found — check that 'prices' table is populated.")
 
 print(f"✅ Loaded {len(df):,} rows across {df['symbol'].nunique()} symbols")
 
-# --- Compute features
-df["close"] = df["close"].astype(float)
-df["volume"] = df["volume"].astype(float)
-
-# Calculate returns and momentum features
-df["ret_1d"] = df.groupby("symbol")["close"].pct_change()
-df["mom_6"] = df.groupby("symbol")["close"].transform(lambda x: x.pct_change(126))
-df["mom_12_1"] = df.groupby("symbol")["close"].transform(lambda x: x.pct_change(252))
-
-# Volatility: rolling 90-day std of daily returns
-df["vol_90"] = df.groupby("symbol")["ret_1d"].rolling(90).std().reset_index(0, drop=True)
-
-# ADV: median volume * price over 20 days
-df["adv_20_median"] = (
-    df.groupby("symbol")["volume"].rolling(20).median().reset_index(0, drop=True)
-    * df["close"]
-)
-
-# SMA200 & slope
-df["sma_200"] = df.groupby("symbol")["close"].transform(lambda x: x.rolling(200).mean())
-df["trend_200"] = df["close"] > df["sma_200"]
-
-# Slope of SMA200 (positive or not)
-def slope(series):
-    if series.isna().sum() > 0:
-        return np.nan
-    y = series.values
-    x = np.arange(len(y))
-    a, b = np.polyfit(x, y, 1)
-    return a
-
-df["sma200_slope"] = (
-    df.groupby("symbol")["sma_200"]
-    .transform(lambda x: x.rolling(20).apply(slope, raw=False))
-)
-df["sma200_slope_pos"] = df["sma200_slope"] > 0
-
-# --- Compute forward 21-day return (target)
-df["return_1m_fwd"] = (
-    df.groupby("symbol")["close"].shift(-21) / df["close"] - 1
-)
-
 # --- Drop incomplete rows
 df = df.dropna(subset=["mom_6", "mom_12_1", "vol_90", "adv_20_median", "sma_200", "return_1m_fwd"])
 
 os.makedirs("outputs", exist_ok=True)
 os.makedirs("data/training", exist_ok=True)
 
-csv_out = "outputs/model_a_training_dataset_36m.csv"
-parquet_out = "outputs/model_a_training_dataset_36m.parquet"
-df.to_csv(csv_out, index=False)
-df.to_parquet(parquet_out, index=False)
-
-legacy_out = "outputs/model_a_training_dataset.csv"
-df.to_csv(legacy_out, index=False)
-
-data_csv = "data/training/model_a_training_dataset_36m.csv"
-data_parquet = "data/training/model_a_training_dataset_36m.parquet"
-df.to_csv(data_csv, index=False)
-df.to_parquet(data_parquet, index=False)
+df.to_csv(CSV_OUT, index=False)
+df.to_parquet(PARQUET_OUT, index=False)
+df.to_csv(LEGACY_OUT, index=False)
+df.to_csv(DATA_CSV, index=False)
+df.to_parquet(DATA_PARQUET, index=False)
 
-print(f"💾 Saved training dataset → {csv_out}")
-print(f"💾 Saved training parquet → {parquet_out}")
+print(f"💾 Saved training dataset → {CSV_OUT}")
+print(f"💾 Saved training parquet → {PARQUET_OUT}")
 print(f"✅ Final dataset shape: {df.shape}")
 print("Sample:")
 print(df.head(5))
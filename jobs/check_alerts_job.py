@@ -3,24 +3,41 @@ jobs/check_alerts_job.py
 Check all active price alerts against current market prices.
 Triggers alerts when conditions are met and records history.
 
-Schedule: Every 15 minutes during market hours (10:00-16:00 AEST weekdays)
-Cron:     */15 0-6 * * 1-5   (UTC equivalent of 10:00-16:00 AEST)
+Schedule: Every 15 minutes during market hours (10:00-16:00 Sydney time
+          on ASX trading days)
+Cron:     */15 23,0-6 * * 0-5   (render.yaml asx-check-alerts, via
+          scripts/cron_check_alerts.py; covers AEST and AEDT, and runs
+          outside market hours or on ASX holidays exit early via is_market_open)
 """
 
 import logging
 import os
 import sys
+from datetime import datetime, time
+from typing import Optional
+from zoneinfo import ZoneInfo
 
 # Ensure project root is on the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from psycopg2.extras import RealDictCursor
 
+from analytics.trading_calendar import is_trading_day
 from app.core import db, return_conn
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
+MARKET_TZ = ZoneInfo("Australia/Sydney")
+MARKET_OPEN = time(10, 0)
+MARKET_CLOSE = time(16, 0)
+
+
+def is_market_open(now: Optional[datetime] = None) -> bool:
+    """True during ASX market hours on a trading day (Sydney time)."""
+    local = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    return is_trading_day(local.date()) and MARKET_OPEN <= local.time() <= MARKET_CLOSE
+
 
 def get_current_prices(symbols: list) -> dict:
     """
@@ -166,5 +183,12 @@ def check_alerts():
         logger.error("Alert check job failed: %s", e)
 
 
+def main():
+    if is_market_open():
+        check_alerts()
+    else:
+        logger.info("ASX market closed, skipping alert check")
+
+
 if __name__ == "__main__":
-    check_alerts()
+    main()
@@ -0,0 +1,51 @@
+"""
+jobs/compute_forward_returns_job.py
+Extend the forward_returns table with returns whose end bar has arrived.
+
+Runs after the daily price sync (scripts/cron_daily_prices.py). Each run
+only reloads the tail of each symbol's price history; --full recomputes
+every row (e.g. after a price backfill or split correction).
+
+Usage:
+    python jobs/compute_forward_returns_job.py
+    python jobs/compute_forward_returns_job.py --full --horizons 1,5,21
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.forward_returns import HORIZONS, update_forward_returns
+from app.core import db_context, logger
+
+
+def run(horizons=HORIZONS, full: bool = False):
+    start = time.time()
+    logger.info(f"Updating forward returns (horizons={list(horizons)}, full={full})")
+
+    with db_context() as conn:
+        written = update_forward_returns(conn, horizons, full=full)
+
+    total = sum(written.values())
+    logger.info(f"✅ Forward returns updated: {total} rows {written} in {time.time() - start:.1f}s")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update precomputed forward returns")
+    parser.add_argument("--full", action="store_true", help="Recompute all rows")
+    parser.add_argument(
+        "--horizons",
+        default=",".join(str(h) for h in HORIZONS),
+        help="Comma-separated horizons in trading days",
+    )
+    args = parser.parse_args()
+    run([int(h) for h in args.horizons.split(",") if h.strip()], full=args.full)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+jobs/compute_portfolio_risk_job.py
+Nightly risk metrics for every active portfolio in one pass.
+
+Loads all active portfolios' holdings and their symbols' price history in
+one query each, builds a sparse portfolios x symbols weight matrix and
+scores every portfolio with the shared matrix math in
+analytics/portfolio_risk.py (the same code RiskMetricsService uses for a
+single portfolio). Rows are bulk-upserted into portfolio_risk_metrics for
+today, so API reads and RiskMetricsService find them as cached metrics.
+
+Run after the daily price and holdings sync.
+
+Usage:
+    python jobs/compute_portfolio_risk_job.py
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import date, datetime
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import portfolio_risk
+from app.core import db_context, logger
+from services.table_loader import copy_upsert
+
+BENCHMARK = os.getenv("PORTFOLIO_RISK_BENCHMARK", "XJO.AX")
+LOOKBACK_DAYS = int(os.getenv("PORTFOLIO_RISK_LOOKBACK_DAYS", "400"))  # calendar days of prices
+TRADING_DAYS = portfolio_risk.TRADING_DAYS_PER_YEAR
+
+METRIC_COLUMNS = [
+    "portfolio_id", "as_of", "total_return_pct", "volatility", "sharpe_ratio", "beta",
+    "max_drawdown_pct", "top_holding_weight_pct", "top_5_weight_pct", "herfindahl_index",
+    "signal_distribution", "correlation_matrix", "calculation_timestamp",
+]
+
+
+def load_holdings(conn) -> pd.DataFrame:
+    query = """
+        select h.portfolio_id, h.ticker, h.current_value, h.unrealized_pl_pct, h.current_signal
+        from user_holdings h
+        join user_portfolios p on p.id = h.portfolio_id
+        where p.is_active = true
+          and h.current_value > 0
+    """
+    df = pd.read_sql(query, conn)
+    for col in ("current_value", "unrealized_pl_pct"):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def load_returns(conn, symbols) -> pd.DataFrame:
+    """Daily returns, dates x symbols, over the last year of trading days."""
+    query = """
+        select dt, symbol, close
+        from prices
+        where symbol = any(%s)
+          and dt >= current_date - (%s * interval '1 day')
+          and close is not null
+        order by symbol, dt
+    """
+    px = pd.read_sql(query, conn, params=(list(symbols), LOOKBACK_DAYS))
+    px["dt"] = pd.to_datetime(px["dt"])
+    # Per-symbol returns over each symbol's own bars (a gap is one return, not two NaNs)
+    px["ret"] = px.groupby("symbol")["close"].pct_change(fill_method=None)
+    returns = px.dropna(subset=["ret"]).pivot(index="dt", columns="symbol", values="ret")
+    return returns.reindex(columns=list(symbols)).tail(TRADING_DAYS)
+
+
+def weight_matrix(holdings: pd.DataFrame, symbols) -> Tuple[np.ndarray, sparse.csr_matrix]:
+    """(portfolio ids, portfolios x symbols value weights); duplicate tickers are summed."""
+    portfolio_ids, rows = np.unique(holdings["portfolio_id"].to_numpy(), return_inverse=True)
+    cols = pd.Index(symbols).get_indexer(holdings["ticker"])
+    values = holdings["current_value"].to_numpy(dtype=np.float64)
+    totals = np.bincount(rows, weights=values)
+    W = sparse.csr_matrix((values / totals[rows], (rows, cols)), shape=(len(portfolio_ids), len(symbols)))
+    return portfolio_ids, W
+
+
+def concentration(holdings: pd.DataFrame) -> pd.DataFrame:
+    """Weight concentration, average unrealized P&L and signal counts per portfolio."""
+    h = holdings.assign(
+        weight_pct=holdings["current_value"] / holdings.groupby("portfolio_id")["current_value"].transform("sum") * 100,
+        signal=holdings["current_signal"].fillna("UNKNOWN"),
+    )
+    h["rank"] = h.groupby("portfolio_id")["weight_pct"].rank(method="first", ascending=False)
+    by_portfolio = h.groupby("portfolio_id")
+    signals = h.groupby(["portfolio_id", "signal"]).size()
+
+    out = pd.DataFrame({
+        "total_return_pct": by_portfolio["unrealized_pl_pct"].mean(),
+        "top_holding_weight_pct": by_portfolio["weight_pct"].max(),
+        "top_5_weight_pct": h[h["rank"] <= 5].groupby("portfolio_id")["weight_pct"].sum(),
+        "herfindahl_index": ((h["weight_pct"] / 100) ** 2).groupby(h["portfolio_id"]).sum(),
+    })
+    out["signal_distribution"] = [
+        json.dumps({k: int(v) for k, v in signals.loc[pid].items()}) for pid in out.index
+    ]
+    return out
+
+
+def correlations(holdings: pd.DataFrame, returns: pd.DataFrame) -> pd.Series:
+    """Holdings' correlation matrix (JSON) per portfolio, sliced from one universe-wide estimate."""
+    corr = returns.corr(min_periods=20)
+    out = {}
+    for pid, tickers in holdings.groupby("portfolio_id")["ticker"]:
+        tickers = list(dict.fromkeys(tickers))
+        matrix = portfolio_risk.correlation_dict(corr.loc[tickers, tickers]) if len(tickers) > 1 else {}
+        out[pid] = json.dumps(matrix)
+    return pd.Series(out, name="correlation_matrix")
+
+
+def compute_metrics(holdings: pd.DataFrame, returns: pd.DataFrame, benchmark: pd.Series) -> pd.DataFrame:
+    """portfolio_risk_metrics rows (without as_of) for every portfolio in holdings."""
+    portfolio_ids, W = weight_matrix(holdings, returns.columns)
+    port = portfolio_risk.portfolio_returns(returns, W)
+    port.columns = portfolio_ids
+    series = portfolio_risk.risk_metrics(port, benchmark)
+    return (
+        concentration(holdings)
+        .join(series.drop(columns="observations"))
+        .join(correlations(holdings, returns))
+        .rename_axis("portfolio_id")
+        .reset_index()
+    )
+
+
+def run() -> int:
+    start = time.time()
+    with db_context() as conn:
+        holdings = load_holdings(conn)
+        if holdings.empty:
+            logger.info("No active portfolio holdings; nothing to compute")
+            return 0
+
+        symbols = sorted(set(holdings["ticker"]))
+        panel = load_returns(conn, list(dict.fromkeys(symbols + [BENCHMARK])))
+        metrics = compute_metrics(holdings, panel[symbols], panel[BENCHMARK])
+        metrics["as_of"] = date.today()
+        metrics["calculation_timestamp"] = datetime.now()
+
+        rows = copy_upsert(conn, "portfolio_risk_metrics", [metrics], METRIC_COLUMNS, conflict=("portfolio_id", "as_of"))
+
+    logger.info(
+        f"✅ Portfolio risk metrics: {rows} portfolios x {len(symbols)} symbols "
+        f"x {len(panel)} days in {time.time() - start:.1f}s"
+    )
+    return rows
+
+
+def main():
+    run()
+
+
+if __name__ == "__main__":
+    main()
@@ -21,13 +21,19 @@ from pathlib import Path
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from analytics.drift_sketch import accumulate, load_baseline
+
+MODEL_VERSION = "v1_4"
+# Read by jobs/persist_ml_signals.py (next step of scripts/cron_daily_signals.py)
+LATEST_SIGNALS_PATH = "outputs/model_a_ml_signals_latest.csv"
+
 def load_models():
     """Load trained Model A classifier and regressor."""
     model_dir = Path(__file__).parent.parent / "models"
 
-    classifier_path = model_dir / "model_a_v1_4_classifier.pkl"
-    regressor_path = model_dir / "model_a_v1_4_regressor.pkl"
-    features_path = model_dir / "model_a_v1_4_features.json"
+    classifier_path = model_dir / f"model_a_{MODEL_VERSION}_classifier.pkl"
+    regressor_path = model_dir / f"model_a_{MODEL_VERSION}_regressor.pkl"
+    features_path = model_dir / f"model_a_{MODEL_VERSION}_features.json"
 
     if not classifier_path.exists():
         raise FileNotFoundError(f"Classifier not found: {classifier_path}")
@@ -114,7 +120,23 @@ def compute_features(df):
     return df
 
 
-def generate_signals(df, classifier, regressor, feature_names):
+def record_drift(conn, X):
+    """Add this run's scored feature rows to today's drift sketch (model_drift_sketches)."""
+    model_dir = Path(__file__).parent.parent / "models"
+    try:
+        baseline = load_baseline(conn, "model_a", MODEL_VERSION, str(model_dir))
+        if baseline is None:
+            print(f"   ⚠️ No drift baseline for model_a {MODEL_VERSION}; skipping drift sketch")
+            return
+        sketch = accumulate(conn, baseline, X, "model_a", MODEL_VERSION)
+        conn.commit()
+        print(f"   ✅ Drift sketch updated ({sketch.meta['rows']} rows today)")
+    except Exception as e:
+        conn.rollback()
+        print(f"   ⚠️ Drift sketch update failed: {e}")
+
+
+def generate_signals(df, classifier, regressor, feature_names, conn):
     """Generate signals for latest data point per symbol."""
     print("\n🎯 Generating signals...")
 
@@ -129,6 +151,8 @@ def generate_signals(df, classifier, regressor, feature_names):
     # Prepare features
     X = latest[feature_names]
 
+    record_drift(conn, X)
+
     # Run inference
     prob_up = classifier.predict_proba(X)[:, 1]
     expected_return = regressor.predict(X)
@@ -235,6 +259,21 @@ def save_signals(signals, conn):
     print("   ✅ Signals saved successfully")
 
 
+def export_latest(signals):
+    """Write the run's signals in the shape persist_ml_signals.py reads."""
+    out = pd.DataFrame({
+        'symbol': signals['symbol'],
+        'as_of': datetime.now().date(),
+        'ml_prob': signals['prob_up'],
+        'ml_expected_return': signals['expected_return'],
+        'signal': signals['signal'],
+        'confidence': signals['confidence'],
+    })
+    os.makedirs(os.path.dirname(LATEST_SIGNALS_PATH), exist_ok=True)
+    out.to_csv(LATEST_SIGNALS_PATH, index=False)
+    print(f"   ✅ Latest signals → {LATEST_SIGNALS_PATH}")
+
+
 def main():
     """Main execution."""
     print("="*60)
@@ -262,10 +301,11 @@ def main():
         df = compute_features(df)
 
         # Generate signals
-        signals = generate_signals(df, classifier, regressor, feature_names)
+        signals = generate_signals(df, classifier, regressor, feature_names, conn)
 
         # Save to database
         save_signals(signals, conn)
+        export_latest(signals)
 
         conn.close()
 
@@ -6,10 +6,11 @@ Fetches news articles from NewsAPI for ASX stocks and analyzes sentiment
 using FinBERT or similar financial sentiment model.
 """
 
+import asyncio
 import os
 import sys
-from datetime import datetime, timedelta
-from typing import List, Dict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
 
 import requests
 from psycopg2.extras import execute_values
@@ -17,18 +18,19 @@ from psycopg2.extras import execute_values
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.core import get_db_connection, logger
+from app.core import db_context, logger
+from services.rate_limiter import PolitenessLimiter
+from services.sentiment import get_sentiment_service
 
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 NEWS_API_URL = "https://newsapi.org/v2/everything"
+NEWS_CONCURRENCY = int(os.getenv("NEWS_API_CONCURRENCY", "4"))
+NEWS_MIN_INTERVAL = float(os.getenv("NEWS_API_MIN_INTERVAL", "1.0"))
 
 
 def get_top_tickers(limit: int = 50) -> List[str]:
     """Get top ASX tickers to fetch news for"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    try:
+    with db_context() as conn, conn.cursor() as cursor:
         # Get tickers from universe or recent signals
         cursor.execute(
             """
@@ -41,29 +43,58 @@ def get_top_tickers(limit: int = 50) -> List[str]:
             (limit,)
         )
 
-        tickers = [row[0] for row in cursor.fetchall()]
-        return tickers
-    finally:
-        cursor.close()
-        conn.close()
+        return [row[0] for row in cursor.fetchall()]
+
+
+def get_high_water_marks(tickers: List[str]) -> Dict[str, datetime]:
+    """Latest stored published_at per ticker (tickers with no news are omitted)"""
+    if not tickers:
+        return {}
+
+    with db_context() as conn, conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT ticker, MAX(published_at)
+            FROM news_sentiment
+            WHERE ticker = ANY(%s)
+            GROUP BY ticker
+            """,
+            (list(tickers),)
+        )
+        return {ticker: latest for ticker, latest in cursor.fetchall() if latest}
+
 
+def fetch_news_for_ticker(
+    ticker: str,
+    days: int = 7,
+    since: Optional[datetime] = None,
+) -> List[Dict]:
+    """
+    Fetch news articles for a specific ticker from NewsAPI
 
-def fetch_news_for_ticker(ticker: str, days: int = 7) -> List[Dict]:
-    """Fetch news articles for a specific ticker from NewsAPI"""
+    Args:
+        ticker: ASX ticker (e.g. BHP.AX)
+        days: Maximum lookback window
+        since: High-water mark; only articles published after it are requested
+    """
     if not NEWS_API_KEY:
         logger.warning("NEWS_API_KEY not set, skipping news fetch")
         return []
 
-    end_date = datetime.now()
+    end_date = datetime.now(timezone.utc)
     start_date = end_date - timedelta(days=days)
+    if since is not None:
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        start_date = max(start_date, since + timedelta(seconds=1))
 
     # Remove .AX suffix for search
     search_ticker = ticker.replace('.AX', '')
 
     params = {
         "q": f"{search_ticker} OR ASX:{search_ticker}",
-        "from": start_date.isoformat(),
-        "to": end_date.isoformat(),
+        "from": start_date.strftime("%Y-%m-%dT%H:%M:%S"),
+        "to": end_date.strftime("%Y-%m-%dT%H:%M:%S"),
         "language": "en",
         "sortBy": "publishedAt",
         "apiKey": NEWS_API_KEY,
@@ -84,128 +115,80 @@ def fetch_news_for_ticker(ticker: str, days: int = 7) -> List[Dict]:
         return []
 
 
+async def fetch_news_for_tickers(
+    tickers: List[str],
+    days: int = 7,
+    high_water_marks: Optional[Dict[str, datetime]] = None,
+) -> Dict[str, List[Dict]]:
+    """Fetch all tickers concurrently under one shared NewsAPI rate limit"""
+    high_water_marks = high_water_marks or {}
+    limiter = PolitenessLimiter(NEWS_CONCURRENCY, NEWS_MIN_INTERVAL)
+
+    async def fetch(ticker: str) -> List[Dict]:
+        async with limiter:
+            return await asyncio.to_thread(
+                fetch_news_for_ticker, ticker, days, high_water_marks.get(ticker)
+            )
+
+    results = await asyncio.gather(*(fetch(ticker) for ticker in tickers))
+    return dict(zip(tickers, results))
+
+
 def analyze_sentiment(text: str) -> Dict[str, any]:
     """
-    Analyze sentiment using FinBERT or fallback to basic analysis
+    Analyze sentiment using the shared FinBERT service (falls back to
+    basic keyword analysis when the model is unavailable)
 
     Returns:
         dict with 'label' (positive/negative/neutral) and 'score' (0-1)
     """
-    try:
-        # Try to use transformers with FinBERT
-        from transformers import pipeline
-
-        # Use FinBERT for financial sentiment
-        sentiment_pipeline = pipeline(
-            "sentiment-analysis",
-            model="ProsusAI/finbert",
-            tokenizer="ProsusAI/finbert"
-        )
-
-        # Truncate to max length (512 tokens)
-        result = sentiment_pipeline(text[:512])
-
-        label = result[0]["label"].lower()
-        score = result[0]["score"]
+    return analyze_sentiments([text])[0]
 
-        # Map FinBERT labels to our labels
-        label_map = {
-            "positive": "positive",
-            "negative": "negative",
-            "neutral": "neutral"
-        }
 
-        return {
-            "label": label_map.get(label, "neutral"),
-            "score": score
-        }
+def analyze_sentiments(texts: List[str]) -> List[Dict[str, any]]:
+    """Batched analyze_sentiment: one model call per batch of texts"""
+    results = get_sentiment_service().analyze_batch(texts)
+    return [{"label": r["label"], "score": r["score"]} for r in results]
 
-    except ImportError:
-        logger.warning("transformers not available, using basic sentiment")
-        return basic_sentiment_analysis(text)
 
-
-def basic_sentiment_analysis(text: str) -> Dict[str, any]:
-    """
-    Basic sentiment analysis as fallback
-    Counts positive/negative keywords
-    """
-    text_lower = text.lower()
-
-    positive_keywords = [
-        'profit', 'growth', 'increase', 'gain', 'upgrade', 'strong',
-        'beat', 'exceed', 'outperform', 'positive', 'bullish', 'rally'
+def build_news_records(articles_by_ticker: Dict[str, List[Dict]]) -> List[tuple]:
+    """Score sentiment for every article in one batch and build insert rows"""
+    pairs = [
+        (ticker, article)
+        for ticker, articles in articles_by_ticker.items()
+        for article in articles
+        if article.get("url") and article.get("title")
     ]
 
-    negative_keywords = [
-        'loss', 'decline', 'decrease', 'downgrade', 'weak', 'miss',
-        'underperform', 'negative', 'bearish', 'crash', 'fall', 'drop'
-    ]
-
-    pos_count = sum(1 for word in positive_keywords if word in text_lower)
-    neg_count = sum(1 for word in negative_keywords if word in text_lower)
-
-    total = pos_count + neg_count
-
-    if total == 0:
-        return {"label": "neutral", "score": 0.5}
-
-    if pos_count > neg_count:
-        return {"label": "positive", "score": min(0.5 + (pos_count - neg_count) * 0.1, 1.0)}
-    elif neg_count > pos_count:
-        return {"label": "negative", "score": min(0.5 + (neg_count - pos_count) * 0.1, 1.0)}
-    else:
-        return {"label": "neutral", "score": 0.5}
-
-
-def store_news_articles(ticker: str, articles: List[Dict]) -> int:
-    """Store news articles with sentiment in database"""
-    if not articles:
-        return 0
-
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    # Combine title and description for sentiment analysis
+    sentiments = analyze_sentiments(
+        [f"{a.get('title', '')}. {a.get('description', '')}" for _, a in pairs]
+    )
 
     records = []
-
-    for article in articles:
-        title = article.get("title", "")
-        description = article.get("description", "")
-        content = article.get("content", "")
-        url = article.get("url", "")
-        published_at = article.get("publishedAt", "")
-        source_name = article.get("source", {}).get("name", "NewsAPI")
-        author = article.get("author", "")
-
-        if not url or not title:
-            continue
-
-        # Combine title and description for sentiment analysis
-        text_for_sentiment = f"{title}. {description}"
-
-        # Analyze sentiment
-        sentiment = analyze_sentiment(text_for_sentiment)
-
+    for (ticker, article), sentiment in zip(pairs, sentiments):
         records.append((
             ticker,
-            title,
-            content,
-            url,
-            published_at,
+            article.get("title", ""),
+            article.get("content", ""),
+            article.get("url", ""),
+            article.get("publishedAt", ""),
             sentiment["label"],
             sentiment["score"],
-            source_name,
-            author
+            (article.get("source") or {}).get("name", "NewsAPI"),
+            article.get("author", ""),
         ))
+    return records
 
+
+def insert_news_records(records: List[tuple]) -> int:
+    """Bulk insert news rows in a single transaction; returns rows inserted"""
     if not records:
-        cursor.close()
-        conn.close()
         return 0
 
-    try:
+    with db_context() as conn, conn.cursor() as cursor:
         # Insert with ON CONFLICT DO NOTHING to avoid duplicates
-        execute_values(
+        inserted = execute_values(
             cursor,
             """
             INSERT INTO news_sentiment (
@@ -214,23 +197,23 @@ def store_news_articles(ticker: str, articles: List[Dict]) -> int:
             )
             VALUES %s
             ON CONFLICT (url) DO NOTHING
+            RETURNING 1
             """,
-            records
+            records,
+            fetch=True,
         )
+    return len(inserted)
 
-        inserted_count = cursor.rowcount
-        conn.commit()
 
+def store_news_articles(ticker: str, articles: List[Dict]) -> int:
+    """Store news articles with sentiment in database"""
+    try:
+        inserted_count = insert_news_records(build_news_records({ticker: articles}))
         logger.info(f"Stored {inserted_count} new articles for {ticker}")
         return inserted_count
-
     except Exception as e:
         logger.error(f"Error storing articles for {ticker}: {e}")
-        conn.rollback()
         return 0
-    finally:
-        cursor.close()
-        conn.close()
 
 
 def run_news_ingestion(ticker_limit: int = 50, days: int = 7):
@@ -238,21 +221,22 @@ def run_news_ingestion(ticker_limit: int = 50, days: int = 7):
     logger.info(f"Starting news ingestion for top {ticker_limit} tickers")
 
     tickers = get_top_tickers(limit=ticker_limit)
-    logger.info(f"Fetching news for {len(tickers)} tickers")
-
-    total_articles = 0
-
-    for ticker in tickers:
-        logger.info(f"Processing {ticker}...")
-
-        articles = fetch_news_for_ticker(ticker, days=days)
-        stored = store_news_articles(ticker, articles)
+    high_water_marks = get_high_water_marks(tickers)
+    logger.info(
+        f"Fetching news for {len(tickers)} tickers "
+        f"({len(high_water_marks)} incremental from last ingest)"
+    )
 
-        total_articles += stored
+    articles_by_ticker = asyncio.run(
+        fetch_news_for_tickers(tickers, days=days, high_water_marks=high_water_marks)
+    )
+    records = build_news_records(articles_by_ticker)
 
-        # Be respectful of API rate limits
-        import time
-        time.sleep(1)  # 1 second between requests
+    try:
+        total_articles = insert_news_records(records)
+    except Exception as e:
+        logger.error(f"Error storing news articles: {e}")
+        return 0
 
     logger.info(f"News ingestion complete. Stored {total_articles} total articles")
     return total_articles
@@ -3,35 +3,29 @@ jobs/loan_simulator.py
 Loan amortization, refinancing, and repayment optimization engine.
 """
 
-import pandas as pd
-
-def loan_amortization(principal, annual_rate, years, extra_payment=0.0):
-    rate = annual_rate / 12
-    months = years * 12
-    monthly_payment = principal * (rate / (1 - (1 + rate) ** -months))
-    schedule = []
-    balance = principal
-    for m in range(1, months + 1):
-        interest = balance * rate
-        principal_paid = monthly_payment - interest + extra_payment
-        balance -= principal_paid
-        schedule.append({
-            "month": m,
-            "interest": interest,
-            "principal_paid": principal_paid,
-            "balance": max(balance, 0)
-        })
-        if balance <= 0:
-            break
-    df = pd.DataFrame(schedule)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.amortization import amortize, monthly_payment, scenario_grid, schedule
+
+
+def loan_amortization(principal, annual_rate, years, extra_payment=0.0, offset_balance=0.0):
+    df = schedule(principal, annual_rate, years, extra_payment, offset_balance)
     total_interest = df["interest"].sum()
     print(f"🏦 Loan fully repaid in {len(df)} months, total interest: ${total_interest:,.2f}")
     return df
 
+def loan_scenarios(principal, annual_rates, years, extra_payments=(0.0,), offset_balances=(0.0,), schedules=False):
+    """Summary (and optionally schedules) for every combination of the given scenario values."""
+    grid = scenario_grid(principal, annual_rates, years, extra_payments, offset_balances)
+    return amortize(grid["principal"], grid["annual_rate"], grid["years"], grid["extra_payment"],
+                    grid["offset_balance"], schedules=schedules)
+
 def compare_refinancing(principal, current_rate, new_rate, years_left):
-    cur_payment = principal * ((current_rate / 12) / (1 - (1 + current_rate / 12) ** -(years_left * 12)))
-    new_payment = principal * ((new_rate / 12) / (1 - (1 + new_rate / 12) ** -(years_left * 12)))
-    diff = cur_payment - new_payment
+    cur_payment, new_payment = monthly_payment(principal, [current_rate, new_rate], years_left * 12)
+    diff = float(cur_payment - new_payment)
     print(f"💰 Refinancing from {current_rate*100:.2f}% to {new_rate*100:.2f}% saves ${diff:,.2f}/mo.")
     return diff
 
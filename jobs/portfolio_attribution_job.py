@@ -1,125 +1,243 @@
 """
 jobs/portfolio_attribution_job.py
-Compute simple portfolio attribution from signals and prices.
+Compute portfolio attribution from signals and prices.
+
+Attribution is incremental: by default every signal date of the model that
+has no portfolio_attribution rows yet is computed, so a daily run only does
+the new day and the first run backfills history. The last
+ATTRIBUTION_RECOMPUTE_DATES signal dates are always recomputed as well, so
+a date attributed before its prices had loaded (zero or partial returns)
+is corrected on the following runs. All pending dates are
+computed together (analytics/attribution.py) from one signals query and
+one prices query, then written per date:
+
+    portfolio_attribution         per-holding weight, return and contribution
+    portfolio_attribution_sector  Brinson allocation / selection / interaction
+    portfolio_performance         portfolio return
+
+A date's return is each symbol's close-to-close return on that date
+(0 when it has no bar that day).
+
+Usage:
+    python jobs/portfolio_attribution_job.py [--model M] [--as-of YYYY-MM-DD] [--start YYYY-MM-DD] [--max-dates N]
 """
 
+import argparse
 import os
-from typing import Optional
+import sys
+from typing import List, Optional
 
 import pandas as pd
 import psycopg2
 from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import attribution
+
 load_dotenv(dotenv_path=".env", override=True)
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 DEFAULT_MODEL = os.getenv("PORTFOLIO_MODEL", "model_a_v1_1")
 DEFAULT_AS_OF = os.getenv("AS_OF")
 
+# Calendar days of prices loaded before the first date (for its previous close)
+PRICE_PAD_DAYS = 10
+# Most recent signal dates recomputed on every run (prices may have landed late)
+ATTRIBUTION_RECOMPUTE_DATES = int(os.getenv("ATTRIBUTION_RECOMPUTE_DATES", "5"))
+
 if not DATABASE_URL:
     raise SystemExit("DATABASE_URL not set")
 
 
-def _resolve_as_of(cur, model: str, as_of: Optional[str]) -> Optional[str]:
-    if as_of:
-        return as_of
+def _pending_dates(cur, model: str, start: Optional[str]) -> List[str]:
+    """Signal dates of the model (from start) with no attribution rows yet, plus the trailing recompute window."""
     cur.execute(
         """
-        select max(as_of)
+        with dates as (
+            select distinct as_of
+            from signals
+            where model = %s
+              and (%s::date is null or as_of >= %s::date)
+        ),
+        trailing as (
+            select as_of from dates order by as_of desc limit %s
+        )
+        select d.as_of
+        from dates d
+        where d.as_of in (select as_of from trailing)
+           or not exists (
+               select 1 from portfolio_attribution a
+               where a.model = %s and a.as_of = d.as_of
+           )
+        order by d.as_of
+        """,
+        (model, start, start, ATTRIBUTION_RECOMPUTE_DATES, model),
+    )
+    return [row[0].isoformat() for row in cur.fetchall()]
+
+
+def _load_weights(con, model: str, dates: List[str]) -> pd.DataFrame:
+    """Signal target weights, dates x symbols (NaN where a symbol has no signal that day)."""
+    sig = pd.read_sql(
+        """
+        select as_of, symbol, target_weight
         from signals
-        where model = %s
+        where model = %s and as_of = any(%s::date[])
+        """,
+        con,
+        params=(model, dates),
+    )
+    sig["as_of"] = pd.to_datetime(sig["as_of"])
+    # A signal row without a weight is in the universe at weight 0
+    sig["target_weight"] = pd.to_numeric(sig["target_weight"], errors="coerce").fillna(0.0)
+    return sig.pivot_table(index="as_of", columns="symbol", values="target_weight", aggfunc="last")
+
+
+def _load_returns(con, symbols: List[str], dates: pd.DatetimeIndex) -> pd.DataFrame:
+    """Close-to-close returns on each date, dates x symbols (NaN where no bar that day)."""
+    px = pd.read_sql(
+        """
+        select dt, symbol, close
+        from prices
+        where symbol = any(%s)
+          and dt between %s::date - (%s * interval '1 day') and %s::date
+        order by symbol, dt
+        """,
+        con,
+        params=(symbols, dates.min().date(), PRICE_PAD_DAYS, dates.max().date()),
+    )
+    px["dt"] = pd.to_datetime(px["dt"])
+    px["ret1"] = px.groupby("symbol")["close"].pct_change(fill_method=None)
+    returns = px.pivot_table(index="dt", columns="symbol", values="ret1", aggfunc="last")
+    return returns.reindex(index=dates, columns=symbols)
+
+
+def _load_sectors(con) -> dict:
+    df = pd.read_sql(
+        """
+        select symbol, sector
+        from fundamentals
+        where updated_at = (select max(updated_at) from fundamentals)
+        """,
+        con,
+    )
+    return dict(zip(df["symbol"], df["sector"]))
+
+
+def compute(weights: pd.DataFrame, returns: pd.DataFrame, sectors: dict):
+    """(holding rows, sector rows, daily portfolio returns) for every date in weights."""
+    returns = returns.reindex_like(weights)
+    contribution = attribution.contributions(weights, returns)
+
+    held = pd.DataFrame({
+        "weight": weights.stack(),
+        "return_1d": returns.fillna(0.0).stack(future_stack=True),
+        "contribution": contribution.stack(future_stack=True),
+    }).dropna(subset=["weight"])
+    held = held.rename_axis(["as_of", "symbol"]).reset_index()
+
+    sector_rows = attribution.sector_attribution(weights, returns, sectors)
+    performance = contribution.sum(axis=1).rename("portfolio_return")
+    return held, sector_rows, performance
+
+
+def _write(cur, model: str, held: pd.DataFrame, sector_rows: pd.DataFrame, performance: pd.Series) -> None:
+    dates = [d.date() for d in performance.index]
+    for table in ("portfolio_attribution", "portfolio_attribution_sector"):
+        cur.execute(f"delete from {table} where model = %s and as_of = any(%s)", (model, dates))
+
+    execute_values(
+        cur,
+        """
+        insert into portfolio_attribution (model, as_of, symbol, weight, return_1d, contribution)
+        values %s
+        """,
+        list(zip(
+            [model] * len(held), held["as_of"].dt.date, held["symbol"],
+            held["weight"], held["return_1d"], held["contribution"],
+        )),
+        page_size=1000,
+    )
+    execute_values(
+        cur,
+        f"""
+        insert into portfolio_attribution_sector (model, {", ".join(attribution.SECTOR_COLUMNS)})
+        values %s
         """,
-        (model,),
+        list(zip(
+            [model] * len(sector_rows), sector_rows["as_of"].dt.date,
+            *(sector_rows[col] for col in attribution.SECTOR_COLUMNS[1:]),
+        )),
+        page_size=1000,
+    )
+    execute_values(
+        cur,
+        """
+        insert into portfolio_performance (model, as_of, portfolio_return)
+        values %s
+        on conflict (model, as_of) do update set
+            portfolio_return = excluded.portfolio_return
+        """,
+        list(zip([model] * len(performance), performance.index.date, performance)),
     )
-    row = cur.fetchone()
-    return row[0].isoformat() if row and row[0] else None
 
 
-def main(model: Optional[str] = None, as_of: Optional[str] = None) -> None:
+def main(
+    model: Optional[str] = None,
+    as_of: Optional[str] = None,
+    start: Optional[str] = None,
+    max_dates: Optional[int] = None,
+) -> List[str]:
+    """
+    Attribute an explicit date (recomputed even if present), or every pending date.
+
+    Args:
+        model: Signals model (default PORTFOLIO_MODEL)
+        as_of: Single date to (re)compute (default AS_OF, else all pending dates)
+        start: Earliest pending date to backfill from
+        max_dates: Compute only the most recent max_dates pending dates (the
+            rest are left for a later run)
+
+    Returns:
+        The dates computed
+    """
     resolved_model = model or DEFAULT_MODEL
     resolved_as_of = as_of or DEFAULT_AS_OF
 
     with psycopg2.connect(DATABASE_URL) as con, con.cursor() as cur:
-        as_of_value = _resolve_as_of(cur, resolved_model, resolved_as_of)
-        if not as_of_value:
-            print("⚠️ No signals found to compute attribution.")
-            return
-
-        sig = pd.read_sql(
-            """
-            select symbol, target_weight
-            from signals
-            where model = %s and as_of = %s
-            """,
-            con,
-            params=(resolved_model, as_of_value),
-        )
-        if sig.empty:
+        dates = [resolved_as_of] if resolved_as_of else _pending_dates(cur, resolved_model, start)
+        if max_dates is not None and len(dates) > max_dates:
+            print(f"⚠️ {len(dates) - max_dates} older pending dates left for the next run")
+            dates = dates[-max_dates:]
+        if not dates:
+            print(f"✅ Attribution up to date for {resolved_model}")
+            return []
+
+        weights = _load_weights(con, resolved_model, dates)
+        if weights.empty:
             print("⚠️ No signals rows to compute attribution.")
-            return
-
-        px = pd.read_sql(
-            """
-            select dt, symbol, close
-            from prices
-            where symbol = any(%s) and dt <= %s
-            order by symbol, dt
-            """,
-            con,
-            params=(sig["symbol"].tolist(), as_of_value),
-        )
-        if px.empty:
-            print("⚠️ No price data for attribution.")
-            return
-
-        px["dt"] = pd.to_datetime(px["dt"])
-        px = px.sort_values(["symbol", "dt"])
-        px["ret1"] = px.groupby("symbol")["close"].pct_change()
-        latest = px.groupby("symbol").tail(1)
-        latest = latest[latest["dt"].dt.date == pd.to_datetime(as_of_value).date()]
-
-        merged = sig.merge(latest[["symbol", "ret1"]], on="symbol", how="left")
-        merged["return_1d"] = merged["ret1"].fillna(0.0)
-        merged["contribution"] = merged["target_weight"].fillna(0.0) * merged["return_1d"]
-
-        rows = []
-        for r in merged.itertuples(index=False):
-            rows.append(
-                (
-                    resolved_model,
-                    as_of_value,
-                    r.symbol,
-                    float(r.target_weight) if r.target_weight is not None else None,
-                    float(r.return_1d) if r.return_1d is not None else None,
-                    float(r.contribution) if r.contribution is not None else None,
-                )
-            )
-
-        execute_values(
-            cur,
-            """
-            insert into portfolio_attribution (model, as_of, symbol, weight, return_1d, contribution)
-            values %s
-            """,
-            rows,
-        )
-
-        portfolio_return = float(merged["contribution"].sum())
-        cur.execute(
-            """
-            insert into portfolio_performance (model, as_of, portfolio_return)
-            values (%s, %s, %s)
-            on conflict (model, as_of) do update set
-                portfolio_return = excluded.portfolio_return
-            """,
-            (resolved_model, as_of_value, portfolio_return),
-        )
+            return []
 
+        returns = _load_returns(con, list(weights.columns), weights.index)
+        held, sector_rows, performance = compute(weights, returns, _load_sectors(con))
+        _write(cur, resolved_model, held, sector_rows, performance)
         con.commit()
 
-    print(f"✅ Attribution computed for {resolved_model} on {as_of_value}")
+    print(
+        f"✅ Attribution computed for {resolved_model}: {len(performance)} dates "
+        f"({performance.index.min().date()} to {performance.index.max().date()}), {len(held)} holdings rows"
+    )
+    return [d.date().isoformat() for d in performance.index]
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Compute portfolio attribution for pending signal dates")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--as-of", default=None, help="Recompute a single date")
+    parser.add_argument("--start", default=None, help="Earliest date to backfill")
+    parser.add_argument("--max-dates", type=int, default=None, help="Compute only the most recent N pending dates")
+    args = parser.parse_args()
+    main(model=args.model, as_of=args.as_of, start=args.start, max_dates=args.max_dates)
@@ -0,0 +1,120 @@
+"""
+jobs/rebalance_portfolios_job.py
+Rebalancing suggestions for every active portfolio in one pass.
+
+Run after a new signal set is persisted. Holdings' prices and signals are
+refreshed (sync_all_portfolio_prices), every active portfolio's positions
+are loaded in one query and planned in one call to
+analytics/rebalancing.py (the rules RebalancingService applies to a single
+portfolio), and each portfolio's pending suggestions are replaced in the
+same transaction.
+
+Usage:
+    python jobs/rebalance_portfolios_job.py [--skip-sync]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+from psycopg2.extras import execute_values
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import rebalancing
+from app.core import db_context, logger
+
+SUGGESTION_TTL_DAYS = int(os.getenv("REBALANCE_SUGGESTION_TTL_DAYS", "7"))
+
+
+def load_positions(conn) -> pd.DataFrame:
+    """Priced holdings of active portfolios, with the portfolio's total value."""
+    query = """
+        select h.portfolio_id, h.ticker, h.shares, h.current_price, h.current_value,
+               h.current_signal, h.signal_confidence, p.total_value
+        from user_holdings h
+        join user_portfolios p on p.id = h.portfolio_id
+        where p.is_active = true
+          and p.total_value > 0
+          and h.current_price is not null
+    """
+    df = pd.read_sql(query, conn)
+    for col in ("shares", "current_price", "current_value", "signal_confidence", "total_value"):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def replace_suggestions(conn, portfolio_ids, suggestions: pd.DataFrame) -> int:
+    """Delete the portfolios' pending suggestions and insert the new ones."""
+    expires_at = datetime.now() + timedelta(days=SUGGESTION_TTL_DAYS)
+    rows = [
+        (
+            s["portfolio_id"], s["ticker"], s["action"], s["suggested_quantity"], s["suggested_value"],
+            s["reason"], s["current_signal"], s["signal_confidence"], s["current_shares"],
+            s["current_weight_pct"], s["target_weight_pct"], s["priority"], s["confidence_score"], expires_at,
+        )
+        for s in rebalancing.records(suggestions)
+    ]
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            delete from portfolio_rebalancing_suggestions
+            where portfolio_id = any(%s)
+              and status = 'pending'
+            """,
+            ([int(p) for p in portfolio_ids],),
+        )
+        execute_values(
+            cur,
+            """
+            insert into portfolio_rebalancing_suggestions (
+                portfolio_id, ticker, action, suggested_quantity, suggested_value,
+                reason, current_signal, signal_confidence,
+                current_shares, current_weight_pct, target_weight_pct,
+                priority, confidence_score, expires_at
+            ) values %s
+            """,
+            rows,
+            page_size=1000,
+        )
+    return len(rows)
+
+
+def run(sync_prices: bool = True) -> int:
+    start = time.time()
+    with db_context() as conn:
+        if sync_prices:
+            with conn.cursor() as cur:
+                cur.execute("select * from sync_all_portfolio_prices()")
+                logger.info(f"Synced prices and signals for {len(cur.fetchall())} portfolios")
+
+        positions = load_positions(conn)
+        if positions.empty:
+            logger.info("No priced holdings in active portfolios; nothing to rebalance")
+            return 0
+
+        suggestions = rebalancing.plan_trades(positions)
+        rows = replace_suggestions(conn, positions["portfolio_id"].unique(), suggestions)
+
+    portfolios = positions["portfolio_id"].nunique()
+    mean_turnover = rebalancing.turnover(suggestions).reindex(positions["portfolio_id"].unique(), fill_value=0).mean()
+    logger.info(
+        f"✅ Rebalancing: {rows} suggestions for {portfolios} portfolios "
+        f"(mean turnover {mean_turnover:.1f}%) in {time.time() - start:.1f}s"
+    )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate rebalancing suggestions for all active portfolios")
+    parser.add_argument("--skip-sync", action="store_true", help="Use holdings' current prices and signals as stored")
+    args = parser.parse_args()
+    run(sync_prices=not args.skip_sync)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import os
+import sys
 import requests
 import subprocess
 import time
@@ -8,6 +9,9 @@ from urllib.parse import urlparse
 from dotenv import load_dotenv
 import psycopg2
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analytics.trading_calendar import latest_trading_day
+
 # Load .env so we have OS_API_KEY etc.
 load_dotenv(dotenv_path=".env", override=True)
 
@@ -135,7 +139,8 @@ def _ensure_latest_prices():
         return latest
 
     latest_dt = date.fromisoformat(str(latest))
-    target_dt = date.fromisoformat(TARGET_DATE)
+    # Weekends and ASX holidays have no bars: expect the last session on or before the target
+    target_dt = latest_trading_day(date.fromisoformat(TARGET_DATE))
     if latest_dt < target_dt:
         print(f"Latest price date {latest_dt} is older than target {target_dt}.")
         latest, _ = _refresh_last_day()
@@ -144,7 +149,7 @@ def _ensure_latest_prices():
 
         backfill_from = os.getenv("BACKFILL_FROM")
         if backfill_from:
-            _backfill_prices(backfill_from, TARGET_DATE)
+            _backfill_prices(backfill_from, target_dt.isoformat())
             latest = _get_latest_date()
     return latest
 
@@ -0,0 +1,13 @@
+-- Migration 006: Store the holdings correlation matrix with portfolio risk metrics
+-- Created: 2026-10-18
+-- Purpose: Cached risk metrics (nightly batch and API) return the same
+--          correlation_matrix as a fresh calculation
+
+ALTER TABLE portfolio_risk_metrics
+    ADD COLUMN IF NOT EXISTS correlation_matrix JSONB;
+
+-- Success message
+DO $$
+BEGIN
+    RAISE NOTICE '✓ portfolio_risk_metrics.correlation_matrix added';
+END $$;
@@ -0,0 +1,11 @@
+-- Migration 006 Rollback: Remove the correlation matrix from portfolio risk metrics
+-- Created: 2026-10-18
+
+ALTER TABLE portfolio_risk_metrics
+    DROP COLUMN IF EXISTS correlation_matrix;
+
+-- Success message
+DO $$
+BEGIN
+    RAISE NOTICE '✓ portfolio_risk_metrics.correlation_matrix removed';
+END $$;
@@ -6,6 +6,7 @@ and saves the results. Drop-in ready for Codex in VS Code.
 """
 
 import os
+import sys
 import json
 import pandas as pd
 import numpy as np
@@ -15,13 +16,24 @@ from dotenv import load_dotenv
 import requests
 import psycopg2
 from sklearn.model_selection import TimeSeriesSplit
-from sklearn.metrics import roc_auc_score, mean_squared_error, classification_report
 import lightgbm as lgb
 import matplotlib.pyplot as plt
 import seaborn as sns
 import joblib
 import shap
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analytics.drift_sketch import DriftSketch, baseline_path, save_sketch
+from analytics.feature_store import FeatureStore
+from analytics.lgbm_cv import (
+    TRAIN_THREADS_PER_JOB,
+    TRAIN_WORKERS,
+    BinnedDataset,
+    best_candidate,
+    cross_validate,
+    param_grid,
+)
+
 # ---------------------------------------------------------------------
 # 1️⃣ Load data
 # ---------------------------------------------------------------------
@@ -37,18 +49,49 @@ EXTENDED_PATH = os.environ.get("EXTENDED_FEATURES_PATH", "outputs/featureset_ext
 DATA_PATH = os.environ.get("TRAINING_DATA_PATH")
 USE_EXTENDED = os.environ.get("USE_EXTENDED_FEATURES", "")
 
-if not DATA_PATH:
-    if (USE_EXTENDED == "1" or (USE_EXTENDED == "" and os.path.exists(EXTENDED_PATH))):
-        DATA_PATH = EXTENDED_PATH
-    else:
-        DATA_PATH = "outputs/model_a_training_dataset.csv"
-
-assert os.path.exists(DATA_PATH), f"❌ Missing file: {DATA_PATH}"
+BASE_FEATURES = [
+    "mom_12_1", "mom_9", "mom_6", "mom_3",
+    "vol_30", "vol_90", "vol_ratio_30_90",
+    "adv_20_median", "adv_ratio_20_60",
+    "trend_200", "sma200_slope_pos", "trend_strength"
+]
+OPTIONAL_FEATURES = [
+    "pe_ratio", "pb_ratio", "eps", "roe", "debt_to_equity", "market_cap",
+    "pe_ratio_zscore", "pb_ratio_zscore", "roe_ratio", "debt_to_equity_ratio",
+    "atr_pct", "adv_zscore", "volume_skew_60",
+    "rba_cash_rate", "cpi", "unemployment", "yield_curve_slope", "yield_10y", "yield_2y",
+    "delta_cpi", "delta_yield_curve_slope", "delta_rba_rate",
+    "sentiment_score", "sentiment_composite",
+    "asx_sentiment_score", "asx_sentiment_confidence", "asx_announcement_count",
+    "asx_event_guidance", "asx_event_dividend", "asx_event_acquisition", "asx_event_earnings",
+    "asx_stance_bullish", "asx_stance_bearish", "asx_stance_neutral", "asx_relevance_score",
+    "roe_z", "pe_inverse", "valuation_score", "quality_score",
+    "sector", "sector_spread_1m",
+]
+# Columns the pipeline reads (features, derivation inputs, targets)
+LOAD_COLUMNS = BASE_FEATURES + OPTIONAL_FEATURES + [
+    "symbol", "dt", "date", "close", "sma200_slope", "return_1m_fwd", "return_1m_fwd_sign",
+]
 
-if DATA_PATH.endswith(".parquet"):
-    df = pd.read_parquet(DATA_PATH)
+store = FeatureStore("model_a_features_extended", date_col="date")
+if not DATA_PATH and USE_EXTENDED != "0" and "EXTENDED_FEATURES_PATH" not in os.environ and store.exists():
+    # Month partitions, only the lookback window and the columns used
+    latest = store.latest_date()
+    print(f"📦 Reading feature store {store.path} (latest {latest})")
+    df = store.read(columns=LOAD_COLUMNS, start_date=latest - relativedelta(months=LOOKBACK_MONTHS))
 else:
-    df = pd.read_csv(DATA_PATH, parse_dates=["dt"])
+    if not DATA_PATH:
+        if (USE_EXTENDED == "1" or (USE_EXTENDED == "" and os.path.exists(EXTENDED_PATH))):
+            DATA_PATH = EXTENDED_PATH
+        else:
+            DATA_PATH = "outputs/model_a_training_dataset.csv"
+
+    assert os.path.exists(DATA_PATH), f"❌ Missing file: {DATA_PATH}"
+
+    if DATA_PATH.endswith(".parquet"):
+        df = pd.read_parquet(DATA_PATH)
+    else:
+        df = pd.read_csv(DATA_PATH, parse_dates=["dt"])
 
 if "dt" not in df.columns and "date" in df.columns:
     df = df.rename(columns={"date": "dt"})
@@ -83,25 +126,6 @@ if "return_1m_fwd_sign" not in df.columns and "return_1m_fwd" in df.columns:
 # ---------------------------------------------------------------------
 # 3️⃣ Feature set + target
 # ---------------------------------------------------------------------
-BASE_FEATURES = [
-    "mom_12_1", "mom_9", "mom_6", "mom_3",
-    "vol_30", "vol_90", "vol_ratio_30_90",
-    "adv_20_median", "adv_ratio_20_60",
-    "trend_200", "sma200_slope_pos", "trend_strength"
-]
-OPTIONAL_FEATURES = [
-    "pe_ratio", "pb_ratio", "eps", "roe", "debt_to_equity", "market_cap",
-    "pe_ratio_zscore", "pb_ratio_zscore", "roe_ratio", "debt_to_equity_ratio",
-    "atr_pct", "adv_zscore", "volume_skew_60",
-    "rba_cash_rate", "cpi", "unemployment", "yield_curve_slope", "yield_10y", "yield_2y",
-    "delta_cpi", "delta_yield_curve_slope", "delta_rba_rate",
-    "sentiment_score", "sentiment_composite",
-    "asx_sentiment_score", "asx_sentiment_confidence", "asx_announcement_count",
-    "asx_event_guidance", "asx_event_dividend", "asx_event_acquisition", "asx_event_earnings",
-    "asx_stance_bullish", "asx_stance_bearish", "asx_stance_neutral", "asx_relevance_score",
-    "roe_z", "pe_inverse", "valuation_score", "quality_score",
-    "sector", "sector_spread_1m",
-]
 FEATURES = [f for f in BASE_FEATURES if f in df.columns] + [f for f in OPTIONAL_FEATURES if f in df.columns]
 FEATURES = [f for f in FEATURES if pd.api.types.is_numeric_dtype(df[f])]
 if not FEATURES:
@@ -124,36 +148,49 @@ y_reg = df[TARGET_REG]
 # ---------------------------------------------------------------------
 # 4️⃣ TimeSeries split & training
 # ---------------------------------------------------------------------
+# Binned once into a cached LightGBM binary Dataset; folds train on index
+# subsets in parallel and reuse cached fold scores when their rows are unchanged
+CLF_PARAMS = dict(
+    n_estimators=600, learning_rate=0.03, num_leaves=64,
+    subsample=0.8, colsample_bytree=0.8,
+    reg_alpha=0.2, reg_lambda=0.4,
+)
+REG_PARAMS = dict(
+    n_estimators=400, learning_rate=0.05, num_leaves=48,
+    subsample=0.8, colsample_bytree=0.8,
+)
+# Optional JSON list of param overrides to evaluate, e.g. '[{}, {"num_leaves": 32}]'
+PARAM_GRID = json.loads(os.environ.get("TRAIN_PARAM_GRID", "[{}]"))
+
 tscv = TimeSeriesSplit(n_splits=CV_FOLDS)
-auc_scores, rmse_scores = [], []
-
-print("⚙️ Starting LightGBM training across time splits...")
-for fold, (train_idx, val_idx) in enumerate(tscv.split(X), 1):
-    X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
-    y_train, y_val = y_class.iloc[train_idx], y_class.iloc[val_idx]
-
-    clf = lgb.LGBMClassifier(
-        n_estimators=600, learning_rate=0.03, num_leaves=64,
-        subsample=0.8, colsample_bytree=0.8,
-        reg_alpha=0.2, reg_lambda=0.4,
-        random_state=fold
-    )
-    clf.fit(X_train, y_train)
-    val_pred = clf.predict_proba(X_val)[:, 1]
-    auc = roc_auc_score(y_val, val_pred)
-    auc_scores.append(auc)
-    print(f"Fold {fold}: ROC-AUC = {auc:.3f}")
+folds = list(tscv.split(X))
+data = BinnedDataset(X, {"class": y_class, "reg": y_reg})
+clf_candidates = {
+    f"clf_{i}": {"label": "class", "objective": "binary", "metric": "auc", "params": p}
+    for i, p in enumerate(param_grid(PARAM_GRID, CLF_PARAMS))
+}
+reg_candidates = {
+    f"reg_{i}": {"label": "reg", "objective": "regression", "metric": "rmse", "params": p}
+    for i, p in enumerate(param_grid(PARAM_GRID, REG_PARAMS))
+}
 
-    reg = lgb.LGBMRegressor(
-        n_estimators=400, learning_rate=0.05, num_leaves=48,
-        subsample=0.8, colsample_bytree=0.8,
-        random_state=fold
-    )
-    reg.fit(X_train, y_reg.iloc[train_idx])
-    val_reg = reg.predict(X_val)
-    rmse = np.sqrt(mean_squared_error(y_reg.iloc[val_idx], val_reg))
-    rmse_scores.append(rmse)
+print(
+    f"⚙️ Starting LightGBM training across time splits "
+    f"({TRAIN_WORKERS} jobs x {TRAIN_THREADS_PER_JOB} threads, dataset {'cached' if data.from_cache else 'binned'})..."
+)
+cv_results = cross_validate(data, folds, {**clf_candidates, **reg_candidates})
+print(f"   {int(cv_results['cached'].sum())}/{len(cv_results)} fold results from cache")
+
+best_clf = best_candidate(cv_results[cv_results["candidate"].isin(clf_candidates)], clf_candidates)
+best_reg = best_candidate(cv_results[cv_results["candidate"].isin(reg_candidates)], reg_candidates)
+auc_scores = cv_results.loc[cv_results["candidate"] == best_clf, "score"].tolist()
+rmse_scores = cv_results.loc[cv_results["candidate"] == best_reg, "score"].tolist()
+for fold, (auc, rmse) in enumerate(zip(auc_scores, rmse_scores), 1):
+    print(f"Fold {fold}: ROC-AUC = {auc:.3f}")
     print(f"Fold {fold}: RMSE = {rmse:.4f}")
+if len(PARAM_GRID) > 1:
+    print(f"🏆 Best candidates: {best_clf} {PARAM_GRID[int(best_clf.split('_')[1])]}, "
+          f"{best_reg} {PARAM_GRID[int(best_reg.split('_')[1])]}")
 
 print(f"\n✅ Mean ROC-AUC: {np.mean(auc_scores):.3f} ± {np.std(auc_scores):.3f}")
 print(f"✅ Mean RMSE: {np.mean(rmse_scores):.4f} ± {np.std(rmse_scores):.4f}")
@@ -161,19 +198,22 @@ print(f"✅ Mean RMSE: {np.mean(rmse_scores):.4f} ± {np.std(rmse_scores):.4f}")
 # ---------------------------------------------------------------------
 # 5️⃣ Final fit on full dataset
 # ---------------------------------------------------------------------
-clf_final = lgb.LGBMClassifier(
-    n_estimators=800, learning_rate=0.03, num_leaves=64,
-    subsample=0.8, colsample_bytree=0.8,
-    reg_alpha=0.2, reg_lambda=0.4,
-    random_state=42
-)
+# More rounds than in CV for the full dataset, unless the winning
+# TRAIN_PARAM_GRID override set n_estimators itself
+clf_override = PARAM_GRID[int(best_clf.split("_")[1])]
+reg_override = PARAM_GRID[int(best_reg.split("_")[1])]
+clf_final = lgb.LGBMClassifier(**{
+    **clf_candidates[best_clf]["params"],
+    "n_estimators": clf_override.get("n_estimators", 800),
+    "random_state": 42,
+})
 clf_final.fit(X, y_class)
 
-reg_final = lgb.LGBMRegressor(
-    n_estimators=600, learning_rate=0.05, num_leaves=48,
-    subsample=0.8, colsample_bytree=0.8,
-    random_state=42
-)
+reg_final = lgb.LGBMRegressor(**{
+    **reg_candidates[best_reg]["params"],
+    "n_estimators": reg_override.get("n_estimators", 600),
+    "random_state": 42,
+})
 reg_final.fit(X, y_reg)
 
 # ---------------------------------------------------------------------
@@ -207,6 +247,19 @@ joblib.dump(reg_final, reg_path)
 joblib.dump(clf_final, clf_path_ts)
 joblib.dump(reg_final, reg_path_ts)
 
+# Training feature distributions, frozen for drift checks against scoring runs
+# (next to the model, and in model_drift_sketches for the drift cron)
+drift_baseline_path = baseline_path("model_a", MODEL_VERSION)
+drift_baseline = DriftSketch.from_baseline(X, FEATURES, model="model_a_ml", version=MODEL_VERSION)
+drift_baseline.save(drift_baseline_path)
+if DATABASE_URL and "..." not in DATABASE_URL:
+    try:
+        with psycopg2.connect(DATABASE_URL) as con:
+            save_sketch(con, drift_baseline, "model_a", MODEL_VERSION, kind="baseline")
+        con.close()
+    except Exception as e:
+        print(f"⚠️ Drift baseline not stored in DB: {e}")
+
 with open(meta_path, "w") as f:
     f.write(f"ROC-AUC Mean: {np.mean(auc_scores):.4f}\n")
     f.write(f"RMSE Mean: {np.mean(rmse_scores):.4f}\n")
@@ -241,6 +294,7 @@ with open(metrics_path, "w") as f:
     )
 
 print(f"\n💾 Saved models →\n  {clf_path}\n  {reg_path}\n📘 Summary → {meta_path}")
+print(f"📊 Drift baseline → {drift_baseline_path}")
 print(f"📈 Feature importance → {feature_json_path}")
 print("\nTop features:")
 print(imp_df.head(10).to_string(index=False))
@@ -298,6 +352,7 @@ registry_payload = {
         "summary": meta_path,
         "feature_importance": feature_json_path,
         "metrics": metrics_path,
+        "drift_baseline": drift_baseline_path,
     },
 }
 _post_json("/registry/model_run", registry_payload)
@@ -8,6 +8,7 @@ Model B complements Model A (momentum) to create an ensemble system.
 """
 
 import os
+import sys
 import json
 import pandas as pd
 import numpy as np
@@ -24,6 +25,19 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import joblib
 import shap
+import psycopg2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analytics.feature_store import FeatureStore
+from analytics.lgbm_cv import (
+    TRAIN_THREADS_PER_JOB,
+    TRAIN_WORKERS,
+    BinnedDataset,
+    best_candidate,
+    cross_validate,
+    param_grid,
+)
+from analytics.forward_returns import attach_labels
 
 # ---------------------------------------------------------------------
 # Configuration
@@ -40,27 +54,6 @@ EXTENDED_PATH = os.environ.get("EXTENDED_FEATURES_PATH", "outputs/featureset_ext
 OUTPUT_DIR = "models"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# Load data
-assert os.path.exists(EXTENDED_PATH), f"❌ Missing file: {EXTENDED_PATH}"
-print(f"📊 Loading data from {EXTENDED_PATH}...")
-df = pd.read_parquet(EXTENDED_PATH)
-
-# Date handling
-if "dt" not in df.columns and "date" in df.columns:
-    df = df.rename(columns={"date": "dt"})
-df["dt"] = pd.to_datetime(df["dt"])
-df = df.sort_values(["symbol", "dt"])
-
-# Filter to lookback period
-cutoff = df["dt"].max() - relativedelta(months=LOOKBACK_MONTHS)
-df = df[df["dt"] >= cutoff]
-print(f"✅ Loaded {len(df):,} rows across {df['symbol'].nunique()} symbols.")
-
-# ---------------------------------------------------------------------
-# Feature Engineering for Model B
-# ---------------------------------------------------------------------
-print("\n⚙️ Engineering fundamental features for Model B...")
-
 # Core fundamental features (10 metrics as per plan)
 BASE_FEATURES = [
     "pe_ratio",
@@ -92,6 +85,37 @@ OPTIONAL_FEATURES = [
     "div_yield",
 ]
 
+# Load data: month partitions of the feature store (lookback window and the
+# columns used only), else the single-file export
+store = FeatureStore("model_a_features_extended", date_col="date")
+if "EXTENDED_FEATURES_PATH" not in os.environ and store.exists():
+    latest = store.latest_date()
+    print(f"📊 Loading data from feature store {store.path} (latest {latest})...")
+    df = store.read(
+        columns=BASE_FEATURES + DERIVED_FEATURES + OPTIONAL_FEATURES + ["symbol", "date", "dt", "close"],
+        start_date=latest - relativedelta(months=LOOKBACK_MONTHS),
+    )
+else:
+    assert os.path.exists(EXTENDED_PATH), f"❌ Missing file: {EXTENDED_PATH}"
+    print(f"📊 Loading data from {EXTENDED_PATH}...")
+    df = pd.read_parquet(EXTENDED_PATH)
+
+# Date handling
+if "dt" not in df.columns and "date" in df.columns:
+    df = df.rename(columns={"date": "dt"})
+df["dt"] = pd.to_datetime(df["dt"])
+df = df.sort_values(["symbol", "dt"])
+
+# Filter to lookback period
+cutoff = df["dt"].max() - relativedelta(months=LOOKBACK_MONTHS)
+df = df[df["dt"] >= cutoff]
+print(f"✅ Loaded {len(df):,} rows across {df['symbol'].nunique()} symbols.")
+
+# ---------------------------------------------------------------------
+# Feature Engineering for Model B
+# ---------------------------------------------------------------------
+print("\n⚙️ Engineering fundamental features for Model B...")
+
 # Combine all features
 FEATURES = []
 for f in BASE_FEATURES + DERIVED_FEATURES + OPTIONAL_FEATURES:
@@ -122,8 +146,12 @@ print(f"\n✅ Using {len(FEATURES)} features with >60% coverage")
 # ---------------------------------------------------------------------
 print("\n🎯 Creating target variable (fundamental quality grades)...")
 
-# Calculate 6-month forward return
-df["return_6m_fwd"] = df.groupby("symbol")["close"].shift(-126) / df["close"] - 1
+# 6-month (126 trading day) forward return from the forward_returns table
+if DATABASE_URL:
+    with psycopg2.connect(DATABASE_URL) as con:
+        df = attach_labels(df, con, horizons=(126,))
+else:
+    df = attach_labels(df, horizons=(126,))
 
 # Create quality quintiles based on forward returns
 df = df.dropna(subset=["return_6m_fwd"])
@@ -156,42 +184,43 @@ print(f"\n✅ Final dataset: {len(X):,} rows, {len(FEATURES)} features")
 # ---------------------------------------------------------------------
 print(f"\n⚙️ Starting LightGBM training with {CV_FOLDS} time series folds...")
 
-tscv = TimeSeriesSplit(n_splits=CV_FOLDS)
-auc_scores = []
-models = []
-
-for fold, (train_idx, val_idx) in enumerate(tscv.split(X), 1):
-    X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
-    y_train, y_val = y_binary.iloc[train_idx], y_binary.iloc[val_idx]
-
-    # LightGBM Classifier (optimized for fundamentals)
-    clf = lgb.LGBMClassifier(
-        n_estimators=300,
-        learning_rate=0.05,
-        num_leaves=32,
-        max_depth=6,
-        min_child_samples=50,
-        subsample=0.8,
-        colsample_bytree=0.8,
-        reg_alpha=0.1,
-        reg_lambda=0.1,
-        random_state=42,
-        verbose=-1,
-        class_weight='balanced'  # Handle class imbalance
-    )
-
-    clf.fit(
-        X_train, y_train,
-        eval_set=[(X_val, y_val)],
-        callbacks=[lgb.early_stopping(stopping_rounds=20, verbose=False)]
-    )
+# Binned once into a cached LightGBM binary Dataset; folds (and any TRAIN_PARAM_GRID
+# candidates) train on index subsets in parallel, reusing cached fold scores
+CLF_PARAMS = dict(
+    n_estimators=300,
+    learning_rate=0.05,
+    num_leaves=32,
+    max_depth=6,
+    min_child_samples=50,
+    subsample=0.8,
+    colsample_bytree=0.8,
+    reg_alpha=0.1,
+    reg_lambda=0.1,
+    random_state=42,
+    verbose=-1,
+    class_weight='balanced'  # Handle class imbalance
+)
+PARAM_GRID = json.loads(os.environ.get("TRAIN_PARAM_GRID", "[{}]"))
 
-    val_pred = clf.predict_proba(X_val)[:, 1]
-    auc = roc_auc_score(y_val, val_pred)
-    auc_scores.append(auc)
-    models.append(clf)
+tscv = TimeSeriesSplit(n_splits=CV_FOLDS)
+data = BinnedDataset(X, {"binary": y_binary})
+candidates = {
+    f"clf_{i}": {
+        "label": "binary", "objective": "binary", "metric": "auc", "params": p,
+        "early_stopping_rounds": 20,
+    }
+    for i, p in enumerate(param_grid(PARAM_GRID, CLF_PARAMS))
+}
+print(f"   {TRAIN_WORKERS} jobs x {TRAIN_THREADS_PER_JOB} threads, dataset {'cached' if data.from_cache else 'binned'}")
 
+cv_results = cross_validate(data, list(tscv.split(X)), candidates)
+best = best_candidate(cv_results, candidates)
+auc_scores = cv_results.loc[cv_results["candidate"] == best, "score"].tolist()
+print(f"   {int(cv_results['cached'].sum())}/{len(cv_results)} fold results from cache")
+for fold, auc in enumerate(auc_scores, 1):
     print(f"   Fold {fold}/{CV_FOLDS}: ROC-AUC = {auc:.3f}")
+if len(candidates) > 1:
+    print(f"   Best candidate: {best} {candidates[best]['params']}")
 
 mean_auc = np.mean(auc_scores)
 print(f"\n📊 Cross-validation ROC-AUC: {mean_auc:.3f} ± {np.std(auc_scores):.3f}")
@@ -207,20 +236,7 @@ else:
 # ---------------------------------------------------------------------
 print("\n⚙️ Training final Model B on full dataset...")
 
-final_clf = lgb.LGBMClassifier(
-    n_estimators=400,
-    learning_rate=0.05,
-    num_leaves=32,
-    max_depth=6,
-    min_child_samples=50,
-    subsample=0.8,
-    colsample_bytree=0.8,
-    reg_alpha=0.1,
-    reg_lambda=0.1,
-    random_state=42,
-    verbose=-1,
-    class_weight='balanced'
-)
+final_clf = lgb.LGBMClassifier(**{**candidates[best]["params"], "n_estimators": 400})
 
 final_clf.fit(X, y_binary)
 
@@ -0,0 +1,17 @@
+-- Forward returns per (symbol, dt, horizon), horizon in ASX trading days
+-- (sessions ahead on the exchange calendar). Shared by signal
+-- accuracy metrics, training labels and backtests.
+-- Maintained incrementally by jobs/compute_forward_returns_job.py.
+create table if not exists forward_returns (
+    symbol text not null,
+    dt date not null,                      -- start bar
+    horizon int not null,                  -- trading days ahead (1, 5, 21, 63, 126)
+    fwd_return real not null,              -- close[end_dt] / close[dt] - 1
+    end_dt date not null,                  -- session the return is measured to
+    updated_at timestamptz not null default now(),
+    primary key (symbol, dt, horizon)
+);
+
+create index if not exists idx_forward_returns_dt_horizon on forward_returns (dt, horizon);
+
+comment on table forward_returns is 'Precomputed trading-day forward returns per symbol, date and horizon';
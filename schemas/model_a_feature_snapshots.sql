@@ -0,0 +1,18 @@
+-- Point-in-time Model A feature snapshots, one row per (symbol, as_of, feature set).
+-- Written as a by-product of each Model A scoring run so single-ticker
+-- lookups can score from one indexed row instead of rebuilding 520 days
+-- of price features.
+create table if not exists model_a_feature_snapshots (
+    symbol text not null,
+    as_of date not null,
+    feature_set_version text not null,
+    features jsonb not null, -- feature name -> value (null when undefined)
+    created_at timestamptz not null default now(),
+    primary key (symbol, as_of, feature_set_version)
+);
+
+create index if not exists idx_model_a_feature_snapshots_asof
+    on model_a_feature_snapshots(as_of desc);
+
+comment on table model_a_feature_snapshots is 'Model A engineered features per symbol and date, keyed by feature-set version';
+comment on column model_a_feature_snapshots.feature_set_version is 'Bumped whenever the feature pipeline changes; stale versions are never scored';
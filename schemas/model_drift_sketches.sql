@@ -0,0 +1,15 @@
+-- Feature drift histogram sketches (analytics/drift_sketch.py), shared
+-- between the scoring cron that writes them and the drift cron that reads
+-- them. kind = 'baseline' is the sketch frozen at training time (day = day
+-- frozen); kind = 'daily' accumulates every scoring run of that day.
+create table if not exists model_drift_sketches (
+    model text not null,
+    version text not null,
+    kind text not null check (kind in ('baseline', 'daily')),
+    day date not null,
+    sketch jsonb not null, -- features, bin edges, counts, missing, meta
+    updated_at timestamptz not null default now(),
+    primary key (model, version, kind, day)
+);
+
+comment on table model_drift_sketches is 'Per-feature histogram counts for PSI drift, frozen baselines and daily scoring sketches';
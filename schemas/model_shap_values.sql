@@ -0,0 +1,25 @@
+-- Per-symbol TreeSHAP feature contributions, computed in one batched
+-- LightGBM pred_contrib pass during each daily scoring run.
+-- Feature names are stored once per model version; each row holds a
+-- float4 array aligned with them, so reasoning endpoints are pure lookups.
+create table if not exists model_shap_feature_sets (
+    model_version text primary key,          -- e.g. model_a_v1.1
+    feature_names text[] not null,
+    created_at timestamptz not null default now()
+);
+
+create table if not exists model_shap_values (
+    model_version text not null references model_shap_feature_sets(model_version),
+    as_of date not null,
+    symbol text not null,
+    base_value real not null,                -- expected raw model output
+    contributions real[] not null,           -- aligned with feature_names
+    created_at timestamptz not null default now(),
+    primary key (model_version, as_of, symbol)
+);
+
+create index if not exists idx_model_shap_values_symbol_asof
+    on model_shap_values(symbol, as_of desc);
+
+comment on table model_shap_values is 'TreeSHAP contributions (raw score space) per model version, date and symbol';
+comment on column model_shap_values.contributions is 'Per-feature contributions; base_value + sum(contributions) = raw prediction';
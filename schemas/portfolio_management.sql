@@ -84,6 +84,7 @@ CREATE TABLE IF NOT EXISTS portfolio_risk_metrics (
     herfindahl_index NUMERIC(8, 6),
     sector_weights JSONB,
     signal_distribution JSONB,
+    correlation_matrix JSONB,
     calculation_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     UNIQUE(portfolio_id, as_of)
 );
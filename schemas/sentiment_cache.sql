@@ -0,0 +1,13 @@
+-- Sentiment model outputs keyed by content hash, so repeated headlines,
+-- syndicated articles and re-scraped announcements are scored once.
+-- Written by services/sentiment.py.
+create table if not exists sentiment_cache (
+    content_hash text not null,            -- sha256 of normalized text
+    model text not null,                   -- e.g. ProsusAI/finbert
+    label text not null,                   -- positive / negative / neutral
+    score real not null,                   -- 0-1 confidence
+    created_at timestamptz not null default now(),
+    primary key (content_hash, model)
+);
+
+comment on table sentiment_cache is 'FinBERT sentiment results deduplicated by content hash';
@@ -0,0 +1,14 @@
+"""
+scripts/cron_check_alerts.py
+Render worker entrypoint for the price alert check.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jobs.check_alerts_job import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""
+scripts/cron_daily_drift.py
+Render worker entrypoint for daily drift audit.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jobs.audit_drift_job import main
+
+if __name__ == "__main__":
+    main()
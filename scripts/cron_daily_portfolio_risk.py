@@ -0,0 +1,14 @@
+"""
+scripts/cron_daily_portfolio_risk.py
+Render worker entrypoint for nightly portfolio risk metrics.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jobs.compute_portfolio_risk_job import main
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ scripts/cron_daily_prices.py
 Render cron entrypoint for daily price sync.
 
 Uses the direct EODHD API method which doesn't require the API server to be running.
+Once prices are in, extends the forward_returns table (signal accuracy and
+training labels read it).
 """
 
 import sys
@@ -29,3 +31,10 @@ if __name__ == "__main__":
         except Exception as api_error:
             print(f"❌ Both sync methods failed: {api_error}")
             sys.exit(1)
+
+    try:
+        from jobs.compute_forward_returns_job import run as update_forward_returns
+        update_forward_returns()
+        print("✅ Forward returns updated.")
+    except Exception as e:
+        print(f"⚠️ Forward returns update failed: {e}")
@@ -1,6 +1,7 @@
 """
 Cron wrapper for daily ML signal generation.
-Calls generate_ml_signals.py and persist_ml_signals.py in sequence.
+Calls generate_signals.py (which also records the day's drift sketch),
+persist_ml_signals.py and rebalance_portfolios_job.py in sequence.
 
 This is the CORE V1 feature - daily ML buy/sell signals.
 Without this job, signals become stale after first generation.
@@ -14,9 +15,9 @@ def main():
     print(f"[{datetime.utcnow()}] Starting daily ML signals generation")
 
     # Step 1: Generate signals
-    print("\n[Step 1/2] Generating ML signals...")
+    print("\n[Step 1/3] Generating ML signals...")
     result1 = subprocess.run(
-        ["python", "jobs/generate_ml_signals.py"],
+        ["python", "jobs/generate_signals.py"],
         capture_output=True,
         text=True
     )
@@ -25,11 +26,11 @@ def main():
         print(f"STDERR: {result1.stderr}", file=sys.stderr)
 
     if result1.returncode != 0:
-        print(f"ERROR: generate_ml_signals failed with return code {result1.returncode}", file=sys.stderr)
+        print(f"ERROR: generate_signals failed with return code {result1.returncode}", file=sys.stderr)
         sys.exit(1)
 
     # Step 2: Persist signals to database
-    print("\n[Step 2/2] Persisting ML signals to database...")
+    print("\n[Step 2/3] Persisting ML signals to database...")
     result2 = subprocess.run(
         ["python", "jobs/persist_ml_signals.py"],
         capture_output=True,
@@ -43,6 +44,21 @@ def main():
         print(f"ERROR: persist_ml_signals failed with return code {result2.returncode}", file=sys.stderr)
         sys.exit(1)
 
+    # Step 3: Rebalancing suggestions for every portfolio against the new signals
+    print("\n[Step 3/3] Generating rebalancing suggestions...")
+    result3 = subprocess.run(
+        ["python", "jobs/rebalance_portfolios_job.py"],
+        capture_output=True,
+        text=True
+    )
+    print(result3.stdout)
+    if result3.stderr:
+        print(f"STDERR: {result3.stderr}", file=sys.stderr)
+
+    if result3.returncode != 0:
+        print(f"ERROR: rebalance_portfolios_job failed with return code {result3.returncode}", file=sys.stderr)
+        sys.exit(1)
+
     print(f"\n[{datetime.utcnow()}] ✅ Daily ML signals completed successfully")
 
 
@@ -113,8 +113,8 @@ echo -e "${YELLOW}⚙️ Building extended feature set...${NC}"
 
 python3 jobs/build_extended_feature_set.py
 
-if [ -f "outputs/featureset_extended_latest.parquet" ]; then
-    SIZE=$(du -h outputs/featureset_extended_latest.parquet | cut -f1)
+if [ -f "outputs/feature_store/model_a_features_extended/manifest.json" ]; then
+    SIZE=$(du -sh outputs/feature_store/model_a_features_extended | cut -f1)
     echo -e "${GREEN}✅ Extended features built ($SIZE)${NC}"
 else
     echo -e "${RED}❌ Failed to build extended features${NC}"
@@ -69,6 +69,7 @@ def check_prerequisites() -> bool:
     optional_files = [
         "outputs/model_a_training_dataset.csv",
         "outputs/featureset_extended_latest.parquet",
+        "outputs/feature_store/model_a_features_extended/manifest.json",
     ]
 
     log_info("Checking prerequisites...")
@@ -158,8 +159,13 @@ def run_hyperparameter_tuning(n_trials: int = 50) -> dict:
         log_info(f"Running Optuna hyperparameter tuning ({n_trials} trials)...")
 
         # Load data
+        from analytics.feature_store import FeatureStore
+
+        store = FeatureStore("model_a_features_extended", date_col="date")
         extended_path = "outputs/featureset_extended_latest.parquet"
-        if os.path.exists(extended_path):
+        if store.exists():
+            df = store.read().rename(columns={"date": "dt"})
+        elif os.path.exists(extended_path):
             df = pd.read_parquet(extended_path)
         else:
             df = pd.read_csv("outputs/model_a_training_dataset.csv", parse_dates=["dt"])
@@ -212,7 +212,7 @@ def test_cron_configuration() -> bool:
         "asx-daily-announcements",
         "asx-weekly-fundamentals",
         "asx-weekly-features",
-        "asx-weekly-drift",
+        "asx-daily-drift",
     ]
 
     found_crons = [cron for cron in expected_crons if cron in content]
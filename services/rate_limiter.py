@@ -0,0 +1,39 @@
+"""
+services/rate_limiter.py
+Async politeness limiter shared by the scraping/ingestion jobs.
+"""
+
+import asyncio
+import time
+
+
+class PolitenessLimiter:
+    """
+    Caps concurrent requests and spaces request starts by min_interval seconds.
+
+    Usage:
+        limiter = PolitenessLimiter(concurrency=4, min_interval=1.0)
+        async with limiter:
+            await asyncio.to_thread(requests.get, url)
+    """
+
+    def __init__(self, concurrency: int = 4, min_interval: float = 1.0):
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._lock = asyncio.Lock()
+        self._min_interval = min_interval
+        self._next_start = 0.0
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        # Sleep while holding the lock so the spacing is measured from when
+        # each request actually starts, not from when its slot was reserved
+        async with self._lock:
+            wait = self._next_start - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_start = time.monotonic() + self._min_interval
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+        return False
@@ -0,0 +1,302 @@
+"""
+services/sentiment.py
+Shared financial sentiment inference (FinBERT).
+
+One process-wide model instance serves every caller (news ingestion, ASX
+announcements). Texts are:
+- deduplicated by content hash, in-batch and against stored results
+  (sentiment_cache table)
+- sorted by length and scored in padded batches
+- scored on a dynamically int8-quantized model when running on CPU
+
+If transformers/torch are unavailable, the model fails to load, or a
+batch exceeds its latency budget, the remaining texts fall back to
+keyword-based basic_sentiment_analysis.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from psycopg2.extras import execute_values
+
+from app.core import db_context, logger
+
+SENTIMENT_MODEL = os.getenv("SENTIMENT_MODEL", "ProsusAI/finbert")
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+SENTIMENT_MAX_TOKENS = int(os.getenv("SENTIMENT_MAX_TOKENS", "512"))
+SENTIMENT_LATENCY_BUDGET = float(os.getenv("SENTIMENT_LATENCY_BUDGET", "60"))
+SENTIMENT_QUANTIZE = os.getenv("SENTIMENT_QUANTIZE", "true").lower() == "true"
+
+FALLBACK_MODEL = "keyword"
+MEMO_MAX_ENTRIES = 50_000
+
+POSITIVE_KEYWORDS = [
+    'profit', 'growth', 'increase', 'gain', 'upgrade', 'strong',
+    'beat', 'exceed', 'outperform', 'positive', 'bullish', 'rally'
+]
+
+NEGATIVE_KEYWORDS = [
+    'loss', 'decline', 'decrease', 'downgrade', 'weak', 'miss',
+    'underperform', 'negative', 'bearish', 'crash', 'fall', 'drop'
+]
+
+
+def basic_sentiment_analysis(text: str) -> Dict[str, Any]:
+    """
+    Basic sentiment analysis as fallback
+    Counts positive/negative keywords
+    """
+    text_lower = text.lower()
+
+    pos_count = sum(1 for word in POSITIVE_KEYWORDS if word in text_lower)
+    neg_count = sum(1 for word in NEGATIVE_KEYWORDS if word in text_lower)
+
+    total = pos_count + neg_count
+
+    if total == 0:
+        return {"label": "neutral", "score": 0.5}
+
+    if pos_count > neg_count:
+        return {"label": "positive", "score": min(0.5 + (pos_count - neg_count) * 0.1, 1.0)}
+    elif neg_count > pos_count:
+        return {"label": "negative", "score": min(0.5 + (neg_count - pos_count) * 0.1, 1.0)}
+    else:
+        return {"label": "neutral", "score": 0.5}
+
+
+def content_hash(text: str) -> str:
+    """Whitespace/case-insensitive SHA-256 of a text."""
+    normalized = " ".join(text.split()).lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class SentimentService:
+    """
+    Batched FinBERT sentiment scorer.
+
+    Use get_sentiment_service() rather than constructing directly so the
+    model is loaded once per process.
+    """
+
+    def __init__(
+        self,
+        model_name: str = SENTIMENT_MODEL,
+        batch_size: int = SENTIMENT_BATCH_SIZE,
+        latency_budget: float = SENTIMENT_LATENCY_BUDGET,
+        quantize: bool = SENTIMENT_QUANTIZE,
+        use_store: bool = True,
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.latency_budget = latency_budget
+        self.quantize = quantize
+        self.use_store = use_store
+
+        self._tokenizer = None
+        self._model = None
+        self._labels: List[str] = []
+        self._load_failed = False
+        self._lock = threading.Lock()
+        self._memo: Dict[str, Dict[str, Any]] = {}
+
+    # ------------------------------------------------------------------
+    # Model loading
+    # ------------------------------------------------------------------
+
+    def _ensure_model(self) -> bool:
+        """Load tokenizer/model once; returns False if unavailable."""
+        if self._model is not None:
+            return True
+        if self._load_failed:
+            return False
+
+        with self._lock:
+            if self._model is not None:
+                return True
+            try:
+                import torch
+                import transformers
+
+                tokenizer = transformers.AutoTokenizer.from_pretrained(self.model_name)
+                model = transformers.AutoModelForSequenceClassification.from_pretrained(
+                    self.model_name
+                )
+                model.eval()
+
+                if self.quantize and not torch.cuda.is_available():
+                    # Dynamic int8 quantization of the Linear layers: ~2-3x
+                    # faster CPU inference with negligible accuracy loss
+                    model = torch.quantization.quantize_dynamic(
+                        model, {torch.nn.Linear}, dtype=torch.qint8
+                    )
+
+                self._labels = [
+                    model.config.id2label[i].lower()
+                    for i in range(model.config.num_labels)
+                ]
+                self._tokenizer = tokenizer
+                self._model = model
+                logger.info(
+                    f"Loaded sentiment model {self.model_name} "
+                    f"(quantized={self.quantize and not torch.cuda.is_available()})"
+                )
+                return True
+            except ImportError:
+                logger.warning("transformers not available, using basic sentiment")
+            except Exception as e:
+                logger.error(f"Failed to load sentiment model {self.model_name}: {e}")
+            self._load_failed = True
+            return False
+
+    def _score_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Run the model on one padded batch."""
+        import torch
+
+        with self._lock, torch.no_grad():
+            encoded = self._tokenizer(
+                texts,
+                padding=True,
+                truncation=True,
+                max_length=SENTIMENT_MAX_TOKENS,
+                return_tensors="pt",
+            )
+            probs = torch.softmax(self._model(**encoded).logits, dim=-1)
+            scores, idx = probs.max(dim=-1)
+
+        return [
+            {"label": self._labels[i], "score": float(s)}
+            for i, s in zip(idx.tolist(), scores.tolist())
+        ]
+
+    # ------------------------------------------------------------------
+    # Stored results
+    # ------------------------------------------------------------------
+
+    def _load_stored(self, hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not self.use_store or not hashes:
+            return {}
+        try:
+            with db_context() as conn, conn.cursor() as cur:
+                cur.execute(
+                    """
+                    select content_hash, label, score
+                    from sentiment_cache
+                    where model = %s and content_hash = any(%s)
+                    """,
+                    (self.model_name, hashes),
+                )
+                return {
+                    h: {"label": label, "score": float(score)}
+                    for h, label, score in cur.fetchall()
+                }
+        except Exception as e:
+            logger.warning(f"Sentiment cache lookup failed: {e}")
+            return {}
+
+    def _store(self, results: Dict[str, Dict[str, Any]]) -> None:
+        if not self.use_store or not results:
+            return
+        rows = [(h, self.model_name, r["label"], r["score"]) for h, r in results.items()]
+        try:
+            with db_context() as conn, conn.cursor() as cur:
+                execute_values(
+                    cur,
+                    """
+                    insert into sentiment_cache (content_hash, model, label, score)
+                    values %s
+                    on conflict (content_hash, model) do nothing
+                    """,
+                    rows,
+                )
+        except Exception as e:
+            logger.warning(f"Sentiment cache write failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def analyze(self, text: str) -> Dict[str, Any]:
+        """Score a single text. Returns dict with 'label' and 'score'."""
+        return self.analyze_batch([text])[0]
+
+    def analyze_batch(self, texts: Sequence[Optional[str]]) -> List[Dict[str, Any]]:
+        """
+        Score many texts in one call.
+
+        Args:
+            texts: Texts to score (None/empty are scored as neutral)
+
+        Returns:
+            One dict per input with 'label' (positive/negative/neutral),
+            'score' (0-1) and 'model' (model name or 'keyword')
+        """
+        texts = [t or "" for t in texts]
+        if len(self._memo) > MEMO_MAX_ENTRIES:
+            self._memo.clear()
+        hashes = [content_hash(t) for t in texts]
+
+        unique: Dict[str, str] = {}
+        for h, t in zip(hashes, texts):
+            if h not in self._memo and t.strip():
+                unique.setdefault(h, t)
+
+        if unique:
+            stored = self._load_stored(list(unique))
+            for h, result in stored.items():
+                self._memo[h] = {**result, "model": self.model_name}
+                unique.pop(h, None)
+
+        if unique:
+            self._score_pending(unique)
+
+        empty = {"label": "neutral", "score": 0.5, "model": FALLBACK_MODEL}
+        return [dict(self._memo.get(h, empty)) for h in hashes]
+
+    def _score_pending(self, pending: Dict[str, str]) -> None:
+        """Score unseen texts with the model, falling back past the budget."""
+        # Sort by length so each padded batch holds similarly sized texts
+        ordered = sorted(pending.items(), key=lambda item: len(item[1]))
+        scored: Dict[str, Dict[str, Any]] = {}
+        start = time.monotonic()
+        position = 0
+
+        if self._ensure_model():
+            while position < len(ordered):
+                if time.monotonic() - start > self.latency_budget:
+                    logger.warning(
+                        f"Sentiment latency budget ({self.latency_budget}s) exceeded, "
+                        f"using basic sentiment for {len(ordered) - position} texts"
+                    )
+                    break
+                batch = ordered[position:position + self.batch_size]
+                try:
+                    results = self._score_batch([t[:4 * SENTIMENT_MAX_TOKENS] for _, t in batch])
+                except Exception as e:
+                    logger.error(f"Sentiment batch failed: {e}")
+                    break
+                for (h, _), result in zip(batch, results):
+                    scored[h] = result
+                    self._memo[h] = {**result, "model": self.model_name}
+                position += len(batch)
+
+        for h, text in ordered[position:]:
+            self._memo[h] = {**basic_sentiment_analysis(text), "model": FALLBACK_MODEL}
+
+        self._store(scored)
+
+
+_service: Optional[SentimentService] = None
+_service_lock = threading.Lock()
+
+
+def get_sentiment_service() -> SentimentService:
+    """Return the process-wide SentimentService (model loaded lazily, once)."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = SentimentService()
+    return _service
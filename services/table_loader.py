@@ -0,0 +1,244 @@
+"""
+services/table_loader.py
+Bulk table loads via COPY.
+
+copy_swap replaces a whole table via COPY into a shadow table and a rename swap:
+
+    1. create {table}__shadow (dropping any leftover from a failed run)
+    2. COPY rows in from CSV buffers, chunk by chunk
+    3. build indexes on the shadow and ANALYZE it; commit
+    4. in one short transaction: lock the live table, rename it aside,
+       rename the shadow into place, drop the old table
+
+Readers keep querying the old table until step 4 commits and then see the
+new one; they never observe a missing or half-loaded table. If anything
+fails before the swap, the live table is untouched.
+
+copy_upsert merges rows into a table keyed by a unique index (e.g. one
+day's snapshot into a history table): COPY into a temporary staging table,
+then a single insert ... on conflict do update.
+"""
+
+import io
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+import pandas as pd
+from psycopg2 import sql
+
+COPY_CHUNK_ROWS = 50_000
+NULL_TOKEN = r"\N"
+
+
+def pg_type(dtype) -> str:
+    """Postgres column type for a pandas dtype."""
+    if pd.api.types.is_bool_dtype(dtype):
+        return "boolean"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "bigint"
+    if pd.api.types.is_float_dtype(dtype):
+        return "double precision"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "timestamptz" if getattr(dtype, "tz", None) is not None else "timestamp"
+    return "text"
+
+
+def pg_columns(df: pd.DataFrame) -> Dict[str, str]:
+    """Column name -> Postgres type, inferring date for object columns of datetime.date."""
+    columns = {}
+    for name, dtype in df.dtypes.items():
+        col_type = pg_type(dtype)
+        if col_type == "text":
+            sample = df[name].dropna()
+            if not sample.empty and all(
+                hasattr(v, "isoformat") and not hasattr(v, "hour") for v in sample.iloc[:100]
+            ):
+                col_type = "date"
+        columns[str(name)] = col_type
+    return columns
+
+
+def pg_columns_from_arrow(schema) -> Dict[str, str]:
+    """Column name -> Postgres type for a pyarrow schema (e.g. a Parquet dataset's)."""
+    import pyarrow.types as pat
+
+    columns = {}
+    for field in schema:
+        t = field.type
+        if pat.is_boolean(t):
+            col_type = "boolean"
+        elif pat.is_integer(t):
+            col_type = "bigint"
+        elif pat.is_floating(t) or pat.is_decimal(t):
+            col_type = "double precision"
+        elif pat.is_date(t):
+            col_type = "date"
+        elif pat.is_timestamp(t):
+            col_type = "timestamptz" if t.tz else "timestamp"
+        else:
+            col_type = "text"
+        columns[field.name] = col_type
+    return columns
+
+
+def _csv_buffer(df: pd.DataFrame, columns: Sequence[str]) -> io.StringIO:
+    frame = df.reindex(columns=list(columns))
+    # Postgres boolean text input; pandas would print "True"/"False"
+    for name in frame.columns:
+        if pd.api.types.is_bool_dtype(frame[name]):
+            frame[name] = frame[name].map({True: "t", False: "f"})
+    frame = frame.replace([np.inf, -np.inf], np.nan)
+    buf = io.StringIO()
+    frame.to_csv(buf, index=False, header=False, na_rep=NULL_TOKEN)
+    buf.seek(0)
+    return buf
+
+
+def _chunks(frames: Iterable[pd.DataFrame], chunk_rows: int):
+    for df in frames:
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+
+
+def copy_swap(
+    conn,
+    table: str,
+    frames: Iterable[pd.DataFrame],
+    columns: Dict[str, str],
+    indexes: Sequence[Sequence[str]] = (),
+    unique: Sequence[Sequence[str]] = (),
+    chunk_rows: int = COPY_CHUNK_ROWS,
+) -> int:
+    """
+    Replace table with the rows of frames, atomically from a reader's view.
+
+    Args:
+        conn: psycopg2 connection (left open; committed on success)
+        table: Live table name
+        frames: DataFrames (or a generator of chunks) to load
+        columns: Column name -> Postgres type, in table column order
+        indexes: Column lists to index on the new table
+        unique: Column lists to build unique indexes on
+        chunk_rows: Rows per COPY buffer
+
+    Returns:
+        Rows loaded
+    """
+    shadow = f"{table}__shadow"
+    old = f"{table}__old"
+    names = list(columns)
+
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("drop table if exists {}").format(sql.Identifier(shadow)))
+            cur.execute(sql.SQL("create table {} ({})").format(
+                sql.Identifier(shadow),
+                sql.SQL(", ").join(
+                    sql.SQL("{} {}").format(sql.Identifier(name), sql.SQL(columns[name]))
+                    for name in names
+                ),
+            ))
+
+            copy = sql.SQL("copy {} ({}) from stdin with (format csv, null {})").format(
+                sql.Identifier(shadow),
+                sql.SQL(", ").join(map(sql.Identifier, names)),
+                sql.Literal(NULL_TOKEN),
+            )
+            rows = 0
+            for chunk in _chunks(frames, chunk_rows):
+                cur.copy_expert(copy, _csv_buffer(chunk, names))
+                rows += len(chunk)
+
+            # Indexes are built once over the loaded rows, not maintained per row
+            index_names: List[str] = []
+            for is_unique, specs in ((True, unique), (False, indexes)):
+                for cols in specs:
+                    name = f"{table}_{'_'.join(cols)}_{'uidx' if is_unique else 'idx'}"
+                    index_names.append(name)
+                    cur.execute(sql.SQL("create {} index {} on {} ({})").format(
+                        sql.SQL("unique" if is_unique else ""),
+                        sql.Identifier(f"{name}__shadow"),
+                        sql.Identifier(shadow),
+                        sql.SQL(", ").join(map(sql.Identifier, cols)),
+                    ))
+            cur.execute(sql.SQL("analyze {}").format(sql.Identifier(shadow)))
+        conn.commit()
+
+        with conn.cursor() as cur:
+            cur.execute("select to_regclass(%s)", (table,))
+            live_exists = cur.fetchone()[0] is not None
+            if live_exists:
+                cur.execute(sql.SQL("lock table {} in access exclusive mode").format(sql.Identifier(table)))
+                cur.execute(sql.SQL("drop table if exists {}").format(sql.Identifier(old)))
+                cur.execute(sql.SQL("alter table {} rename to {}").format(sql.Identifier(table), sql.Identifier(old)))
+            cur.execute(sql.SQL("alter table {} rename to {}").format(sql.Identifier(shadow), sql.Identifier(table)))
+            if live_exists:
+                cur.execute(sql.SQL("drop table {}").format(sql.Identifier(old)))
+            for name in index_names:
+                cur.execute(sql.SQL("drop index if exists {}").format(sql.Identifier(name)))
+                cur.execute(sql.SQL("alter index {} rename to {}").format(
+                    sql.Identifier(f"{name}__shadow"), sql.Identifier(name),
+                ))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return rows
+
+
+def copy_upsert(
+    conn,
+    table: str,
+    frames: Iterable[pd.DataFrame],
+    columns: Sequence[str],
+    conflict: Sequence[str],
+    chunk_rows: int = COPY_CHUNK_ROWS,
+) -> int:
+    """
+    Insert or update rows of frames in table, in one transaction.
+
+    Args:
+        conn: psycopg2 connection (left open; committed on success)
+        table: Target table name
+        frames: DataFrames (or a generator of chunks) to load
+        columns: Columns to load; values are parsed with the table's column types
+        conflict: Columns of the unique index that identifies a row
+        chunk_rows: Rows per COPY buffer
+
+    Returns:
+        Rows loaded
+    """
+    staging = f"{table}__staging"
+    names = list(columns)
+    cols = sql.SQL(", ").join(map(sql.Identifier, names))
+    updates = [name for name in names if name not in conflict]
+
+    try:
+        with conn.cursor() as cur:
+            # Same column types as the target, without its defaults (no sequence values consumed)
+            cur.execute(sql.SQL("create temp table {} on commit drop as select {} from {} with no data").format(
+                sql.Identifier(staging), cols, sql.Identifier(table),
+            ))
+            copy = sql.SQL("copy {} ({}) from stdin with (format csv, null {})").format(
+                sql.Identifier(staging), cols, sql.Literal(NULL_TOKEN),
+            )
+            rows = 0
+            for chunk in _chunks(frames, chunk_rows):
+                cur.copy_expert(copy, _csv_buffer(chunk, names))
+                rows += len(chunk)
+
+            action = sql.SQL("do nothing") if not updates else sql.SQL("do update set {}").format(
+                sql.SQL(", ").join(
+                    sql.SQL("{} = excluded.{}").format(sql.Identifier(name), sql.Identifier(name))
+                    for name in updates
+                )
+            )
+            cur.execute(sql.SQL("insert into {} ({}) select {} from {} on conflict ({}) {}").format(
+                sql.Identifier(table), cols, cols, sql.Identifier(staging),
+                sql.SQL(", ").join(map(sql.Identifier, conflict)), action,
+            ))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return rows
@@ -0,0 +1,73 @@
+"""
+services/universe_returns.py
+Universe daily returns and their cached covariance.
+
+Every route that needs the universe covariance goes through
+universe_covariance, so the cache entry for (as_of, lookback, method) is
+always estimated from the same return window whichever caller fills it.
+The key also carries a fingerprint of the window's prices (row count,
+close checksum, last date), so prices restated after the first estimate
+produce a new entry instead of a stale hit.
+"""
+
+from datetime import date, timedelta
+from typing import Optional
+
+import pandas as pd
+
+from analytics.covariance import FactorCovariance, covariance_cache
+
+
+def _window_start(as_of: date, lookback: int) -> date:
+    """Calendar start covering lookback trading days (plus one prior close) up to as_of."""
+    return as_of - timedelta(days=int(lookback * 1.6) + 10)
+
+
+def load_universe_returns(con, as_of: date, lookback: int) -> pd.DataFrame:
+    """Close-to-close returns of every symbol, the last lookback trading dates up to as_of (dates x symbols)."""
+    px = pd.read_sql(
+        """
+        select dt, symbol, close
+        from prices
+        where dt > %s and dt <= %s
+        order by symbol, dt
+        """,
+        con,
+        params=(_window_start(as_of, lookback), as_of),
+    )
+    px["dt"] = pd.to_datetime(px["dt"])
+    px["ret1"] = px.groupby("symbol")["close"].pct_change()
+    return px.pivot(index="dt", columns="symbol", values="ret1").tail(lookback)
+
+
+def prices_fingerprint(con, as_of: date, lookback: int) -> str:
+    """Row count, close checksum and last date of the price window load_universe_returns reads."""
+    with con.cursor() as cur:
+        cur.execute(
+            """
+            select count(*), coalesce(sum(close), 0), max(dt)
+            from prices
+            where dt > %s and dt <= %s
+            """,
+            (_window_start(as_of, lookback), as_of),
+        )
+        count, checksum, last = cur.fetchone()
+    return f"{count}:{float(checksum):.6f}:{last}"
+
+
+def universe_covariance(
+    con,
+    as_of: date,
+    lookback: int,
+    method: str = "sample",
+    halflife: Optional[float] = None,
+) -> FactorCovariance:
+    """The cached universe covariance of the lookback window ending at as_of."""
+    return covariance_cache.get(
+        as_of,
+        lookback,
+        lambda: load_universe_returns(con, as_of, lookback),
+        method=method,
+        halflife=halflife,
+        fingerprint=prices_fingerprint(con, as_of, lookback),
+    )
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from analytics import attribution
+from jobs import portfolio_attribution_job as job
+
+SECTORS = {"BHP.AX": "Materials", "RIO.AX": "Materials", "CBA.AX": "Financials", "NAB.AX": "Financials"}
+
+
+def _frames():
+    idx = pd.to_datetime(["2024-03-01", "2024-03-04", "2024-03-05"])
+    weights = pd.DataFrame({
+        "BHP.AX": [0.4, 0.5, 0.0],
+        "RIO.AX": [0.1, 0.0, 0.3],
+        "CBA.AX": [0.5, 0.25, 0.7],
+        "NAB.AX": [0.0, 0.25, np.nan],  # not in the universe on the last day
+    }, index=idx)
+    returns = pd.DataFrame({
+        "BHP.AX": [0.01, -0.02, 0.005],
+        "RIO.AX": [0.02, 0.01, np.nan],  # no bar: counts as 0
+        "CBA.AX": [-0.01, 0.003, 0.012],
+        "NAB.AX": [0.004, 0.0, 0.02],
+    }, index=idx)
+    return weights, returns
+
+
+def test_effects_sum_to_active_return():
+    weights, returns = _frames()
+    benchmark = attribution.equal_weight_benchmark(weights)
+
+    effects = attribution.sector_attribution(weights, returns, SECTORS)
+
+    contribution = attribution.contributions(weights, returns).sum(axis=1)
+    bench_return = attribution.contributions(benchmark, returns).sum(axis=1)
+    total = effects.groupby("as_of")[["allocation", "selection", "interaction"]].sum().sum(axis=1)
+    np.testing.assert_allclose(total.to_numpy(), (contribution - bench_return).to_numpy(), atol=1e-12)
+    assert benchmark.iloc[-1].tolist() == [1 / 3, 1 / 3, 1 / 3, 0.0]
+
+
+def test_sector_effects_match_per_date_loop():
+    weights, returns = _frames()
+    effects = attribution.sector_attribution(weights, returns, SECTORS).set_index(["as_of", "sector"])
+
+    d = weights.index[0]
+    w, r = weights.loc[d], returns.loc[d].fillna(0.0)
+    b = attribution.equal_weight_benchmark(weights).loc[d]
+    rb_total = (b * r).sum()
+    mats = ["BHP.AX", "RIO.AX"]
+    wp, wb = w[mats].sum(), b[mats].sum()
+    rp, rb = (w[mats] * r[mats]).sum() / wp, (b[mats] * r[mats]).sum() / wb
+
+    row = effects.loc[(d, "Materials")]
+    assert np.isclose(row["allocation"], (wp - wb) * (rb - rb_total))
+    assert np.isclose(row["selection"], wb * (rp - rb))
+    assert np.isclose(row["interaction"], (wp - wb) * (rp - rb))
+
+
+def test_job_compute_rows():
+    weights, returns = _frames()
+
+    held, sector_rows, performance = job.compute(weights, returns, SECTORS)
+
+    assert len(held) == weights.notna().sum().sum()
+    assert held["return_1d"].notna().all()
+    last = held[held["as_of"] == weights.index[-1]].set_index("symbol")
+    assert last.loc["RIO.AX", "contribution"] == 0.0
+    assert np.isclose(performance.iloc[0], 0.4 * 0.01 + 0.1 * 0.02 - 0.5 * 0.01)
+    assert set(sector_rows["sector"]) == {"Materials", "Financials"}
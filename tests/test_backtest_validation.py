@@ -5,9 +5,15 @@ Backtesting Validation Tests for Model A
 Validates that backtesting logic produces accurate and reliable results.
 """
 
+import numpy as np
+import pandas as pd
 import pytest
+
+from analytics.trading_calendar import next_trading_day, trading_days
 from jobs.backtest_model_a_ml import (
     _compute_max_drawdown,
+    compute_technical_signals,
+    run_single_period_backtest,
     run_walk_forward_backtest,
 )
 
@@ -373,6 +379,159 @@ class TestBacktestEdgeCases:
             assert -0.5 < total_return < 2.0  # Between -50% and +200%
 
 
+def _synthetic_market(n_symbols=40, n_days=400, seed=3):
+    """Random-walk prices plus daily scored signals with gaps and NaN scores."""
+    rng = np.random.default_rng(seed)
+    dates = pd.DatetimeIndex(trading_days("2022-01-03", "2035-12-31")[:n_days])
+    symbols = [f"S{i:02d}.AX" for i in range(n_symbols)]
+    close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_days, n_symbols)), axis=0))
+    prices = pd.DataFrame({
+        "symbol": np.tile(symbols, n_days),
+        "dt": np.repeat(dates, n_symbols),
+        "close": close.ravel(),
+    })
+    prices = prices[rng.random(len(prices)) > 0.03]  # missing bars / suspensions
+    prices = prices.sort_values(["symbol", "dt"]).reset_index(drop=True)
+    prices["daily_return"] = prices.groupby("symbol")["close"].pct_change()
+
+    signals = pd.DataFrame({
+        "as_of": np.repeat(dates, n_symbols),
+        "symbol": np.tile(symbols, n_days),
+        "ml_prob": rng.random(n_days * n_symbols),
+    })
+    signals = signals[rng.random(len(signals)) > 0.2].copy()
+    signals.loc[signals.sample(frac=0.02, random_state=seed).index, "ml_prob"] = np.nan
+    return prices, signals
+
+
+def _reference_backtest(signals, prices, start_date, end_date, top_n, initial_capital=1_000_000):
+    """Original row-by-row engine, kept as the parity oracle."""
+    signals = signals[(signals["as_of"] >= pd.Timestamp(start_date)) & (signals["as_of"] <= pd.Timestamp(end_date))]
+    prices = prices[(prices["dt"] >= pd.Timestamp(start_date)) & (prices["dt"] <= pd.Timestamp(end_date))]
+    curve, capital = [], initial_capital
+    for sig_date in sorted(signals["as_of"].dt.date.unique()):
+        day_signals = signals[signals["as_of"].dt.date == sig_date]
+        day_signals = day_signals.sort_values("ml_prob", ascending=False).head(top_n)
+        next_day = pd.Timestamp(next_trading_day(sig_date))
+        day_prices = prices[prices["dt"].dt.date == next_day.date()]
+        if day_prices.empty:
+            continue
+        weight = 1.0 / len(day_signals)
+        port_return, matched = 0.0, 0
+        for _, sig in day_signals.iterrows():
+            sym_price = day_prices[day_prices["symbol"] == sig["symbol"]]
+            if not sym_price.empty and pd.notna(sym_price["daily_return"].iloc[0]):
+                port_return += weight * sym_price["daily_return"].iloc[0]
+                matched += 1
+        if matched > 0:
+            capital *= 1 + port_return
+            curve.append({"date": sig_date, "equity": capital, "return": port_return, "n_positions": matched})
+    return curve
+
+
+class TestVectorizedEngineParity:
+    """The matrix engine must reproduce the original row-by-row engine"""
+
+    @pytest.mark.parametrize("top_n", [1, 10, 60])
+    def test_equity_curve_matches_reference(self, top_n):
+        prices, signals = _synthetic_market(n_days=120)
+
+        expected = _reference_backtest(signals, prices, "2022-01-03", "2022-06-30", top_n)
+        result = run_single_period_backtest(signals, prices, "2022-01-03", "2022-06-30", top_n=top_n)
+
+        curve = result["equity_curve"]
+        assert [e["date"] for e in curve] == [e["date"] for e in expected]
+        assert [e["n_positions"] for e in curve] == [e["n_positions"] for e in expected]
+        np.testing.assert_allclose([e["equity"] for e in curve], [e["equity"] for e in expected], rtol=1e-10)
+
+    def test_costs_are_charged_on_turnover(self):
+        prices, signals = _synthetic_market(n_days=60)
+
+        free = run_single_period_backtest(signals, prices, "2022-01-03", "2022-03-31", top_n=5)
+        costly = run_single_period_backtest(signals, prices, "2022-01-03", "2022-03-31", top_n=5, cost_bps=10)
+
+        assert 0 < costly["stats"]["mean_turnover"] <= 2.0
+        assert costly["stats"]["total_cost"] > 0
+        assert costly["stats"]["total_return"] < free["stats"]["total_return"]
+
+    def test_five_year_walk_forward_runs_in_seconds(self, monkeypatch):
+        import time
+
+        import jobs.backtest_model_a_ml as bt
+
+        prices, signals = _synthetic_market(n_symbols=200, n_days=1260)
+        monkeypatch.setattr(bt, "load_prices", lambda *_: prices)
+        monkeypatch.setattr(bt, "load_signals_from_db", lambda *_: signals)
+
+        started = time.perf_counter()
+        result = bt.run_walk_forward_backtest("2022-01-03", "2026-10-31", train_months=12, test_months=1, top_n=20)
+
+        assert result["aggregate"]["n_folds"] >= 30
+        assert time.perf_counter() - started < 20
+
+
+class TestParallelFolds:
+    """Folds and parameter sweeps evaluated in a process pool over shared memory"""
+
+    @pytest.fixture
+    def market(self, monkeypatch):
+        import jobs.backtest_model_a_ml as bt
+
+        prices, signals = _synthetic_market(n_symbols=60, n_days=400)
+        monkeypatch.setattr(bt, "load_prices", lambda *_: prices)
+        monkeypatch.setattr(bt, "load_signals_from_db", lambda *_: signals)
+        return bt, prices, signals
+
+    def test_pool_matches_in_process_and_per_fold_engine(self, market):
+        bt, prices, signals = market
+
+        serial = bt.run_walk_forward_backtest("2022-01-03", "2023-06-30", train_months=6, top_n=10, workers=1)
+        pooled = bt.run_walk_forward_backtest("2022-01-03", "2023-06-30", train_months=6, top_n=10, workers=2)
+
+        assert [f["fold_id"] for f in pooled["folds"]] == [f["fold_id"] for f in serial["folds"]]
+        assert pooled["aggregate"] == serial["aggregate"]
+        fold = serial["folds"][0]
+        direct = run_single_period_backtest(signals, prices, fold["test_start"], fold["test_end"], top_n=10)
+        assert fold["stats"] == pytest.approx(direct["stats"], rel=1e-9)
+
+    def test_parameter_sweep_covers_grid(self, market):
+        bt, _, _ = market
+
+        sweep = bt.run_parameter_sweep(
+            "2022-01-03", "2023-06-30",
+            top_n_values=(5, 20), rebalance_every_values=(1, 5), cost_bps_values=(0, 10),
+            train_months=6, workers=2,
+        )
+
+        assert len(sweep["results"]) == 8
+        sharpes = [r["aggregate"]["mean_sharpe"] for r in sweep["results"]]
+        assert sharpes == sorted(sharpes, reverse=True)
+        weekly = next(r for r in sweep["results"] if r["params"] == {"top_n": 5, "rebalance_every": 5, "cost_bps": 10.0})
+        daily = next(r for r in sweep["results"] if r["params"] == {"top_n": 5, "rebalance_every": 1, "cost_bps": 10.0})
+
+        def turnover(r):
+            return np.mean([f["stats"]["mean_turnover"] for f in r["folds"]])
+
+        assert turnover(weekly) < turnover(daily)
+
+
+class TestTechnicalSignals:
+    """Vectorized momentum signals"""
+
+    def test_momentum_uses_trailing_bars(self):
+        prices, _ = _synthetic_market(n_symbols=5, n_days=300)
+        as_of = prices["dt"].max()
+
+        result = compute_technical_signals(prices, as_of)
+
+        sym = prices[prices["symbol"] == result.iloc[0]["symbol"]]
+        close = sym["close"].to_numpy()
+        assert result.iloc[0]["mom_6"] == pytest.approx(close[-1] / close[-126] - 1)
+        assert result.iloc[0]["mom_12_1"] == pytest.approx(close[-21] / close[-252] - 1)
+        assert result.iloc[0]["vol_90"] == pytest.approx(sym["daily_return"].tail(90).std())
+        assert list(result["rank"]) == list(range(1, len(result) + 1))
+
+
 @pytest.mark.integration
 class TestBacktestWithRealData:
     """Integration tests with real database data (if available)"""
@@ -0,0 +1,90 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from jobs import build_extended_feature_set as job
+
+SYMBOLS = ["AAA.AX", "BBB.AX", "CCC.AX", "DDD.AX", "EEE.AX"]
+
+
+def _prices(n=40, seed=7):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-01-01", periods=n).date
+    frames = []
+    for i, symbol in enumerate(SYMBOLS):
+        # Staggered listings so the cross-section differs by date
+        d = dates[i * 3:]
+        close = 10 * np.cumprod(1 + rng.normal(0, 0.01, len(d)))
+        frames.append(pd.DataFrame({
+            "date": d, "symbol": symbol, "open": close, "high": close * 1.01,
+            "low": close * 0.99, "close": close, "volume": rng.integers(1_000, 5_000, len(d)),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _fund():
+    rng = np.random.default_rng(1)
+    fund = pd.DataFrame({"symbol": SYMBOLS})
+    for col in job.CROSS_SECTION_COLUMNS:
+        fund[col] = rng.normal(1, 0.5, len(SYMBOLS))
+    fund.loc[1, "pb_ratio"] = np.nan
+    return fund
+
+
+@pytest.fixture
+def fake_sources(monkeypatch):
+    px = _prices()
+
+    def read_sql(query, params=None):
+        if "open, high" not in query:
+            return px[["date", "symbol"]]
+        rows = px if len(params) == 2 else px[px["symbol"].isin(params[2])]
+        return rows.reset_index(drop=True)
+
+    empty = pd.DataFrame()
+    monkeypatch.setattr(job, "_safe_read_sql", read_sql)
+    monkeypatch.setattr(job, "load_side_inputs", lambda: {
+        "fund": _fund(), "fund_features": empty, "trends": [], "sent": empty,
+        "announcements": empty, "macro": empty, "etf": empty, "risk": empty,
+    })
+    monkeypatch.setattr(job, "db", MagicMock)
+    monkeypatch.setattr(job, "attach_labels", lambda df, conn, **kw: df.assign(return_1m_fwd=np.nan))
+    return px
+
+
+def _build(chunk_rows):
+    chunks = list(job.iter_feature_chunks("2024-01-01", "2024-03-31", chunk_rows=chunk_rows))
+    df = pd.concat(chunks, ignore_index=True).sort_values(["symbol", "date"]).reset_index(drop=True)
+    return chunks, df
+
+
+def test_symbol_chunks_respect_row_budget():
+    counts = pd.Series({"B": 40, "A": 30, "C": 100, "D": 10})
+    assert job.symbol_chunks(counts, 70) == [["A", "B"], ["C"], ["D"]]
+
+
+def test_chunked_build_matches_single_pass(fake_sources):
+    chunks, chunked = _build(chunk_rows=60)
+    _, whole = _build(chunk_rows=10_000)
+
+    assert len(chunks) > 1
+    assert all(chunk["symbol"].nunique() <= 2 for chunk in chunks)
+    pd.testing.assert_frame_equal(chunked, whole)
+
+
+def test_cross_sectional_scores_use_full_universe(fake_sources):
+    _, df = _build(chunk_rows=40)
+
+    by_date = df.groupby("date")
+    expected_z = (df["pe_ratio"] - by_date["pe_ratio"].transform("mean")) / by_date["pe_ratio"].transform("std")
+    np.testing.assert_allclose(df["pe_ratio_zscore"], expected_z)
+
+    pe_inverse = 1 / df["pe_ratio"]
+    expected_value = (
+        pe_inverse.groupby(df["date"]).rank(pct=True)
+        + (1 - by_date["pb_ratio"].rank(pct=True))
+        + by_date["roe"].rank(pct=True)
+    ) / 3
+    np.testing.assert_allclose(df["value_score"], expected_value)
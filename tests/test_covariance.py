@@ -0,0 +1,104 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.covariance import LedoitWolf
+
+from analytics import covariance
+
+
+def _returns(n_dates=90, n_symbols=40, seed=2):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, (n_dates, 1))
+    R = market * rng.uniform(0.5, 1.5, n_symbols) + rng.normal(0, 0.01, (n_dates, n_symbols))
+    return pd.DataFrame(R, index=pd.bdate_range("2024-01-01", periods=n_dates),
+                        columns=[f"S{i:02d}.AX" for i in range(n_symbols)])
+
+
+def test_sample_and_ledoit_wolf_match_reference_estimators():
+    R = _returns()
+
+    sample = covariance.estimate(R, "sample")
+    lw = covariance.estimate(R, "ledoit_wolf")
+
+    np.testing.assert_allclose(sample.matrix().to_numpy(), np.cov(R.to_numpy(), rowvar=False), rtol=1e-5, atol=1e-10)
+    reference = LedoitWolf().fit(R.to_numpy())
+    assert np.isclose(float(lw.meta["shrinkage"]), reference.shrinkage_)
+    np.testing.assert_allclose(lw.matrix().to_numpy(), reference.covariance_, rtol=1e-5, atol=1e-10)
+    # Stored as symbols x dates float32, not symbols x symbols
+    assert sample.loadings.shape == (40, 90) and sample.loadings.dtype == np.float32
+
+
+def test_ewma_weights_recent_dates():
+    R = _returns()
+    halflife = 10
+    w = 0.5 ** (np.arange(len(R))[::-1] / halflife)
+    w /= w.sum()
+    X = R.to_numpy() - w @ R.to_numpy()
+    expected = (X * w[:, None]).T @ X
+
+    ewma = covariance.estimate(R, "ewma", halflife=halflife)
+
+    np.testing.assert_allclose(ewma.matrix().to_numpy(), expected, rtol=1e-5, atol=1e-10)
+
+
+def test_subset_slicing_and_portfolio_variance():
+    R = _returns()
+    R.iloc[:30, 5] = np.nan  # below 80% coverage: dropped
+    cov = covariance.estimate(R, "ledoit_wolf")
+    held = ["S03.AX", "S17.AX", "S05.AX", "S31.AX"]
+    weights = pd.Series([0.4, 0.3, 0.2, 0.1], index=held)
+
+    covered = cov.covered(held)
+    assert covered == ["S03.AX", "S17.AX", "S31.AX"]
+    w = weights[covered]
+    sub = cov.matrix(covered)
+    assert np.isclose(cov.portfolio_variance(w), w.to_numpy() @ sub.to_numpy() @ w.to_numpy())
+    np.testing.assert_allclose(cov.variances(covered), np.diag(sub))
+    pd.testing.assert_frame_equal(sub, cov.matrix().loc[covered, covered])
+
+
+def test_cache_estimates_once_per_key_and_reloads_from_disk(tmp_path):
+    R = _returns()
+    calls = []
+
+    def load():
+        calls.append(1)
+        return R
+
+    cache = covariance.CovarianceCache(cache_dir=str(tmp_path))
+    first = cache.get(date(2024, 5, 3), 60, load, method="ledoit_wolf")
+    again = cache.get(date(2024, 5, 3), 60, load, method="ledoit_wolf")
+    cache.get(date(2024, 5, 3), 60, load, method="sample")
+    assert again is first
+    assert len(calls) == 2
+    assert first.meta["dates"] == 60
+
+    restarted = covariance.CovarianceCache(cache_dir=str(tmp_path))
+    reloaded = restarted.get(date(2024, 5, 3), 60, load, method="ledoit_wolf")
+    assert len(calls) == 2
+    pd.testing.assert_frame_equal(reloaded.matrix(), first.matrix())
+
+    with pytest.raises(ValueError):
+        covariance.estimate(R, "garch")
+
+
+def test_cache_fingerprint_and_file_limit(tmp_path):
+    R = _returns()
+    calls = []
+
+    def load():
+        calls.append(1)
+        return R
+
+    cache = covariance.CovarianceCache(cache_dir=str(tmp_path), max_files=2)
+    cache.get(date(2024, 5, 3), 60, load, fingerprint="100:1.5")
+    cache.get(date(2024, 5, 3), 60, load, fingerprint="100:1.5")
+    cache.get(date(2024, 5, 3), 60, load, fingerprint="100:1.7")  # prices restated
+    assert len(calls) == 2
+
+    cache.get(date(2024, 5, 6), 60, load)
+    files = sorted(p.name for p in tmp_path.glob("*.npz"))
+    assert len(files) == 2
+    assert covariance.CovarianceCache.key(date(2024, 5, 3), 60, "sample", fingerprint="100:1.5") + ".npz" not in files
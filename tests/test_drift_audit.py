@@ -3,6 +3,8 @@ tests/test_drift_audit.py
 Unit tests for drift audit (PSI calculation) functions.
 """
 
+import json
+
 import numpy as np
 import pandas as pd
 import pytest
@@ -86,3 +88,132 @@ def test_drift_audit_handles_empty_data():
         pytest.fail(f"Drift calculation raised unexpected error: {e}")
 
     assert psi is None
+
+
+def _features(n, shift=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "mom_6": rng.normal(shift, 1.0, n),
+        "vol_90": rng.lognormal(0.0, 0.5, n),
+        "trend_200": rng.integers(0, 2, n),
+    })
+
+
+def _legacy_psi(base, curr, bins=10):
+    """PSI as audit_drift_job computed it from full columns."""
+    cuts = np.unique(base.quantile(np.linspace(0, 1, bins + 1)).values)
+    base_dist = pd.cut(base, bins=cuts, include_lowest=True).value_counts(normalize=True).sort_index()
+    curr_dist = pd.cut(curr, bins=cuts, include_lowest=True).value_counts(normalize=True).sort_index()
+    eps = 1e-6
+    return float((((curr_dist + eps) - (base_dist + eps)) * np.log((curr_dist + eps) / (base_dist + eps))).sum())
+
+
+def test_sketch_psi_matches_full_column_psi():
+    from analytics.drift_sketch import DriftSketch
+
+    base = _features(5000)
+    curr = _features(800, shift=0.3, seed=1)
+    # Keep current inside the training range (the legacy path dropped out-of-range values)
+    curr["mom_6"] = curr["mom_6"].clip(base["mom_6"].min() + 1e-9, base["mom_6"].max())
+
+    baseline = DriftSketch.from_baseline(base, ["mom_6"])
+    psi = baseline.psi(baseline.empty_like().update(curr))
+
+    assert psi["mom_6"] == pytest.approx(_legacy_psi(base["mom_6"], curr["mom_6"]), rel=1e-6)
+    assert psi["mom_6"] > 0.05
+
+
+class _SketchTable:
+    """In-memory stand-in for a psycopg2 connection holding model_drift_sketches."""
+
+    def __init__(self):
+        self.rows = {}
+        self.commits = 0
+        self._result = []
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def commit(self):
+        self.commits += 1
+
+    def execute(self, sql, params):
+        sql = " ".join(sql.split())
+        if sql.startswith("insert into"):
+            model, version, kind, day, sketch = params
+            self.rows[(model, version, kind, day)] = json.loads(json.dumps(sketch.adapted))
+        elif "kind = 'baseline'" in sql:
+            model, version = params
+            days = sorted(d for (m, v, k, d) in self.rows if (m, v, k) == (model, version, "baseline"))
+            self._result = [(self.rows[(model, version, "baseline", days[-1])],)] if days else []
+        elif "day = %s" in sql:
+            key = (params[0], params[1], "daily", params[2])
+            self._result = [(self.rows[key],)] if key in self.rows else []
+        else:
+            model, version, start, end = params
+            self._result = [
+                (self.rows[key],) for key in sorted(self.rows, key=lambda k: k[3])
+                if key[:3] == (model, version, "daily") and start < key[3] <= end
+            ]
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+    def fetchall(self):
+        return list(self._result)
+
+
+def test_sketch_counts_accumulate_across_runs():
+    from datetime import date
+
+    from analytics.drift_sketch import DriftSketch, accumulate
+
+    baseline = DriftSketch.from_baseline(_features(2000), ["mom_6", "vol_90", "trend_200"])
+    runs = [_features(300, seed=s) for s in (1, 2, 3)]
+    conn = _SketchTable()
+    for run in runs:
+        sketch = accumulate(conn, baseline, run, "model_a", "v9", day=date(2024, 6, 3))
+
+    assert len(conn.rows) == 1
+    whole = baseline.empty_like().update(pd.concat(runs))
+    np.testing.assert_array_equal(sketch.counts, whole.counts)
+    assert sketch.meta["rows"] == 900
+    # Identical distribution: no drift; out-of-range values still land in the outer bins
+    assert (baseline.psi(sketch) < 0.05).all()
+    extreme = baseline.empty_like().update(pd.DataFrame({"mom_6": [1e6], "vol_90": [-1e6]}))
+    assert extreme.counts[0, -1] == 1 and extreme.counts[1, 0] == 1
+    assert extreme.missing[2] == 1
+
+
+def test_audit_job_uses_stored_baseline_and_daily_window(tmp_path, monkeypatch):
+    from datetime import date
+
+    from analytics import drift_sketch
+    from jobs import audit_drift_job as job
+
+    conn = _SketchTable()
+    baseline = drift_sketch.DriftSketch.from_baseline(_features(3000), ["mom_6", "vol_90", "trend_200"])
+    drift_sketch.save_sketch(conn, baseline, "model_a", "v9", kind="baseline")
+    today = date.today()
+    for i, shift in enumerate((1.0, 1.0, 0.0)):
+        day = date.fromordinal(today.toordinal() - i)
+        drift_sketch.accumulate(conn, baseline, _features(400, shift=shift, seed=i), "model_a", "v9", day=day)
+
+    # No artifact on disk: the baseline comes from the table, as in the drift cron's container
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(drift_sketch, "_today", lambda: today)
+    monkeypatch.setattr(job, "DRIFT_MODEL_VERSION", "v9")
+    monkeypatch.setattr(job, "DRIFT_WINDOW_DAYS", 2)
+
+    current = job.load_current(conn, job.load_baseline(conn))
+    out = job.compute_drift(job.load_baseline(conn), current)
+
+    assert current.meta["rows"] == 800
+    assert out.iloc[0]["feature"] == "mom_6"
+    assert out.iloc[0]["psi"] > 0.25
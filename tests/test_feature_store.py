@@ -0,0 +1,152 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from analytics.feature_store import (
+    FeatureStore,
+    contiguous_runs,
+    month_range,
+    partition_fingerprints,
+    windows_span,
+)
+
+WINDOWS = {"prices": (2, 1), "fundamentals": "cumulative"}
+
+
+def _frame(start="2024-01-01", end="2024-06-30"):
+    dates = pd.bdate_range(start, end)
+    return pd.DataFrame({
+        "date": np.repeat(dates.date, 2),
+        "symbol": np.tile(["AAA.AX", "BBB.AX"], len(dates)),
+        "close": np.arange(2 * len(dates), dtype=float),
+        "mom_6": 0.1,
+        "vol_90": 0.2,
+    })
+
+
+def _digests():
+    months = month_range("2023-10-01", "2024-07-31")
+    return {
+        "prices": {m: f"p-{m}" for m in months},
+        "fundamentals": {"2024-03": "q1"},
+    }
+
+
+def test_fingerprints_follow_input_windows():
+    months = month_range("2024-01-01", "2024-06-30")
+    base = partition_fingerprints(months, _digests(), WINDOWS, "v1")
+
+    restated = _digests()
+    restated["prices"]["2024-03"] = "changed"
+    restated["fundamentals"]["2024-05"] = "q2"
+    changed = partition_fingerprints(months, restated, WINDOWS, "v1")
+
+    # prices 2024-03 feeds 2024-02 (label window) to 2024-05 (warm-up);
+    # the new fundamentals quarter feeds 2024-05 onwards
+    assert [m for m in months if base[m] != changed[m]] == ["2024-02", "2024-03", "2024-04", "2024-05", "2024-06"]
+    assert partition_fingerprints(months, _digests(), WINDOWS, "v2") != base
+
+
+def test_only_stale_partitions_are_rebuilt(tmp_path):
+    store = FeatureStore("features", root=str(tmp_path))
+    months = month_range("2024-01-01", "2024-06-30")
+    fingerprints = partition_fingerprints(months, _digests(), WINDOWS, "v1")
+
+    assert store.stale_partitions(fingerprints, "v1") == months
+    written = store.write_partitions(_frame(), months, fingerprints, "v1")
+    assert sum(written.values()) == len(_frame())
+    assert store.stale_partitions(fingerprints, "v1") == []
+
+    digests = _digests()
+    digests["prices"]["2024-07"] = "new bars"
+    fresh = partition_fingerprints(months, digests, WINDOWS, "v1")
+    assert store.stale_partitions(fresh, "v1") == ["2024-06"]
+    # Feature definition bump invalidates everything
+    assert store.stale_partitions(fresh, "v2") == months
+
+
+def test_read_projects_columns_and_filters_dates(tmp_path):
+    store = FeatureStore("features", root=str(tmp_path))
+    months = month_range("2024-01-01", "2024-06-30")
+    store.write_partitions(_frame(), months, dict.fromkeys(months, "x"), "v1")
+
+    df = store.read(columns=["symbol", "mom_6", "missing_col"], start_date="2024-05-15", end_date="2024-06-10")
+
+    assert set(df.columns) == {"date", "symbol", "mom_6"}
+    assert pd.to_datetime(df["date"]).min() >= pd.Timestamp("2024-05-15")
+    assert pd.to_datetime(df["date"]).max() <= pd.Timestamp("2024-06-10")
+    assert store.latest_date() == pd.Timestamp("2024-06-28").date()
+
+
+def test_chunked_writes_unify_sparse_columns(tmp_path):
+    store = FeatureStore("features", root=str(tmp_path))
+    frame = _frame("2024-01-01", "2024-02-29")
+    frame["sector"] = np.where(frame["symbol"] == "AAA.AX", "Materials", None)
+    chunks = [chunk for _, chunk in frame.groupby("symbol")]
+
+    written = store.write_partitions(iter(chunks), ["2024-01", "2024-02"], {"2024-01": "a", "2024-02": "b"}, "v1")
+
+    assert written == {"2024-01": 46, "2024-02": 42}
+    assert not list(tmp_path.glob("features/*.staging"))
+    months = list(store.iter_months(columns=["symbol", "sector"]))
+    assert [len(m) for m in months] == [46, 42]
+    assert months[0].dtypes.equals(months[1].dtypes)
+    assert set(store.read()["sector"].dropna()) == {"Materials"}
+
+
+def test_prune_and_version_bump_remove_old_partitions(tmp_path):
+    store = FeatureStore("features", root=str(tmp_path))
+    months = month_range("2024-01-01", "2024-06-30")
+    store.write_partitions(_frame(), months, dict.fromkeys(months, "x"), "v1")
+
+    assert store.prune(keep=months[2:]) == ["2024-01", "2024-02"]
+    assert not (tmp_path / "features" / "month=2024-01").exists()
+
+    store.write_partitions(_frame("2024-05-01"), ["2024-05", "2024-06"], dict.fromkeys(months, "y"), "v2")
+    manifest = json.loads((tmp_path / "features" / "manifest.json").read_text())
+    assert manifest["version"] == "v2"
+    assert sorted(manifest["partitions"]) == ["2024-05", "2024-06"]
+    assert not (tmp_path / "features" / "month=2024-03").exists()
+
+
+def test_contiguous_runs_and_span():
+    assert contiguous_runs(["2024-03", "2023-12", "2024-01", "2024-06"]) == [
+        ["2023-12", "2024-01"], ["2024-03"], ["2024-06"],
+    ]
+    assert windows_span(WINDOWS) == (2, 1)
+
+
+def test_extended_build_recomputes_only_changed_months(tmp_path, monkeypatch):
+    from functools import partial
+
+    from jobs import build_extended_feature_set as job
+
+    digests = _digests()
+    calls = []
+
+    def fake_chunks(start, end):
+        calls.append((str(start), str(end)))
+        frame = _frame(str(start), str(end))
+        for _, chunk in frame.groupby("symbol"):
+            yield chunk
+
+    monkeypatch.setattr(job, "FeatureStore", partial(FeatureStore, root=str(tmp_path)))
+    monkeypatch.setattr(job, "INPUT_WINDOWS", WINDOWS)
+    monkeypatch.setattr(job, "input_digests", lambda: digests)
+    monkeypatch.setattr(job, "iter_feature_chunks", fake_chunks)
+    monkeypatch.setattr(job, "db", lambda: (_ for _ in ()).throw(RuntimeError("no db")))
+
+    first = job.build_features("2024-01-01", "2024-06-30")
+    assert calls == [("2023-11-01", "2024-06-30")]
+    assert first == len(_frame())
+    # One part file per symbol chunk
+    assert len(list((tmp_path / job.FEATURE_DATASET / "month=2024-03").glob("part-*.parquet"))) == 2
+
+    job.build_features("2024-01-01", "2024-06-30")
+    assert len(calls) == 1
+
+    digests["prices"]["2024-06"] = "late bar"
+    job.build_features("2024-01-01", "2024-06-30")
+    # Warm-up from 2024-03 for the 2024-05..06 partitions that read June prices
+    assert calls[-1] == ("2024-03-01", "2024-06-30")
@@ -0,0 +1,118 @@
+from datetime import date
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics import forward_returns, trading_calendar
+
+
+def _prices(n=40, symbols=("AAA.AX", "BBB.AX"), seed=3):
+    rng = np.random.default_rng(seed)
+    dates = pd.DatetimeIndex(trading_calendar.trading_days("2024-01-01", "2025-12-31")[:n])
+    frames = [
+        pd.DataFrame({
+            "symbol": s,
+            "dt": dates,
+            "close": 10 * np.cumprod(1 + rng.normal(0, 0.01, n)),
+        })
+        for s in symbols
+    ]
+    # Shuffle to check ordering is handled
+    return pd.concat(frames).sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+def _cursor(conn):
+    return conn.cursor.return_value.__enter__.return_value
+
+
+def test_compute_matches_per_symbol_shift():
+    prices = _prices()
+
+    long = forward_returns.compute_forward_returns(prices, horizons=(1, 21))
+
+    for symbol, px in prices.sort_values("dt").groupby("symbol"):
+        expected = (px["close"].shift(-21) / px["close"] - 1).dropna().to_numpy()
+        got = long[(long["symbol"] == symbol) & (long["horizon"] == 21)].sort_values("dt")
+        np.testing.assert_allclose(got["fwd_return"], expected)
+        assert (got["end_dt"].to_numpy() == px["dt"].to_numpy()[21:]).all()
+    # Never crosses symbols: last bar of each symbol has no 1-day return
+    assert len(long[long["horizon"] == 1]) == 2 * 39
+
+
+def test_compute_uses_exchange_sessions_across_missing_bars():
+    prices = pd.DataFrame({
+        "symbol": "AAA.AX",
+        # 2024-01-26 (Australia Day) is a holiday; 2024-01-30 has no bar
+        "dt": pd.to_datetime(["2024-01-24", "2024-01-25", "2024-01-29", "2024-01-31", "2024-02-01"]),
+        "close": [10.0, 11.0, 12.0, 13.0, 14.0],
+    })
+
+    long = forward_returns.compute_forward_returns(prices, horizons=(1, 3)).set_index(["dt", "horizon"])
+
+    assert long.loc[(pd.Timestamp("2024-01-25"), 1), "end_dt"] == pd.Timestamp("2024-01-29")
+    # 01-29 + 1 session = 01-30 (suspended): valued at the last close
+    assert long.loc[(pd.Timestamp("2024-01-29"), 1), "fwd_return"] == pytest.approx(0.0)
+    assert long.loc[(pd.Timestamp("2024-01-24"), 3), "fwd_return"] == pytest.approx(12.0 / 10.0 - 1)
+    assert (pd.Timestamp("2024-01-31"), 3) not in long.index
+
+
+def test_attach_labels_falls_back_to_close_and_keeps_date_dtype():
+    prices = _prices()
+    prices["date"] = prices.pop("dt").dt.date
+
+    out = forward_returns.attach_labels(prices, horizons=(21,), date_col="date")
+
+    assert isinstance(out["date"].iloc[0], date)
+    px = out[out["symbol"] == "AAA.AX"].sort_values("date")
+    expected = px["close"].shift(-21) / px["close"] - 1
+    np.testing.assert_allclose(px["return_1m_fwd"], expected)
+
+
+def test_attach_labels_prefers_table_and_fills_gaps():
+    prices = _prices(n=30, symbols=("AAA.AX",))
+    stored = pd.Timestamp(prices["dt"].min())
+    conn = MagicMock()
+    _cursor(conn).fetchall.return_value = [("AAA.AX", stored.date(), 21, 0.5)]
+
+    out = forward_returns.attach_labels(prices, conn, horizons=(21,)).sort_values("dt")
+
+    assert out["return_1m_fwd"].iloc[0] == pytest.approx(0.5)
+    # Second bar is not in the table: computed from close
+    expected = out["close"].iloc[22] / out["close"].iloc[1] - 1
+    assert out["return_1m_fwd"].iloc[1] == pytest.approx(expected)
+    assert out["return_1m_fwd"].iloc[-1:].isna().all()
+
+
+def test_update_inserts_only_rows_past_watermark(monkeypatch):
+    prices = _prices(n=30, symbols=("AAA.AX",))
+    last = prices["dt"].sort_values().iloc[5]
+    conn = MagicMock()
+    cur = _cursor(conn)
+    cur.fetchall.side_effect = [
+        [("AAA.AX", 1, last.date()), ("AAA.AX", 5, last.date())],
+        list(prices[["symbol", "dt", "close"]].itertuples(index=False, name=None)),
+    ]
+    written = {}
+    monkeypatch.setattr(
+        forward_returns, "execute_values",
+        lambda cur, sql, rows, page_size: written.setdefault("rows", rows),
+    )
+
+    counts = forward_returns.update_forward_returns(conn, horizons=(1, 5))
+
+    price_query_params = cur.execute.call_args_list[1].args[1]
+    assert price_query_params[0] == ["AAA.AX"]
+    assert price_query_params[1] == [last.date()]
+    assert counts == {1: 29 - 6, 5: 25 - 6}
+    assert all(row[1] > last.date() for row in written["rows"])
+
+
+def test_update_without_new_prices_writes_nothing(monkeypatch):
+    conn = MagicMock()
+    _cursor(conn).fetchall.side_effect = [[], []]
+    monkeypatch.setattr(forward_returns, "execute_values", MagicMock())
+
+    assert forward_returns.update_forward_returns(conn, horizons=(1, 21)) == {1: 0, 21: 0}
+    forward_returns.execute_values.assert_not_called()
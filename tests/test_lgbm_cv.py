@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import TimeSeriesSplit
+
+from analytics import lgbm_cv
+
+PARAMS = dict(n_estimators=20, learning_rate=0.1, num_leaves=8, min_child_samples=5)
+
+
+def _data(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 4)), columns=["mom_6", "vol_90", "pe_ratio", "roe"])
+    y_reg = 0.02 * X["mom_6"] + rng.normal(0, 0.01, n)
+    return X, (y_reg > 0).astype(int), y_reg
+
+
+def _candidates(grid=({},)):
+    candidates = {}
+    for i, p in enumerate(lgbm_cv.param_grid(list(grid), PARAMS)):
+        candidates[f"clf_{i}"] = {"label": "class", "objective": "binary", "metric": "auc", "params": p}
+        candidates[f"reg_{i}"] = {"label": "reg", "objective": "regression", "metric": "rmse", "params": p}
+    return candidates
+
+
+def _run(X, y_class, y_reg, cache_dir, workers=2, grid=({},)):
+    data = lgbm_cv.BinnedDataset(X, {"class": y_class, "reg": y_reg}, cache_dir=str(cache_dir))
+    folds = list(TimeSeriesSplit(n_splits=4).split(X))
+    return data, lgbm_cv.cross_validate(data, folds, _candidates(grid), workers=workers, threads=1)
+
+
+def test_cross_validate_scores_every_candidate_and_fold(tmp_path):
+    X, y_class, y_reg = _data()
+
+    data, results = _run(X, y_class, y_reg, tmp_path, grid=({}, {"num_leaves": 4}))
+
+    assert not data.from_cache
+    assert len(results) == 4 * 4
+    assert not results["cached"].any()
+    auc = results[results["candidate"].str.startswith("clf")]["score"]
+    assert auc.between(0.5, 1.0).all()
+    assert results["best_iteration"].eq(20).all()
+
+
+def test_parallel_matches_sequential(tmp_path):
+    X, y_class, y_reg = _data()
+
+    _, sequential = _run(X, y_class, y_reg, tmp_path / "a", workers=1)
+    _, parallel = _run(X, y_class, y_reg, tmp_path / "b", workers=4)
+
+    np.testing.assert_allclose(parallel["score"], sequential["score"])
+
+
+def test_rerun_reuses_dataset_and_unchanged_folds(tmp_path):
+    X, y_class, y_reg = _data()
+    _run(X, y_class, y_reg, tmp_path)
+
+    data, again = _run(X, y_class, y_reg, tmp_path)
+    assert data.from_cache
+    assert again["cached"].all()
+
+    # A restated label in the last fold's validation window only retrains that fold
+    y_reg = y_reg.copy()
+    y_reg.iloc[-1] += 1.0
+    _, restated = _run(X, y_class, y_reg, tmp_path)
+    retrained = restated[~restated["cached"]]
+    assert retrained["candidate"].tolist() == ["reg_0"]
+    assert retrained["fold"].tolist() == [4]
+
+
+def test_balanced_weights_and_early_stopping(tmp_path):
+    X, y_class, y_reg = _data()
+    weights = lgbm_cv._balanced_weights(np.array([0, 0, 0, 1]))
+    np.testing.assert_allclose(weights, [4 / 6, 4 / 6, 4 / 6, 2.0])
+
+    data = lgbm_cv.BinnedDataset(X, {"class": y_class}, cache_dir=str(tmp_path))
+    spec = {
+        "label": "class", "objective": "binary", "metric": "auc",
+        "params": {**PARAMS, "n_estimators": 500, "class_weight": "balanced"},
+        "early_stopping_rounds": 5,
+    }
+    folds = list(TimeSeriesSplit(n_splits=3).split(X))
+    result = lgbm_cv.fit_fold(data, *folds[-1], spec, seed=1, threads=1)
+
+    assert result["best_iteration"] < 500
+    assert 0.0 <= result["score"] <= 1.0
+
+
+def test_best_candidate_respects_metric_direction():
+    results = pd.DataFrame({
+        "candidate": ["clf_0", "clf_1", "reg_0", "reg_1"],
+        "score": [0.55, 0.60, 0.020, 0.010],
+    })
+    candidates = _candidates(({}, {"num_leaves": 4}))
+
+    clf = {k: v for k, v in candidates.items() if k.startswith("clf")}
+    reg = {k: v for k, v in candidates.items() if k.startswith("reg")}
+    assert lgbm_cv.best_candidate(results[results["candidate"].isin(clf)], clf) == "clf_1"
+    assert lgbm_cv.best_candidate(results[results["candidate"].isin(reg)], reg) == "reg_1"
+
+
+def test_cache_keeps_most_recent_datasets_and_results(tmp_path, monkeypatch):
+    import os
+    import time
+
+    monkeypatch.setattr(lgbm_cv, "LGBM_CACHE_MAX_DATASETS", 2)
+    monkeypatch.setattr(lgbm_cv, "LGBM_CACHE_MAX_RESULTS", 3)
+    now = time.time()
+    keys = []
+    for age, seed in zip((100, 50, 0), (1, 2, 3)):
+        X, y_class, _ = _data(seed=seed)
+        data = lgbm_cv.BinnedDataset(X, {"class": y_class}, cache_dir=str(tmp_path))
+        path = tmp_path / "datasets" / f"{data.key}.bin"
+        os.utime(path, (now - age, now - age))
+        keys.append(data.key)
+
+    remaining = sorted(p.stem for p in (tmp_path / "datasets").glob("*.bin"))
+    assert remaining == sorted(keys[1:])
+
+    X, y_class, y_reg = _data()
+    _run(X, y_class, y_reg, tmp_path)
+    assert len(list((tmp_path / "results").glob("*.json"))) == 3
@@ -128,3 +128,44 @@ def test_refinance_scenario():
 
     assert monthly_savings > 0
     assert total_savings > 10000  # Should save meaningful amount over loan life
+
+
+def test_vectorized_schedule_matches_monthly_loop():
+    """Array amortization should reproduce the month-by-month recursion, including offset."""
+    from analytics.amortization import schedule
+
+    principal, annual_rate, years, extra, offset = 300000, 0.05, 15, 1000, 50000
+    rate = annual_rate / 12
+    payment = principal * rate / (1 - (1 + rate) ** -(years * 12))
+
+    balance, rows = principal, []
+    for month in range(1, years * 12 + 1):
+        interest = max(balance - offset, 0) * rate
+        balance -= payment - interest + extra
+        rows.append((month, interest, max(balance, 0)))
+        if balance <= 0:
+            break
+
+    df = schedule(principal, annual_rate, years, extra_payment=extra, offset_balance=offset)
+
+    assert len(df) == len(rows)
+    np.testing.assert_allclose(df[["month", "interest", "balance"]].to_numpy(), np.array(rows), atol=1e-6)
+
+
+def test_scenario_grid_summary():
+    """Extra payments and offsets should shorten the loan and save interest across the grid."""
+    from analytics.amortization import amortize, scenario_grid
+
+    grid = scenario_grid(500000, [0.05, 0.06], [25, 30], [0, 500], [0, 100000])
+    summary, schedules = amortize(
+        grid["principal"], grid["annual_rate"], grid["years"],
+        grid["extra_payment"], grid["offset_balance"], schedules=True,
+    )
+
+    assert len(summary) == 16
+    plain = (grid["extra_payment"] == 0) & (grid["offset_balance"] == 0)
+    assert np.allclose(summary.loc[plain, "interest_saved"], 0, atol=1e-6)
+    assert (summary.loc[~plain, "interest_saved"] > 0).all()
+    assert (summary.loc[~plain, "months_saved"] > 0).all()
+    assert np.isclose(summary.loc[0, "monthly_payment"], 2922.95, atol=0.01)
+    assert (schedules.groupby("scenario").size().to_numpy() == summary["months"].to_numpy()).all()
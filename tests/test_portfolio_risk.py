@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from analytics import portfolio_risk
+
+
+def _returns(n=250, seed=5):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2024-01-01", periods=n)
+    bench = rng.normal(0.0004, 0.01, n)
+    R = pd.DataFrame({
+        "BHP.AX": 1.2 * bench + rng.normal(0, 0.006, n),
+        "CBA.AX": 0.6 * bench + rng.normal(0, 0.004, n),
+        "WES.AX": 0.9 * bench + rng.normal(0, 0.005, n),
+    }, index=idx)
+    return R, pd.Series(bench, index=idx)
+
+
+def test_single_portfolio_matches_direct_calculation():
+    R, bench = _returns()
+    w = np.array([0.5, 0.3, 0.2])
+
+    port = portfolio_risk.portfolio_returns(R, w)
+    m = portfolio_risk.risk_metrics(port, bench).iloc[0]
+
+    direct = R.to_numpy() @ w
+    np.testing.assert_allclose(port[0], direct)
+    assert np.isclose(m["volatility"], np.std(direct) * np.sqrt(252) * 100)
+    assert np.isclose(m["beta"], np.cov(direct, bench)[0, 1] / np.var(bench, ddof=1))
+    wealth = np.cumprod(1 + direct)
+    expected_dd = min((wealth / np.maximum.accumulate(np.maximum(wealth, 1)) - 1).min(), 0) * 100
+    assert np.isclose(m["max_drawdown_pct"], expected_dd)
+    assert m["max_drawdown_pct"] <= 0
+
+
+def test_missing_returns_renormalise_weights():
+    R, _ = _returns(n=10)
+    R.iloc[:5, 0] = np.nan
+
+    port = portfolio_risk.portfolio_returns(R, np.array([0.5, 0.25, 0.25]))
+
+    np.testing.assert_allclose(port[0].iloc[:5], R.iloc[:5, 1:].mean(axis=1))
+    np.testing.assert_allclose(port[0].iloc[5:], R.iloc[5:] @ np.array([0.5, 0.25, 0.25]))
+
+
+def test_sparse_weight_matrix_scores_every_portfolio():
+    R, bench = _returns()
+    W = np.array([[0.5, 0.3, 0.2], [0.0, 1.0, 0.0], [0.0, 0.0, 0.0]])
+
+    dense = portfolio_risk.risk_metrics(portfolio_risk.portfolio_returns(R, W), bench)
+    sparse_ = portfolio_risk.risk_metrics(portfolio_risk.portfolio_returns(R, sparse.csr_matrix(W)), bench)
+
+    pd.testing.assert_frame_equal(dense, sparse_)
+    assert dense.loc[1, "beta"] < dense.loc[0, "beta"]
+    # An empty portfolio has no metrics
+    assert dense.loc[2, ["volatility", "beta"]].isna().all()
@@ -0,0 +1,77 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from analytics import portfolio_risk
+from jobs import compute_portfolio_risk_job as job
+
+SYMBOLS = ["BHP.AX", "CBA.AX", "CSL.AX", "WES.AX"]
+
+
+def _returns(n=200, seed=11):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2024-01-01", periods=n)
+    bench = pd.Series(rng.normal(0.0003, 0.01, n), index=idx)
+    R = pd.DataFrame(
+        {s: (0.5 + i * 0.3) * bench + rng.normal(0, 0.006, n) for i, s in enumerate(SYMBOLS)}, index=idx
+    )
+    R.iloc[:40, 2] = np.nan  # CSL listed late
+    return R, bench
+
+
+def _holdings():
+    return pd.DataFrame([
+        (1, "BHP.AX", 5000.0, 10.0, "BUY"),
+        (1, "CBA.AX", 3000.0, -4.0, "HOLD"),
+        (1, "BHP.AX", 2000.0, 6.0, "BUY"),
+        (2, "CSL.AX", 4000.0, 2.0, None),
+        (2, "WES.AX", 4000.0, 1.0, "SELL"),
+        (3, "WES.AX", 1000.0, None, "HOLD"),
+    ], columns=["portfolio_id", "ticker", "current_value", "unrealized_pl_pct", "current_signal"])
+
+
+def test_batch_matches_single_portfolio_metrics():
+    R, bench = _returns()
+    holdings = _holdings()
+
+    batch = job.compute_metrics(holdings, R, bench).set_index("portfolio_id")
+
+    for pid, rows in holdings.groupby("portfolio_id"):
+        w = rows.groupby("ticker")["current_value"].sum()
+        w = w / w.sum()
+        single = portfolio_risk.risk_metrics(
+            portfolio_risk.portfolio_returns(R[list(w.index)], w.to_numpy()), bench
+        ).iloc[0]
+        for col in ("volatility", "sharpe_ratio", "beta", "max_drawdown_pct"):
+            assert np.isclose(batch.loc[pid, col], single[col]), (pid, col)
+
+
+def test_concentration_and_signals_per_portfolio():
+    R, bench = _returns()
+
+    batch = job.compute_metrics(_holdings(), R, bench).set_index("portfolio_id")
+
+    assert np.isclose(batch.loc[1, "top_holding_weight_pct"], 50.0)
+    assert np.isclose(batch.loc[1, "herfindahl_index"], 0.5**2 + 0.3**2 + 0.2**2)
+    assert np.isclose(batch.loc[1, "total_return_pct"], 4.0)
+    assert json.loads(batch.loc[1, "signal_distribution"]) == {"BUY": 2, "HOLD": 1}
+    assert json.loads(batch.loc[2, "signal_distribution"]) == {"SELL": 1, "UNKNOWN": 1}
+    assert np.isnan(batch.loc[3, "total_return_pct"])
+    assert set(job.METRIC_COLUMNS) - {"as_of", "calculation_timestamp"} <= set(batch.reset_index().columns)
+
+
+def test_correlation_matrix_matches_single_portfolio():
+    R, bench = _returns()
+    holdings = _holdings()
+
+    batch = job.compute_metrics(holdings, R, bench).set_index("portfolio_id")
+
+    for pid, rows in holdings.groupby("portfolio_id"):
+        tickers = list(dict.fromkeys(rows["ticker"]))
+        expected = portfolio_risk.correlation_matrix(R[tickers]) if len(tickers) > 1 else {}
+        stored = json.loads(batch.loc[pid, "correlation_matrix"])
+        assert stored.keys() == expected.keys(), pid
+        for ticker, row in expected.items():
+            assert np.allclose(list(stored[ticker].values()), list(row.values())), (pid, ticker)
+    assert json.loads(batch.loc[3, "correlation_matrix"]) == {}
@@ -0,0 +1,80 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics import projection
+from analytics.covariance import estimate
+
+INPUTS = dict(
+    equity_value=200_000.0, equity_mu=0.006, equity_sigma=0.045,
+    property_value=800_000.0, property_growth=0.04, property_vol=0.08, equity_property_corr=0.3,
+    loan_balance=500_000.0, loan_rate=0.06, loan_payment=3_500.0, loan_rate_vol=0.01,
+)
+
+
+def test_seeded_paths_are_reproducible():
+    a = projection.simulate(years=5, n_paths=2_500, seed=7, chunk_size=1_000, **INPUTS)
+    b = projection.simulate(years=5, n_paths=2_500, seed=7, chunk_size=1_000, **INPUTS)
+    c = projection.simulate(years=5, n_paths=2_500, seed=8, chunk_size=1_000, **INPUTS)
+
+    assert a["net_worth"].shape == (2_500, 6)
+    np.testing.assert_array_equal(a["net_worth"], b["net_worth"])
+    assert not np.array_equal(a["equity"], c["equity"])
+    assert (a["equity"][:, 0] == INPUTS["equity_value"]).all()
+
+
+def test_deterministic_paths_match_closed_form():
+    inputs = dict(INPUTS, equity_sigma=0.0, property_vol=0.0, loan_rate_vol=0.0)
+    out = projection.simulate(years=3, n_paths=10, seed=0, **inputs)
+
+    years = np.arange(4)
+    np.testing.assert_allclose(out["equity"][0], 200_000 * np.exp(0.006 * 12 * years))
+    np.testing.assert_allclose(out["property"][0], 800_000 * np.exp(0.04 * years))
+    r, months = 0.06 / 12, 12 * years
+    balance = 500_000 * (1 + r) ** months - 3_500 * ((1 + r) ** months - 1) / r
+    np.testing.assert_allclose(out["loan"][0], balance)
+
+
+def test_loan_stays_repaid():
+    out = projection.simulate(years=10, n_paths=200, seed=1, **dict(INPUTS, loan_balance=50_000.0))
+    assert (out["loan"][:, 2:] == 0).all()
+
+
+def test_fan_chart_percentiles_ordered():
+    fans = projection.project(years=10, n_paths=5_000, seed=3, **INPUTS)
+
+    assert set(fans) == {"equity", "property", "loan", "net_worth"}
+    equity = fans["equity"]
+    assert list(equity.columns) == ["p5", "p25", "p50", "p75", "p95"]
+    assert len(equity) == 11
+    assert (np.diff(equity.to_numpy(), axis=1) >= 0).all()
+    assert (equity.iloc[0] == INPUTS["equity_value"]).all()
+
+
+def test_equity_moments_scale_to_monthly():
+    rng = np.random.default_rng(0)
+    returns = pd.DataFrame(rng.normal(0, 0.01, (250, 3)), columns=["A", "B", "C"])
+    cov = estimate(returns)
+    weights = pd.Series(1.0, index=["A", "B", "D"])  # D has no history
+    expected = pd.Series({"A": 0.12, "B": 0.06, "C": 0.0})
+
+    mu, sigma = projection.equity_moments(weights, expected, cov, horizon_days=126)
+
+    monthly = (1 + expected[["A", "B"]]) ** (21 / 126) - 1
+    assert np.isclose(mu, monthly.mean())
+    assert np.isclose(sigma, np.sqrt(cov.portfolio_variance(pd.Series(0.5, index=["A", "B"])) * 21))
+
+
+def test_ten_thousand_paths_ten_years_is_fast():
+    projection.project(years=1, n_paths=100, seed=0, **INPUTS)
+    started = time.perf_counter()
+    projection.project(years=10, n_paths=10_000, seed=0, **INPUTS)
+    assert time.perf_counter() - started < 1.0
+
+
+def test_chunk_size_is_capped_by_cell_budget(monkeypatch):
+    monkeypatch.setattr(projection, "PROJECTION_MAX_CHUNK_CELLS", 120 * 50)
+    capped = projection.simulate(years=10, n_paths=200, seed=5, chunk_size=100_000, **INPUTS)
+    explicit = projection.simulate(years=10, n_paths=200, seed=5, chunk_size=50, **INPUTS)
+    np.testing.assert_array_equal(capped["net_worth"], explicit["net_worth"])
@@ -0,0 +1,210 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics import rebalancing
+
+
+def _positions():
+    return pd.DataFrame([
+        (1, "WES.AX", 200, 32.0, 6400.0, "STRONG_SELL", 75.0),
+        (1, "BHP.AX", 100, 45.5, 4550.0, "STRONG_BUY", 85.0),
+        (1, "CBA.AX", 50, 105.0, 5250.0, "HOLD", 55.0),
+        (1, "NAB.AX", 150, 28.0, 4200.0, "SELL", 65.0),
+        (2, "CSL.AX", 20, 280.0, 5600.0, None, None),
+        (2, "STO.AX", 100, 7.0, 700.0, "BUY", 72.0),
+        (2, "RIO.AX", 10, 120.0, 1200.0, "HOLD", 60.0),
+    ], columns=["portfolio_id", "ticker", "shares", "current_price", "current_value",
+                "current_signal", "signal_confidence"])
+
+
+def test_target_weights_rules():
+    cw = np.array([5.0, 5.0, 9.0, 1.0, 1.0, 20.0, 4.0])
+    signal = np.array(["STRONG_SELL", "SELL", "STRONG_BUY", "BUY", "HOLD", None, "BUY"], dtype=object)
+    conf = np.array([70.0, 60.0, 80.0, 70.0, 90.0, np.nan, 69.0])
+
+    target = rebalancing.target_weights(cw, signal, conf)
+
+    np.testing.assert_allclose(target, [0.0, 2.5, 10.0, 2.0, 1.0, 10.0, 4.0])
+
+
+def test_plan_trades_batch_matches_each_portfolio():
+    positions = _positions()
+
+    batch = rebalancing.plan_trades(positions)
+
+    for pid, rows in positions.groupby("portfolio_id"):
+        single = rebalancing.plan_trades(rows.drop(columns="portfolio_id")).drop(columns="portfolio_id")
+        pd.testing.assert_frame_equal(
+            batch[batch["portfolio_id"] == pid].drop(columns="portfolio_id").reset_index(drop=True), single
+        )
+
+
+def test_plan_trades_actions_and_priority():
+    plan = rebalancing.plan_trades(_positions()).set_index(["portfolio_id", "ticker"])
+
+    wes = plan.loc[(1, "WES.AX")]
+    assert wes["action"] == "SELL" and wes["suggested_quantity"] == 200 and wes["priority"] == 1
+    assert "overweight" in wes["reason"]
+    assert plan.loc[(1, "NAB.AX"), "action"] == "TRIM"
+    assert plan.loc[(1, "NAB.AX"), "target_weight_pct"] == 10.0  # halved, then capped
+
+    # Unsignalled 75% position is capped at 10%; a BUY is raised up to the cap
+    assert plan.loc[(2, "CSL.AX"), "target_weight_pct"] == 10.0
+    assert plan.loc[(2, "STO.AX"), "action"] == "ADD"
+    assert list(plan.loc[2, "priority"]) == list(range(1, len(plan.loc[2]) + 1))
+
+    turnover = rebalancing.turnover(plan.reset_index())
+    assert turnover.loc[1] > 0 and turnover.loc[2] > 0
+
+
+def test_plan_trades_skips_small_changes():
+    positions = pd.DataFrame({
+        "ticker": ["A", "B"], "shares": [10, 10], "current_price": [10.0, 10.0],
+        "current_value": [100.0, 100.0], "current_signal": ["HOLD", "HOLD"], "signal_confidence": [60.0, 60.0],
+        "total_value": [2000.0, 2000.0], "target_weight_pct": [5.2, np.nan],
+    })
+
+    assert rebalancing.plan_trades(positions).empty
+
+
+# --- Parity with the pre-vectorization RebalancingService loops -------------
+
+MAX_POSITION, MIN_POSITION, OVERWEIGHT = 10.0, 2.0, 15.0
+
+
+def _legacy_target_weights(holdings, total_value):
+    targets = {}
+    for h in holdings:
+        signal, confidence = h.get('current_signal'), h.get('signal_confidence', 0)
+        cw = (h.get('current_value', 0) / total_value) * 100 if total_value > 0 else 0
+        if signal == 'STRONG_SELL' and confidence >= 70:
+            tw = 0.0
+        elif signal == 'SELL' and confidence >= 60:
+            tw = cw * 0.5
+        elif signal == 'STRONG_BUY' and confidence >= 80:
+            tw = min(cw * 1.2, MAX_POSITION)
+        elif signal == 'BUY' and confidence >= 70:
+            tw = min(cw * 1.1, MAX_POSITION)
+        else:
+            tw = cw
+        if tw > MAX_POSITION:
+            tw = MAX_POSITION
+        if 0 < tw < MIN_POSITION:
+            tw = MIN_POSITION if signal in ['BUY', 'STRONG_BUY'] else cw
+        targets[h.get('ticker')] = tw
+    return targets
+
+
+def _legacy_actions(current_weights, target_weights, holdings, total_value, threshold=0.5):
+    actions, holdings_map = [], {h.get('ticker'): h for h in holdings}
+    for ticker, tw in target_weights.items():
+        cw = current_weights.get(ticker, 0)
+        if abs(tw - cw) < threshold and tw > 0:
+            continue
+        h = holdings_map.get(ticker, {})
+        signal, confidence = h.get('current_signal'), h.get('signal_confidence', 50.0)
+        price, shares = h.get('current_price', 0), h.get('shares', 0)
+        if tw == 0:
+            action, qty = 'SELL', float(shares)
+            value = qty * price if price else 0
+            reason = f"{signal} signal (confidence: {confidence:.1f}%). Exit position."
+            score = float(confidence)
+        elif tw < cw - threshold:
+            action, value = 'TRIM', (cw - tw) / 100 * total_value
+            qty = value / price if price else 0
+            reason = f"{signal or 'Rebalance'} - reduce from {cw:.1f}% to {tw:.1f}%"
+            score = float(confidence) * 0.8
+        elif tw > cw + threshold:
+            action, value = 'ADD', (tw - cw) / 100 * total_value
+            qty = value / price if price else 0
+            reason = f"{signal or 'Rebalance'} - increase from {cw:.1f}% to {tw:.1f}%"
+            score = float(confidence) * 0.9
+        else:
+            continue
+        actions.append({
+            'ticker': ticker, 'action': action,
+            'suggested_quantity': float(qty) if qty else None,
+            'suggested_value': float(value) if value else None,
+            'reason': reason, 'current_signal': signal,
+            'signal_confidence': float(confidence) if confidence else None,
+            'current_shares': float(shares) if shares else None,
+            'current_weight_pct': float(cw), 'target_weight_pct': float(tw),
+            'confidence_score': score, 'priority': 1,
+        })
+    for ticker, cw in current_weights.items():
+        if cw <= OVERWEIGHT:
+            continue
+        existing = next((a for a in actions if a['ticker'] == ticker), None)
+        if not existing:
+            h = holdings_map.get(ticker, {})
+            price, shares = h.get('current_price', 0), h.get('shares', 0)
+            value = (cw - 12.0) / 100 * total_value
+            actions.append({
+                'ticker': ticker, 'action': 'TRIM',
+                'suggested_quantity': float(value / price if price else 0),
+                'suggested_value': float(value),
+                'reason': f"Position is {cw:.1f}% of portfolio (overweight). Reduce concentration risk.",
+                'current_signal': h.get('current_signal'), 'signal_confidence': h.get('signal_confidence'),
+                'current_shares': float(shares) if shares else None,
+                'current_weight_pct': float(cw), 'target_weight_pct': 12.0,
+                'confidence_score': 70.0, 'priority': 1,
+            })
+        elif 'concentration' not in existing['reason'].lower():
+            existing['reason'] = f"{existing['reason']} Position overweight ({cw:.1f}%)."
+    return actions
+
+
+def _legacy_prioritize(suggestions):
+    weights = {'SELL': 3, 'TRIM': 2, 'ADD': 1, 'BUY': 1, 'HOLD': 0}
+
+    def key(s):
+        return (weights.get(s['action'], 0) * 100 + s.get('confidence_score', 50.0)
+                + min((s.get('suggested_value') or 0) / 1000, 50))
+
+    ranked = sorted(suggestions, key=key, reverse=True)
+    for i, s in enumerate(ranked, start=1):
+        s['priority'] = i
+    return ranked
+
+
+def _random_holdings(rng):
+    signals = ['STRONG_SELL', 'SELL', 'HOLD', 'BUY', 'STRONG_BUY', None]
+    holdings = []
+    for i in range(rng.integers(1, 13)):
+        shares = int(rng.integers(1, 500))
+        price = float(np.round(rng.uniform(0.5, 150), 2))
+        holdings.append({
+            'ticker': f"T{i}.AX", 'shares': shares, 'current_price': price,
+            'current_value': shares * price,
+            'current_signal': signals[rng.integers(len(signals))],
+            'signal_confidence': float(np.round(rng.uniform(40, 95), 1)),
+        })
+    return holdings
+
+
+def _plan(targets, actions, prioritize, holdings):
+    total = sum(h['current_value'] for h in holdings)
+    current = {h['ticker']: h['current_value'] / total * 100 for h in holdings}
+    return prioritize(actions(current, targets(holdings, total), holdings, total))
+
+
+def test_service_matches_legacy_loops_on_random_portfolios():
+    from app.features.portfolio.services import rebalancing_service
+
+    service = rebalancing_service.RebalancingService()
+    rng = np.random.default_rng(46)
+    for _ in range(300):
+        holdings = _random_holdings(rng)
+        new = _plan(service._calculate_target_weights, service._generate_actions,
+                    service._prioritize_suggestions, holdings)
+        old = _plan(_legacy_target_weights, _legacy_actions, _legacy_prioritize, holdings)
+
+        assert [s['ticker'] for s in new] == [s['ticker'] for s in old]
+        for n, o in zip(new, old):
+            assert set(n) >= set(o)
+            for field, expected in o.items():
+                if isinstance(expected, float):
+                    assert n[field] == pytest.approx(expected), (field, n, o)
+                else:
+                    assert n[field] == expected, (field, n, o)
@@ -0,0 +1,65 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from analytics import risk_model
+
+
+def _returns(n_dates=120, n_symbols=6, seed=3):
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range("2024-01-01", periods=n_dates)
+    market = rng.normal(0, 0.01, n_dates)
+    betas = np.linspace(0.5, 1.5, n_symbols)
+    R = market[:, None] * betas + rng.normal(0, 0.005, (n_dates, n_symbols))
+    returns = pd.DataFrame(R, index=idx, columns=[f"S{i}.AX" for i in range(n_symbols)])
+    # Late listing and gaps in the history
+    returns.iloc[:50, 1] = np.nan
+    returns.iloc[::7, 2] = np.nan
+    returns.iloc[:100, 5] = np.nan
+    return returns, pd.Series(market, index=idx)
+
+
+def test_exposures_match_per_symbol_reference():
+    returns, market = _returns()
+
+    out = risk_model.market_exposures(returns, market, min_obs=30)
+
+    for symbol in returns.columns[:5]:
+        r, m = returns[symbol].align(market, join="inner")
+        keep = r.notna()
+        r, m = r[keep], m[keep]
+        assert out.loc[symbol, "n_obs"] == len(r)
+        assert np.isclose(out.loc[symbol, "vol"], np.std(r))
+        assert np.isclose(out.loc[symbol, "beta"], np.cov(r, m)[0, 1] / np.var(m, ddof=1))
+        assert np.isclose(out.loc[symbol, "corr"], np.corrcoef(r, m)[0, 1])
+    # 20 observations < min_obs
+    assert out.loc["S5.AX", ["vol", "beta", "corr"]].isna().all()
+
+
+def test_ewma_weights_recent_returns():
+    returns, market = _returns()
+    # Beta doubles in the last 30 days
+    returns.iloc[-30:, 0] = 2 * returns.iloc[-30:, 0]
+
+    flat = risk_model.market_exposures(returns, market, min_obs=30)
+    ewma = risk_model.market_exposures(returns, market, halflife=10, min_obs=30)
+
+    assert ewma.loc["S0.AX", "beta"] > flat.loc["S0.AX", "beta"]
+    np.testing.assert_allclose(risk_model.time_weights(3, 1), [0.25, 0.5, 1.0])
+
+
+def test_build_snapshot_rows():
+    returns, _ = _returns()
+    close = (1 + returns.fillna(0)).cumprod() * 10
+    close[returns.isna()] = np.nan
+    prices = close.stack().rename("close").reset_index()
+    prices.columns = ["dt", "symbol", "close"]
+
+    snapshot = risk_model.build_snapshot(prices, {"S0.AX": "Materials"}, halflife=None, min_obs=60)
+
+    assert list(snapshot.columns) == risk_model.SNAPSHOT_COLUMNS
+    assert "S5.AX" not in set(snapshot["symbol"])
+    assert snapshot["as_of"].iloc[0] == returns.index.max().date()
+    assert snapshot.set_index("symbol").loc["S0.AX", "sector"] == "Materials"
+    assert all(-1 <= json.loads(c)["market"] <= 1 for c in snapshot["factor_corr"])
@@ -0,0 +1,71 @@
+from unittest.mock import patch
+
+from services import sentiment
+from services.sentiment import SentimentService, content_hash
+
+
+def _service(**kwargs):
+    kwargs.setdefault("use_store", False)
+    return SentimentService(model_name="test-finbert", batch_size=2, **kwargs)
+
+
+def _fake_model(service, calls):
+    def score_batch(texts):
+        calls.append(list(texts))
+        return [{"label": "positive", "score": 0.9} for _ in texts]
+
+    return patch.multiple(service, _ensure_model=lambda: True, _score_batch=score_batch)
+
+
+def test_duplicates_are_scored_once_in_length_sorted_batches():
+    service = _service()
+    calls = []
+    texts = ["a much longer headline here", "short", "Short ", "mid length text"]
+
+    with _fake_model(service, calls):
+        results = service.analyze_batch(texts)
+        service.analyze_batch(["short"])
+
+    # "short" / "Short " hash identically; the second call is served from memory
+    assert calls == [["short", "mid length text"], ["a much longer headline here"]]
+    assert [r["label"] for r in results] == ["positive"] * 4
+    assert results[1]["model"] == "test-finbert"
+
+
+def test_stored_results_skip_inference():
+    service = _service()
+    calls = []
+    stored = {content_hash("profit upgrade"): {"label": "negative", "score": 0.7}}
+
+    with _fake_model(service, calls), \
+         patch.object(service, "_load_stored", return_value=stored):
+        result = service.analyze("profit upgrade")
+
+    assert calls == []
+    assert result == {"label": "negative", "score": 0.7, "model": "test-finbert"}
+
+
+def test_latency_budget_falls_back_to_keywords():
+    service = _service(latency_budget=1.5)
+    calls = []
+    clock = iter([0.0, 1.0, 2.0, 3.0])
+
+    with _fake_model(service, calls), \
+         patch.object(sentiment.time, "monotonic", side_effect=lambda: next(clock)):
+        results = service.analyze_batch(["strong profit growth", "weak loss", "flat"])
+
+    # Shortest batch is scored; the budget is spent before the second batch
+    assert calls == [["flat", "weak loss"]]
+    assert [r["model"] for r in results] == ["keyword", "test-finbert", "test-finbert"]
+    assert results[0]["label"] == "positive"
+
+
+def test_model_unavailable_uses_basic_sentiment():
+    service = _service()
+
+    with patch.object(service, "_ensure_model", return_value=False):
+        results = service.analyze_batch(["record profit and growth", ""])
+
+    assert results[0]["label"] == "positive"
+    assert results[0]["model"] == "keyword"
+    assert results[1]["label"] == "neutral"
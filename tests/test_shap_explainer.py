@@ -0,0 +1,40 @@
+import pickle
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+from analytics import shap_explainer
+
+
+def _fit_classifier(n=400, seed=7):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 4)), columns=["mom_12_1", "mom_6", "vol_90", "noise"])
+    y = (X["mom_12_1"] - 0.5 * X["vol_90"] + rng.normal(scale=0.3, size=n) > 0).astype(int)
+    model = lgb.LGBMClassifier(n_estimators=30, num_leaves=7, verbose=-1)
+    model.fit(X, y)
+    return model, X
+
+
+def test_contributions_sum_to_raw_score():
+    model, X = _fit_classifier()
+
+    contributions, base_values = shap_explainer.compute_contributions(model, X)
+
+    assert contributions.shape == (len(X), 4)
+    assert contributions.dtype == np.float32
+    raw = model.predict(X, raw_score=True)
+    np.testing.assert_allclose(base_values + contributions.sum(axis=1), raw, atol=1e-4)
+
+
+def test_compute_shap_values_ranks_informative_features(tmp_path):
+    model, X = _fit_classifier()
+    path = tmp_path / "clf.pkl"
+    path.write_bytes(pickle.dumps(model))
+
+    result = shap_explainer.compute_shap_values(str(path), X)
+    explanation = shap_explainer.explain_prediction(str(path), X, prediction_index=3)
+
+    assert list(result["feature_importance"])[0] == "mom_12_1"
+    assert set(explanation["shap_values"]) == set(X.columns)
+    assert np.isclose(explanation["prediction"], model.predict(X.iloc[3:4], raw_score=True)[0], atol=1e-4)
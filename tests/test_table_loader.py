@@ -0,0 +1,122 @@
+from datetime import date
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+from psycopg2 import sql
+
+from services.table_loader import copy_swap, copy_upsert, pg_columns
+
+
+def _render(stmt) -> str:
+    """Flatten a psycopg2 sql.Composable without a live connection."""
+    if isinstance(stmt, str):
+        return stmt
+    if isinstance(stmt, sql.Composed):
+        return "".join(_render(part) for part in stmt.seq)
+    if isinstance(stmt, sql.Identifier):
+        return ".".join(f'"{s}"' for s in stmt.strings)
+    if isinstance(stmt, sql.Literal):
+        return repr(stmt.wrapped)
+    return stmt.string
+
+
+def _frame(n=5):
+    return pd.DataFrame({
+        "date": [date(2024, 1, i + 1) for i in range(n)],
+        "symbol": ["AAA.AX"] * n,
+        "close": [1.0, np.nan, np.inf, 4.0, 5.0][:n],
+        "volume": np.arange(n, dtype="int64"),
+        "flag": [True, False, True, False, True][:n],
+    })
+
+
+def _conn(live_exists=True):
+    conn = MagicMock()
+    cur = conn.cursor.return_value.__enter__.return_value
+    cur.fetchone.return_value = ("model_a_features_extended" if live_exists else None,)
+    copied = []
+    cur.copy_expert.side_effect = lambda stmt, buf: copied.append((_render(stmt), buf.read()))
+    return conn, cur, copied
+
+
+def test_pg_columns_maps_frame_dtypes():
+    assert pg_columns(_frame()) == {
+        "date": "date",
+        "symbol": "text",
+        "close": "double precision",
+        "volume": "bigint",
+        "flag": "boolean",
+    }
+
+
+def test_copy_swap_loads_shadow_then_renames_in_one_transaction():
+    conn, cur, copied = _conn()
+    df = _frame()
+
+    rows = copy_swap(conn, "model_a_features_extended", [df], pg_columns(df), indexes=[("date", "symbol")], chunk_rows=2)
+
+    assert rows == 5
+    assert len(copied) == 3
+    assert copied[0][0].startswith('copy "model_a_features_extended__shadow" ("date", "symbol"')
+    # inf/NaN -> NULL, booleans as t/f
+    assert copied[0][1].splitlines() == ["2024-01-01,AAA.AX,1.0,0,t", r"2024-01-02,AAA.AX,\N,1,f"]
+    assert copied[1][1].splitlines()[0] == r"2024-01-03,AAA.AX,\N,2,t"
+
+    statements = [_render(c.args[0]) for c in cur.execute.call_args_list]
+    create_index = next(i for i, s in enumerate(statements) if s.startswith("create  index"))
+    lock = next(i for i, s in enumerate(statements) if s.startswith("lock table"))
+    assert '"model_a_features_extended__shadow"' in statements[create_index]
+    assert statements[lock:] == [
+        'lock table "model_a_features_extended" in access exclusive mode',
+        'drop table if exists "model_a_features_extended__old"',
+        'alter table "model_a_features_extended" rename to "model_a_features_extended__old"',
+        'alter table "model_a_features_extended__shadow" rename to "model_a_features_extended"',
+        'drop table "model_a_features_extended__old"',
+        'drop index if exists "model_a_features_extended_date_symbol_idx"',
+        'alter index "model_a_features_extended_date_symbol_idx__shadow" rename to "model_a_features_extended_date_symbol_idx"',
+    ]
+    # Load/index commit, then swap commit
+    assert conn.commit.call_count == 2
+
+
+def test_copy_swap_first_load_just_renames():
+    conn, cur, _ = _conn(live_exists=False)
+
+    copy_swap(conn, "features", [_frame()], pg_columns(_frame()))
+
+    statements = [_render(c.args[0]) for c in cur.execute.call_args_list]
+    assert not any(s.startswith("lock table") for s in statements)
+    assert statements[-1] == 'alter table "features__shadow" rename to "features"'
+
+
+def test_copy_failure_rolls_back_before_touching_live_table():
+    conn, cur, _ = _conn()
+    cur.copy_expert.side_effect = RuntimeError("bad row")
+
+    with pytest.raises(RuntimeError):
+        copy_swap(conn, "features", [_frame()], pg_columns(_frame()))
+
+    statements = [_render(c.args[0]) for c in cur.execute.call_args_list]
+    assert not any("rename" in s for s in statements)
+    conn.rollback.assert_called_once()
+    conn.commit.assert_not_called()
+
+
+def test_copy_upsert_stages_then_merges_on_conflict():
+    conn, cur, copied = _conn()
+    df = _frame()
+
+    rows = copy_upsert(conn, "snapshot", [df], ["date", "symbol", "close"], conflict=("date", "symbol"))
+
+    assert rows == 5
+    assert copied[0][0].startswith('copy "snapshot__staging" ("date", "symbol", "close")')
+    statements = [_render(c.args[0]) for c in cur.execute.call_args_list]
+    assert statements == [
+        'create temp table "snapshot__staging" on commit drop as select "date", "symbol", "close" '
+        'from "snapshot" with no data',
+        'insert into "snapshot" ("date", "symbol", "close") select "date", "symbol", "close" '
+        'from "snapshot__staging" on conflict ("date", "symbol") do update set "close" = excluded."close"',
+    ]
+    conn.commit.assert_called_once()
@@ -0,0 +1,41 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from analytics import trading_calendar as tc
+
+
+def test_holiday_rules_and_substitutes():
+    assert tc.asx_holidays(2024) == [
+        date(2024, 1, 1), date(2024, 1, 26), date(2024, 3, 29), date(2024, 4, 1),
+        date(2024, 4, 25), date(2024, 6, 10), date(2024, 12, 25), date(2024, 12, 26),
+    ]
+    # Christmas on Saturday, Boxing Day on Sunday -> Monday and Tuesday
+    assert date(2021, 12, 27) in tc.asx_holidays(2021)
+    assert date(2021, 12, 28) in tc.asx_holidays(2021)
+    # Anzac Day on a weekend has no substitute
+    assert all(d.month != 4 or d.day != 26 for d in tc.asx_holidays(2021))
+    # One-off closure
+    assert date(2022, 9, 22) in tc.asx_holidays(2022)
+
+
+def test_scalar_helpers():
+    assert tc.is_trading_day(date(2024, 1, 29))
+    assert not tc.is_trading_day("2024-01-26")
+    assert tc.next_trading_day(date(2024, 12, 24)) == date(2024, 12, 27)
+    assert tc.previous_trading_day(date(2024, 1, 2)) == date(2023, 12, 29)
+    assert tc.latest_trading_day(date(2024, 1, 28)) == date(2024, 1, 25)
+    assert tc.offset(date(2024, 1, 27), 1) == date(2024, 1, 29)
+    assert tc.count_trading_days("2024-01-01", "2025-01-01") == 254
+
+
+def test_vectorized_offsets_match_trading_day_index():
+    days = tc.trading_days("2023-01-01", "2024-12-31")
+    dates = pd.Series(pd.to_datetime(days[:100]))
+
+    shifted = tc.offset(dates, 21)
+
+    assert isinstance(shifted, np.ndarray)
+    np.testing.assert_array_equal(shifted, days[21:121])
+    np.testing.assert_array_equal(tc.offset(shifted, -21), days[:100])